@@ -184,9 +184,47 @@ CORS_ALLOW_CREDENTIALS = True
 # Configuración para Machine Learning
 ML_SETTINGS = {
     'MODELS_DIR': os.path.join(BASE_DIR, 'machine_learning', 'models'),
+    # Snapshots .npy de los datos de entrenamiento por dataset (TrainingDataLoader)
+    'TRAINING_CACHE_DIR': os.path.join(BASE_DIR, 'machine_learning', 'cache'),
     'DEFAULT_TRAIN_TEST_SPLIT': 0.2,
     'DEFAULT_CV_FOLDS': 5,
-    'MAX_PREDICTIONS_HISTORY': 50
+    # Procesos para entrenar candidatos y folds en paralelo (-1: todos los núcleos)
+    'TRAINING_N_JOBS': -1,
+    # Reentrenamiento incremental: caída de R² en el hold-out que se tolera al promover
+    'INCREMENTAL_TOLERANCIA_R2': 0.0,
+    'MAX_PREDICTIONS_HISTORY': 50,
+    'MAX_PREDICCIONES_LOTE': 5000,
+    # Caché de predicciones por vector de features y modelo (ver CACHES['predicciones'])
+    'PREDICTION_CACHE_TTL': 3600,  # segundos
+    'PREDICTION_CACHE_MAX_ENTRIES': 50000
+}
+
+# Cachés. La de predicciones se comparte entre workers con Redis si se define
+# PREDICCIONES_CACHE_URL (p. ej. redis://localhost:6379/1); si no, es local a cada proceso.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'predicciones': {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': os.environ['PREDICCIONES_CACHE_URL'],
+        'TIMEOUT': ML_SETTINGS['PREDICTION_CACHE_TTL'],
+        'KEY_PREFIX': 'ml',
+    } if os.environ.get('PREDICCIONES_CACHE_URL') else {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'predicciones-ml',
+        'TIMEOUT': ML_SETTINGS['PREDICTION_CACHE_TTL'],
+        'OPTIONS': {'MAX_ENTRIES': ML_SETTINGS['PREDICTION_CACHE_MAX_ENTRIES']},
+    },
+}
+
+# Cola de trabajos en segundo plano (comando procesar_trabajos)
+TRABAJOS_SETTINGS = {
+    'WORKERS': 2,
+    'INTERVALO_SONDEO': 2,  # segundos entre consultas a la cola
+    'MINUTOS_BLOQUEO': 30,  # trabajos EN_PROCESO sin actividad se reencolan
+    'SEGUNDOS_REVISION_BLOQUEOS': 60,  # cada cuánto el worker busca trabajos bloqueados de otros workers
+    'MAX_INTENTOS': 3
 }
 
 # Logging específico para ML
@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Trimestre, PromedioTrimestral, PromedioAnual
+from .models import Trimestre, PromedioTrimestral, PromedioAnual, TrabajoAsincrono
 
 @admin.register(Trimestre)
 class TrimestreAdmin(admin.ModelAdmin):
@@ -22,3 +22,9 @@ class PromedioAnualAdmin(admin.ModelAdmin):
     list_filter = ['año_academico', 'aprobado_anual', 'materia__curso']
     search_fields = ['estudiante__nombre', 'estudiante__apellido', 'materia__nombre']
     readonly_fields = ['fecha_calculo', 'created_at']
+
+@admin.register(TrabajoAsincrono)
+class TrabajoAsincronoAdmin(admin.ModelAdmin):
+    list_display = ['id', 'tipo', 'estado', 'porcentaje', 'intentos', 'fecha_creacion', 'fecha_fin']
+    list_filter = ['tipo', 'estado']
+    readonly_fields = ['fecha_creacion', 'fecha_inicio', 'fecha_fin', 'fecha_actualizacion']
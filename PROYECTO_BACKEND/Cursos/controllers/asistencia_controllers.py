@@ -7,6 +7,7 @@ from django.db import transaction
 from django.utils import timezone
 from datetime import datetime
 from ..models import Asistencia, Materia
+from ..services import AsistenciaMasivaService
 from Usuarios.models import Usuario
 
 @api_view(['POST'])
@@ -218,78 +219,8 @@ def registrar_asistencias_masivo(request):
                 status=status.HTTP_400_BAD_REQUEST
             )
         
-        # Registrar asistencias en una transacción
-        resultados = []
-        with transaction.atomic():
-            for asistencia_data in asistencias_data:
-                estudiante_id = asistencia_data.get('estudiante_id')
-                presente = asistencia_data.get('presente', True)
-                justificada = asistencia_data.get('justificada', False)
-                
-                # Obtener estudiante
-                try:
-                    estudiante = Usuario.objects.get(id=estudiante_id)
-                    # Verificar que sea estudiante
-                    if not hasattr(estudiante, 'rol') or estudiante.rol.nombre != 'Estudiante':
-                        resultados.append({
-                            'estudiante_id': estudiante_id,
-                            'error': 'El usuario no es un estudiante',
-                            'success': False
-                        })
-                        continue
-                except Usuario.DoesNotExist:
-                    resultados.append({
-                        'estudiante_id': estudiante_id,
-                        'error': 'Estudiante no encontrado',
-                        'success': False
-                    })
-                    continue
-                
-                # Verificar que pertenezca al curso
-                if not estudiante.curso:
-                    resultados.append({
-                        'estudiante_id': estudiante_id,
-                        'error': 'El estudiante no tiene un curso asignado',
-                        'success': False
-                    })
-                    continue
-
-                if estudiante.curso != materia.curso:
-                    resultados.append({
-                        'estudiante_id': estudiante_id,
-                        'error': 'El estudiante no pertenece al curso de esta materia',
-                        'success': False
-                    })
-                    continue
-                
-                # ✅ Crear o actualizar asistencia con trimestre
-                try:
-                    asistencia, created = Asistencia.objects.update_or_create(
-                        estudiante=estudiante,
-                        materia=materia,
-                        fecha=fecha,
-                        defaults={
-                            'presente': presente,
-                            'justificada': justificada,
-                            'trimestre': trimestre  # ✅ Incluir trimestre
-                        }
-                    )
-                    
-                    resultados.append({
-                        'estudiante_id': estudiante_id,
-                        'estudiante': f"{estudiante.nombre} {estudiante.apellido}",
-                        'presente': presente,
-                        'justificada': justificada,
-                        'trimestre': str(trimestre),  # ✅ Incluir en respuesta
-                        'created': created,
-                        'success': True
-                    })
-                except Exception as e:
-                    resultados.append({
-                        'estudiante_id': estudiante_id,
-                        'error': str(e),
-                        'success': False
-                    })
+        # Registrar todas las asistencias de la clase por lotes
+        resultados = AsistenciaMasivaService(materia, trimestre, fecha).registrar(asistencias_data)
         
         # Preparar respuesta
         return Response({
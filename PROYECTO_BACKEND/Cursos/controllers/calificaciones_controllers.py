@@ -10,6 +10,9 @@ from django.contrib.contenttypes.models import ContentType
 from ..models import (Calificacion, EvaluacionEntregable, EvaluacionParticipacion,
                       Materia, TipoEvaluacion)
 from Usuarios.models import Usuario
+from ..services.calificacion_service import CalificacionMasivaService
+from ..services.exportacion_service import FORMATOS_EXPORTACION, ExportacionService
+from ..services.reporte_service import PlanillaCalificacionesService
 
 
 @api_view(['POST'])
@@ -156,73 +159,10 @@ def registrar_calificaciones_masivo(request):
                 status=status.HTTP_404_NOT_FOUND
             )
             
-        resultados = []
-        
-        with transaction.atomic():
-            for cal_data in calificaciones_data:
-                try:
-                    estudiante_id = cal_data.get('estudiante_id')
-                    nota = cal_data.get('nota')
-                    
-                    if not estudiante_id or nota is None:
-                        resultados.append({
-                            'estudiante_id': estudiante_id,
-                            'error': 'Se requiere estudiante_id y nota',
-                            'success': False
-                        })
-                        continue
-                    
-                    # Obtener estudiante
-                    try:
-                        estudiante = Usuario.objects.get(id=estudiante_id, rol__nombre='Estudiante')
-                    except Usuario.DoesNotExist:
-                        resultados.append({
-                            'estudiante_id': estudiante_id,
-                            'error': 'Estudiante no encontrado',
-                            'success': False
-                        })
-                        continue
-                    
-                    # Convertir a Decimal
-                    nota = Decimal(str(nota))
-                    if nota < 0 or nota > nota_maxima:
-                        resultados.append({
-                            'estudiante_id': estudiante_id,
-                            'error': f'Nota fuera del rango válido (0-{nota_maxima})',
-                            'success': False
-                        })
-                        continue
-                    
-                    # Crear o actualizar calificación
-                    calificacion, created = Calificacion.objects.update_or_create(
-                        content_type=content_type,
-                        object_id=evaluacion.id,
-                        estudiante=estudiante,
-                        defaults={
-                            'nota': nota,
-                            'observaciones': cal_data.get('observaciones', ''),
-                            'retroalimentacion': cal_data.get('retroalimentacion', ''),
-                            'finalizada': True,
-                            'fecha_calificacion': timezone.now()
-                        }
-                    )
-                    
-                    resultados.append({
-                        'estudiante_id': estudiante_id,
-                        'estudiante': f"{estudiante.nombre} {estudiante.apellido}",
-                        'nota': float(calificacion.nota),
-                        'porcentaje': 100.0,  # O el cálculo que corresponda
-                        'esta_aprobado': float(calificacion.nota) >= float(nota_minima_aprobacion),
-                        'created': created,
-                        'success': True
-                    })
-                
-                except Exception as e:
-                    resultados.append({
-                        'estudiante_id': cal_data.get('estudiante_id'),
-                        'error': str(e),
-                        'success': False
-                    })
+        # Validación y escritura por lotes (consultas constantes por solicitud)
+        resultados = CalificacionMasivaService(
+            evaluacion, content_type, nota_maxima, nota_minima_aprobacion
+        ).registrar(calificaciones_data)
         
         exitosos = [r for r in resultados if r['success']]
         errores = [r for r in resultados if not r['success']]
@@ -475,153 +415,62 @@ def get_calificaciones_por_estudiante(request, estudiante_id):
 def get_reporte_calificaciones_materia(request, materia_id):
     """
     Genera un reporte completo de calificaciones por materia.
+
+    Query params:
+    - formato: 'json' (por defecto, un objeto por estudiante), 'columnar'
+      (listas paralelas y matriz de notas), 'csv' o 'xlsx' (planilla descargable)
     """
     try:
-        from ..utils import get_evaluaciones_activas
-        
         try:
-            materia = Materia.objects.get(id=materia_id)
+            materia = Materia.objects.select_related('curso__nivel').get(id=materia_id)
         except Materia.DoesNotExist:
             return Response(
                 {'error': 'Materia no encontrada'},
                 status=status.HTTP_404_NOT_FOUND
             )
-        
-        # Obtener estudiantes del curso
-        estudiantes = Usuario.objects.filter(
-            curso=materia.curso,
-            rol__nombre='Estudiante'
-        ).order_by('apellido', 'nombre')
-        
-        # Obtener evaluaciones de la materia (ambos tipos)
-        # Se elimina el filtro de publicado=True
-        evaluaciones_entregable = EvaluacionEntregable.objects.filter(
-            materia=materia,
-            activo=True
-            # publicado=True  <-- Se eliminó esta línea
-        )
-        evaluaciones_participacion = EvaluacionParticipacion.objects.filter(
-            materia=materia,
-            activo=True
-            # publicado=True  <-- Se eliminó esta línea
-        )
-        
-        # Combinar y ordenar todas las evaluaciones
-        evaluaciones = list(evaluaciones_entregable) + list(evaluaciones_participacion)
-        # Ordenar por fecha (primero intentar fecha_asignacion, luego fecha_registro)
-        evaluaciones.sort(key=lambda x: getattr(x, 'fecha_asignacion', getattr(x, 'fecha_registro', None)))
-        
-        # Construir reporte
-        reporte_data = []
-        content_types = {
-            'entregable': ContentType.objects.get_for_model(EvaluacionEntregable),
-            'participacion': ContentType.objects.get_for_model(EvaluacionParticipacion)
-        }
-        
-        for estudiante in estudiantes:
-            estudiante_data = {
-                'estudiante': {
-                    'id': estudiante.id,
-                    'nombre': f"{estudiante.nombre} {estudiante.apellido}",
-                    'codigo': estudiante.codigo
-                },
-                'calificaciones': {},
-                'promedio_final': 0.0,
-                'total_porcentaje': 0.0,
-                'esta_aprobado': False
-            }
-            
-            # Inicializar variables como Decimal
-            suma_ponderada = Decimal('0')
-            total_porcentaje = Decimal('0')
-            
-            for evaluacion in evaluaciones:
-                # Determinar el tipo y ContentType para la evaluación
-                if isinstance(evaluacion, EvaluacionEntregable):
-                    content_type = content_types['entregable']
-                    nota_minima = evaluacion.nota_minima_aprobacion
-                else:
-                    content_type = content_types['participacion']
-                    nota_minima = Decimal('51.0')  # Valor por defecto
-                
-                try:
-                    calificacion = Calificacion.objects.get(
-                        content_type=content_type,
-                        object_id=evaluacion.id,
-                        estudiante=estudiante
-                    )
-                    
-                    # Ahora todas las operaciones son entre Decimal
-                    nota_ponderada = (calificacion.nota * evaluacion.porcentaje_nota_final) / Decimal('100')
-                    suma_ponderada += nota_ponderada
-                    total_porcentaje += evaluacion.porcentaje_nota_final
-                    
-                    estudiante_data['calificaciones'][str(evaluacion.id)] = {
-                        'nota': float(calificacion.nota),
-                        'porcentaje': 100.0,  # O cálculo directo según tu lógica
-                        'esta_aprobado': float(calificacion.nota) >= float(nota_minima),
-                        'entrega_tardia': calificacion.entrega_tardia
-                    }
-                except Calificacion.DoesNotExist:
-                    estudiante_data['calificaciones'][str(evaluacion.id)] = {
-                        'nota': None,
-                        'porcentaje': None,
-                        'esta_aprobado': False,
-                        'entrega_tardia': False
-                    }
-            
-            # Calcular promedio final si hay evaluaciones
-            if total_porcentaje > Decimal('0'):
-                promedio = (suma_ponderada / total_porcentaje) * Decimal('100')
-                estudiante_data['promedio_final'] = round(float(promedio), 2)  # Convertir a float solo para la respuesta
-                estudiante_data['esta_aprobado'] = promedio >= Decimal('51.0')
-            else:
-                estudiante_data['promedio_final'] = 0.0
-                estudiante_data['esta_aprobado'] = False
-            
-            estudiante_data['total_porcentaje'] = float(total_porcentaje)  # Convertir a float solo para la respuesta
-            reporte_data.append(estudiante_data)
-        
-        # Información de evaluaciones para el frontend
-        evaluaciones_info = []
-        for evaluacion in evaluaciones:
-            eval_data = {
-                'id': evaluacion.id,
-                'titulo': evaluacion.titulo,
-                'tipo': evaluacion.tipo_evaluacion.get_nombre_display(),
-                'porcentaje_nota_final': float(evaluacion.porcentaje_nota_final),
-            }
-            
-            # Añadir campos específicos según tipo
-            if isinstance(evaluacion, EvaluacionEntregable):
-                eval_data.update({
-                    'fecha_entrega': evaluacion.fecha_entrega,
-                    'nota_maxima': float(evaluacion.nota_maxima),
-                    'nota_minima_aprobacion': float(evaluacion.nota_minima_aprobacion),
-                    'tipo_objeto': 'entregable'
-                })
-            else:
-                eval_data.update({
-                    'fecha_registro': evaluacion.fecha_registro,
-                    'nota_maxima': 100.0,
-                    'nota_minima_aprobacion': 51.0,
-                    'tipo_objeto': 'participacion'
-                })
-                
-            evaluaciones_info.append(eval_data)
-        
-        return Response({
+
+        formato = request.query_params.get('formato', 'json')
+        if formato not in ('json', 'columnar') + FORMATOS_EXPORTACION:
+            return Response(
+                {'error': "formato debe ser 'json', 'columnar', 'csv' o 'xlsx'"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        # Matriz estudiantes × evaluaciones construida con una consulta de calificaciones
+        servicio = PlanillaCalificacionesService()
+        planilla = servicio.construir(materia)
+
+        if formato in FORMATOS_EXPORTACION:
+            return ExportacionService(
+                f'calificaciones_materia_{materia.id}',
+                servicio.columnas_exportacion(planilla)
+            ).respuesta(formato, servicio.filas_exportacion(planilla))
+
+        if formato == 'columnar':
+            columnas = servicio.a_columnas(planilla)
+            evaluaciones, estudiantes = columnas.pop('evaluaciones'), columnas.pop('estudiantes')
+        else:
+            columnas = {}
+            evaluaciones = servicio.evaluaciones_info(planilla)
+            estudiantes = servicio.a_filas(planilla)
+
+        datos = {
             'materia': {
                 'id': materia.id,
                 'nombre': materia.nombre,
                 'curso': str(materia.curso)
             },
-            'evaluaciones': evaluaciones_info,
-            'estudiantes': reporte_data,
-            'total_estudiantes': len(reporte_data),
-            'total_evaluaciones': len(evaluaciones),
+            'evaluaciones': evaluaciones,
+            'estudiantes': estudiantes,
+            'total_estudiantes': len(planilla.estudiantes),
+            'total_evaluaciones': len(planilla.evaluaciones),
             'nota_minima_aprobacion_general': 51.0
-        })
+        }
+        if columnas:
+            datos['formato'] = 'columnar'
+            datos.update(columnas)
+
+        return Response(datos)
     
     except Exception as e:
         return Response(
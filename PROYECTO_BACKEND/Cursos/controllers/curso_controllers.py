@@ -4,8 +4,18 @@ from rest_framework.response import Response
 from rest_framework import status
 from ..models import Curso, Nivel, Trimestre  # Eliminar Usuario de aquí
 from ..serializers import CursoSerializer
+from ..services.listado_service import CampoCalculado, ListadoService
 from django.db.models import F
 
+# Columnas del listado de estudiantes de un curso (get_estudiantes_de_curso)
+CAMPOS_ESTUDIANTE_CURSO = {
+    'id': 'id',
+    'codigo': 'codigo',
+    'nombre': 'nombre',
+    'apellido': 'apellido',
+    'nombre_completo': CampoCalculado(['nombre', 'apellido'], lambda fila: f"{fila['nombre']} {fila['apellido']}")
+}
+
 @api_view(['GET'])
 @permission_classes([AllowAny])
 def get_cursos(request):
@@ -236,11 +246,15 @@ def get_estudiantes_sin_curso(request):
 def get_estudiantes_de_curso(request, curso_id):
     """
     Obtiene todos los estudiantes asignados a un curso específico.
+
+    Parámetros opcionales: fields (proyección), limite y cursor (paginación en el orden del listado).
     """
     try:
+        listado = ListadoService(request, CAMPOS_ESTUDIANTE_CURSO)
+        
         # Verificar que el curso existe
         try:
-            curso = Curso.objects.get(id=curso_id)
+            curso = Curso.objects.select_related('nivel').get(id=curso_id)
         except Curso.DoesNotExist:
             return Response(
                 {'error': f'Curso con id {curso_id} no existe'},
@@ -250,24 +264,16 @@ def get_estudiantes_de_curso(request, curso_id):
         # Importar Usuario donde se necesita
         from Usuarios.models import Usuario
         
-        # Obtener estudiantes asignados a este curso
+        # Obtener estudiantes asignados a este curso (solo las columnas de la respuesta)
         estudiantes = Usuario.objects.filter(
             curso=curso,
             rol__nombre='Estudiante'
-        ).select_related('rol')
+        )
         
         # Preparar respuesta
-        estudiantes_data = []
-        for estudiante in estudiantes:
-            estudiantes_data.append({
-                'id': estudiante.id,
-                'codigo': estudiante.codigo,
-                'nombre': estudiante.nombre,
-                'apellido': estudiante.apellido,
-                'nombre_completo': f"{estudiante.nombre} {estudiante.apellido}"
-            })
+        estudiantes_data = listado.listar(estudiantes)
         
-        return Response({
+        respuesta = {
             'curso': {
                 'id': curso.id,
                 'nombre': str(curso),
@@ -276,9 +282,18 @@ def get_estudiantes_de_curso(request, curso_id):
                 'paralelo': curso.paralelo
             },
             'estudiantes': estudiantes_data,
-            'total_estudiantes': len(estudiantes_data)
-        })
+            'total_estudiantes': estudiantes.count() if listado.paginado else len(estudiantes_data)
+        }
+        if listado.paginado:
+            respuesta.update(listado.datos_paginacion())
+        
+        return Response(respuesta)
     
+    except ValueError as e:
+        return Response(
+            {'error': str(e)},
+            status=status.HTTP_400_BAD_REQUEST
+        )
     except Exception as e:
         return Response(
             {'error': str(e)},
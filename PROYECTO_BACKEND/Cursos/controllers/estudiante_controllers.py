@@ -10,7 +10,11 @@ from decimal import Decimal
 
 from Usuarios.models import Usuario
 from ..models import Curso, Materia, EvaluacionEntregable, EvaluacionParticipacion, Calificacion, Asistencia, TipoEvaluacion, Trimestre, PromedioTrimestral
-from ..utils import get_evaluacion_by_id, get_evaluaciones_activas
+from ..utils import get_evaluacion_by_id, get_evaluaciones_activas, es_solicitud_asincrona
+from ..services.estudiante_service import DatosEstudianteService
+from ..services.exportacion_service import FORMATOS_EXPORTACION, ExportacionService
+from ..services.promedio_service import PromedioTrimestralService
+from ..services.trabajo_service import TrabajoService
 
 @api_view(['GET'])
 def obtener_materias_estudiante(request):
@@ -202,7 +206,7 @@ def obtener_evaluaciones_estudiante(request, estudiante_id):
             )
         
         # Verificar que tenga un curso asignado
-        if not estudiante.curso:
+        if not estudiante.curso_id:
             return Response(
                 {'error': 'El estudiante no tiene un curso asignado'},
                 status=status.HTTP_404_NOT_FOUND
@@ -213,61 +217,30 @@ def obtener_evaluaciones_estudiante(request, estudiante_id):
         trimestre_id = request.query_params.get('trimestre_id')
         anio = request.query_params.get('anio')  # Nuevo parámetro
         
-        # Construir filtros para las evaluaciones
-        filtros_evaluacion = Q(materia__curso=estudiante.curso)
-        
-        if materia_id:
-            filtros_evaluacion &= Q(materia_id=materia_id)
-            
-        if trimestre_id:
-            filtros_evaluacion &= Q(trimestre_id=trimestre_id)
-            
-        # Confirmar que el filtro se está aplicando correctamente en el backend
-        if anio:
-            # Usar un log para verificar que el parámetro llegue correctamente
-            print(f"Filtrando por año: {anio}")
-            filtros_evaluacion &= Q(trimestre__año_academico=anio)
-        
-        # Obtener evaluaciones de ambos tipos
-        evaluaciones_entregables = EvaluacionEntregable.objects.filter(
-            filtros_evaluacion
-        ).select_related('tipo_evaluacion', 'materia', 'trimestre')
-        
-        evaluaciones_participacion = EvaluacionParticipacion.objects.filter(
-            filtros_evaluacion
-        ).select_related('tipo_evaluacion', 'materia', 'trimestre')
-        
-        # Preparar ContentTypes para consultas de calificaciones
-        entregable_ct = ContentType.objects.get_for_model(EvaluacionEntregable)
-        participacion_ct = ContentType.objects.get_for_model(EvaluacionParticipacion)
+        # Evaluaciones de ambos tipos y todas las calificaciones del estudiante en 3 consultas
+        evaluaciones = DatosEstudianteService(estudiante).evaluaciones(
+            materia_id=materia_id,
+            trimestre_id=trimestre_id,
+            anio=anio
+        )
         
         # Preparar la respuesta
         resultado = []
         
-        # Procesar evaluaciones entregables
-        for evaluacion in evaluaciones_entregables:
-            # Intentar obtener la calificación del estudiante para esta evaluación
-            try:
-                calificacion = Calificacion.objects.get(
-                    content_type=entregable_ct,
-                    object_id=evaluacion.id,
-                    estudiante=estudiante
-                )
-                calificacion_data = {
-                    'id': calificacion.id,
-                    'nota': float(calificacion.nota),
-                    'nota_final': float(calificacion.calcular_nota_con_penalizacion()),  # Cambio aquí
-                    'entrega_tardia': calificacion.entrega_tardia,
-                    'penalizacion_aplicada': float(calificacion.penalizacion_aplicada),
-                    'fecha_entrega': calificacion.fecha_entrega,
-                    'observaciones': calificacion.observaciones,
-                    'retroalimentacion': calificacion.retroalimentacion,
-                    'finalizada': calificacion.finalizada
-                }
-            except Calificacion.DoesNotExist:
-                calificacion_data = None
+        for tipo_objeto, evaluacion, calificacion in evaluaciones:
+            calificacion_data = {
+                'id': calificacion.id,
+                'nota': float(calificacion.nota),
+                'nota_final': float(calificacion.calcular_nota_con_penalizacion()),
+                'entrega_tardia': calificacion.entrega_tardia,
+                'penalizacion_aplicada': float(calificacion.penalizacion_aplicada),
+                'fecha_entrega': calificacion.fecha_entrega,
+                'observaciones': calificacion.observaciones,
+                'retroalimentacion': calificacion.retroalimentacion,
+                'finalizada': calificacion.finalizada
+            } if calificacion else None
             
-            # Datos de la evaluación
+            # Datos comunes de la evaluación
             evaluacion_data = {
                 'id': evaluacion.id,
                 'titulo': evaluacion.titulo,
@@ -275,69 +248,31 @@ def obtener_evaluaciones_estudiante(request, estudiante_id):
                 'tipo_evaluacion': {
                     'id': evaluacion.tipo_evaluacion.id,
                     'nombre': evaluacion.tipo_evaluacion.nombre
-                } if evaluacion.tipo_evaluacion else None,
-                'fecha_asignacion': evaluacion.fecha_asignacion,
-                'fecha_entrega': evaluacion.fecha_entrega,
-                'fecha_limite': evaluacion.fecha_limite,
-                'nota_maxima': float(evaluacion.nota_maxima),
-                'nota_minima_aprobacion': float(evaluacion.nota_minima_aprobacion),
-                'porcentaje_nota_final': float(evaluacion.porcentaje_nota_final),
-                'permite_entrega_tardia': evaluacion.permite_entrega_tardia,
-                'penalizacion_tardio': float(evaluacion.penalizacion_tardio),
-                'activo': evaluacion.activo,
-                'publicado': evaluacion.publicado,
-                'tipo_objeto': 'entregable',
-                'materia': {
-                    'id': evaluacion.materia.id,
-                    'nombre': evaluacion.materia.nombre
-                },
-                'trimestre': {
-                    'id': evaluacion.trimestre.id,
-                    'nombre': evaluacion.trimestre.nombre,
-                    'año_academico': evaluacion.trimestre.año_academico
-                } if evaluacion.trimestre else None,
-                'calificacion': calificacion_data
+                } if evaluacion.tipo_evaluacion else None
             }
             
-            resultado.append(evaluacion_data)
-            
-        # Procesar evaluaciones de participación
-        for evaluacion in evaluaciones_participacion:
-            # Intentar obtener la calificación del estudiante para esta evaluación
-            try:
-                calificacion = Calificacion.objects.get(
-                    content_type=participacion_ct,
-                    object_id=evaluacion.id,
-                    estudiante=estudiante
-                )
-                calificacion_data = {
-                    'id': calificacion.id,
-                    'nota': float(calificacion.nota),
-                    'nota_final': float(calificacion.calcular_nota_con_penalizacion()),  # Cambio aquí
-                    'entrega_tardia': calificacion.entrega_tardia,
-                    'penalizacion_aplicada': float(calificacion.penalizacion_aplicada),
-                    'fecha_entrega': calificacion.fecha_entrega,
-                    'observaciones': calificacion.observaciones,
-                    'retroalimentacion': calificacion.retroalimentacion,
-                    'finalizada': calificacion.finalizada
-                }
-            except Calificacion.DoesNotExist:
-                calificacion_data = None
+            # Campos específicos de cada tipo
+            if tipo_objeto == 'entregable':
+                evaluacion_data.update({
+                    'fecha_asignacion': evaluacion.fecha_asignacion,
+                    'fecha_entrega': evaluacion.fecha_entrega,
+                    'fecha_limite': evaluacion.fecha_limite,
+                    'nota_maxima': float(evaluacion.nota_maxima),
+                    'nota_minima_aprobacion': float(evaluacion.nota_minima_aprobacion),
+                    'porcentaje_nota_final': float(evaluacion.porcentaje_nota_final),
+                    'permite_entrega_tardia': evaluacion.permite_entrega_tardia,
+                    'penalizacion_tardio': float(evaluacion.penalizacion_tardio)
+                })
+            else:
+                evaluacion_data.update({
+                    'fecha_registro': evaluacion.fecha_registro,
+                    'porcentaje_nota_final': float(evaluacion.porcentaje_nota_final)
+                })
             
-            # Datos de la evaluación (campos específicos para participación)
-            evaluacion_data = {
-                'id': evaluacion.id,
-                'titulo': evaluacion.titulo,
-                'descripcion': evaluacion.descripcion,
-                'tipo_evaluacion': {
-                    'id': evaluacion.tipo_evaluacion.id,
-                    'nombre': evaluacion.tipo_evaluacion.nombre
-                } if evaluacion.tipo_evaluacion else None,
-                'fecha_registro': evaluacion.fecha_registro,
-                'porcentaje_nota_final': float(evaluacion.porcentaje_nota_final),
+            evaluacion_data.update({
                 'activo': evaluacion.activo,
                 'publicado': evaluacion.publicado,
-                'tipo_objeto': 'participacion',
+                'tipo_objeto': tipo_objeto,
                 'materia': {
                     'id': evaluacion.materia.id,
                     'nombre': evaluacion.materia.nombre
@@ -348,7 +283,7 @@ def obtener_evaluaciones_estudiante(request, estudiante_id):
                     'año_academico': evaluacion.trimestre.año_academico
                 } if evaluacion.trimestre else None,
                 'calificacion': calificacion_data
-            }
+            })
             
             resultado.append(evaluacion_data)
         
@@ -485,162 +420,24 @@ def calcular_promedios_trimestre(request, trimestre_id):
                 status=status.HTTP_404_NOT_FOUND
             )
         
-        # Iniciar transacción para mantener consistencia de datos
-        with transaction.atomic():
-            resultados = []
-            
-            # Obtener parámetros opcionales
-            solo_materia_id = request.data.get('solo_materia_id')
-            solo_estudiantes = request.data.get('solo_estudiantes')
-            
-            # Filtrar materias si es necesario
-            materias_query = Materia.objects.all()
-            if solo_materia_id:
-                materias_query = materias_query.filter(id=solo_materia_id)
-            
-            # Procesar cada materia
-            for materia in materias_query:
-                print(f"Procesando materia: {materia.nombre}")
-                
-                # Obtener estudiantes del curso
-                estudiantes = Usuario.objects.filter(
-                    curso=materia.curso,
-                    rol__nombre='Estudiante'
-                ).order_by('apellido', 'nombre')
-                
-                # Filtrar estudiantes si es necesario
-                if solo_estudiantes:
-                    estudiantes = estudiantes.filter(id__in=request.data['solo_estudiantes'])
-                
-                for estudiante in estudiantes:
-                    # Obtener evaluaciones del trimestre (ambos tipos)
-                    evaluaciones_entregable = EvaluacionEntregable.objects.filter(
-                        materia=materia,
-                        trimestre=trimestre
-                    )
-                    
-                    evaluaciones_participacion = EvaluacionParticipacion.objects.filter(
-                        materia=materia,
-                        trimestre=trimestre
-                    )
-                    
-                    # Contenttypes para calificaciones
-                    entregable_ct = ContentType.objects.get_for_model(EvaluacionEntregable)
-                    participacion_ct = ContentType.objects.get_for_model(EvaluacionParticipacion)
-                    
-                    print(f"Debug - Estudiante: {estudiante.nombre}, Materia: {materia.nombre}")
-                    print(f"Debug - Evaluaciones entregables: {evaluaciones_entregable.count()}")
-                    print(f"Debug - Evaluaciones participación: {evaluaciones_participacion.count()}")
-                    
-                    # Combinar evaluaciones y verificar si hay alguna
-                    total_evaluaciones = evaluaciones_entregable.count() + evaluaciones_participacion.count()
-                    
-                    if total_evaluaciones > 0:
-                        suma_ponderada = Decimal('0.0')  # ✅ USAR DECIMAL
-                        total_porcentaje = Decimal('0.0')  # ✅ USAR DECIMAL
-                        calificaciones_encontradas = 0
-                        
-                        # Procesar evaluaciones entregables
-                        for evaluacion in evaluaciones_entregables: # type: ignore
-                            try:
-                                calificacion = Calificacion.objects.get(
-                                    content_type=entregable_ct,
-                                    object_id=evaluacion.id,
-                                    estudiante=estudiante
-                                )
-                                
-                                # ✅ CORRECCIÓN: Asegurar que todo sea Decimal
-                                nota_estudiante = calificacion.calcular_nota_con_penalizacion()
-                                porcentaje_eval = Decimal(str(evaluacion.porcentaje_nota_final))
-                                
-                                # ✅ CORRECCIÓN: Operaciones con Decimal
-                                nota_ponderada = nota_estudiante * (porcentaje_eval / Decimal('100.0'))
-                                suma_ponderada += nota_ponderada
-                                total_porcentaje += porcentaje_eval
-                                calificaciones_encontradas += 1
-                                
-                                print(f"Debug - Evaluación: {evaluacion.titulo}")
-                                print(f"Debug - Nota estudiante: {nota_estudiante}")
-                                print(f"Debug - Porcentaje evaluación: {porcentaje_eval}")
-                            except Calificacion.DoesNotExist:
-                                print(f"No se encontró calificación para {estudiante.nombre} en {evaluacion.titulo}")
-                        
-                        # Procesar evaluaciones de participación
-                        for evaluacion in evaluaciones_participacion:
-                            try:
-                                calificacion = Calificacion.objects.get(
-                                    content_type=participacion_ct,
-                                    object_id=evaluacion.id,
-                                    estudiante=estudiante
-                                )
-                                
-                                # ✅ CORRECCIÓN: Asegurar que todo sea Decimal
-                                nota_estudiante = calificacion.calcular_nota_con_penalizacion()
-                                porcentaje_eval = Decimal(str(evaluacion.porcentaje_nota_final))
-                                
-                                # ✅ CORRECCIÓN: Operaciones con Decimal
-                                nota_ponderada = nota_estudiante * (porcentaje_eval / Decimal('100.0'))
-                                suma_ponderada += nota_ponderada
-                                total_porcentaje += porcentaje_eval
-                                calificaciones_encontradas += 1
-                                
-                                print(f"Debug - Evaluación: {evaluacion.titulo}")
-                                print(f"Debug - Nota estudiante: {nota_estudiante}")
-                                print(f"Debug - Porcentaje evaluación: {porcentaje_eval}")
-                            except Calificacion.DoesNotExist:
-                                print(f"No se encontró calificación para {estudiante.nombre} en {evaluacion.titulo}")
-                        
-                        # Calcular promedio de evaluaciones
-                        promedio_evaluaciones = Decimal('0.0')
-                        if calificaciones_encontradas > 0 and total_porcentaje > 0:
-                            # Ajustar al porcentaje total evaluado
-                            promedio_evaluaciones = (suma_ponderada / total_porcentaje) * 100
-                        
-                        # Calcular asistencia
-                        asistencias = Asistencia.objects.filter(
-                            estudiante=estudiante,
-                            materia=materia,
-                            fecha__range=[trimestre.fecha_inicio, trimestre.fecha_fin]
-                        )
-                        
-                        total_clases = asistencias.count()
-                        asistencias_presentes = asistencias.filter(presente=True).count()
-                        porcentaje_asistencia = Decimal('0.0')
-                        
-                        if total_clases > 0:
-                            porcentaje_asistencia = Decimal(asistencias_presentes) / Decimal(total_clases) * 100
-                        
-                        # Determinar si el estudiante aprueba el trimestre
-                        # Verificar asistencia mínima y nota mínima
-                        promedio_final = promedio_evaluaciones
-                        aprobado = (porcentaje_asistencia >= trimestre.porcentaje_asistencia_minima and 
-                                    promedio_final >= trimestre.nota_minima_aprobacion)
-                        
-                        # Crear o actualizar el promedio trimestral
-                        promedio, created = PromedioTrimestral.objects.update_or_create(
-                            estudiante=estudiante,
-                            materia=materia,
-                            trimestre=trimestre,
-                            defaults={
-                                'promedio_evaluaciones': promedio_evaluaciones,
-                                'promedio_final': promedio_final,
-                                'total_clases': total_clases,
-                                'asistencias': asistencias_presentes,
-                                'porcentaje_asistencia': porcentaje_asistencia,
-                                'aprobado': aprobado,
-                                'calculado_automaticamente': True
-                            }
-                        )
-                        
-                        resultados.append({
-                            'estudiante': f"{estudiante.nombre} {estudiante.apellido}",
-                            'materia': materia.nombre,
-                            'promedio_evaluaciones': float(promedio_evaluaciones),
-                            'promedio_final': float(promedio_final),
-                            'porcentaje_asistencia': float(porcentaje_asistencia),
-                            'aprobado': aprobado,
-                            'created': created
-                        })
+        # Con ?asincrono=true el cálculo se encola y se responde de inmediato
+        if es_solicitud_asincrona(request):
+            trabajo = TrabajoService().encolar('CALCULAR_PROMEDIOS_TRIMESTRE', {
+                'trimestre_id': trimestre.id,
+                'solo_materia_id': request.data.get('solo_materia_id'),
+                'solo_estudiantes': request.data.get('solo_estudiantes')
+            }, creado_por=request.user)
+            return Response(
+                TrabajoService().datos_encolado(trabajo, f'Cálculo de promedios del {trimestre.nombre} encolado'),
+                status=status.HTTP_202_ACCEPTED
+            )
+        
+        # Cálculo por lotes (mismo servicio que el comando calcular_promedios_trimestre)
+        resultados = PromedioTrimestralService().calcular(
+            trimestre,
+            materias_ids=[request.data['solo_materia_id']] if request.data.get('solo_materia_id') else None,
+            estudiantes_ids=request.data.get('solo_estudiantes') or None
+        )
         
         return Response({
             'mensaje': f'Promedios calculados para el {trimestre.nombre}',
@@ -775,8 +572,9 @@ def obtener_calificaciones_trimestre(request, estudiante_id, trimestre_id):
                 status=status.HTTP_404_NOT_FOUND
             )
         
-        # Obtener todas las materias del curso del estudiante
-        materias = Materia.objects.filter(curso=estudiante.curso)
+        # Materias del curso, promedios calculados y acumulados: una consulta cada uno
+        datos = DatosEstudianteService(estudiante)
+        materias = datos.materias()
         
         # Preparar respuesta
         resultado = {
@@ -797,16 +595,14 @@ def obtener_calificaciones_trimestre(request, estudiante_id, trimestre_id):
             'materias': []
         }
         
+        promedios = datos.promedios(trimestres_ids=[trimestre.id])
+        acumulados = datos.acumulados(trimestres_ids=[trimestre.id])
+        
         # Buscar promedios por materia para este trimestre
         for materia in materias:
             # Intentar obtener el promedio trimestral calculado
-            try:
-                promedio = PromedioTrimestral.objects.get(
-                    estudiante=estudiante,
-                    materia=materia,
-                    trimestre=trimestre
-                )
-                
+            promedio = promedios.get((materia.id, trimestre.id))
+            if promedio:
                 materia_data = {
                     'id': materia.id,
                     'nombre': materia.nombre,
@@ -814,96 +610,15 @@ def obtener_calificaciones_trimestre(request, estudiante_id, trimestre_id):
                     'aprobado': promedio.aprobado,
                     'asistencia': float(promedio.porcentaje_asistencia)
                 }
-                
-            except PromedioTrimestral.DoesNotExist:
-                # Si no existe promedio calculado, calcular en tiempo real
-                
-                # ContentTypes para calificaciones
-                entregable_ct = ContentType.objects.get_for_model(EvaluacionEntregable)
-                participacion_ct = ContentType.objects.get_for_model(EvaluacionParticipacion)
-                
-                # Obtener evaluaciones para la materia en este trimestre
-                evaluaciones_entregable = EvaluacionEntregable.objects.filter(
-                    materia=materia, 
-                    trimestre=trimestre
-                )
-                evaluaciones_participacion = EvaluacionParticipacion.objects.filter(
-                    materia=materia, 
-                    trimestre=trimestre
-                )
-                
-                # Variables para cálculos
-                suma_ponderada = Decimal('0.0')
-                total_porcentaje = Decimal('0.0')
-                calificaciones_encontradas = 0
-                
-                # Procesar evaluaciones entregables
-                for evaluacion in evaluaciones_entregables: # type: ignore
-                    try:
-                        calificacion = Calificacion.objects.get(
-                            content_type=entregable_ct,
-                            object_id=evaluacion.id,
-                            estudiante=estudiante
-                        )
-                        
-                        nota_estudiante = calificacion.calcular_nota_con_penalizacion()
-                        porcentaje_eval = Decimal(str(evaluacion.porcentaje_nota_final))
-                        
-                        nota_ponderada = nota_estudiante * (porcentaje_eval / Decimal('100.0'))
-                        suma_ponderada += nota_ponderada
-                        total_porcentaje += porcentaje_eval
-                        calificaciones_encontradas += 1
-                    except Calificacion.DoesNotExist:
-                        pass
-                
-                # Procesar evaluaciones de participación
-                for evaluacion in evaluaciones_participacion:
-                    try:
-                        calificacion = Calificacion.objects.get(
-                            content_type=participacion_ct,
-                            object_id=evaluacion.id,
-                            estudiante=estudiante
-                        )
-                        
-                        nota_estudiante = calificacion.calcular_nota_con_penalizacion()
-                        porcentaje_eval = Decimal(str(evaluacion.porcentaje_nota_final))
-                        
-                        nota_ponderada = nota_estudiante * (porcentaje_eval / Decimal('100.0'))
-                        suma_ponderada += nota_ponderada
-                        total_porcentaje += porcentaje_eval
-                        calificaciones_encontradas += 1
-                    except Calificacion.DoesNotExist:
-                        pass
-                
-                # Calcular promedio de evaluaciones
-                promedio_evaluaciones = Decimal('0.0')
-                if calificaciones_encontradas > 0 and total_porcentaje > 0:
-                    promedio_evaluaciones = (suma_ponderada / total_porcentaje) * 100
-                
-                # Calcular asistencia
-                asistencias = Asistencia.objects.filter(
-                    estudiante=estudiante,
-                    materia=materia,
-                    fecha__range=[trimestre.fecha_inicio, trimestre.fecha_fin]
-                )
-                
-                total_clases = asistencias.count()
-                asistencias_presentes = asistencias.filter(presente=True).count()
-                porcentaje_asistencia = Decimal('0.0')
-                
-                if total_clases > 0:
-                    porcentaje_asistencia = Decimal(asistencias_presentes) / Decimal(total_clases) * 100
-                
-                # Determinar si el estudiante aprueba el trimestre
-                aprobado = (porcentaje_asistencia >= trimestre.porcentaje_asistencia_minima and 
-                            promedio_evaluaciones >= trimestre.nota_minima_aprobacion)
-                
+            else:
+                # Si no existe promedio calculado, usar el acumulado mantenido al escribir
+                acumulado = datos.acumulado(acumulados, materia.id, trimestre.id)
                 materia_data = {
                     'id': materia.id,
                     'nombre': materia.nombre,
-                    'promedio': float(promedio_evaluaciones),
-                    'aprobado': aprobado,
-                    'asistencia': float(porcentaje_asistencia),
+                    'promedio': float(acumulado.promedio_evaluaciones),
+                    'aprobado': acumulado.esta_aprobado(trimestre),
+                    'asistencia': float(acumulado.porcentaje_asistencia),
                     'calculado_tiempo_real': True
                 }
             
@@ -929,6 +644,7 @@ def historial_academico_estudiante(request, estudiante_id):
     - Participaciones por trimestre y materia (solo promedio)
 
     GET /api/cursos/estudiantes/{estudiante_id}/historial-academico/
+    Con ?formato=csv o ?formato=xlsx se descarga una fila por trimestre y materia.
     """
     try:
         # Verificar que el estudiante existe
@@ -940,14 +656,17 @@ def historial_academico_estudiante(request, estudiante_id):
                 status=status.HTTP_404_NOT_FOUND
             )
 
-        if not estudiante.curso:
+        if not estudiante.curso_id:
             return Response(
                 {'error': 'El estudiante no tiene un curso asignado'},
                 status=status.HTTP_404_NOT_FOUND
             )
 
-        materias = Materia.objects.filter(curso=estudiante.curso)
-        trimestres = Trimestre.objects.all().order_by('año_academico', 'fecha_inicio')
+        # Materias, trimestres y acumulados de todo el historial: tres consultas en total
+        datos = DatosEstudianteService(estudiante)
+        materias = datos.materias()
+        trimestres = datos.trimestres()
+        acumulados = datos.acumulados()
 
         historial = []
 
@@ -959,62 +678,45 @@ def historial_academico_estudiante(request, estudiante_id):
                 'materias': []
             }
             for materia in materias:
-                # Notas (promedio de evaluaciones)
-                entregable_ct = ContentType.objects.get_for_model(EvaluacionEntregable)
-                participacion_ct = ContentType.objects.get_for_model(EvaluacionParticipacion)
-
-                # Evaluaciones entregables - solo calcular promedio
-                calificaciones_entregable = Calificacion.objects.filter(
-                    content_type=entregable_ct,
-                    object_id__in=EvaluacionEntregable.objects.filter(
-                        materia=materia, trimestre=trimestre
-                    ).values_list('id', flat=True),
-                    estudiante=estudiante
-                )
-                
-                notas_valores = [
-                    float(c.calcular_nota_con_penalizacion())  # Cambio aquí
-                    for c in calificaciones_entregable
-                ]
-                promedio_notas = round(sum(notas_valores) / len(notas_valores), 2) if notas_valores else None
+                acumulado = datos.acumulado(acumulados, materia.id, trimestre.id)
 
-                # Evaluaciones de participación - solo calcular promedio
-                calificaciones_participacion = Calificacion.objects.filter(
-                    content_type=participacion_ct,
-                    object_id__in=EvaluacionParticipacion.objects.filter(
-                        materia=materia, trimestre=trimestre
-                    ).values_list('id', flat=True),
-                    estudiante=estudiante
-                )
-                
-                participaciones_valores = [
-                    float(c.calcular_nota_con_penalizacion())
-                    for c in calificaciones_participacion
-                ]
-                promedio_participacion = round(sum(participaciones_valores) / len(participaciones_valores), 2) if participaciones_valores else None
+                # Notas y participaciones (solo promedio)
+                promedio_notas = acumulado.promedio_entregables
+                promedio_participacion = acumulado.promedio_participacion
 
                 # Asistencias
-                asistencias = Asistencia.objects.filter(
-                    estudiante=estudiante,
-                    materia=materia,
-                    fecha__range=[trimestre.fecha_inicio, trimestre.fecha_fin]
-                )
-                total_clases = asistencias.count()
-                asistencias_presentes = asistencias.filter(presente=True).count()
-                porcentaje_asistencia = (asistencias_presentes / total_clases * 100) if total_clases > 0 else None
+                total_clases = acumulado.total_clases
+                asistencias_presentes = acumulado.asistencias
+                porcentaje_asistencia = acumulado.porcentaje_asistencia if total_clases > 0 else None
 
                 materia_data = {
                     'id': materia.id,
                     'nombre': materia.nombre,
-                    'promedio_nota': promedio_notas,
-                    'promedio_participacion': promedio_participacion,
-                    'porcentaje_asistencia': round(porcentaje_asistencia, 2) if porcentaje_asistencia is not None else None,
+                    'promedio_nota': round(float(promedio_notas), 2) if promedio_notas is not None else None,
+                    'promedio_participacion': round(float(promedio_participacion), 2) if promedio_participacion is not None else None,
+                    'porcentaje_asistencia': round(float(porcentaje_asistencia), 2) if porcentaje_asistencia is not None else None,
                     'total_clases': total_clases,
                     'asistencias_presentes': asistencias_presentes
                 }
                 trimestre_data['materias'].append(materia_data)
             historial.append(trimestre_data)
 
+        formato = request.GET.get('formato')
+        if formato in FORMATOS_EXPORTACION:
+            columnas = [
+                'trimestre', 'año_academico', 'materia', 'promedio_nota', 'promedio_participacion',
+                'porcentaje_asistencia', 'total_clases', 'asistencias_presentes'
+            ]
+            filas = (
+                [trimestre_data['nombre'], trimestre_data['año_academico'], materia_data['nombre']]
+                + [materia_data[columna] for columna in columnas[3:]]
+                for trimestre_data in historial
+                for materia_data in trimestre_data['materias']
+            )
+            return ExportacionService(
+                f'historial_academico_{estudiante.id}', columnas
+            ).respuesta(formato, filas)
+
         return Response({'historial': historial})
 
     except Exception as e:
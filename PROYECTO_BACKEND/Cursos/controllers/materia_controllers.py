@@ -8,6 +8,15 @@ from ..serializers import MateriaSerializer
 from ..serializers import MateriaDetalleSerializer 
 from django.db.models import Count, Avg, Max, Min, Sum
 from ..utils import get_evaluacion_by_id, get_evaluaciones_activas
+from ..services.listado_service import ListadoService
+
+# Representación de MateriaSerializer para los listados con ?fields=
+CAMPOS_MATERIA = {
+    'id': 'id',
+    'nombre': 'nombre',
+    'curso': 'curso_id',
+    'profesor': 'profesor_id'
+}
 
 @api_view(['GET'])
 @permission_classes([AllowAny])
@@ -15,11 +24,21 @@ def get_materias(request):
     """
     Obtiene todas las materias registradas.
     Acceso público para todos.
+
+    Parámetros opcionales: fields (proyección), limite y cursor (paginación en el orden del listado).
+    Con paginación la respuesta es {'materias', 'limite', 'siguiente_cursor'}.
     """
     try:
-        materias = Materia.objects.all()
-        serializer = MateriaSerializer(materias, many=True)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        listado = ListadoService(request, CAMPOS_MATERIA)
+        materias = listado.listar(
+            Materia.objects.all(),
+            lambda objetos: MateriaSerializer(objetos, many=True).data
+        )
+        if listado.paginado:
+            return Response({'materias': materias, **listado.datos_paginacion()}, status=status.HTTP_200_OK)
+        return Response(materias, status=status.HTTP_200_OK)
+    except ValueError as e:
+        return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
     except Exception as e:
         return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
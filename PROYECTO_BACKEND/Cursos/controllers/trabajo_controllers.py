@@ -0,0 +1,102 @@
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.permissions import AllowAny
+from rest_framework.response import Response
+from rest_framework import status
+
+from ..models import TrabajoAsincrono
+from ..services.trabajo_service import TrabajoService
+
+
+@api_view(['GET'])
+@permission_classes([AllowAny])
+def obtener_trabajos(request):
+    """
+    Lista los trabajos en segundo plano más recientes.
+    
+    Query params:
+    - estado: PENDIENTE | EN_PROCESO | COMPLETADO | ERROR (opcional)
+    - tipo: tipo de trabajo (opcional)
+    - limite: cantidad máxima (por defecto 50)
+    """
+    try:
+        trabajos = TrabajoAsincrono.objects.all()
+        
+        estado = request.query_params.get('estado')
+        tipo = request.query_params.get('tipo')
+        if estado:
+            trabajos = trabajos.filter(estado=estado.upper())
+        if tipo:
+            trabajos = trabajos.filter(tipo=tipo.upper())
+        
+        try:
+            limite = min(int(request.query_params.get('limite', 50)), 200)
+        except ValueError:
+            return Response(
+                {'error': 'El parámetro limite debe ser un número'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        servicio = TrabajoService()
+        return Response({
+            'trabajos': [servicio.serializar(trabajo) for trabajo in trabajos.defer('resultado')[:limite]]
+        })
+    
+    except Exception as e:
+        return Response(
+            {'error': str(e)},
+            status=status.HTTP_500_INTERNAL_SERVER_ERROR
+        )
+
+@api_view(['GET'])
+@permission_classes([AllowAny])
+def obtener_trabajo(request, trabajo_id):
+    """Estado y progreso (porcentaje, lote actual, ETA) de un trabajo"""
+    try:
+        try:
+            trabajo = TrabajoAsincrono.objects.defer('resultado').get(id=trabajo_id)
+        except TrabajoAsincrono.DoesNotExist:
+            return Response(
+                {'error': 'Trabajo no encontrado'},
+                status=status.HTTP_404_NOT_FOUND
+            )
+        
+        return Response(TrabajoService().serializar(trabajo))
+    
+    except Exception as e:
+        return Response(
+            {'error': str(e)},
+            status=status.HTTP_500_INTERNAL_SERVER_ERROR
+        )
+
+@api_view(['GET'])
+@permission_classes([AllowAny])
+def obtener_resultado_trabajo(request, trabajo_id):
+    """Resultado de un trabajo completado (el mismo cuerpo que devolvería el endpoint síncrono)"""
+    try:
+        try:
+            trabajo = TrabajoAsincrono.objects.get(id=trabajo_id)
+        except TrabajoAsincrono.DoesNotExist:
+            return Response(
+                {'error': 'Trabajo no encontrado'},
+                status=status.HTTP_404_NOT_FOUND
+            )
+        
+        if trabajo.estado == 'ERROR':
+            return Response(
+                {'error': trabajo.error, 'trabajo': TrabajoService().serializar(trabajo)},
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR
+            )
+        
+        if trabajo.estado != 'COMPLETADO':
+            return Response(
+                {'error': 'El trabajo aún no ha terminado', 'trabajo': TrabajoService().serializar(trabajo)},
+                status=status.HTTP_409_CONFLICT
+            )
+        
+        return Response(trabajo.resultado)
+    
+    except Exception as e:
+        return Response(
+            {'error': str(e)},
+            status=status.HTTP_500_INTERNAL_SERVER_ERROR
+        )
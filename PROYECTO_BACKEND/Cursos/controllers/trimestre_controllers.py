@@ -3,6 +3,8 @@ from rest_framework.permissions import AllowAny
 from rest_framework.response import Response
 from rest_framework import status
 from django.db import transaction
+from django.core.paginator import InvalidPage, PageNotAnInteger, Paginator
+from django.http import StreamingHttpResponse
 from django.utils import timezone
 from django.db.models import Q, Avg, Count
 from datetime import datetime, date
@@ -10,7 +12,11 @@ from decimal import Decimal
 from django.contrib.contenttypes.models import ContentType
 
 from ..models import Trimestre, PromedioTrimestral, PromedioAnual, Materia, EvaluacionEntregable, EvaluacionParticipacion, Calificacion, Asistencia
-from ..utils import get_evaluacion_by_id, get_evaluaciones_activas
+from ..utils import get_evaluacion_by_id, get_evaluaciones_activas, es_solicitud_asincrona
+from ..services.promedio_service import PromedioAnualService, PromedioTrimestralService
+from ..services.exportacion_service import FORMATOS_EXPORTACION, ExportacionService
+from ..services.reporte_service import ReporteAnualService, ReporteTrimestralService
+from ..services.trabajo_service import TrabajoService
 from Usuarios.models import Usuario
 
 @api_view(['GET'])
@@ -220,162 +226,24 @@ def calcular_promedios_trimestre(request, trimestre_id):
                 status=status.HTTP_404_NOT_FOUND
             )
         
-        # Iniciar transacción para mantener consistencia de datos
-        with transaction.atomic():
-            resultados = []
-            
-            # Obtener parámetros opcionales
-            solo_materia_id = request.data.get('solo_materia_id')
-            solo_estudiantes = request.data.get('solo_estudiantes')
-            
-            # Filtrar materias si es necesario
-            materias_query = Materia.objects.all()
-            if solo_materia_id:
-                materias_query = materias_query.filter(id=solo_materia_id)
-            
-            # Procesar cada materia
-            for materia in materias_query:
-                print(f"Procesando materia: {materia.nombre}")
-                
-                # Obtener estudiantes del curso
-                estudiantes = Usuario.objects.filter(
-                    curso=materia.curso,
-                    rol__nombre='Estudiante'
-                ).order_by('apellido', 'nombre')
-                
-                # Filtrar estudiantes si es necesario
-                if solo_estudiantes:
-                    estudiantes = estudiantes.filter(id__in=request.data['solo_estudiantes'])
-                
-                for estudiante in estudiantes:
-                    # Obtener evaluaciones del trimestre (ambos tipos)
-                    evaluaciones_entregable = EvaluacionEntregable.objects.filter(
-                        materia=materia,
-                        trimestre=trimestre
-                    )
-                    
-                    evaluaciones_participacion = EvaluacionParticipacion.objects.filter(
-                        materia=materia,
-                        trimestre=trimestre
-                    )
-                    
-                    # Contenttypes para calificaciones
-                    entregable_ct = ContentType.objects.get_for_model(EvaluacionEntregable)
-                    participacion_ct = ContentType.objects.get_for_model(EvaluacionParticipacion)
-                    
-                    print(f"Debug - Estudiante: {estudiante.nombre}, Materia: {materia.nombre}")
-                    print(f"Debug - Evaluaciones entregables: {evaluaciones_entregable.count()}")
-                    print(f"Debug - Evaluaciones participación: {evaluaciones_participacion.count()}")
-                    
-                    # Combinar evaluaciones y verificar si hay alguna
-                    total_evaluaciones = evaluaciones_entregable.count() + evaluaciones_participacion.count()
-                    
-                    if total_evaluaciones > 0:
-                        suma_ponderada = Decimal('0.0')  # ✅ USAR DECIMAL
-                        total_porcentaje = Decimal('0.0')  # ✅ USAR DECIMAL
-                        calificaciones_encontradas = 0
-                        
-                        # Procesar evaluaciones entregables
-                        for evaluacion in evaluaciones_entregable:
-                            try:
-                                calificacion = Calificacion.objects.get(
-                                    content_type=entregable_ct,
-                                    object_id=evaluacion.id,
-                                    estudiante=estudiante
-                                )
-                                
-                                # ✅ CORRECCIÓN: Asegurar que todo sea Decimal
-                                nota_estudiante = calificacion.nota_final if calificacion.nota_final else calificacion.nota
-                                porcentaje_eval = Decimal(str(evaluacion.porcentaje_nota_final))
-                                
-                                # ✅ CORRECCIÓN: Operaciones con Decimal
-                                nota_ponderada = nota_estudiante * (porcentaje_eval / Decimal('100.0'))
-                                suma_ponderada += nota_ponderada
-                                total_porcentaje += porcentaje_eval
-                                calificaciones_encontradas += 1
-                                
-                                print(f"Debug - Evaluación: {evaluacion.titulo}")
-                                print(f"Debug - Nota estudiante: {nota_estudiante}")
-                                print(f"Debug - Porcentaje evaluación: {porcentaje_eval}")
-                            except Calificacion.DoesNotExist:
-                                print(f"No se encontró calificación para {estudiante.nombre} en {evaluacion.titulo}")
-                        
-                        # Procesar evaluaciones de participación
-                        for evaluacion in evaluaciones_participacion:
-                            try:
-                                calificacion = Calificacion.objects.get(
-                                    content_type=participacion_ct,
-                                    object_id=evaluacion.id,
-                                    estudiante=estudiante
-                                )
-                                
-                                # ✅ CORRECCIÓN: Asegurar que todo sea Decimal
-                                nota_estudiante = calificacion.nota_final if calificacion.nota_final else calificacion.nota
-                                porcentaje_eval = Decimal(str(evaluacion.porcentaje_nota_final))
-                                
-                                # ✅ CORRECCIÓN: Operaciones con Decimal
-                                nota_ponderada = nota_estudiante * (porcentaje_eval / Decimal('100.0'))
-                                suma_ponderada += nota_ponderada
-                                total_porcentaje += porcentaje_eval
-                                calificaciones_encontradas += 1
-                                
-                                print(f"Debug - Evaluación: {evaluacion.titulo}")
-                                print(f"Debug - Nota estudiante: {nota_estudiante}")
-                                print(f"Debug - Porcentaje evaluación: {porcentaje_eval}")
-                            except Calificacion.DoesNotExist:
-                                print(f"No se encontró calificación para {estudiante.nombre} en {evaluacion.titulo}")
-                        
-                        # Calcular promedio de evaluaciones
-                        promedio_evaluaciones = Decimal('0.0')
-                        if calificaciones_encontradas > 0 and total_porcentaje > 0:
-                            # Ajustar al porcentaje total evaluado
-                            promedio_evaluaciones = (suma_ponderada / total_porcentaje) * 100
-                        
-                        # Calcular asistencia
-                        asistencias = Asistencia.objects.filter(
-                            estudiante=estudiante,
-                            materia=materia,
-                            fecha__range=[trimestre.fecha_inicio, trimestre.fecha_fin]
-                        )
-                        
-                        total_clases = asistencias.count()
-                        asistencias_presentes = asistencias.filter(presente=True).count()
-                        porcentaje_asistencia = Decimal('0.0')
-                        
-                        if total_clases > 0:
-                            porcentaje_asistencia = Decimal(asistencias_presentes) / Decimal(total_clases) * 100
-                        
-                        # Determinar si el estudiante aprueba el trimestre
-                        # Verificar asistencia mínima y nota mínima
-                        promedio_final = promedio_evaluaciones
-                        aprobado = (porcentaje_asistencia >= trimestre.porcentaje_asistencia_minima and 
-                                    promedio_final >= trimestre.nota_minima_aprobacion)
-                        
-                        # Crear o actualizar el promedio trimestral
-                        promedio, created = PromedioTrimestral.objects.update_or_create(
-                            estudiante=estudiante,
-                            materia=materia,
-                            trimestre=trimestre,
-                            defaults={
-                                'promedio_evaluaciones': promedio_evaluaciones,
-                                'promedio_final': promedio_final,
-                                'total_clases': total_clases,
-                                'asistencias': asistencias_presentes,
-                                'porcentaje_asistencia': porcentaje_asistencia,
-                                'aprobado': aprobado,
-                                'calculado_automaticamente': True
-                            }
-                        )
-                        
-                        resultados.append({
-                            'estudiante': f"{estudiante.nombre} {estudiante.apellido}",
-                            'materia': materia.nombre,
-                            'promedio_evaluaciones': float(promedio_evaluaciones),
-                            'promedio_final': float(promedio_final),
-                            'porcentaje_asistencia': float(porcentaje_asistencia),
-                            'aprobado': aprobado,
-                            'created': created
-                        })
+        # Con ?asincrono=true el cálculo se encola y se responde de inmediato
+        if es_solicitud_asincrona(request):
+            trabajo = TrabajoService().encolar('CALCULAR_PROMEDIOS_TRIMESTRE', {
+                'trimestre_id': trimestre.id,
+                'solo_materia_id': request.data.get('solo_materia_id'),
+                'solo_estudiantes': request.data.get('solo_estudiantes')
+            }, creado_por=request.user)
+            return Response(
+                TrabajoService().datos_encolado(trabajo, f'Cálculo de promedios del {trimestre.nombre} encolado'),
+                status=status.HTTP_202_ACCEPTED
+            )
+        
+        # Cálculo por lotes (mismo servicio que el comando calcular_promedios_trimestre)
+        resultados = PromedioTrimestralService().calcular(
+            trimestre,
+            materias_ids=[request.data['solo_materia_id']] if request.data.get('solo_materia_id') else None,
+            estudiantes_ids=request.data.get('solo_estudiantes') or None
+        )
         
         return Response({
             'mensaje': f'Promedios calculados para el {trimestre.nombre}',
@@ -393,71 +261,38 @@ def calcular_promedios_trimestre(request, trimestre_id):
 @api_view(['POST'])
 @permission_classes([AllowAny])
 def calcular_promedios_anuales(request, año_academico):
-    """Calcula promedios anuales para un año académico"""
+    """
+    Calcula promedios anuales para un año académico.
+    Con solo_materia_id o solo_curso_id en el body se recalcula solo esa materia o curso.
+    """
     try:
-        trimestres = Trimestre.objects.filter(año_academico=año_academico).order_by('numero')
-        
-        if trimestres.count() != 3:
+        try:
+            PromedioAnualService().validar_trimestres(año_academico)
+        except ValueError as e:
             return Response(
-                {'error': f'Se requieren exactamente 3 trimestres para calcular promedios anuales. Encontrados: {trimestres.count()}'},
+                {'error': str(e)},
                 status=status.HTTP_400_BAD_REQUEST
             )
         
-        materias = Materia.objects.all()
-        resultados = []
+        solo_materia_id = request.data.get('solo_materia_id')
+        solo_curso_id = request.data.get('solo_curso_id')
         
-        with transaction.atomic():
-            for materia in materias:
-                estudiantes = Usuario.objects.filter(
-                    curso=materia.curso,
-                    rol__nombre='Estudiante'
-                )
-                
-                for estudiante in estudiantes:
-                    # Obtener promedios trimestrales
-                    promedios_trim = {}
-                    asistencias_anuales = []
-                    
-                    for trimestre in trimestres:
-                        try:
-                            promedio = PromedioTrimestral.objects.get(
-                                estudiante=estudiante,
-                                materia=materia,
-                                trimestre=trimestre
-                            )
-                            promedios_trim[f'trimestre_{trimestre.numero}'] = promedio.promedio_final
-                            asistencias_anuales.append(promedio.porcentaje_asistencia)
-                        except PromedioTrimestral.DoesNotExist:
-                            promedios_trim[f'trimestre_{trimestre.numero}'] = None
-                    
-                    # Calcular promedio anual de asistencia
-                    porcentaje_asistencia_anual = sum(asistencias_anuales) / len(asistencias_anuales) if asistencias_anuales else 0.0
-                    
-                    # Crear o actualizar promedio anual
-                    promedio_anual, created = PromedioAnual.objects.update_or_create(
-                        estudiante=estudiante,
-                        materia=materia,
-                        año_academico=año_academico,
-                        defaults={
-                            'promedio_trimestre_1': promedios_trim.get('trimestre_1'),
-                            'promedio_trimestre_2': promedios_trim.get('trimestre_2'),
-                            'promedio_trimestre_3': promedios_trim.get('trimestre_3'),
-                            'porcentaje_asistencia_anual': porcentaje_asistencia_anual,
-                            'calculado_automaticamente': True
-                        }
-                    )
-                    
-                    # Calcular promedio final anual
-                    promedio_anual.calcular_promedio_anual()
-                    
-                    resultados.append({
-                        'estudiante': f"{estudiante.nombre} {estudiante.apellido}",
-                        'materia': materia.nombre,
-                        'promedio_anual': float(promedio_anual.promedio_anual),
-                        'aprobado_anual': promedio_anual.aprobado_anual,
-                        'porcentaje_asistencia_anual': float(porcentaje_asistencia_anual),
-                        'created': created
-                    })
+        if es_solicitud_asincrona(request):
+            trabajo = TrabajoService().encolar('CALCULAR_PROMEDIOS_ANUALES', {
+                'año_academico': año_academico,
+                'solo_materia_id': solo_materia_id,
+                'solo_curso_id': solo_curso_id
+            }, creado_por=request.user)
+            return Response(
+                TrabajoService().datos_encolado(trabajo, f'Cálculo de promedios anuales de {año_academico} encolado'),
+                status=status.HTTP_202_ACCEPTED
+            )
+        
+        resultados = PromedioAnualService().calcular(
+            año_academico,
+            materias_ids=[solo_materia_id] if solo_materia_id else None,
+            cursos_ids=[solo_curso_id] if solo_curso_id else None
+        )
         
         return Response({
             'mensaje': f'Promedios anuales calculados para {año_academico}',
@@ -475,55 +310,28 @@ def calcular_promedios_anuales(request, año_academico):
 @api_view(['GET'])
 @permission_classes([AllowAny])
 def get_reporte_trimestral(request, trimestre_id):
-    """Genera reporte completo de un trimestre"""
+    """
+    Genera reporte completo de un trimestre.
+    Con ?formato=csv o ?formato=xlsx se descarga el reporte leyendo las filas por lotes.
+    """
     try:
         trimestre = Trimestre.objects.get(id=trimestre_id)
         materia_id = request.GET.get('materia_id')
         curso_id = request.GET.get('curso_id')
+        formato = request.GET.get('formato')
         
         # Filtros
-        promedios = PromedioTrimestral.objects.filter(trimestre=trimestre)
-        
-        if materia_id:
-            promedios = promedios.filter(materia_id=materia_id)
+        reporte = ReporteTrimestralService(trimestre)
+        promedios = reporte.consulta(materia_id=materia_id, curso_id=curso_id)
         
-        if curso_id:
-            promedios = promedios.filter(materia__curso_id=curso_id)
+        if formato in FORMATOS_EXPORTACION:
+            return ExportacionService(
+                f'reporte_trimestral_{trimestre.id}',
+                ReporteTrimestralService.COLUMNAS_EXPORTACION
+            ).respuesta(formato, reporte.filas_exportacion(promedios))
         
         # Construir reporte
-        datos_reporte = []
-        for promedio in promedios.select_related('estudiante', 'materia'):
-            datos_reporte.append({
-                'estudiante': {
-                    'id': promedio.estudiante.id,
-                    'nombre': f"{promedio.estudiante.nombre} {promedio.estudiante.apellido}",
-                    'codigo': promedio.estudiante.codigo
-                },
-                'materia': {
-                    'id': promedio.materia.id,
-                    'nombre': promedio.materia.nombre,
-                    'curso': str(promedio.materia.curso)
-                },
-                'promedio_evaluaciones': float(promedio.promedio_evaluaciones),
-                'promedio_final': float(promedio.promedio_final),
-                'porcentaje_asistencia': float(promedio.porcentaje_asistencia),
-                'total_clases': promedio.total_clases,
-                'asistencias': promedio.asistencias,
-                'aprobado': promedio.aprobado,
-                'observaciones': promedio.observaciones
-            })
-        
-        # Estadísticas generales
-        total_estudiantes = promedios.count()
-        aprobados = promedios.filter(aprobado=True).count()
-        reprobados = total_estudiantes - aprobados
-        
-        if total_estudiantes > 0:
-            promedio_general = promedios.aggregate(Avg('promedio_final'))['promedio_final__avg'] or 0
-            asistencia_promedio = promedios.aggregate(Avg('porcentaje_asistencia'))['porcentaje_asistencia__avg'] or 0
-        else:
-            promedio_general = 0
-            asistencia_promedio = 0
+        datos_reporte = [reporte.fila(promedio) for promedio in promedios]
         
         return Response({
             'trimestre': {
@@ -535,14 +343,7 @@ def get_reporte_trimestral(request, trimestre_id):
                 'fecha_fin': trimestre.fecha_fin,
                 'estado': trimestre.estado
             },
-            'estadisticas': {
-                'total_estudiantes': total_estudiantes,
-                'aprobados': aprobados,
-                'reprobados': reprobados,
-                'porcentaje_aprobacion': round((aprobados / total_estudiantes * 100), 2) if total_estudiantes > 0 else 0,
-                'promedio_general': round(float(promedio_general), 2),
-                'asistencia_promedio': round(float(asistencia_promedio), 2)
-            },
+            'estadisticas': reporte.estadisticas(promedios),
             'datos': datos_reporte
         })
         
@@ -560,78 +361,79 @@ def get_reporte_trimestral(request, trimestre_id):
 @api_view(['GET'])
 @permission_classes([AllowAny])
 def get_reporte_anual_comparativo(request, año_academico):
-    """Genera reporte comparativo anual por trimestres"""
+    """
+    Genera reporte comparativo anual por trimestres.
+
+    Query params:
+    - estudiante_id, curso_id: filtros
+    - pagina, tamaño_pagina: paginación en el servidor (por defecto se devuelve todo)
+    - stream=true: el JSON completo se envía por partes mientras se leen las filas
+    - formato=csv|xlsx: descarga del reporte completo
+    """
     try:
         estudiante_id = request.GET.get('estudiante_id')
         curso_id = request.GET.get('curso_id')
+        formato = request.GET.get('formato')
         
-        # Obtener trimestres del año
-        trimestres = Trimestre.objects.filter(año_academico=año_academico).order_by('numero')
+        reporte = ReporteAnualService(año_academico)
         
-        if not trimestres.exists():
+        if not reporte.trimestres:
             return Response(
                 {'error': f'No se encontraron trimestres para el año {año_academico}'},
                 status=status.HTTP_404_NOT_FOUND
             )
         
-        # Filtros base
-        filtros = {'año_academico': año_academico}
-        if estudiante_id:
-            filtros['estudiante_id'] = estudiante_id
-        if curso_id:
-            filtros['materia__curso_id'] = curso_id
-        
-        promedios_anuales = PromedioAnual.objects.filter(**filtros).select_related('estudiante', 'materia')
-        
-        datos_comparativo = []
-        for promedio in promedios_anuales:
-            # Obtener detalles trimestrales
-            detalles_trimestrales = []
-            for trimestre in trimestres:
-                try:
-                    prom_trim = PromedioTrimestral.objects.get(
-                        estudiante=promedio.estudiante,
-                        materia=promedio.materia,
-                        trimestre=trimestre
-                    )
-                    detalles_trimestrales.append({
-                        'trimestre': trimestre.numero,
-                        'nombre_trimestre': trimestre.nombre,
-                        'promedio': float(prom_trim.promedio_final),
-                        'asistencia': float(prom_trim.porcentaje_asistencia),
-                        'aprobado': prom_trim.aprobado
-                    })
-                except PromedioTrimestral.DoesNotExist:
-                    detalles_trimestrales.append({
-                        'trimestre': trimestre.numero,
-                        'nombre_trimestre': trimestre.nombre,
-                        'promedio': None,
-                        'asistencia': None,
-                        'aprobado': False
-                    })
-            
-            datos_comparativo.append({
-                'estudiante': {
-                    'id': promedio.estudiante.id,
-                    'nombre': f"{promedio.estudiante.nombre} {promedio.estudiante.apellido}",
-                    'codigo': promedio.estudiante.codigo
-                },
-                'materia': {
-                    'id': promedio.materia.id,
-                    'nombre': promedio.materia.nombre,
-                    'curso': str(promedio.materia.curso)
-                },
-                'trimestres': detalles_trimestrales,
-                'promedio_anual': float(promedio.promedio_anual),
-                'asistencia_anual': float(promedio.porcentaje_asistencia_anual),
-                'aprobado_anual': promedio.aprobado_anual
+        # Una consulta con los trimestres pivoteados en columnas
+        promedios_anuales = reporte.consulta(estudiante_id=estudiante_id, curso_id=curso_id)
+        
+        if formato in FORMATOS_EXPORTACION:
+            return ExportacionService(
+                f'reporte_anual_{año_academico}',
+                reporte.columnas_exportacion()
+            ).respuesta(formato, reporte.filas_exportacion(promedios_anuales))
+        
+        if request.GET.get('stream', 'false').lower() == 'true':
+            return StreamingHttpResponse(
+                reporte.json_streaming(promedios_anuales),
+                content_type='application/json'
+            )
+        
+        if 'pagina' not in request.GET and 'tamaño_pagina' not in request.GET:
+            datos_comparativo = [reporte.fila(promedio) for promedio in promedios_anuales]
+            return Response({
+                'año_academico': año_academico,
+                'trimestres': reporte.trimestres_info(),
+                'total_registros': len(datos_comparativo),
+                'datos': datos_comparativo
             })
         
+        try:
+            tamaño_pagina = max(1, min(int(request.GET.get('tamaño_pagina', 100)), 1000))
+            paginador = Paginator(promedios_anuales, tamaño_pagina)
+            pagina = paginador.page(request.GET.get('pagina', 1))
+        except (ValueError, PageNotAnInteger):
+            return Response(
+                {'error': 'Los parámetros pagina y tamaño_pagina deben ser números'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        except InvalidPage as e:
+            return Response(
+                {'error': f'Página inválida: {e}'},
+                status=status.HTTP_404_NOT_FOUND
+            )
+        
         return Response({
             'año_academico': año_academico,
-            'trimestres': [{'numero': t.numero, 'nombre': t.nombre} for t in trimestres],
-            'total_registros': len(datos_comparativo),
-            'datos': datos_comparativo
+            'trimestres': reporte.trimestres_info(),
+            'total_registros': paginador.count,
+            'paginacion': {
+                'pagina': pagina.number,
+                'tamaño_pagina': tamaño_pagina,
+                'total_paginas': paginador.num_pages,
+                'tiene_siguiente': pagina.has_next(),
+                'tiene_anterior': pagina.has_previous()
+            },
+            'datos': [reporte.fila(promedio) for promedio in pagina.object_list]
         })
         
     except Exception as e:
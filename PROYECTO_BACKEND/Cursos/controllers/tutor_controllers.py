@@ -12,7 +12,8 @@ from decimal import Decimal
 
 from Usuarios.models import Usuario, Tutor, Estudiante
 from ..models import (Calificacion, EvaluacionEntregable, EvaluacionParticipacion,
-                     Materia, Trimestre, PromedioTrimestral, Asistencia)
+                     Materia, Trimestre, PromedioTrimestral, Asistencia, AcumuladoTrimestral)
+from ..services.acumulado_service import AcumuladoTrimestralService
 
 @api_view(['GET'])
 @permission_classes([AllowAny])
@@ -140,17 +141,17 @@ def obtener_calificaciones_estudiantes(request, tutor_id):
     try:
         # Verificar que el tutor existe
         try:
-            tutor = Tutor.objects.get(usuario_id=tutor_id)
+            tutor = Tutor.objects.select_related('usuario').get(usuario_id=tutor_id)
         except Tutor.DoesNotExist:
             return Response(
                 {'error': 'Tutor no encontrado'},
                 status=status.HTTP_404_NOT_FOUND
             )
         
-        # Obtener estudiantes asignados al tutor
-        estudiantes = tutor.estudiantes.all().select_related('usuario')
+        # Estudiantes asignados al tutor con usuario y curso en una sola consulta
+        estudiantes = list(tutor.estudiantes.all().select_related('usuario__curso__nivel'))
         
-        if not estudiantes.exists():
+        if not estudiantes:
             return Response({
                 'tutor': {
                     'id': tutor.usuario.id,
@@ -166,57 +167,68 @@ def obtener_calificaciones_estudiantes(request, tutor_id):
         materia_id = request.query_params.get('materia_id')
         año_academico = request.query_params.get('año_academico')  # Nuevo parámetro
         
-        # Preparar ContentTypes para consultas
-        entregable_ct = ContentType.objects.get_for_model(EvaluacionEntregable)
-        participacion_ct = ContentType.objects.get_for_model(EvaluacionParticipacion)
+        # Materias de todos los cursos de los estudiantes, agrupadas por curso (una consulta)
+        cursos_ids = {estudiante.usuario.curso_id for estudiante in estudiantes if estudiante.usuario.curso_id}
+        materias = Materia.objects.filter(curso_id__in=cursos_ids)
+        if materia_id:
+            materias = materias.filter(id=materia_id)
+        materias_por_curso = {}
+        for materia in materias:
+            materias_por_curso.setdefault(materia.curso_id, []).append(materia)
+        
+        # Trimestres según filtros (una consulta para todo el tablero)
+        trimestres = Trimestre.objects.all()
+        if año_academico:
+            trimestres = trimestres.filter(año_academico=año_academico)
+        if trimestre_id:
+            trimestres = trimestres.filter(id=trimestre_id)
+        trimestres = list(trimestres)
+        trimestres_ids = [trimestre.id for trimestre in trimestres]
+        
+        # Promedios y acumulados de todos los estudiantes: una consulta indexada cada uno
+        estudiantes_ids = [estudiante.usuario_id for estudiante in estudiantes]
+        promedios = {
+            (promedio.estudiante_id, promedio.materia_id, promedio.trimestre_id): promedio
+            for promedio in PromedioTrimestral.objects.filter(
+                estudiante_id__in=estudiantes_ids,
+                trimestre_id__in=trimestres_ids
+            )
+        }
+        acumulados = AcumuladoTrimestralService().obtener_mapa(estudiantes_ids, trimestres_ids=trimestres_ids)
         
         # Preparar resultado
         resultado = []
         
         # Para cada estudiante
         for estudiante in estudiantes:
+            usuario = estudiante.usuario
+            curso = usuario.curso
             estudiante_data = {
-                'id': estudiante.usuario.id,
-                'codigo': estudiante.usuario.codigo,
-                'nombre': estudiante.usuario.nombre,
-                'apellido': estudiante.usuario.apellido,
-                'nombre_completo': f"{estudiante.usuario.nombre} {estudiante.usuario.apellido}",
+                'id': usuario.id,
+                'codigo': usuario.codigo,
+                'nombre': usuario.nombre,
+                'apellido': usuario.apellido,
+                'nombre_completo': f"{usuario.nombre} {usuario.apellido}",
                 'curso': {
-                    'id': estudiante.curso.id,
-                    'nombre': str(estudiante.curso)
-                } if estudiante.curso else None,
+                    'id': curso.id,
+                    'nombre': str(curso)
+                } if curso else None,
                 'materias': []
             }
             
             # Si el estudiante no tiene curso asignado, continuar con el siguiente
-            if not estudiante.curso:
+            if not curso:
                 resultado.append(estudiante_data)
                 continue
             
-            # Filtrar materias según parámetros
-            materias = Materia.objects.filter(curso=estudiante.curso)
-            if materia_id:
-                materias = materias.filter(id=materia_id)
-            
             # Para cada materia
-            for materia in materias:
+            for materia in materias_por_curso.get(curso.id, []):
                 materia_data = {
                     'id': materia.id,
                     'nombre': materia.nombre,
                     'trimestres': []
                 }
                 
-                # Filtrar trimestres según parámetros
-                trimestres = Trimestre.objects.all()
-                
-                # Aplicar filtro por año académico si se proporciona
-                if año_academico:
-                    trimestres = trimestres.filter(año_academico=año_academico)
-                
-                # Aplicar filtro por trimestre_id si se proporciona
-                if trimestre_id:
-                    trimestres = trimestres.filter(id=trimestre_id)
-                
                 # Para cada trimestre
                 for trimestre in trimestres:
                     trimestre_data = {
@@ -225,102 +237,19 @@ def obtener_calificaciones_estudiantes(request, tutor_id):
                         'año_academico': trimestre.año_academico
                     }
                     
-                    # Intentar obtener promedio calculado
-                    try:
-                        promedio = PromedioTrimestral.objects.get(
-                            estudiante=estudiante.usuario,
-                            materia=materia,
-                            trimestre=trimestre
-                        )
-                        
+                    clave = (usuario.id, materia.id, trimestre.id)
+                    
+                    # Promedio calculado si existe; si no, se calcula en memoria desde el acumulado
+                    promedio = promedios.get(clave)
+                    if promedio:
                         trimestre_data['promedio'] = float(promedio.promedio_final)
                         trimestre_data['aprobado'] = promedio.aprobado
                         trimestre_data['asistencia'] = float(promedio.porcentaje_asistencia)
-                        
-                    except PromedioTrimestral.DoesNotExist:
-                        # Calcular el promedio en tiempo real
-                        
-                        # Obtener evaluaciones para la materia en este trimestre
-                        evaluaciones_entregable = EvaluacionEntregable.objects.filter(
-                            materia=materia, 
-                            trimestre=trimestre
-                        )
-                        
-                        evaluaciones_participacion = EvaluacionParticipacion.objects.filter(
-                            materia=materia,
-                            trimestre=trimestre
-                        )
-                        
-                        # Variables para cálculos
-                        suma_ponderada = Decimal('0.0')
-                        total_porcentaje = Decimal('0.0')
-                        calificaciones_encontradas = 0
-                        
-                        # Procesar evaluaciones entregables
-                        for evaluacion in evaluaciones_entregable:
-                            try:
-                                calificacion = Calificacion.objects.get(
-                                    content_type=entregable_ct,
-                                    object_id=evaluacion.id,
-                                    estudiante=estudiante.usuario
-                                )
-                                
-                                nota_estudiante = calificacion.calcular_nota_con_penalizacion()
-                                porcentaje_eval = Decimal(str(evaluacion.porcentaje_nota_final))
-                                
-                                nota_ponderada = nota_estudiante * (porcentaje_eval / Decimal('100.0'))
-                                suma_ponderada += nota_ponderada
-                                total_porcentaje += porcentaje_eval
-                                calificaciones_encontradas += 1
-                            except Calificacion.DoesNotExist:
-                                pass
-                        
-                        # Procesar evaluaciones de participación
-                        for evaluacion in evaluaciones_participacion:
-                            try:
-                                calificacion = Calificacion.objects.get(
-                                    content_type=participacion_ct,
-                                    object_id=evaluacion.id,
-                                    estudiante=estudiante.usuario
-                                )
-                                
-                                nota_estudiante = calificacion.calcular_nota_con_penalizacion()
-                                porcentaje_eval = Decimal(str(evaluacion.porcentaje_nota_final))
-                                
-                                nota_ponderada = nota_estudiante * (porcentaje_eval / Decimal('100.0'))
-                                suma_ponderada += nota_ponderada
-                                total_porcentaje += porcentaje_eval
-                                calificaciones_encontradas += 1
-                            except Calificacion.DoesNotExist:
-                                pass
-                        
-                        # Calcular promedio de evaluaciones
-                        promedio_evaluaciones = Decimal('0.0')
-                        if calificaciones_encontradas > 0 and total_porcentaje > 0:
-                            promedio_evaluaciones = (suma_ponderada / total_porcentaje) * 100
-                        
-                        # Calcular asistencia
-                        asistencias = Asistencia.objects.filter(
-                            estudiante=estudiante.usuario,
-                            materia=materia,
-                            fecha__range=[trimestre.fecha_inicio, trimestre.fecha_fin]
-                        )
-                        
-                        total_clases = asistencias.count()
-                        asistencias_presentes = asistencias.filter(presente=True).count()
-                        porcentaje_asistencia = Decimal('0.0')
-                        
-                        if total_clases > 0:
-                            porcentaje_asistencia = Decimal(asistencias_presentes) / Decimal(total_clases) * 100
-                        
-                        # Determinar si el estudiante aprueba el trimestre
-                        aprobado = (porcentaje_asistencia >= trimestre.porcentaje_asistencia_minima and 
-                                    promedio_evaluaciones >= trimestre.nota_minima_aprobacion)
-                        
-                        # Agregar a datos del trimestre
-                        trimestre_data['promedio'] = float(promedio_evaluaciones)
-                        trimestre_data['aprobado'] = aprobado
-                        trimestre_data['asistencia'] = float(porcentaje_asistencia)
+                    else:
+                        acumulado = acumulados.get(clave) or AcumuladoTrimestral()
+                        trimestre_data['promedio'] = float(acumulado.promedio_evaluaciones)
+                        trimestre_data['aprobado'] = acumulado.esta_aprobado(trimestre)
+                        trimestre_data['asistencia'] = float(acumulado.porcentaje_asistencia)
                         trimestre_data['calculado_tiempo_real'] = True
                     
                     # Añadir datos del trimestre a la materia
@@ -0,0 +1,42 @@
+from django.core.management.base import BaseCommand, CommandError
+from Cursos.models import Trimestre
+from Cursos.services.promedio_service import PromedioTrimestralService
+
+
+class Command(BaseCommand):
+    help = 'Calcula y guarda los promedios trimestrales de todas las materias y estudiantes'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--trimestre', type=int, action='append', dest='trimestres',
+            help='ID de trimestre a calcular (se puede repetir). Por defecto los trimestres activos.'
+        )
+        parser.add_argument(
+            '--materia', type=int, action='append', dest='materias',
+            help='Limitar el cálculo a una materia (se puede repetir)'
+        )
+        parser.add_argument(
+            '--estudiante', type=int, action='append', dest='estudiantes',
+            help='Limitar el cálculo a un estudiante (se puede repetir)'
+        )
+
+    def handle(self, *args, **options):
+        if options['trimestres']:
+            trimestres = Trimestre.objects.filter(id__in=options['trimestres'])
+            faltantes = set(options['trimestres']) - set(trimestres.values_list('id', flat=True))
+            if faltantes:
+                raise CommandError(f'Trimestres no encontrados: {sorted(faltantes)}')
+        else:
+            trimestres = Trimestre.objects.filter(activo=True)
+
+        servicio = PromedioTrimestralService()
+        for trimestre in trimestres.order_by('año_academico', 'numero'):
+            resultados = servicio.calcular(
+                trimestre,
+                materias_ids=options['materias'],
+                estudiantes_ids=options['estudiantes']
+            )
+            aprobados = sum(1 for resultado in resultados if resultado['aprobado'])
+            self.stdout.write(self.style.SUCCESS(
+                f'{trimestre}: {len(resultados)} promedios calculados ({aprobados} aprobados)'
+            ))
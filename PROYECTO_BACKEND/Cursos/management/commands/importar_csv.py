@@ -0,0 +1,138 @@
+import time
+from django.core.management.base import BaseCommand, CommandError
+from Cursos.services.importacion_paralela_service import TAMAÑO_BLOQUE_IMPORTACION, ImportacionParalelaService
+from Cursos.services.importacion_service import ENTIDADES, TAMAÑO_LOTE_IMPORTACION, ImportacionService
+
+
+class Command(BaseCommand):
+    help = (
+        'Importa archivos CSV (estudiantes, materias, evaluaciones, calificaciones, '
+        'participaciones, asistencias...) con los mapeos de Cursos/services/importacion_service.py'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('entidad', choices=sorted(ENTIDADES), help='Tipo de datos del archivo')
+        parser.add_argument('archivos', nargs='+', help='Archivos CSV a importar, en orden')
+        parser.add_argument(
+            '--lote', type=int, default=TAMAÑO_LOTE_IMPORTACION,
+            help='Filas por lote de escritura'
+        )
+        parser.add_argument(
+            '--encoding', default=None,
+            help='Codificación de los archivos (por defecto se detecta: UTF-8 o cp1252)'
+        )
+        parser.add_argument(
+            '--fijar', action='append', default=[], metavar='COLUMNA=VALOR',
+            help='Valor para una columna que el archivo no trae, p. ej. --fijar trimestre_id=4'
+        )
+        parser.add_argument(
+            '--workers', type=int, default=0,
+            help='Importar en paralelo por bloques con esta cantidad de procesos (solo asistencias)'
+        )
+        parser.add_argument(
+            '--bloque-mb', type=float, default=TAMAÑO_BLOQUE_IMPORTACION / (1024 * 1024), dest='bloque_mb',
+            help='Tamaño de cada bloque en modo paralelo, en MB'
+        )
+        parser.add_argument(
+            '--checkpoint', default=None,
+            help='Archivo de progreso del modo paralelo (por defecto <archivo>.progreso.json)'
+        )
+        parser.add_argument(
+            '--reiniciar', action='store_true',
+            help='Ignorar el progreso guardado y volver a importar todos los bloques'
+        )
+
+    def handle(self, *args, **options):
+        columnas_fijas = {}
+        for asignacion in options['fijar']:
+            columna, separador, valor = asignacion.partition('=')
+            if not separador:
+                raise CommandError(f'--fijar espera COLUMNA=VALOR, se recibió "{asignacion}"')
+            columnas_fijas[columna.strip()] = valor.strip()
+
+        mapeos = ENTIDADES[options['entidad']]
+        if options['workers'] > 0:
+            if len(mapeos) != 1 or not mapeos[0].paralelo:
+                raise CommandError(f"La entidad {options['entidad']} no admite importación paralela")
+            if options['checkpoint'] and len(options['archivos']) > 1:
+                raise CommandError('--checkpoint solo se puede usar con un archivo')
+
+        inicio = time.monotonic()
+        total_filas = 0
+
+        for ruta in options['archivos']:
+            if options['workers'] > 0:
+                total_filas += self._importar_paralelo(ruta, mapeos[0], columnas_fijas, options)
+                continue
+
+            for mapeo in mapeos:
+                servicio = ImportacionService(
+                    mapeo,
+                    tamaño_lote=options['lote'],
+                    columnas_fijas=columnas_fijas,
+                    progreso=self._progreso
+                )
+                try:
+                    resultado = servicio.importar(ruta, codificacion=options['encoding'])
+                except (OSError, ValueError) as e:
+                    raise CommandError(f'{ruta}: {e}')
+
+                total_filas += resultado.filas
+                self._resumen(resultado)
+
+        segundos = time.monotonic() - inicio
+        velocidad = total_filas / segundos if segundos else 0
+        self.stdout.write(self.style.SUCCESS(
+            f'Importación terminada: {total_filas} filas en {segundos:.2f} s ({velocidad:.0f} filas/s)'
+        ))
+
+    def _importar_paralelo(self, ruta, mapeo, columnas_fijas, options):
+        servicio = ImportacionParalelaService(
+            mapeo,
+            workers=options['workers'],
+            tamaño_bloque=int(options['bloque_mb'] * 1024 * 1024),
+            tamaño_lote=options['lote'],
+            columnas_fijas=columnas_fijas,
+            checkpoint=options['checkpoint'],
+            progreso=self._progreso_bloques
+        )
+        try:
+            resultado = servicio.importar(ruta, codificacion=options['encoding'], reiniciar=options['reiniciar'])
+        except (OSError, ValueError) as e:
+            raise CommandError(f'{ruta}: {e}')
+
+        if resultado.bloques_previos:
+            self.stdout.write(f'{ruta}: {resultado.bloques_previos} bloques ya importados en una ejecución anterior')
+        self._resumen(resultado)
+        if resultado.bloques_fallidos:
+            raise CommandError(
+                f'{ruta}: {resultado.bloques_fallidos} de {resultado.bloques} bloques fallaron; '
+                f'vuelva a ejecutar el comando para reanudar desde {resultado.checkpoint}'
+            )
+        return resultado.filas
+
+    def _progreso_bloques(self, resultado):
+        self.stdout.write(
+            f'  bloque {resultado.bloques_previos + resultado.bloques_terminados}/{resultado.bloques}: '
+            f'{resultado.filas} filas ({resultado.filas_por_segundo:.0f} filas/s)'
+        )
+
+    def _progreso(self, resultado):
+        self.stdout.write(
+            f'  {resultado.mapeo.nombre}: {resultado.filas} filas leídas '
+            f'({resultado.filas_por_segundo:.0f} filas/s)'
+        )
+
+    def _resumen(self, resultado):
+        self.stdout.write(
+            f'{resultado.archivo} [{resultado.mapeo.nombre}]: {resultado.filas} filas, '
+            f'{resultado.creados} creadas, {resultado.actualizados} actualizadas, '
+            f'{resultado.omitidos} omitidas, {resultado.total_errores} con error '
+            f'- {resultado.segundos:.2f} s ({resultado.filas_por_segundo:.0f} filas/s)'
+        )
+        for ubicacion, mensaje in resultado.errores:
+            self.stdout.write(self.style.WARNING(f'  {ubicacion}: {mensaje}'))
+        if resultado.total_errores > len(resultado.errores):
+            self.stdout.write(self.style.WARNING(
+                f'  ... y {resultado.total_errores - len(resultado.errores)} errores más'
+            ))
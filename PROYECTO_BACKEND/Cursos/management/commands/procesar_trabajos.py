@@ -0,0 +1,77 @@
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connections
+from Cursos.services.trabajo_service import TrabajoService, ejecutar_trabajo, inicializar_worker
+
+
+class Command(BaseCommand):
+    help = 'Worker de la cola de trabajos en segundo plano: ejecuta los trabajos pendientes en un pool de procesos'
+
+    def add_arguments(self, parser):
+        configuracion = settings.TRABAJOS_SETTINGS
+        parser.add_argument(
+            '--workers', type=int, default=configuracion.get('WORKERS', 2),
+            help='Cantidad de procesos que ejecutan trabajos en paralelo'
+        )
+        parser.add_argument(
+            '--intervalo', type=float, default=configuracion.get('INTERVALO_SONDEO', 2),
+            help='Segundos entre consultas a la cola cuando no hay trabajos'
+        )
+        parser.add_argument(
+            '--una-vez', action='store_true', dest='una_vez',
+            help='Procesar los trabajos pendientes y terminar'
+        )
+
+    def handle(self, *args, **options):
+        workers = max(1, options['workers'])
+        intervalo = options['intervalo']
+        revision_bloqueos = settings.TRABAJOS_SETTINGS.get('SEGUNDOS_REVISION_BLOQUEOS', 60)
+        servicio = TrabajoService()
+
+        self._liberar_bloqueados(servicio)
+        proxima_revision = time.monotonic() + revision_bloqueos
+
+        self.stdout.write(self.style.SUCCESS(f'Procesando trabajos con {workers} workers'))
+
+        # Cada proceso del pool abre su propia conexión
+        connections.close_all()
+        en_curso = {}
+
+        with ProcessPoolExecutor(max_workers=workers, initializer=inicializar_worker) as executor:
+            try:
+                while True:
+                    # Un worker que murió deja trabajos EN_PROCESO: se revisan también mientras este corre
+                    if time.monotonic() >= proxima_revision:
+                        self._liberar_bloqueados(servicio, excluir=en_curso.values())
+                        proxima_revision = time.monotonic() + revision_bloqueos
+
+                    libres = workers - len(en_curso)
+                    if libres > 0:
+                        for trabajo_id in servicio.reclamar(libres):
+                            en_curso[executor.submit(ejecutar_trabajo, trabajo_id)] = trabajo_id
+                            self.stdout.write(f'Trabajo {trabajo_id} iniciado')
+
+                    if not en_curso:
+                        if options['una_vez']:
+                            break
+                        time.sleep(intervalo)
+                        continue
+
+                    terminados, _ = wait(en_curso, timeout=intervalo, return_when=FIRST_COMPLETED)
+                    for futuro in terminados:
+                        trabajo_id = en_curso.pop(futuro)
+                        try:
+                            estado = futuro.result()
+                        except Exception as e:
+                            # El proceso murió antes de registrar el resultado; liberar_bloqueados lo reencola
+                            estado = f'ERROR ({e})'
+                        self.stdout.write(f'Trabajo {trabajo_id}: {estado}')
+            except KeyboardInterrupt:
+                self.stdout.write('Deteniendo worker; los trabajos en curso terminarán antes de salir')
+
+    def _liberar_bloqueados(self, servicio, excluir=()):
+        reencolados, fallidos = servicio.liberar_bloqueados(excluir=excluir)
+        if reencolados or fallidos:
+            self.stdout.write(f'Trabajos bloqueados: {reencolados} reencolados, {fallidos} marcados con error')
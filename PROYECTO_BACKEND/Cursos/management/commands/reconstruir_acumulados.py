@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+from Cursos.services.acumulado_service import AcumuladoTrimestralService
+
+
+class Command(BaseCommand):
+    help = 'Reconstruye la tabla de acumulados trimestrales desde calificaciones y asistencias'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--trimestre', type=int, action='append', dest='trimestres',
+            help='ID de trimestre a reconstruir (se puede repetir). Por defecto todos.'
+        )
+
+    def handle(self, *args, **options):
+        total = AcumuladoTrimestralService().reconstruir(trimestres_ids=options['trimestres'])
+        self.stdout.write(self.style.SUCCESS(f'Acumulados reconstruidos: {total}'))
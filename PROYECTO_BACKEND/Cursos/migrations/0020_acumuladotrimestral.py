@@ -0,0 +1,42 @@
+# Generated by Django 5.2.18 on 2026-10-18 20:34
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Cursos', '0019_asistencia_updated_at_calificacion_index'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AcumuladoTrimestral',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('suma_ponderada', models.DecimalField(decimal_places=6, default=0, help_text='Suma de nota × porcentaje / 100', max_digits=14)),
+                ('suma_porcentajes', models.DecimalField(decimal_places=2, default=0, help_text='Suma de porcentajes de las evaluaciones calificadas', max_digits=10)),
+                ('total_calificaciones', models.IntegerField(default=0)),
+                ('suma_notas_entregables', models.DecimalField(decimal_places=6, default=0, max_digits=14)),
+                ('total_entregables', models.IntegerField(default=0)),
+                ('suma_notas_participacion', models.DecimalField(decimal_places=6, default=0, max_digits=14)),
+                ('total_participaciones', models.IntegerField(default=0)),
+                ('total_clases', models.IntegerField(default=0)),
+                ('asistencias', models.IntegerField(default=0)),
+                ('justificadas', models.IntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('estudiante', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='acumulados_trimestrales', to=settings.AUTH_USER_MODEL)),
+                ('materia', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='acumulados_trimestrales', to='Cursos.materia')),
+                ('trimestre', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='acumulados', to='Cursos.trimestre')),
+            ],
+            options={
+                'verbose_name': 'Acumulado Trimestral',
+                'verbose_name_plural': 'Acumulados Trimestrales',
+                'db_table': 'acumulados_trimestrales',
+                'unique_together': {('estudiante', 'materia', 'trimestre')},
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 21:27
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Cursos', '0021_trabajoasincrono'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='trabajoasincrono',
+            name='tipo',
+            field=models.CharField(choices=[('CALCULAR_PROMEDIOS_TRIMESTRE', 'Calcular promedios trimestrales'), ('CALCULAR_PROMEDIOS_ANUALES', 'Calcular promedios anuales'), ('CREAR_DATASET', 'Crear dataset ML'), ('ENTRENAR_MODELOS', 'Entrenar modelos ML'), ('REENTRENAR_MODELO', 'Reentrenar modelo ML activo (incremental)')], max_length=50),
+        ),
+    ]
@@ -0,0 +1,19 @@
+from django.db import migrations
+
+
+def llenar_acumulados(apps, schema_editor):
+    """Calcular los acumulados de las calificaciones y asistencias existentes"""
+    from Cursos.services.acumulado_service import AcumuladoTrimestralService
+    AcumuladoTrimestralService(apps=apps).reconstruir()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Cursos', '0022_trabajoasincrono_reentrenar_modelo'),
+        ('contenttypes', '0002_remove_content_type_name'),
+    ]
+
+    operations = [
+        migrations.RunPython(llenar_acumulados, migrations.RunPython.noop),
+    ]
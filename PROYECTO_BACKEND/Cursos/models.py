@@ -4,6 +4,8 @@ from django.contrib.contenttypes.fields import GenericForeignKey
 from django.contrib.contenttypes.models import ContentType
 from django.core.validators import MinValueValidator, MaxValueValidator
 from decimal import Decimal
+from django.core.serializers.json import DjangoJSONEncoder
+import uuid
 
 class Nivel(models.Model):
     id = models.AutoField(primary_key=True)
@@ -90,6 +92,7 @@ class Asistencia(models.Model):
     fecha = models.DateField(default=timezone.now)
     presente = models.BooleanField(default=True)
     justificada = models.BooleanField(default=False)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
     
     class Meta:
         verbose_name = 'Asistencia'
@@ -121,7 +124,26 @@ class Asistencia(models.Model):
                 from django.core.exceptions import ValidationError
                 raise ValidationError("No existe un trimestre activo para la fecha especificada")
         
+        anterior = None
+        if self.pk:
+            anterior = type(self).objects.filter(pk=self.pk).values(
+                'estudiante_id', 'materia_id', 'trimestre_id', 'fecha'
+            ).first()
+        
         super().save(*args, **kwargs)
+        
+        # Mantener acumulados de asistencia (write-through), también los de la clave anterior si cambió
+        from .services.acumulado_service import AcumuladoTrimestralService
+        asistencias = [self]
+        if anterior:
+            asistencias.append(Asistencia(**anterior))
+        AcumuladoTrimestralService().recalcular_asistencias(asistencias)
+
+    def delete(self, *args, **kwargs):
+        resultado = super().delete(*args, **kwargs)
+        from .services.acumulado_service import AcumuladoTrimestralService
+        AcumuladoTrimestralService().recalcular_asistencias([self])
+        return resultado
 
 class Trimestre(models.Model):
     """
@@ -326,6 +348,26 @@ class EvaluacionBase(models.Model):
     class Meta:
         abstract = True  # Esta clase es abstracta, no se crea tabla en la BD
 
+    def save(self, *args, **kwargs):
+        """Si cambian porcentaje, materia o trimestre se recalculan los acumulados de sus calificaciones"""
+        anterior = None
+        if self.pk:
+            anterior = type(self).objects.filter(pk=self.pk).values(
+                'porcentaje_nota_final', 'materia_id', 'trimestre_id'
+            ).first()
+        
+        super().save(*args, **kwargs)
+        
+        if anterior and (
+            anterior['porcentaje_nota_final'] != self.porcentaje_nota_final or
+            anterior['materia_id'] != self.materia_id or
+            anterior['trimestre_id'] != self.trimestre_id
+        ):
+            from .services.acumulado_service import AcumuladoTrimestralService
+            AcumuladoTrimestralService().recalcular_evaluacion(
+                self, materia_id=anterior['materia_id'], trimestre_id=anterior['trimestre_id']
+            )
+
 class EvaluacionEntregable(EvaluacionBase):
     """Para evaluaciones con fechas de entrega como exámenes y trabajos"""
     fecha_asignacion = models.DateField()
@@ -382,7 +424,7 @@ class Calificacion(models.Model):
     )
     fecha_calificacion = models.DateTimeField(null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
-    updated_at = models.DateTimeField(auto_now=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
 
     class Meta:
         db_table = 'calificaciones'
@@ -390,6 +432,31 @@ class Calificacion(models.Model):
         verbose_name_plural = 'Calificaciones'
         unique_together = [('content_type', 'object_id', 'estudiante')]
 
+    def save(self, *args, **kwargs):
+        anterior = None
+        if self.pk:
+            anterior = type(self).objects.filter(pk=self.pk).values(
+                'content_type_id', 'object_id', 'estudiante_id'
+            ).first()
+        
+        super().save(*args, **kwargs)
+        
+        # Mantener acumulados de calificaciones (write-through), también los de la evaluación anterior si cambió
+        from .services.acumulado_service import AcumuladoTrimestralService
+        calificaciones = [self]
+        if anterior:
+            calificaciones.append(Calificacion(**anterior))
+        AcumuladoTrimestralService().recalcular_calificaciones(calificaciones)
+
+    def delete(self, *args, **kwargs):
+        # Las claves se resuelven antes de eliminar (se necesita la evaluación)
+        from .services.acumulado_service import AcumuladoTrimestralService
+        servicio = AcumuladoTrimestralService()
+        claves = servicio.claves_de_calificaciones([self])
+        resultado = super().delete(*args, **kwargs)
+        servicio.recalcular(claves)
+        return resultado
+
     def __str__(self):
         evaluacion_titulo = getattr(self.evaluacion, 'titulo', 'Sin título')
         return f"{self.estudiante.nombre} - {evaluacion_titulo}: {self.nota}/{self.nota_sobre}"
@@ -477,6 +544,72 @@ class PromedioTrimestral(models.Model):
         self.save()
         return self.promedio_final
 
+class AcumuladoTrimestral(models.Model):
+    """
+    Acumulados de calificaciones y asistencia por estudiante, materia y trimestre.
+    Se mantienen al guardar calificaciones/asistencias (write-through) para que
+    las consultas de promedios no tengan que recalcular sobre cada evaluación.
+    """
+    estudiante = models.ForeignKey('Usuarios.Usuario', on_delete=models.CASCADE, related_name='acumulados_trimestrales')
+    materia = models.ForeignKey(Materia, on_delete=models.CASCADE, related_name='acumulados_trimestrales')
+    trimestre = models.ForeignKey(Trimestre, on_delete=models.CASCADE, related_name='acumulados')
+    
+    # Calificaciones (nota con penalización)
+    suma_ponderada = models.DecimalField(max_digits=14, decimal_places=6, default=0, help_text="Suma de nota × porcentaje / 100")
+    suma_porcentajes = models.DecimalField(max_digits=10, decimal_places=2, default=0, help_text="Suma de porcentajes de las evaluaciones calificadas")
+    total_calificaciones = models.IntegerField(default=0)
+    suma_notas_entregables = models.DecimalField(max_digits=14, decimal_places=6, default=0)
+    total_entregables = models.IntegerField(default=0)
+    suma_notas_participacion = models.DecimalField(max_digits=14, decimal_places=6, default=0)
+    total_participaciones = models.IntegerField(default=0)
+    
+    # Asistencia
+    total_clases = models.IntegerField(default=0)
+    asistencias = models.IntegerField(default=0)
+    justificadas = models.IntegerField(default=0)
+    
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'acumulados_trimestrales'
+        verbose_name = 'Acumulado Trimestral'
+        verbose_name_plural = 'Acumulados Trimestrales'
+        unique_together = ('estudiante', 'materia', 'trimestre')
+
+    def __str__(self):
+        return f"{self.estudiante_id} - {self.materia_id} - {self.trimestre_id}"
+
+    @property
+    def promedio_evaluaciones(self):
+        """Promedio ponderado por porcentaje_nota_final (0 si no hay calificaciones)"""
+        if self.total_calificaciones > 0 and self.suma_porcentajes > 0:
+            return Decimal(self.suma_ponderada) / Decimal(self.suma_porcentajes) * 100
+        return Decimal('0.0')
+
+    @property
+    def promedio_entregables(self):
+        if self.total_entregables > 0:
+            return Decimal(self.suma_notas_entregables) / self.total_entregables
+        return None
+
+    @property
+    def promedio_participacion(self):
+        if self.total_participaciones > 0:
+            return Decimal(self.suma_notas_participacion) / self.total_participaciones
+        return None
+
+    @property
+    def porcentaje_asistencia(self):
+        if self.total_clases > 0:
+            return Decimal(self.asistencias) / Decimal(self.total_clases) * 100
+        return Decimal('0.0')
+
+    def esta_aprobado(self, trimestre=None):
+        """Aprobación con los mínimos de nota y asistencia del trimestre"""
+        trimestre = trimestre or self.trimestre
+        return (self.porcentaje_asistencia >= trimestre.porcentaje_asistencia_minima and
+                self.promedio_evaluaciones >= trimestre.nota_minima_aprobacion)
+
 class PromedioAnual(models.Model):
     """
     Almacena el promedio anual de cada estudiante por materia.
@@ -525,3 +658,71 @@ class PromedioAnual(models.Model):
         
         self.save()
         return self.promedio_anual
+
+class TrabajoAsincrono(models.Model):
+    """
+    Trabajo en segundo plano (cálculo de promedios, datasets, entrenamiento).
+    Los endpoints lo encolan y devuelven su id; el comando procesar_trabajos lo ejecuta.
+    """
+    TIPO_CHOICES = [
+        ('CALCULAR_PROMEDIOS_TRIMESTRE', 'Calcular promedios trimestrales'),
+        ('CALCULAR_PROMEDIOS_ANUALES', 'Calcular promedios anuales'),
+        ('CREAR_DATASET', 'Crear dataset ML'),
+        ('ENTRENAR_MODELOS', 'Entrenar modelos ML'),
+        ('REENTRENAR_MODELO', 'Reentrenar modelo ML activo (incremental)'),
+    ]
+    ESTADO_CHOICES = [
+        ('PENDIENTE', 'Pendiente'),
+        ('EN_PROCESO', 'En proceso'),
+        ('COMPLETADO', 'Completado'),
+        ('ERROR', 'Error'),
+    ]
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    tipo = models.CharField(max_length=50, choices=TIPO_CHOICES)
+    estado = models.CharField(max_length=20, choices=ESTADO_CHOICES, default='PENDIENTE')
+    parametros = models.JSONField(default=dict, encoder=DjangoJSONEncoder)
+    resultado = models.JSONField(null=True, blank=True, encoder=DjangoJSONEncoder)
+    error = models.TextField(blank=True, default='')
+    
+    # Progreso
+    porcentaje = models.DecimalField(max_digits=5, decimal_places=2, default=0)
+    lote_actual = models.IntegerField(default=0)
+    total_lotes = models.IntegerField(default=0)
+    mensaje = models.CharField(max_length=255, blank=True, default='')
+    
+    # Ejecución
+    intentos = models.IntegerField(default=0)
+    worker = models.CharField(max_length=100, blank=True, default='')
+    creado_por = models.ForeignKey('Usuarios.Usuario', on_delete=models.SET_NULL, null=True, blank=True, related_name='trabajos_asincronos')
+    fecha_creacion = models.DateTimeField(auto_now_add=True)
+    fecha_inicio = models.DateTimeField(null=True, blank=True)
+    fecha_fin = models.DateTimeField(null=True, blank=True)
+    fecha_actualizacion = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'trabajos_asincronos'
+        verbose_name = 'Trabajo Asíncrono'
+        verbose_name_plural = 'Trabajos Asíncronos'
+        ordering = ['-fecha_creacion']
+        indexes = [
+            models.Index(fields=['estado', 'fecha_creacion']),
+        ]
+
+    def __str__(self):
+        return f"{self.get_tipo_display()} - {self.get_estado_display()} ({self.id})"
+
+    @property
+    def eta_segundos(self):
+        """Tiempo restante estimado a partir del ritmo observado desde el inicio"""
+        if self.estado != 'EN_PROCESO' or not self.fecha_inicio or self.porcentaje <= 0:
+            return None
+        transcurrido = (timezone.now() - self.fecha_inicio).total_seconds()
+        porcentaje = float(self.porcentaje)
+        return round(transcurrido * (100 - porcentaje) / porcentaje, 1)
+
+    @property
+    def duracion_segundos(self):
+        if not self.fecha_inicio:
+            return None
+        return round(((self.fecha_fin or timezone.now()) - self.fecha_inicio).total_seconds(), 1)
@@ -0,0 +1,27 @@
+# Cursos/services/__init__.py
+from .acumulado_service import AcumuladoTrimestralService
+from .asistencia_service import AsistenciaMasivaService
+from .calificacion_service import CalificacionMasivaService
+from .exportacion_service import ExportacionService
+from .importacion_service import ImportacionService
+from .listado_service import ListadoService
+from .estudiante_service import DatosEstudianteService
+from .promedio_service import PromedioAnualService, PromedioTrimestralService
+from .reporte_service import PlanillaCalificacionesService, ReporteAnualService, ReporteTrimestralService
+from .trabajo_service import TrabajoService
+
+__all__ = [
+    'AcumuladoTrimestralService',
+    'AsistenciaMasivaService',
+    'CalificacionMasivaService',
+    'DatosEstudianteService',
+    'ExportacionService',
+    'ImportacionService',
+    'ListadoService',
+    'PlanillaCalificacionesService',
+    'PromedioAnualService',
+    'PromedioTrimestralService',
+    'ReporteAnualService',
+    'ReporteTrimestralService',
+    'TrabajoService'
+]
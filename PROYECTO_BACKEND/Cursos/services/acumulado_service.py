@@ -0,0 +1,308 @@
+from collections import defaultdict
+from decimal import Decimal
+from django.contrib.contenttypes.models import ContentType
+from django.db.models import Case, Count, DecimalField, F, IntegerField, OuterRef, Q, Subquery, Sum, Value, When
+from django.db.models.functions import Coalesce, Greatest
+from ..models import (AcumuladoTrimestral, Asistencia, Calificacion,
+                      EvaluacionEntregable, EvaluacionParticipacion, Trimestre)
+import logging
+
+logger = logging.getLogger(__name__)
+
+CAMPOS_ACUMULADO = [
+    'suma_ponderada', 'suma_porcentajes', 'total_calificaciones',
+    'suma_notas_entregables', 'total_entregables',
+    'suma_notas_participacion', 'total_participaciones',
+    'total_clases', 'asistencias', 'justificadas'
+]
+
+# Multiplicar por 0.01 en lugar de dividir por 100 evita la división entera de SQLite
+CENTESIMO = Value(Decimal('0.01'))
+
+# Nota con penalización, igual que Calificacion.calcular_nota_con_penalizacion
+NOTA_CON_PENALIZACION = Case(
+    When(
+        penalizacion_aplicada__gt=0,
+        then=Greatest(Value(Decimal('0')), F('nota') - F('nota') * F('penalizacion_aplicada') * CENTESIMO)
+    ),
+    default=F('nota'),
+    output_field=DecimalField(max_digits=14, decimal_places=6)
+)
+
+
+class AcumuladoTrimestralService:
+    """
+    Mantiene la tabla AcumuladoTrimestral: sumas ponderadas, conteos de
+    calificaciones y contadores de asistencia por (estudiante, materia, trimestre).
+    Cada recálculo es por conjuntos: una consulta agregada por tipo de evaluación,
+    una de asistencias y un upsert.
+
+    Una asistencia cuenta en su trimestre si su fecha cae dentro de él; si no (filas
+    anteriores a la columna trimestre, que quedaron con el valor por defecto), en el
+    trimestre que contiene la fecha, como se calculaba antes por rango de fechas.
+
+    `apps` permite usarlo desde una migración con los modelos históricos.
+    """
+
+    def __init__(self, apps=None):
+        if apps is None:
+            self.AcumuladoTrimestral = AcumuladoTrimestral
+            self.Asistencia = Asistencia
+            self.Calificacion = Calificacion
+            self.Trimestre = Trimestre
+            self.evaluaciones = (EvaluacionEntregable, EvaluacionParticipacion)
+            self.ContentType = ContentType
+        else:
+            self.AcumuladoTrimestral = apps.get_model('Cursos', 'AcumuladoTrimestral')
+            self.Asistencia = apps.get_model('Cursos', 'Asistencia')
+            self.Calificacion = apps.get_model('Cursos', 'Calificacion')
+            self.Trimestre = apps.get_model('Cursos', 'Trimestre')
+            self.evaluaciones = (
+                apps.get_model('Cursos', 'EvaluacionEntregable'),
+                apps.get_model('Cursos', 'EvaluacionParticipacion')
+            )
+            self.ContentType = apps.get_model('contenttypes', 'ContentType')
+
+    def recalcular(self, claves):
+        """Recalcular los acumulados de las claves (estudiante_id, materia_id, trimestre_id)"""
+        claves = {clave for clave in claves if None not in clave}
+        if not claves:
+            return 0
+
+        estudiantes_ids = {clave[0] for clave in claves}
+        materias_ids = {clave[1] for clave in claves}
+        trimestres_ids = {clave[2] for clave in claves}
+
+        valores = self._calcular(
+            Q(estudiante_id__in=estudiantes_ids),
+            materias_ids=materias_ids,
+            trimestres_ids=trimestres_ids
+        )
+
+        # Las claves pedidas sin datos quedan en cero (p. ej. tras eliminar la última calificación)
+        for clave in claves:
+            valores.setdefault(clave, self._valores_vacios())
+
+        return self._guardar(valores)
+
+    def recalcular_calificaciones(self, calificaciones):
+        """Recalcular los acumulados afectados por un conjunto de calificaciones"""
+        return self.recalcular(self.claves_de_calificaciones(calificaciones))
+
+    def recalcular_asistencias(self, asistencias):
+        """Recalcular los acumulados afectados por un conjunto de asistencias"""
+        return self.recalcular(self.claves_de_asistencias(asistencias))
+
+    def recalcular_evaluacion(self, evaluacion, materia_id=None, trimestre_id=None):
+        """Recalcular los acumulados de todos los estudiantes calificados en una evaluación"""
+        estudiantes_ids = self.Calificacion.objects.filter(
+            content_type=self.ContentType.objects.get_for_model(evaluacion),
+            object_id=evaluacion.id
+        ).values_list('estudiante_id', flat=True)
+
+        materias = {evaluacion.materia_id, materia_id or evaluacion.materia_id}
+        trimestres = {evaluacion.trimestre_id, trimestre_id or evaluacion.trimestre_id}
+
+        return self.recalcular(
+            (estudiante_id, materia, trimestre)
+            for estudiante_id in estudiantes_ids
+            for materia in materias
+            for trimestre in trimestres
+        )
+
+    def reconstruir(self, trimestres_ids=None):
+        """Reconstruir todos los acumulados (opcionalmente solo de algunos trimestres)"""
+        valores = self._calcular(Q(), trimestres_ids=trimestres_ids)
+
+        existentes = self.AcumuladoTrimestral.objects.all()
+        if trimestres_ids is not None:
+            existentes = existentes.filter(trimestre_id__in=trimestres_ids)
+        for clave in existentes.values_list('estudiante_id', 'materia_id', 'trimestre_id'):
+            valores.setdefault(clave, self._valores_vacios())
+
+        return self._guardar(valores)
+
+    def claves_de_calificaciones(self, calificaciones):
+        """(estudiante, materia, trimestre) de cada calificación, con una consulta por tipo de evaluación"""
+        ids_por_tipo = defaultdict(set)
+        for calificacion in calificaciones:
+            ids_por_tipo[calificacion.content_type_id].add((calificacion.object_id, calificacion.estudiante_id))
+
+        modelos = {
+            self.ContentType.objects.get_for_model(modelo).id: modelo
+            for modelo in self.evaluaciones
+        }
+
+        claves = set()
+        for content_type_id, pares in ids_por_tipo.items():
+            modelo = modelos.get(content_type_id)
+            if modelo is None:
+                continue
+            evaluaciones = {
+                evaluacion_id: (materia_id, trimestre_id)
+                for evaluacion_id, materia_id, trimestre_id in modelo.objects.filter(
+                    id__in={object_id for object_id, _ in pares}
+                ).values_list('id', 'materia_id', 'trimestre_id')
+            }
+            for object_id, estudiante_id in pares:
+                if object_id in evaluaciones:
+                    materia_id, trimestre_id = evaluaciones[object_id]
+                    claves.add((estudiante_id, materia_id, trimestre_id))
+
+        return claves
+
+    def claves_de_asistencias(self, asistencias):
+        """
+        (estudiante, materia, trimestre) de cada asistencia: su trimestre y el que
+        contiene su fecha (si son distintos, la fila cuenta en uno de los dos).
+        Los trimestres de las fechas involucradas se leen en una consulta.
+        """
+        asistencias = list(asistencias)
+        fechas = [asistencia.fecha for asistencia in asistencias if asistencia.fecha]
+        trimestres = list(self.Trimestre.objects.filter(
+            fecha_inicio__lte=max(fechas), fecha_fin__gte=min(fechas)
+        ).values_list('id', 'fecha_inicio', 'fecha_fin')) if fechas else []
+
+        claves = set()
+        for asistencia in asistencias:
+            claves.add((asistencia.estudiante_id, asistencia.materia_id, asistencia.trimestre_id))
+            claves.update(
+                (asistencia.estudiante_id, asistencia.materia_id, trimestre_id)
+                for trimestre_id, fecha_inicio, fecha_fin in trimestres
+                if asistencia.fecha and fecha_inicio <= asistencia.fecha <= fecha_fin
+            )
+        return claves
+
+    def obtener_mapa(self, estudiantes_ids, materias_ids=None, trimestres_ids=None):
+        """Acumulados indexados por (estudiante_id, materia_id, trimestre_id) en una sola consulta"""
+        acumulados = self.AcumuladoTrimestral.objects.filter(estudiante_id__in=estudiantes_ids)
+        if materias_ids is not None:
+            acumulados = acumulados.filter(materia_id__in=materias_ids)
+        if trimestres_ids is not None:
+            acumulados = acumulados.filter(trimestre_id__in=trimestres_ids)
+
+        return {
+            (acumulado.estudiante_id, acumulado.materia_id, acumulado.trimestre_id): acumulado
+            for acumulado in acumulados
+        }
+
+    def _calcular(self, filtro_estudiantes, materias_ids=None, trimestres_ids=None):
+        """Valores agregados desde calificaciones y asistencias, indexados por clave"""
+        valores = defaultdict(self._valores_vacios)
+
+        entregable, participacion = self.evaluaciones
+        for modelo, es_participacion in ((entregable, False), (participacion, True)):
+            evaluacion = modelo.objects.filter(pk=OuterRef('object_id'))
+            calificaciones = self.Calificacion.objects.filter(
+                filtro_estudiantes,
+                content_type=self.ContentType.objects.get_for_model(modelo)
+            ).annotate(
+                eval_materia_id=Subquery(evaluacion.values('materia_id')[:1]),
+                eval_trimestre_id=Subquery(evaluacion.values('trimestre_id')[:1]),
+                eval_porcentaje=Subquery(evaluacion.values('porcentaje_nota_final')[:1])
+            )
+            if materias_ids is not None:
+                calificaciones = calificaciones.filter(eval_materia_id__in=materias_ids)
+            if trimestres_ids is not None:
+                calificaciones = calificaciones.filter(eval_trimestre_id__in=trimestres_ids)
+            else:
+                calificaciones = calificaciones.filter(eval_trimestre_id__isnull=False)
+
+            filas = calificaciones.values(
+                'estudiante_id', 'eval_materia_id', 'eval_trimestre_id'
+            ).annotate(
+                suma_ponderada=Sum(
+                    NOTA_CON_PENALIZACION * F('eval_porcentaje') * CENTESIMO,
+                    output_field=DecimalField(max_digits=14, decimal_places=6)
+                ),
+                suma_porcentajes=Sum('eval_porcentaje'),
+                suma_notas=Sum(NOTA_CON_PENALIZACION),
+                total=Count('id')
+            ).order_by()
+
+            for fila in filas:
+                acumulado = valores[(fila['estudiante_id'], fila['eval_materia_id'], fila['eval_trimestre_id'])]
+                acumulado['suma_ponderada'] += self._decimal(fila['suma_ponderada'])
+                acumulado['suma_porcentajes'] += self._decimal(fila['suma_porcentajes'])
+                acumulado['total_calificaciones'] += fila['total']
+                if es_participacion:
+                    acumulado['suma_notas_participacion'] += self._decimal(fila['suma_notas'])
+                    acumulado['total_participaciones'] += fila['total']
+                else:
+                    acumulado['suma_notas_entregables'] += self._decimal(fila['suma_notas'])
+                    acumulado['total_entregables'] += fila['total']
+
+        # Trimestre asignado si la fecha cae en él; si no, el que contiene la fecha
+        trimestre_por_fecha = self.Trimestre.objects.filter(
+            fecha_inicio__lte=OuterRef('fecha'),
+            fecha_fin__gte=OuterRef('fecha')
+        ).order_by('id').values('id')[:1]
+        asistencias = self.Asistencia.objects.filter(filtro_estudiantes).annotate(
+            trimestre_efectivo_id=Case(
+                When(
+                    trimestre__fecha_inicio__lte=F('fecha'),
+                    trimestre__fecha_fin__gte=F('fecha'),
+                    then=F('trimestre_id')
+                ),
+                default=Coalesce(Subquery(trimestre_por_fecha), F('trimestre_id')),
+                output_field=IntegerField()
+            )
+        )
+        if materias_ids is not None:
+            asistencias = asistencias.filter(materia_id__in=materias_ids)
+        if trimestres_ids is not None:
+            asistencias = asistencias.filter(trimestre_efectivo_id__in=trimestres_ids)
+
+        filas = asistencias.values('estudiante_id', 'materia_id', 'trimestre_efectivo_id').annotate(
+            total_clases=Count('id'),
+            asistencias=Count('id', filter=Q(presente=True)),
+            justificadas=Count('id', filter=Q(presente=False, justificada=True))
+        ).order_by()
+
+        for fila in filas:
+            acumulado = valores[(fila['estudiante_id'], fila['materia_id'], fila['trimestre_efectivo_id'])]
+            acumulado['total_clases'] = fila['total_clases']
+            acumulado['asistencias'] = fila['asistencias']
+            acumulado['justificadas'] = fila['justificadas']
+
+        return dict(valores)
+
+    def _guardar(self, valores):
+        """Upsert de los acumulados calculados"""
+        registros = [
+            self.AcumuladoTrimestral(
+                estudiante_id=estudiante_id,
+                materia_id=materia_id,
+                trimestre_id=trimestre_id,
+                **campos
+            )
+            for (estudiante_id, materia_id, trimestre_id), campos in valores.items()
+        ]
+
+        self.AcumuladoTrimestral.objects.bulk_create(
+            registros,
+            batch_size=500,
+            update_conflicts=True,
+            unique_fields=['estudiante', 'materia', 'trimestre'],
+            update_fields=CAMPOS_ACUMULADO + ['updated_at']
+        )
+        return len(registros)
+
+    def _valores_vacios(self):
+        return {
+            'suma_ponderada': Decimal('0'),
+            'suma_porcentajes': Decimal('0'),
+            'total_calificaciones': 0,
+            'suma_notas_entregables': Decimal('0'),
+            'total_entregables': 0,
+            'suma_notas_participacion': Decimal('0'),
+            'total_participaciones': 0,
+            'total_clases': 0,
+            'asistencias': 0,
+            'justificadas': 0
+        }
+
+    def _decimal(self, valor):
+        if valor is None:
+            return Decimal('0')
+        return Decimal(str(valor)).quantize(Decimal('0.000001'))
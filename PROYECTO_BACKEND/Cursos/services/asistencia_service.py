@@ -0,0 +1,171 @@
+from django.db import connection, transaction
+from django.utils import timezone
+from ..models import Asistencia
+from .acumulado_service import AcumuladoTrimestralService
+from Usuarios.models import Usuario
+import logging
+
+logger = logging.getLogger(__name__)
+
+CAMPOS_ACTUALIZABLES = ['presente', 'justificada', 'trimestre', 'updated_at']
+
+
+class AsistenciaMasivaService:
+    """
+    Toma de asistencia de una clase (materia y fecha) con un número fijo de consultas:
+    una para validar estudiantes, una para las asistencias existentes,
+    un bulk_create para las nuevas y un bulk_update para las modificadas.
+    """
+
+    def __init__(self, materia, trimestre, fecha):
+        self.materia = materia
+        self.trimestre = trimestre
+        self.fecha = fecha
+
+    def registrar(self, asistencias_data):
+        """
+        Registrar (crear o actualizar) las asistencias recibidas.
+        Devuelve un resultado por fila, en el mismo orden, con el formato de la API.
+        """
+        resultados = [None] * len(asistencias_data)
+        filas_validas = []
+
+        for indice, asistencia_data in enumerate(asistencias_data):
+            estudiante_id = asistencia_data.get('estudiante_id')
+            try:
+                id_normalizado = int(estudiante_id)
+            except (TypeError, ValueError):
+                resultados[indice] = self._error(estudiante_id, 'Estudiante no encontrado')
+                continue
+            filas_validas.append((indice, id_normalizado, asistencia_data))
+
+        # Todos los estudiantes (con su rol) en una sola consulta
+        estudiantes = Usuario.objects.filter(
+            id__in={id_normalizado for _, id_normalizado, _ in filas_validas}
+        ).select_related('rol').only('id', 'nombre', 'apellido', 'curso_id', 'rol__nombre').in_bulk()
+
+        # Asistencias existentes contra la clave única (estudiante, materia, fecha)
+        existentes = {
+            asistencia.estudiante_id: asistencia
+            for asistencia in Asistencia.objects.filter(
+                materia=self.materia,
+                fecha=self.fecha,
+                estudiante_id__in=list(estudiantes)
+            )
+        }
+
+        ahora = timezone.now()
+        nuevas = {}
+        modificadas = {}
+        anteriores = []
+        filas_aplicadas = []
+
+        for indice, id_normalizado, asistencia_data in filas_validas:
+            estudiante_id = asistencia_data.get('estudiante_id')
+            presente = asistencia_data.get('presente', True)
+            justificada = asistencia_data.get('justificada', False)
+            estudiante = estudiantes.get(id_normalizado)
+
+            if estudiante is None:
+                resultados[indice] = self._error(estudiante_id, 'Estudiante no encontrado')
+                continue
+
+            if estudiante.rol is None or estudiante.rol.nombre != 'Estudiante':
+                resultados[indice] = self._error(estudiante_id, 'El usuario no es un estudiante')
+                continue
+
+            if not estudiante.curso_id:
+                resultados[indice] = self._error(estudiante_id, 'El estudiante no tiene un curso asignado')
+                continue
+
+            if estudiante.curso_id != self.materia.curso_id:
+                resultados[indice] = self._error(estudiante_id, 'El estudiante no pertenece al curso de esta materia')
+                continue
+
+            # Una fila repetida del mismo estudiante actualiza la anterior (como update_or_create)
+            if id_normalizado in nuevas:
+                asistencia, created = nuevas[id_normalizado], False
+            elif id_normalizado in existentes:
+                asistencia, created = existentes[id_normalizado], False
+            else:
+                # El trimestre se asigna aquí para que no se busque por fila en Asistencia.save()
+                asistencia = Asistencia(
+                    estudiante=estudiante,
+                    materia=self.materia,
+                    fecha=self.fecha
+                )
+                created = True
+                nuevas[id_normalizado] = asistencia
+
+            cambio = (
+                created or
+                asistencia.presente != presente or
+                asistencia.justificada != justificada or
+                asistencia.trimestre_id != self.trimestre.id
+            )
+
+            # Si cambia de trimestre también se recalcula el acumulado del anterior
+            if id_normalizado in existentes and asistencia.trimestre_id != self.trimestre.id:
+                anteriores.append(Asistencia(
+                    estudiante_id=asistencia.estudiante_id,
+                    materia_id=asistencia.materia_id,
+                    trimestre_id=asistencia.trimestre_id,
+                    fecha=asistencia.fecha
+                ))
+
+            asistencia.presente = presente
+            asistencia.justificada = justificada
+            asistencia.trimestre = self.trimestre
+            asistencia.updated_at = ahora
+
+            # Solo se reescriben las filas existentes que realmente cambiaron
+            if cambio and id_normalizado in existentes:
+                modificadas[id_normalizado] = asistencia
+
+            filas_aplicadas.append((indice, estudiante_id, estudiante, presente, justificada, created))
+
+        with transaction.atomic():
+            self._guardar(list(nuevas.values()), list(modificadas.values()))
+
+            # Mantener acumulados de las asistencias escritas (write-through)
+            AcumuladoTrimestralService().recalcular_asistencias(
+                list(nuevas.values()) + list(modificadas.values()) + anteriores
+            )
+
+        for indice, estudiante_id, estudiante, presente, justificada, created in filas_aplicadas:
+            resultados[indice] = {
+                'estudiante_id': estudiante_id,
+                'estudiante': f"{estudiante.nombre} {estudiante.apellido}",
+                'presente': presente,
+                'justificada': justificada,
+                'trimestre': str(self.trimestre),
+                'created': created,
+                'success': True
+            }
+
+        return resultados
+
+    def _guardar(self, nuevas, modificadas):
+        if nuevas:
+            if connection.features.supports_update_conflicts_with_target:
+                # Upsert nativo: una toma de asistencia concurrente de la misma clase se convierte en actualización
+                Asistencia.objects.bulk_create(
+                    nuevas,
+                    batch_size=500,
+                    update_conflicts=True,
+                    unique_fields=['estudiante', 'materia', 'fecha'],
+                    update_fields=CAMPOS_ACTUALIZABLES
+                )
+            else:
+                Asistencia.objects.bulk_create(nuevas, batch_size=500)
+
+        if modificadas:
+            # bulk_update no aplica auto_now: updated_at ya viene asignado
+            Asistencia.objects.bulk_update(modificadas, CAMPOS_ACTUALIZABLES, batch_size=500)
+
+    def _error(self, estudiante_id, mensaje):
+        return {
+            'estudiante_id': estudiante_id,
+            'error': mensaje,
+            'success': False
+        }
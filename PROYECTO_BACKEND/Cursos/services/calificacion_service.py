@@ -0,0 +1,162 @@
+from decimal import Decimal
+from django.db import connection, transaction
+from django.utils import timezone
+from ..models import Calificacion
+from .acumulado_service import AcumuladoTrimestralService
+from Usuarios.models import Usuario
+import logging
+
+logger = logging.getLogger(__name__)
+
+CAMPOS_ACTUALIZABLES = ['nota', 'observaciones', 'retroalimentacion', 'finalizada', 'fecha_calificacion', 'updated_at']
+
+
+class CalificacionMasivaService:
+    """
+    Registro masivo de calificaciones de una evaluación con un número fijo de consultas:
+    una para validar estudiantes, una para las calificaciones existentes,
+    un bulk_create para las nuevas y un bulk_update para las existentes.
+    """
+
+    def __init__(self, evaluacion, content_type, nota_maxima, nota_minima_aprobacion):
+        self.evaluacion = evaluacion
+        self.content_type = content_type
+        self.nota_maxima = nota_maxima
+        self.nota_minima_aprobacion = nota_minima_aprobacion
+
+    def registrar(self, calificaciones_data):
+        """
+        Registrar (crear o actualizar) las calificaciones recibidas.
+        Devuelve un resultado por fila, en el mismo orden, con el formato de la API.
+        """
+        resultados = [None] * len(calificaciones_data)
+        filas_validas = []
+
+        # Validación de cada fila sin consultas
+        for indice, cal_data in enumerate(calificaciones_data):
+            estudiante_id = cal_data.get('estudiante_id')
+            nota = cal_data.get('nota')
+
+            if not estudiante_id or nota is None:
+                resultados[indice] = self._error(estudiante_id, 'Se requiere estudiante_id y nota')
+                continue
+
+            try:
+                id_normalizado = int(estudiante_id)
+            except (TypeError, ValueError):
+                resultados[indice] = self._error(
+                    estudiante_id, f"Field 'id' expected a number but got {estudiante_id!r}."
+                )
+                continue
+
+            filas_validas.append((indice, id_normalizado, nota, cal_data))
+
+        # Todos los estudiantes en una sola consulta
+        estudiantes = Usuario.objects.filter(
+            id__in={id_normalizado for _, id_normalizado, _, _ in filas_validas},
+            rol__nombre='Estudiante'
+        ).only('id', 'nombre', 'apellido').in_bulk()
+
+        # Calificaciones existentes contra la clave única (content_type, object_id, estudiante)
+        existentes = {
+            calificacion.estudiante_id: calificacion
+            for calificacion in Calificacion.objects.filter(
+                content_type=self.content_type,
+                object_id=self.evaluacion.id,
+                estudiante_id__in=list(estudiantes)
+            )
+        }
+
+        ahora = timezone.now()
+        nuevas = {}
+        actualizadas = {}
+        filas_aplicadas = []
+
+        for indice, id_normalizado, nota, cal_data in filas_validas:
+            estudiante_id = cal_data.get('estudiante_id')
+            estudiante = estudiantes.get(id_normalizado)
+
+            if estudiante is None:
+                resultados[indice] = self._error(estudiante_id, 'Estudiante no encontrado')
+                continue
+
+            try:
+                nota = Decimal(str(nota))
+            except Exception as e:
+                resultados[indice] = self._error(estudiante_id, str(e))
+                continue
+
+            if nota < 0 or nota > self.nota_maxima:
+                resultados[indice] = self._error(
+                    estudiante_id, f'Nota fuera del rango válido (0-{self.nota_maxima})'
+                )
+                continue
+
+            # Una fila repetida del mismo estudiante actualiza la anterior (como update_or_create)
+            if id_normalizado in nuevas:
+                calificacion, created = nuevas[id_normalizado], False
+            elif id_normalizado in existentes:
+                calificacion, created = existentes[id_normalizado], False
+                actualizadas[id_normalizado] = calificacion
+            else:
+                calificacion = Calificacion(
+                    content_type=self.content_type,
+                    object_id=self.evaluacion.id,
+                    estudiante=estudiante
+                )
+                created = True
+                nuevas[id_normalizado] = calificacion
+
+            calificacion.nota = nota
+            calificacion.observaciones = cal_data.get('observaciones', '')
+            calificacion.retroalimentacion = cal_data.get('retroalimentacion', '')
+            calificacion.finalizada = True
+            calificacion.fecha_calificacion = ahora
+            calificacion.updated_at = ahora
+
+            filas_aplicadas.append((indice, estudiante_id, estudiante, nota, created))
+
+        with transaction.atomic():
+            self._guardar(list(nuevas.values()), list(actualizadas.values()))
+
+            # Mantener acumulados de las calificaciones escritas (write-through)
+            AcumuladoTrimestralService().recalcular_calificaciones(
+                list(nuevas.values()) + list(actualizadas.values())
+            )
+
+        for indice, estudiante_id, estudiante, nota, created in filas_aplicadas:
+            resultados[indice] = {
+                'estudiante_id': estudiante_id,
+                'estudiante': f"{estudiante.nombre} {estudiante.apellido}",
+                'nota': float(nota),
+                'porcentaje': 100.0,  # O el cálculo que corresponda
+                'esta_aprobado': float(nota) >= float(self.nota_minima_aprobacion),
+                'created': created,
+                'success': True
+            }
+
+        return resultados
+
+    def _guardar(self, nuevas, actualizadas):
+        if nuevas:
+            if connection.features.supports_update_conflicts_with_target:
+                # Upsert nativo: una inserción concurrente de la misma clave se convierte en actualización
+                Calificacion.objects.bulk_create(
+                    nuevas,
+                    batch_size=500,
+                    update_conflicts=True,
+                    unique_fields=['content_type', 'object_id', 'estudiante'],
+                    update_fields=CAMPOS_ACTUALIZABLES
+                )
+            else:
+                Calificacion.objects.bulk_create(nuevas, batch_size=500)
+
+        if actualizadas:
+            Calificacion.objects.bulk_update(actualizadas, CAMPOS_ACTUALIZABLES, batch_size=500)
+
+    def _error(self, estudiante_id, mensaje):
+        return {
+            'estudiante_id': estudiante_id,
+            'error': mensaje,
+            'success': False
+        }
@@ -0,0 +1,106 @@
+from django.contrib.contenttypes.models import ContentType
+from django.db.models import Q
+from ..models import (AcumuladoTrimestral, Calificacion, EvaluacionEntregable,
+                      EvaluacionParticipacion, Materia, PromedioTrimestral, Trimestre)
+from .acumulado_service import AcumuladoTrimestralService
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class DatosEstudianteService:
+    """
+    Cargador compartido de los endpoints del estudiante. Cada método hace un número
+    fijo de consultas (independiente de la cantidad de materias, trimestres o
+    evaluaciones) y devuelve diccionarios para armar la respuesta en memoria:
+    - evaluaciones del curso con la calificación del estudiante, indexadas por (content_type_id, object_id)
+    - acumulados de notas y asistencia por (materia, trimestre)
+    - promedios trimestrales calculados por (materia, trimestre)
+    """
+
+    def __init__(self, estudiante):
+        self.estudiante = estudiante
+        self._materias = None
+
+    def materias(self):
+        """Materias del curso del estudiante (una consulta, reutilizada)"""
+        if self._materias is None:
+            self._materias = list(Materia.objects.filter(curso_id=self.estudiante.curso_id))
+        return self._materias
+
+    def evaluaciones(self, materia_id=None, trimestre_id=None, anio=None):
+        """
+        Evaluaciones del curso con su calificación: lista de (tipo_objeto, evaluacion, calificacion).
+        Tres consultas: una por tipo de evaluación y una para todas las calificaciones.
+        """
+        filtros = Q(materia__curso_id=self.estudiante.curso_id)
+        if materia_id:
+            filtros &= Q(materia_id=materia_id)
+        if trimestre_id:
+            filtros &= Q(trimestre_id=trimestre_id)
+        if anio:
+            filtros &= Q(trimestre__año_academico=anio)
+
+        por_tipo = [
+            ('entregable', EvaluacionEntregable),
+            ('participacion', EvaluacionParticipacion)
+        ]
+        evaluaciones = [
+            (tipo_objeto, modelo, list(
+                modelo.objects.filter(filtros).select_related('tipo_evaluacion', 'materia', 'trimestre')
+            ))
+            for tipo_objeto, modelo in por_tipo
+        ]
+
+        calificaciones = self.calificaciones_por_evaluacion({
+            modelo: [evaluacion.id for evaluacion in lista]
+            for _, modelo, lista in evaluaciones
+        })
+
+        resultado = []
+        for tipo_objeto, modelo, lista in evaluaciones:
+            content_type_id = ContentType.objects.get_for_model(modelo).id
+            for evaluacion in lista:
+                resultado.append((tipo_objeto, evaluacion, calificaciones.get((content_type_id, evaluacion.id))))
+        return resultado
+
+    def calificaciones_por_evaluacion(self, ids_por_modelo):
+        """Calificaciones del estudiante indexadas por (content_type_id, object_id) en una consulta"""
+        filtro = Q()
+        for modelo, ids in ids_por_modelo.items():
+            if ids:
+                filtro |= Q(content_type=ContentType.objects.get_for_model(modelo), object_id__in=ids)
+        if not filtro:
+            return {}
+
+        return {
+            (calificacion.content_type_id, calificacion.object_id): calificacion
+            for calificacion in Calificacion.objects.filter(filtro, estudiante=self.estudiante)
+        }
+
+    def acumulados(self, trimestres_ids=None):
+        """Acumulados de notas y asistencia por (materia_id, trimestre_id) en una consulta"""
+        return {
+            (materia_id, trimestre_id): acumulado
+            for (_, materia_id, trimestre_id), acumulado in AcumuladoTrimestralService().obtener_mapa(
+                [self.estudiante.id], trimestres_ids=trimestres_ids
+            ).items()
+        }
+
+    def acumulado(self, acumulados, materia_id, trimestre_id):
+        """Acumulado de (materia, trimestre), o uno vacío si el estudiante no tiene datos"""
+        return acumulados.get((materia_id, trimestre_id)) or AcumuladoTrimestral()
+
+    def promedios(self, trimestres_ids=None):
+        """Promedios trimestrales calculados por (materia_id, trimestre_id) en una consulta"""
+        promedios = PromedioTrimestral.objects.filter(estudiante=self.estudiante)
+        if trimestres_ids is not None:
+            promedios = promedios.filter(trimestre_id__in=trimestres_ids)
+        return {
+            (promedio.materia_id, promedio.trimestre_id): promedio
+            for promedio in promedios
+        }
+
+    def trimestres(self):
+        """Todos los trimestres en orden cronológico"""
+        return list(Trimestre.objects.all().order_by('año_academico', 'fecha_inicio'))
@@ -0,0 +1,81 @@
+import csv
+import tempfile
+from django.http import FileResponse, StreamingHttpResponse
+from openpyxl import Workbook
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Formatos de descarga que aceptan los reportes con ?formato=
+FORMATOS_EXPORTACION = ('csv', 'xlsx')
+
+# Filas que los reportes leen por vez con .iterator(chunk_size=...)
+TAMAÑO_LOTE_EXPORTACION = 500
+
+
+class _Eco:
+    """Pseudo-buffer para csv.writer: devuelve la línea escrita en lugar de guardarla"""
+
+    def write(self, valor):
+        return valor
+
+
+class ExportacionService:
+    """
+    Descarga de reportes en CSV o XLSX a partir de un generador de filas.
+
+    Las filas se consumen una a una (los reportes las leen con un cursor del servidor),
+    así que la memoria no crece con el tamaño del reporte:
+    - CSV: StreamingHttpResponse; los primeros bytes salen antes de que termine la consulta.
+    - XLSX: no se transmite mientras se lee. Un .xlsx es un zip que solo se puede cerrar
+      con todas las filas escritas, así que el workbook write_only se guarda completo en
+      un archivo temporal y recién entonces se envía por partes con FileResponse. El
+      tiempo hasta el primer byte y el espacio en disco crecen con el reporte; para
+      descargas grandes conviene CSV.
+    """
+
+    def __init__(self, nombre_archivo, columnas):
+        self.nombre_archivo = nombre_archivo
+        self.columnas = columnas
+
+    def respuesta(self, formato, filas):
+        if formato == 'csv':
+            return self._respuesta_csv(filas)
+        if formato == 'xlsx':
+            return self._respuesta_xlsx(filas)
+        raise ValueError(f"Formato de exportación no soportado: {formato}")
+
+    def _respuesta_csv(self, filas):
+        response = StreamingHttpResponse(self._lineas_csv(filas), content_type='text/csv; charset=utf-8')
+        response['Content-Disposition'] = f'attachment; filename="{self.nombre_archivo}.csv"'
+        return response
+
+    def _lineas_csv(self, filas):
+        writer = csv.writer(_Eco())
+        # BOM para que Excel abra el archivo como UTF-8 (acentos en nombres y materias)
+        yield '\ufeff' + writer.writerow(self.columnas)
+        for fila in filas:
+            yield writer.writerow(fila)
+
+    def _respuesta_xlsx(self, filas):
+        libro = Workbook(write_only=True)
+        hoja = libro.create_sheet(title=self.nombre_archivo[:31])
+        hoja.append(self.columnas)
+
+        total = 0
+        for fila in filas:
+            hoja.append(fila)
+            total += 1
+
+        # TemporaryFile se borra al cerrarse; FileResponse lo cierra al terminar de enviarlo
+        archivo = tempfile.TemporaryFile()
+        libro.save(archivo)
+        archivo.seek(0)
+        logger.info(f"Exportación XLSX {self.nombre_archivo}: {total} filas")
+
+        return FileResponse(
+            archivo,
+            as_attachment=True,
+            filename=f'{self.nombre_archivo}.xlsx',
+            content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+        )
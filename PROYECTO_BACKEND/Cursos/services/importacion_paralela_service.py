@@ -0,0 +1,325 @@
+import csv
+import io
+import json
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from contextlib import nullcontext
+from django.db import connection, connections, transaction
+from .acumulado_service import AcumuladoTrimestralService
+from .importacion_service import (MAPEOS, TAMAÑO_LOTE_IMPORTACION, ImportacionService,
+                                  ResultadoImportacion, detectar_codificacion)
+from .trabajo_service import inicializar_worker
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Bytes del archivo que procesa cada tarea del pool (se ajusta al fin de línea siguiente)
+TAMAÑO_BLOQUE_IMPORTACION = 8 * 1024 * 1024
+
+# Marca de NULL en el CSV que se envía con COPY
+NULO_COPY = '\\N'
+
+
+class ResultadoImportacionParalela(ResultadoImportacion):
+    """Resultado de una importación paralela: agrega el avance por bloques"""
+
+    def __init__(self, mapeo, archivo):
+        super().__init__(mapeo, archivo)
+        self.bloques = 0
+        self.bloques_terminados = 0
+        self.bloques_previos = 0
+        self.bloques_fallidos = 0
+        self.checkpoint = None
+
+
+class ImportacionParalelaService:
+    """
+    Importación de archivos muy grandes (asistencias de varios años) en paralelo:
+    - El archivo se parte en bloques de bytes alineados a fin de línea; cada bloque se
+      parsea en un proceso del pool y se escribe en su propia transacción.
+    - Escritura con bulk_create(ignore_conflicts=True); en PostgreSQL, COPY a una tabla
+      temporal y un INSERT ... ON CONFLICT DO NOTHING por bloque.
+    - Cada bloque terminado se anota en un archivo de checkpoint: si la carga se
+      interrumpe, la siguiente ejecución sigue con los bloques pendientes.
+    - Al final se reconstruyen los acumulados de los trimestres importados.
+
+    SQLite admite un solo escritor: ahí los bloques se parsean en paralelo pero cada lote
+    se escribe con un candado compartido entre los procesos y en su propia transacción.
+    Reimportar un bloque a medio escribir es seguro porque los duplicados se descartan.
+
+    Requiere un mapeo con `paralelo=True` y que las filas del CSV no tengan saltos de
+    línea dentro de campos entre comillas.
+    """
+
+    def __init__(self, mapeo, workers=2, tamaño_bloque=TAMAÑO_BLOQUE_IMPORTACION,
+                 tamaño_lote=TAMAÑO_LOTE_IMPORTACION, columnas_fijas=None, checkpoint=None, progreso=None):
+        if not mapeo.paralelo:
+            raise ValueError(f"El mapeo {mapeo.nombre} no admite importación paralela")
+        self.mapeo = mapeo
+        self.workers = max(1, workers)
+        self.tamaño_bloque = max(1, tamaño_bloque)
+        self.tamaño_lote = max(1, tamaño_lote)
+        self.columnas_fijas = columnas_fijas or {}
+        self.checkpoint = checkpoint
+        self.progreso = progreso
+
+    def importar(self, ruta, codificacion=None, reiniciar=False):
+        resultado = ResultadoImportacionParalela(self.mapeo, ruta)
+        codificacion = codificacion or detectar_codificacion(ruta)
+        cabecera, inicio_datos = self._cabecera(ruta, codificacion)
+        bloques = self._bloques(ruta, inicio_datos)
+
+        resultado.checkpoint = self.checkpoint or f'{ruta}.progreso.json'
+        estado = self._leer_checkpoint(ruta, resultado.checkpoint, reiniciar)
+        terminados = set(estado['bloques'])
+        pendientes = [(inicio, fin) for inicio, fin in bloques if inicio not in terminados]
+        resultado.bloques = len(bloques)
+        resultado.bloques_previos = len(bloques) - len(pendientes)
+
+        # Cada proceso del pool abre su propia conexión
+        connections.close_all()
+        with ProcessPoolExecutor(max_workers=self.workers, initializer=inicializar_worker_importacion,
+                                 initargs=(multiprocessing.Lock(),)) as executor:
+            futuros = {
+                executor.submit(
+                    importar_bloque, self.mapeo.nombre, ruta, inicio, fin, codificacion,
+                    cabecera, self.columnas_fijas, self.tamaño_lote
+                ): inicio
+                for inicio, fin in pendientes
+            }
+            for futuro in as_completed(futuros):
+                inicio = futuros[futuro]
+                try:
+                    parcial = futuro.result()
+                except Exception as e:
+                    logger.exception(f"Error importando el bloque {inicio} de {ruta}")
+                    resultado.bloques_fallidos += 1
+                    resultado.error(f'bloque desde el byte {inicio}', str(e))
+                    continue
+
+                self._sumar(resultado, parcial)
+                estado['bloques'].append(inicio)
+                estado['trimestres'] = sorted(set(estado['trimestres']) | set(parcial['trimestres']))
+                self._guardar_checkpoint(resultado.checkpoint, estado)
+                resultado.actualizar_tiempo()
+                if self.progreso:
+                    self.progreso(resultado)
+
+        if estado['trimestres']:
+            AcumuladoTrimestralService().reconstruir(trimestres_ids=estado['trimestres'])
+
+        if not resultado.bloques_fallidos and os.path.exists(resultado.checkpoint):
+            os.remove(resultado.checkpoint)
+        resultado.actualizar_tiempo()
+        return resultado
+
+    def _cabecera(self, ruta, codificacion):
+        with open(ruta, 'rb') as archivo:
+            linea = archivo.readline()
+            inicio_datos = archivo.tell()
+        cabecera = next(csv.reader([linea.decode(codificacion)]), None)
+        if not cabecera:
+            raise ValueError(f"El archivo {ruta} está vacío")
+        return cabecera, inicio_datos
+
+    def _bloques(self, ruta, inicio_datos):
+        """Rangos [inicio, fin) de bytes; cada límite cae justo después de un salto de línea"""
+        tamaño = os.path.getsize(ruta)
+        limites = [inicio_datos]
+        with open(ruta, 'rb') as archivo:
+            posicion = inicio_datos + self.tamaño_bloque
+            while posicion < tamaño:
+                archivo.seek(posicion)
+                archivo.readline()
+                posicion = archivo.tell()
+                if posicion >= tamaño:
+                    break
+                limites.append(posicion)
+                posicion += self.tamaño_bloque
+        limites.append(tamaño)
+        return [(inicio, fin) for inicio, fin in zip(limites, limites[1:]) if fin > inicio]
+
+    def _leer_checkpoint(self, ruta, checkpoint, reiniciar):
+        """Estado guardado de una ejecución anterior, si corresponde al mismo archivo y bloques"""
+        info = os.stat(ruta)
+        nuevo = {
+            'archivo': os.path.abspath(ruta),
+            'tamaño': info.st_size,
+            'modificado': info.st_mtime,
+            'tamaño_bloque': self.tamaño_bloque,
+            'mapeo': self.mapeo.nombre,
+            'bloques': [],
+            'trimestres': []
+        }
+        if reiniciar or not os.path.exists(checkpoint):
+            return nuevo
+
+        with open(checkpoint, encoding='utf-8') as archivo:
+            estado = json.load(archivo)
+        if any(estado.get(campo) != nuevo[campo] for campo in ('archivo', 'tamaño', 'modificado', 'tamaño_bloque', 'mapeo')):
+            logger.warning(f"Checkpoint {checkpoint} de otro archivo o configuración; se importa desde el inicio")
+            return nuevo
+        return estado
+
+    def _guardar_checkpoint(self, checkpoint, estado):
+        # Escritura atómica: un corte a mitad de escritura no deja un JSON inválido
+        temporal = f'{checkpoint}.tmp'
+        with open(temporal, 'w', encoding='utf-8') as archivo:
+            json.dump(estado, archivo)
+        os.replace(temporal, checkpoint)
+
+    def _sumar(self, resultado, parcial):
+        resultado.bloques_terminados += 1
+        resultado.filas += parcial['filas']
+        resultado.creados += parcial['creados']
+        resultado.omitidos += parcial['omitidos']
+        resultado.total_errores += parcial['total_errores'] - len(parcial['errores'])
+        for ubicacion, mensaje in parcial['errores']:
+            resultado.error(ubicacion, mensaje)
+
+
+# --- Ejecución de un bloque (corre en el worker) ---
+
+# Cachés de referencias por proceso: se cargan una vez y sirven para todos sus bloques
+_CACHÉS_WORKER = {}
+
+# Candado compartido por los procesos del pool para serializar las escrituras en SQLite
+_CANDADO_ESCRITURA = None
+
+
+def inicializar_worker_importacion(candado):
+    global _CANDADO_ESCRITURA
+    _CANDADO_ESCRITURA = candado
+    inicializar_worker()
+
+
+def importar_bloque(nombre_mapeo, ruta, inicio, fin, codificacion, cabecera, columnas_fijas, tamaño_lote):
+    """Parsear y escribir las filas de los bytes [inicio, fin) en una transacción"""
+    mapeo = MAPEOS[nombre_mapeo]
+    servicio = ImportacionService(mapeo, columnas_fijas=columnas_fijas)
+    resultado = ResultadoImportacion(mapeo, ruta)
+
+    with open(ruta, 'rb') as archivo:
+        archivo.seek(inicio)
+        datos = archivo.read(fin - inicio)
+    lector = csv.reader(io.StringIO(datos.decode(codificacion), newline=''))
+    del datos
+
+    objetos = servicio.objetos(
+        lector, cabecera, resultado,
+        cachés=_CACHÉS_WORKER.setdefault(nombre_mapeo, {}),
+        ubicacion=f' (bloque desde el byte {inicio})'
+    )
+    trimestres = set()
+    escritas = 0
+
+    sqlite = connection.vendor == 'sqlite'
+    # En SQLite cada bulk_create es su propia transacción (ver ImportacionParalelaService)
+    with nullcontext() if sqlite else transaction.atomic():
+        escritor = _EscrituraCopy(mapeo.modelo) if connection.vendor == 'postgresql' else _EscrituraBulk(mapeo.modelo)
+        lote = []
+        for _, objeto in objetos:
+            lote.append(objeto)
+            if len(lote) >= tamaño_lote:
+                escritas += _escribir_lote(escritor, lote, trimestres, sqlite)
+                lote = []
+        if lote:
+            escritas += _escribir_lote(escritor, lote, trimestres, sqlite)
+        creados = escritor.terminar(escritas)
+
+    return {
+        'filas': resultado.filas,
+        'creados': creados,
+        # Filas repetidas en el bloque más las que ya estaban en la base
+        'omitidos': resultado.omitidos + escritas - creados,
+        'total_errores': resultado.total_errores,
+        'errores': resultado.errores,
+        'trimestres': sorted(trimestre for trimestre in trimestres if trimestre is not None)
+    }
+
+
+def _escribir_lote(escritor, lote, trimestres, exclusiva):
+    with _CANDADO_ESCRITURA if exclusiva and _CANDADO_ESCRITURA is not None else nullcontext():
+        escritor.escribir(lote)
+    trimestres.update(getattr(objeto, 'trimestre_id', None) for objeto in lote)
+    return len(lote)
+
+
+class _EscrituraBulk:
+    """bulk_create(ignore_conflicts=True); las filas insertadas se cuentan con total_changes() en SQLite"""
+
+    def __init__(self, modelo):
+        self.modelo = modelo
+        self.cambios_iniciales = self._cambios()
+
+    def escribir(self, objetos):
+        self.modelo.objects.bulk_create(objetos, ignore_conflicts=True)
+
+    def terminar(self, escritas):
+        if self.cambios_iniciales is None:
+            return escritas
+        return self._cambios() - self.cambios_iniciales
+
+    def _cambios(self):
+        if connection.vendor != 'sqlite':
+            return None
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT total_changes()')
+            return cursor.fetchone()[0]
+
+
+class _EscrituraCopy:
+    """
+    COPY de PostgreSQL: las filas se copian a una tabla temporal (se borra al confirmar)
+    y se pasan a la tabla real con INSERT ... ON CONFLICT DO NOTHING.
+    """
+
+    def __init__(self, modelo):
+        quote = connection.ops.quote_name
+        self.campos = [campo for campo in modelo._meta.concrete_fields if not campo.primary_key]
+        self.columnas = ', '.join(quote(campo.column) for campo in self.campos)
+        self.tabla = quote(modelo._meta.db_table)
+        self.temporal = quote(f'importacion_{modelo._meta.db_table}')
+
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'CREATE TEMP TABLE {self.temporal} ON COMMIT DROP AS '
+                f'SELECT {self.columnas} FROM {self.tabla} WITH NO DATA'
+            )
+
+    def escribir(self, objetos):
+        buffer = io.StringIO()
+        escritor = csv.writer(buffer)
+        for objeto in objetos:
+            escritor.writerow([
+                self._texto(campo.get_db_prep_save(campo.pre_save(objeto, True), connection))
+                for campo in self.campos
+            ])
+        buffer.seek(0)
+
+        sql = f"COPY {self.temporal} ({self.columnas}) FROM STDIN WITH (FORMAT csv, NULL '{NULO_COPY}')"
+        with connection.cursor() as cursor:
+            crudo = cursor.cursor
+            if hasattr(crudo, 'copy_expert'):
+                # psycopg2
+                crudo.copy_expert(sql, buffer)
+            else:
+                # psycopg 3
+                with crudo.copy(sql) as copia:
+                    copia.write(buffer.getvalue())
+
+    def terminar(self, escritas):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'INSERT INTO {self.tabla} ({self.columnas}) '
+                f'SELECT {self.columnas} FROM {self.temporal} ON CONFLICT DO NOTHING'
+            )
+            return cursor.rowcount
+
+    def _texto(self, valor):
+        if valor is None:
+            return NULO_COPY
+        if isinstance(valor, bool):
+            return 't' if valor else 'f'
+        return str(valor)
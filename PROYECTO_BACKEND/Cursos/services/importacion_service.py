@@ -0,0 +1,582 @@
+import codecs
+import csv
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime
+from decimal import Decimal, InvalidOperation
+from django.contrib.auth.hashers import make_password
+from django.contrib.contenttypes.models import ContentType
+from django.db import transaction
+from django.utils import timezone
+from ..models import (Asistencia, Calificacion, Curso, EvaluacionEntregable,
+                      EvaluacionParticipacion, Materia, TipoEvaluacion, Trimestre)
+from .acumulado_service import AcumuladoTrimestralService
+from Usuarios.models import Usuario
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Filas que se acumulan antes de escribir; Django parte cada lote según el
+# límite de parámetros del motor (SQLite/PostgreSQL)
+TAMAÑO_LOTE_IMPORTACION = 2000
+
+# Bytes que se leen para decidir la codificación del archivo
+MUESTRA_CODIFICACION = 64 * 1024
+
+# Errores de fila que se guardan con detalle en el resultado
+MAXIMO_ERRORES_DETALLE = 50
+
+
+# --- Conversores de columnas ---
+
+def texto(valor):
+    return valor.strip()
+
+
+def entero(valor):
+    return int(valor.strip())
+
+
+def decimal(valor):
+    try:
+        return Decimal(valor.strip())
+    except InvalidOperation:
+        raise ValueError(f"'{valor}' no es un número")
+
+
+def booleano(valor):
+    return valor.strip().lower() in ('true', '1', 'si', 'sí', 't', 'verdadero')
+
+
+def fecha(valor):
+    return date.fromisoformat(valor.strip()[:10])
+
+
+def fecha_hora(valor):
+    """Fecha (AAAA-MM-DD) o fecha y hora ISO; las fechas sin zona se toman en la zona del servidor"""
+    resultado = datetime.fromisoformat(valor.strip())
+    if timezone.is_naive(resultado):
+        resultado = timezone.make_aware(resultado)
+    return resultado
+
+
+# --- Definición declarativa de los mapeos ---
+
+class Columna:
+    """
+    Valor de un campo del modelo leído de una columna del CSV.
+    `nombres` puede ser una tupla de alternativas: se usa la primera presente en la cabecera.
+    """
+
+    def __init__(self, nombres, convertir=texto, opcional=False, defecto=None):
+        self.nombres = (nombres,) if isinstance(nombres, str) else tuple(nombres)
+        self.convertir = convertir
+        self.opcional = opcional
+        self.defecto = defecto
+
+
+class Referencia:
+    """
+    Clave foránea resuelta con una caché precargada (una consulta por importación).
+    `cargar()` devuelve tuplas (valor_columna_1, ..., id); las claves se comparan como texto.
+    """
+
+    def __init__(self, columnas, cargar, descripcion, opcional=False):
+        self.columnas = tuple(Columna(nombres, opcional=opcional) for nombres in columnas)
+        self.cargar = cargar
+        self.descripcion = descripcion
+        self.opcional = opcional
+
+
+class MapeoImportacion:
+    """
+    Cómo se convierte una fila del CSV en una instancia del modelo:
+    - campos: campo del modelo -> Columna o Referencia
+    - clave: campos que identifican la fila (clave única) para descartar o actualizar existentes
+    - actualizar: campos que se sobrescriben en filas existentes; vacío = las existentes se omiten
+    - fijos: valores comunes a todas las filas (un callable se evalúa una vez por importación)
+    - preparar(nuevos): se llama antes de insertar cada lote
+    - despues(nuevos, actualizados): se llama dentro de la transacción de cada lote
+    - paralelo: admite la importación paralela por bloques (solo inserta y la clave es
+      una restricción única en la base, así que los duplicados entre bloques se descartan ahí)
+    """
+
+    def __init__(self, nombre, modelo, clave, campos, actualizar=(), fijos=None, preparar=None, despues=None,
+                 paralelo=False):
+        self.nombre = nombre
+        self.modelo = modelo
+        self.clave = tuple(clave)
+        self.campos = campos
+        self.actualizar = list(actualizar)
+        self.fijos = fijos or {}
+        self.preparar = preparar
+        self.despues = despues
+        self.paralelo = paralelo
+
+
+class ResultadoImportacion:
+    """Contadores de una importación; `errores` guarda (ubicación, mensaje) de las primeras filas rechazadas"""
+
+    def __init__(self, mapeo, archivo):
+        self.mapeo = mapeo
+        self.archivo = archivo
+        self.filas = 0
+        self.creados = 0
+        self.actualizados = 0
+        self.omitidos = 0
+        self.total_errores = 0
+        self.errores = []
+        self.inicio = time.monotonic()
+        self.segundos = 0.0
+
+    @property
+    def filas_por_segundo(self):
+        return self.filas / self.segundos if self.segundos else 0.0
+
+    def error(self, ubicacion, mensaje):
+        self.total_errores += 1
+        if len(self.errores) < MAXIMO_ERRORES_DETALLE:
+            self.errores.append((ubicacion, mensaje))
+
+    def actualizar_tiempo(self):
+        self.segundos = time.monotonic() - self.inicio
+
+
+class ImportacionService:
+    """
+    Importación de archivos CSV a partir de un MapeoImportacion:
+    - Las filas se leen una a una (csv.reader sobre el archivo, sin cargarlo entero).
+    - Las claves foráneas se resuelven con diccionarios precargados, sin consultas por fila.
+    - Por lote: una consulta para las claves existentes, un bulk_create para las nuevas
+      y un bulk_update para las que se actualizan, todo en una transacción. Las filas
+      que el bulk_create descarta por conflicto se cuentan como omitidas.
+    - Filas repetidas dentro del archivo: en mapeos que actualizan gana la última,
+      en los demás la primera.
+    """
+
+    def __init__(self, mapeo, tamaño_lote=TAMAÑO_LOTE_IMPORTACION, columnas_fijas=None, progreso=None):
+        self.mapeo = mapeo
+        self.tamaño_lote = max(1, tamaño_lote)
+        # Valores para columnas que el archivo no trae (p. ej. trimestre_id de un CSV por trimestre)
+        self.columnas_fijas = columnas_fijas or {}
+        self.progreso = progreso
+
+    def importar(self, ruta, codificacion=None):
+        resultado = ResultadoImportacion(self.mapeo, ruta)
+        codificacion = codificacion or detectar_codificacion(ruta)
+        lote = {}
+
+        with open(ruta, mode='r', encoding=codificacion, newline='') as archivo:
+            lector = csv.reader(archivo)
+            cabecera = next(lector, None)
+            if cabecera is None:
+                raise ValueError(f"El archivo {ruta} está vacío")
+
+            for clave, objeto in self.objetos(lector, cabecera, resultado):
+                lote[clave] = objeto
+                if len(lote) >= self.tamaño_lote:
+                    self._guardar_lote(lote, resultado)
+                    lote = {}
+
+        if lote:
+            self._guardar_lote(lote, resultado)
+        resultado.actualizar_tiempo()
+        return resultado
+
+    def objetos(self, lector, cabecera, resultado, cachés=None, ubicacion=''):
+        """
+        Instancias (sin guardar) de las filas de `lector`, como pares (clave, objeto).
+        Las filas inválidas y las repetidas se cuentan en `resultado`; `ubicacion`
+        se agrega al número de línea de los errores (p. ej. el bloque de una importación paralela).
+        """
+        cachés = {} if cachés is None else cachés
+        lectores = self._lectores(cabecera, cachés)
+        fijos = {
+            campo: valor() if callable(valor) else valor
+            for campo, valor in self.mapeo.fijos.items()
+        }
+        vistas = set()
+
+        for fila in lector:
+            if not any(fila):
+                continue
+            resultado.filas += 1
+            try:
+                valores = {campo: leer(fila) for campo, leer in lectores}
+            except ValueError as e:
+                resultado.error(f'línea {lector.line_num}{ubicacion}', str(e))
+                continue
+            except IndexError:
+                resultado.error(f'línea {lector.line_num}{ubicacion}', 'La fila tiene menos columnas que la cabecera')
+                continue
+
+            valores.update(fijos)
+            clave = tuple(valores[campo] for campo in self.mapeo.clave)
+            if clave in vistas and not self.mapeo.actualizar:
+                resultado.omitidos += 1
+                continue
+            vistas.add(clave)
+            yield clave, self.mapeo.modelo(**valores)
+
+    def _lectores(self, cabecera, cachés):
+        """Funciones fila -> valor por campo, con las columnas ya resueltas a índices"""
+        indices = {nombre.strip().lstrip('\ufeff'): indice for indice, nombre in enumerate(cabecera)}
+        lectores = []
+        for campo, definicion in self.mapeo.campos.items():
+            if isinstance(definicion, Referencia):
+                lectores.append((campo, self._lector_referencia(definicion, indices, cachés)))
+            else:
+                lectores.append((campo, self._lector_columna(definicion, indices)))
+        return lectores
+
+    def _lector_columna(self, columna, indices):
+        indice = next((indices[nombre] for nombre in columna.nombres if nombre in indices), None)
+        nombre = columna.nombres[0]
+
+        if indice is None:
+            fijo = next((self.columnas_fijas[n] for n in columna.nombres if n in self.columnas_fijas), None)
+            if fijo is not None:
+                valor = columna.convertir(fijo)
+                return lambda fila: valor
+            if columna.opcional:
+                return lambda fila: columna.defecto() if callable(columna.defecto) else columna.defecto
+            raise ValueError(f"Falta la columna '{nombre}' en el archivo ({self.mapeo.nombre})")
+
+        def leer(fila):
+            valor = fila[indice]
+            if not valor.strip():
+                if columna.opcional:
+                    return columna.defecto() if callable(columna.defecto) else columna.defecto
+                raise ValueError(f"La columna '{nombre}' está vacía")
+            return columna.convertir(valor)
+        return leer
+
+    def _lector_referencia(self, referencia, indices, cachés):
+        if referencia not in cachés:
+            cachés[referencia] = {
+                tuple(str(valor).strip() for valor in registro[:-1]): registro[-1]
+                for registro in referencia.cargar()
+            }
+        caché = cachés[referencia]
+        partes = [self._lector_columna(columna, indices) for columna in referencia.columnas]
+
+        def leer(fila):
+            clave = tuple(leer_parte(fila) for leer_parte in partes)
+            if None in clave:
+                # Solo en referencias opcionales: columna ausente o vacía
+                return None
+            identificador = caché.get(clave)
+            if identificador is None and not referencia.opcional:
+                raise ValueError(f"No existe {referencia.descripcion} {' / '.join(clave)}")
+            return identificador
+        return leer
+
+    def _guardar_lote(self, lote, resultado):
+        mapeo = self.mapeo
+        with transaction.atomic():
+            existentes = self._existentes(lote)
+            nuevos = [objeto for clave, objeto in lote.items() if clave not in existentes]
+            actualizados = []
+
+            if mapeo.actualizar:
+                for clave, pk in existentes.items():
+                    objeto = lote[clave]
+                    objeto.pk = pk
+                    actualizados.append(objeto)
+                if actualizados:
+                    mapeo.modelo.objects.bulk_update(actualizados, mapeo.actualizar)
+            else:
+                resultado.omitidos += len(existentes)
+
+            insertados = 0
+            if nuevos:
+                if mapeo.preparar:
+                    mapeo.preparar(nuevos)
+                mapeo.modelo.objects.bulk_create(nuevos, ignore_conflicts=True)
+                # ignore_conflicts no informa qué filas descartó: se cuentan las claves nuevas que ahora
+                # existen (una importación concurrente de las mismas filas puede contarlas en ambas)
+                insertados = len(self._existentes({
+                    clave: objeto for clave, objeto in lote.items() if clave not in existentes
+                }))
+                resultado.omitidos += len(nuevos) - insertados
+
+            if mapeo.despues:
+                mapeo.despues(nuevos, actualizados)
+
+        resultado.creados += insertados
+        resultado.actualizados += len(actualizados)
+        resultado.actualizar_tiempo()
+        if self.progreso:
+            self.progreso(resultado)
+
+    def _existentes(self, lote):
+        """
+        Claves del lote que ya están en la base -> pk, en una consulta:
+        se filtra cada campo de la clave con __in y se comparan las tuplas en memoria.
+        """
+        filtros = {
+            f'{campo}__in': {clave[posicion] for clave in lote}
+            for posicion, campo in enumerate(self.mapeo.clave)
+        }
+        return {
+            tuple(registro[:-1]): registro[-1]
+            for registro in self.mapeo.modelo.objects.filter(**filtros).values_list(*self.mapeo.clave, 'pk')
+            if tuple(registro[:-1]) in lote
+        }
+
+
+def detectar_codificacion(ruta):
+    """
+    UTF-8 (con o sin BOM) si la muestra inicial decodifica como UTF-8, si no cp1252
+    (CSV guardados desde Excel en Windows). Solo se lee el comienzo del archivo.
+    """
+    with open(ruta, 'rb') as archivo:
+        muestra = archivo.read(MUESTRA_CODIFICACION)
+    try:
+        # final=False: un carácter cortado al final de la muestra no es un error
+        codecs.getincrementaldecoder('utf-8')().decode(muestra, final=False)
+        return 'utf-8-sig'
+    except UnicodeDecodeError:
+        return 'cp1252'
+
+
+# --- Cachés de referencias ---
+
+def _cursos():
+    return Curso.objects.values_list('id', 'id')
+
+
+def _usuarios_por_codigo():
+    return Usuario.objects.values_list('codigo', 'id')
+
+
+def _materias():
+    return Materia.objects.values_list('nombre', 'curso_id', 'id')
+
+
+def _trimestres():
+    return Trimestre.objects.values_list('id', 'id')
+
+
+def _tipos_evaluacion():
+    return TipoEvaluacion.objects.values_list('id', 'id')
+
+
+def _evaluaciones(modelo):
+    return lambda: modelo.objects.values_list('titulo', 'trimestre_id', 'materia__nombre', 'materia__curso_id', 'id')
+
+
+def _content_type(modelo):
+    return lambda: ContentType.objects.get_for_model(modelo).id
+
+
+# --- Ganchos ---
+
+def _hashear_contraseñas(usuarios):
+    """
+    Hash de las contraseñas de los usuarios nuevos. PBKDF2 libera el GIL,
+    así que un pool de hilos reparte el costo entre los núcleos.
+    """
+    crudas = [usuario.password for usuario in usuarios]
+    with ThreadPoolExecutor() as executor:
+        hashes = executor.map(lambda cruda: make_password(cruda or None), crudas)
+        for usuario, hash_contraseña in zip(usuarios, hashes):
+            usuario.password = hash_contraseña
+
+
+def _recalcular_acumulados_calificaciones(nuevas, actualizadas):
+    AcumuladoTrimestralService().recalcular_calificaciones(nuevas + actualizadas)
+
+
+def _recalcular_acumulados_asistencias(nuevas, actualizadas):
+    AcumuladoTrimestralService().recalcular_asistencias(nuevas + actualizadas)
+
+
+def _recalcular_acumulados_evaluaciones(nuevas, actualizadas):
+    """Las evaluaciones actualizadas pueden cambiar de porcentaje: se recalculan sus calificaciones"""
+    if not actualizadas:
+        return
+    modelo = type(actualizadas[0])
+    AcumuladoTrimestralService().recalcular_calificaciones(
+        Calificacion.objects.filter(
+            content_type=ContentType.objects.get_for_model(modelo),
+            object_id__in=[evaluacion.pk for evaluacion in actualizadas]
+        ).only('content_type_id', 'object_id', 'estudiante_id')
+    )
+
+
+# --- Mapeos por entidad ---
+
+MATERIA = Referencia(('materia', 'curso_id'), _materias, 'la materia')
+TRIMESTRE = Referencia(('trimestre_id',), _trimestres, 'el trimestre')
+TIPO_EVALUACION = Referencia(('tipo_evaluacion_id',), _tipos_evaluacion, 'el tipo de evaluación')
+ESTUDIANTE = Referencia(('estudiante_codigo',), _usuarios_por_codigo, 'el estudiante con código')
+
+USUARIOS = MapeoImportacion(
+    'usuarios', Usuario,
+    clave=['codigo'],
+    campos={
+        'codigo': Columna('codigo'),
+        'nombre': Columna('nombre'),
+        'apellido': Columna('apellido'),
+        'telefono': Columna('telefono', opcional=True),
+        'rol_id': Columna('rol_id', entero, opcional=True),
+        'curso_id': Referencia(('curso',), _cursos, 'el curso', opcional=True),
+        'password': Columna('password', opcional=True)
+    },
+    # La contraseña solo se asigna al crear: una reimportación no pisa las que cambiaron los usuarios
+    actualizar=['nombre', 'apellido', 'telefono', 'rol_id', 'curso_id'],
+    fijos={'is_active': True, 'is_staff': False},
+    preparar=_hashear_contraseñas
+)
+
+MATERIAS = MapeoImportacion(
+    'materias', Materia,
+    clave=['nombre', 'curso_id'],
+    campos={
+        'nombre': Columna('nombre'),
+        'curso_id': Referencia(('curso_id',), _cursos, 'el curso')
+    }
+)
+
+TRIMESTRES = MapeoImportacion(
+    'trimestres', Trimestre,
+    clave=['numero', 'año_academico'],
+    campos={
+        'numero': Columna('numero', entero),
+        'año_academico': Columna('año_academico', entero),
+        'nombre': Columna('nombre'),
+        'fecha_inicio': Columna('fecha_inicio', fecha),
+        'fecha_fin': Columna('fecha_fin', fecha),
+        'fecha_limite_evaluaciones': Columna('fecha_limite_evaluaciones', fecha),
+        'fecha_limite_calificaciones': Columna('fecha_limite_calificaciones', fecha),
+        'nota_minima_aprobacion': Columna('nota_minima_aprobacion', decimal),
+        'porcentaje_asistencia_minima': Columna('porcentaje_asistencia_minima', decimal),
+        'estado': Columna('estado', opcional=True, defecto='PLANIFICADO')
+    },
+    actualizar=[
+        'nombre', 'fecha_inicio', 'fecha_fin', 'fecha_limite_evaluaciones', 'fecha_limite_calificaciones',
+        'nota_minima_aprobacion', 'porcentaje_asistencia_minima', 'estado'
+    ]
+)
+
+EVALUACIONES = MapeoImportacion(
+    'evaluaciones', EvaluacionEntregable,
+    clave=['materia_id', 'trimestre_id', 'titulo'],
+    campos={
+        'materia_id': MATERIA,
+        'trimestre_id': TRIMESTRE,
+        'tipo_evaluacion_id': TIPO_EVALUACION,
+        'titulo': Columna('titulo'),
+        'descripcion': Columna('descripcion', opcional=True),
+        'fecha_asignacion': Columna('fecha_asignacion', fecha),
+        'fecha_entrega': Columna('fecha_entrega', fecha),
+        'nota_maxima': Columna('nota_maxima', decimal, opcional=True, defecto=Decimal('100')),
+        'nota_minima_aprobacion': Columna('nota_minima_aprobacion', decimal, opcional=True, defecto=Decimal('51')),
+        'porcentaje_nota_final': Columna('porcentaje_nota_final', decimal),
+        'permite_entrega_tardia': Columna('permite_entrega_tardia', booleano, opcional=True, defecto=False),
+        'penalizacion_tardio': Columna('penalizacion_tardio', decimal, opcional=True, defecto=Decimal('0'))
+    },
+    actualizar=[
+        'tipo_evaluacion_id', 'descripcion', 'fecha_asignacion', 'fecha_entrega', 'nota_maxima',
+        'nota_minima_aprobacion', 'porcentaje_nota_final', 'permite_entrega_tardia', 'penalizacion_tardio'
+    ],
+    fijos={'publicado': True, 'activo': True},
+    despues=_recalcular_acumulados_evaluaciones
+)
+
+PARTICIPACIONES = MapeoImportacion(
+    'participaciones', EvaluacionParticipacion,
+    clave=['materia_id', 'trimestre_id', 'titulo'],
+    campos={
+        'materia_id': MATERIA,
+        'trimestre_id': TRIMESTRE,
+        'tipo_evaluacion_id': TIPO_EVALUACION,
+        'titulo': Columna('titulo'),
+        'descripcion': Columna('descripcion', opcional=True),
+        'fecha_registro': Columna('fecha_registro', fecha),
+        'porcentaje_nota_final': Columna('porcentaje_nota_final', decimal)
+    },
+    actualizar=['tipo_evaluacion_id', 'descripcion', 'fecha_registro', 'porcentaje_nota_final'],
+    fijos={'publicado': True, 'activo': True},
+    despues=_recalcular_acumulados_evaluaciones
+)
+
+CALIFICACIONES = MapeoImportacion(
+    'calificaciones', Calificacion,
+    clave=['content_type_id', 'object_id', 'estudiante_id'],
+    campos={
+        'object_id': Referencia(
+            (('titulo_evaluacion', 'titulo'), 'trimestre_id', 'materia', 'curso_id'),
+            _evaluaciones(EvaluacionEntregable), 'la evaluación'
+        ),
+        'estudiante_id': ESTUDIANTE,
+        'nota': Columna(('nota', 'calificacion'), decimal),
+        'penalizacion_aplicada': Columna('penalizacion_aplicada', decimal, opcional=True, defecto=Decimal('0')),
+        'entrega_tardia': Columna('entrega_tardia', booleano, opcional=True, defecto=False),
+        'finalizada': Columna('finalizada', booleano, opcional=True, defecto=True),
+        'fecha_entrega': Columna('fecha_entrega', fecha_hora, opcional=True),
+        'fecha_calificacion': Columna(('fecha_calificacion', 'fecha_entrega'), fecha_hora, opcional=True,
+                                      defecto=timezone.now),
+        'observaciones': Columna('observaciones', opcional=True),
+        'retroalimentacion': Columna('retroalimentacion', opcional=True)
+    },
+    fijos={'content_type_id': _content_type(EvaluacionEntregable)},
+    despues=_recalcular_acumulados_calificaciones
+)
+
+CALIFICACIONES_PARTICIPACIONES = MapeoImportacion(
+    'calificaciones_participaciones', Calificacion,
+    clave=['content_type_id', 'object_id', 'estudiante_id'],
+    campos={
+        'object_id': Referencia(
+            (('titulo_evaluacion', 'titulo'), 'trimestre_id', 'materia', 'curso_id'),
+            _evaluaciones(EvaluacionParticipacion), 'la participación'
+        ),
+        'estudiante_id': ESTUDIANTE,
+        'nota': Columna(('nota', 'calificacion'), decimal),
+        'finalizada': Columna('finalizada', booleano, opcional=True, defecto=True),
+        'fecha_entrega': Columna(('fecha_calificacion', 'fecha_registro'), fecha_hora, opcional=True),
+        'fecha_calificacion': Columna(('fecha_calificacion', 'fecha_registro'), fecha_hora, opcional=True,
+                                      defecto=timezone.now)
+    },
+    fijos={'content_type_id': _content_type(EvaluacionParticipacion)},
+    despues=_recalcular_acumulados_calificaciones
+)
+
+ASISTENCIAS = MapeoImportacion(
+    'asistencias', Asistencia,
+    clave=['estudiante_id', 'materia_id', 'fecha'],
+    campos={
+        'estudiante_id': ESTUDIANTE,
+        'materia_id': MATERIA,
+        'trimestre_id': TRIMESTRE,
+        'fecha': Columna('fecha', fecha),
+        'presente': Columna('presente', booleano),
+        'justificada': Columna('justificada', booleano, opcional=True, defecto=False)
+    },
+    despues=_recalcular_acumulados_asistencias,
+    paralelo=True
+)
+
+# Entidad -> mapeos que se aplican en orden sobre el mismo archivo
+# (los CSV "por estudiante" traen la evaluación y su calificación en cada fila)
+ENTIDADES = {
+    'estudiantes': (USUARIOS,),
+    'profesores': (USUARIOS,),
+    'materias': (MATERIAS,),
+    'trimestres': (TRIMESTRES,),
+    'evaluaciones': (EVALUACIONES,),
+    'participaciones': (PARTICIPACIONES,),
+    'calificaciones': (CALIFICACIONES,),
+    'calificaciones_participaciones': (CALIFICACIONES_PARTICIPACIONES,),
+    'evaluaciones_estudiantes': (EVALUACIONES, CALIFICACIONES),
+    'participaciones_estudiantes': (PARTICIPACIONES, CALIFICACIONES_PARTICIPACIONES),
+    'asistencias': (ASISTENCIAS,)
+}
+
+MAPEOS = {
+    mapeo.nombre: mapeo
+    for mapeos in ENTIDADES.values()
+    for mapeo in mapeos
+}
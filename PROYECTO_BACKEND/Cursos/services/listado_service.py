@@ -0,0 +1,185 @@
+import base64
+import json
+import logging
+from functools import reduce
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Q
+
+logger = logging.getLogger(__name__)
+
+LIMITE_POR_DEFECTO = 50
+LIMITE_MAXIMO = 500
+
+
+class CampoCalculado:
+    """Campo de un listado que se arma a partir de otras columnas de la fila"""
+
+    def __init__(self, rutas, funcion):
+        self.rutas = rutas
+        self.funcion = funcion
+
+
+class ListadoService:
+    """
+    Listados de los endpoints de directorio (usuarios, estudiantes, materias...):
+
+    - Paginación por cursor (keyset) sobre el orden del queryset del endpoint con `id`
+      como desempate: ?limite=50&cursor=<siguiente_cursor recibido>. El cursor es opaco
+      y guarda los valores de orden de la última fila. Solo se activa si llega limite o
+      cursor; sin ellos se devuelve todo como antes.
+    - Proyección con ?fields=id,nombre,rol: se leen solo esas columnas con .values().
+    - select_related automático de las relaciones de `campos` al serializar objetos.
+
+    `campos` describe la representación pública: nombre -> ruta ORM, dict anidado de
+    nombre -> ruta, o CampoCalculado.
+    """
+
+    def __init__(self, request, campos, incluir=()):
+        self.campos = campos
+        self.seleccion = self._leer_campos(request.query_params.get('fields'))
+        if self.seleccion is not None:
+            # Campos que el endpoint agrega siempre (p. ej. anotaciones pedidas con otro parámetro)
+            self.seleccion += [nombre for nombre in incluir if nombre not in self.seleccion]
+        self.limite, self.cursor = self._leer_paginacion(request.query_params)
+        self.siguiente_cursor = None
+        # Ids de las filas devueltas por listar(), en orden (aunque fields= no incluya id)
+        self.ids = []
+
+    @property
+    def paginado(self):
+        return self.limite is not None
+
+    def listar(self, queryset, serializar=None):
+        """
+        Filas de la página (o de todo el listado si no se pagina).
+        Con fields= se devuelven diccionarios armados desde .values(); sin fields=
+        se usa `serializar(objetos)` (el serializer del endpoint) con select_related
+        de las relaciones de `campos`.
+        """
+        nombres = self.seleccion or list(self.campos)
+        rutas = self._rutas(nombres)
+        orden = self._orden(queryset)
+
+        if self.paginado:
+            queryset = queryset.order_by(*orden)
+            if self.cursor is not None:
+                queryset = queryset.filter(self._despues_del_cursor(orden))
+            queryset = queryset[:self.limite + 1]
+
+        campos_orden = [campo.lstrip('-') for campo in orden]
+        if self.seleccion is None and serializar is not None:
+            relaciones = sorted({ruta.split('__')[0] for ruta in rutas if '__' in ruta})
+            if relaciones:
+                queryset = queryset.select_related(*relaciones)
+            objetos = self._recortar(list(queryset), campos_orden, _valor_de_objeto)
+            return serializar(objetos)
+
+        columnas = list(dict.fromkeys(['id', *rutas, *campos_orden]))
+        filas = self._recortar(list(queryset.values(*columnas)), campos_orden, _valor_de_fila)
+        return [self._representar(fila, nombres) for fila in filas]
+
+    def datos_paginacion(self):
+        """Claves que se agregan a la respuesta cuando el listado está paginado"""
+        return {
+            'limite': self.limite,
+            'siguiente_cursor': self.siguiente_cursor
+        }
+
+    def _recortar(self, elementos, campos_orden, obtener_valor):
+        """Quitar la fila extra leída para saber si hay otra página y guardar los ids listados"""
+        if self.paginado and len(elementos) > self.limite:
+            elementos = elementos[:self.limite]
+            ultimo = elementos[-1]
+            self.siguiente_cursor = self._codificar_cursor([obtener_valor(ultimo, campo) for campo in campos_orden])
+        else:
+            self.siguiente_cursor = None
+        self.ids = [obtener_valor(elemento, 'id') for elemento in elementos]
+        return elementos
+
+    def _orden(self, queryset):
+        """Orden del endpoint (order_by del queryset o Meta.ordering) con `id` como desempate"""
+        orden = [campo for campo in queryset.query.order_by or queryset.model._meta.ordering if isinstance(campo, str)]
+        if not any(campo.lstrip('-') in ('id', 'pk') for campo in orden):
+            orden.append('id')
+        return orden
+
+    def _despues_del_cursor(self, orden):
+        """Filas posteriores a la del cursor: (a > x) OR (a = x AND b > y) OR ... en el orden dado"""
+        if len(self.cursor) != len(orden):
+            raise ValueError('El cursor no corresponde a este listado')
+        condicion = Q()
+        iguales = {}
+        for campo, valor in zip(orden, self.cursor):
+            nombre = campo.lstrip('-')
+            comparacion = 'lt' if campo.startswith('-') else 'gt'
+            condicion |= Q(**iguales, **{f'{nombre}__{comparacion}': valor})
+            iguales[nombre] = valor
+        return condicion
+
+    def _codificar_cursor(self, valores):
+        texto = json.dumps(valores, cls=DjangoJSONEncoder, separators=(',', ':'))
+        return base64.urlsafe_b64encode(texto.encode('utf-8')).decode('ascii')
+
+    def _decodificar_cursor(self, cursor):
+        try:
+            valores = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+        except (ValueError, UnicodeError):
+            raise ValueError('El parámetro cursor no es válido')
+        if not isinstance(valores, list):
+            raise ValueError('El parámetro cursor no es válido')
+        return valores
+
+    def _representar(self, fila, nombres):
+        datos = {}
+        for nombre in nombres:
+            campo = self.campos[nombre]
+            if isinstance(campo, CampoCalculado):
+                datos[nombre] = campo.funcion(fila)
+            elif isinstance(campo, dict):
+                anidado = {clave: fila[ruta] for clave, ruta in campo.items()}
+                # Relación nula (p. ej. usuario sin rol): igual que el serializer
+                datos[nombre] = anidado if any(valor is not None for valor in anidado.values()) else None
+            else:
+                datos[nombre] = fila[campo]
+        return datos
+
+    def _rutas(self, nombres):
+        rutas = []
+        for nombre in nombres:
+            campo = self.campos[nombre]
+            if isinstance(campo, CampoCalculado):
+                rutas.extend(campo.rutas)
+            elif isinstance(campo, dict):
+                rutas.extend(campo.values())
+            else:
+                rutas.append(campo)
+        return list(dict.fromkeys(rutas))
+
+    def _leer_campos(self, valor):
+        if not valor:
+            return None
+        nombres = [nombre.strip() for nombre in valor.split(',') if nombre.strip()]
+        desconocidos = [nombre for nombre in nombres if nombre not in self.campos]
+        if desconocidos:
+            raise ValueError(
+                f"Campos no disponibles: {', '.join(desconocidos)}. Disponibles: {', '.join(self.campos)}"
+            )
+        return list(dict.fromkeys(nombres))
+
+    def _leer_paginacion(self, params):
+        if 'limite' not in params and 'cursor' not in params:
+            return None, None
+        try:
+            limite = int(params.get('limite', LIMITE_POR_DEFECTO))
+        except ValueError:
+            raise ValueError('El parámetro limite debe ser un número')
+        cursor = self._decodificar_cursor(params['cursor']) if params.get('cursor') else None
+        return max(1, min(limite, LIMITE_MAXIMO)), cursor
+
+
+def _valor_de_objeto(objeto, ruta):
+    return reduce(getattr, ruta.split('__'), objeto)
+
+
+def _valor_de_fila(fila, ruta):
+    return fila[ruta]
@@ -0,0 +1,406 @@
+from decimal import Decimal
+import numpy as np
+import pandas as pd
+from django.contrib.contenttypes.models import ContentType
+from django.db import transaction
+from django.db.models import Count, Q
+from ..models import (Asistencia, Calificacion, EvaluacionEntregable, EvaluacionParticipacion,
+                      Materia, PromedioAnual, PromedioTrimestral, Trimestre)
+from Usuarios.models import Usuario
+import logging
+
+logger = logging.getLogger(__name__)
+
+CAMPOS_PROMEDIO = [
+    'promedio_evaluaciones', 'promedio_final', 'total_clases', 'asistencias',
+    'porcentaje_asistencia', 'aprobado', 'calculado_automaticamente', 'fecha_calculo'
+]
+
+CAMPOS_PROMEDIO_ANUAL = [
+    'promedio_trimestre_1', 'promedio_trimestre_2', 'promedio_trimestre_3', 'promedio_anual',
+    'aprobado_anual', 'porcentaje_asistencia_anual', 'calculado_automaticamente', 'fecha_calculo'
+]
+
+
+class PromedioTrimestralService:
+    """
+    Cálculo por lotes de los promedios trimestrales: lee evaluaciones, calificaciones
+    y asistencias del trimestre con unas pocas consultas, calcula promedios ponderados
+    y asistencia con group-bys de pandas y guarda PromedioTrimestral con un upsert.
+    """
+
+    def calcular(self, trimestre, materias_ids=None, estudiantes_ids=None):
+        """
+        Calcular y guardar los promedios del trimestre.
+
+        Se procesa cada (estudiante, materia) del curso de la materia cuando la materia
+        tiene al menos una evaluación en el trimestre. Devuelve un resultado por par con
+        el formato de la API, ordenado por materia y por apellido/nombre del estudiante.
+        """
+        materias = Materia.objects.all().order_by('id').values_list('id', 'nombre', 'curso_id')
+        if materias_ids is not None:
+            materias = materias.filter(id__in=materias_ids)
+        materias = list(materias)
+        if not materias:
+            return []
+
+        # Solo materias con al menos una evaluación en el trimestre
+        evaluaciones = self._cargar_evaluaciones(trimestre, [m[0] for m in materias])
+        materias_evaluadas = set(evaluaciones['materia_id'].tolist())
+        materias = [m for m in materias if m[0] in materias_evaluadas]
+        if not materias:
+            return []
+
+        estudiantes = Usuario.objects.filter(
+            curso_id__in={curso_id for _, _, curso_id in materias},
+            rol__nombre='Estudiante'
+        ).order_by('apellido', 'nombre').values_list('id', 'nombre', 'apellido', 'curso_id')
+        if estudiantes_ids is not None:
+            estudiantes = estudiantes.filter(id__in=estudiantes_ids)
+        estudiantes = list(estudiantes)
+
+        # Pares (estudiante, materia) a procesar, en el orden de la respuesta
+        estudiantes_por_curso = {}
+        for estudiante in estudiantes:
+            estudiantes_por_curso.setdefault(estudiante[3], []).append(estudiante)
+
+        pares = pd.DataFrame(
+            [
+                (estudiante_id, materia_id, f"{nombre} {apellido}", materia_nombre)
+                for materia_id, materia_nombre, curso_id in materias
+                for estudiante_id, nombre, apellido, _ in estudiantes_por_curso.get(curso_id, [])
+            ],
+            columns=['estudiante_id', 'materia_id', 'estudiante', 'materia']
+        )
+        if pares.empty:
+            return []
+
+        ids_estudiantes = pares['estudiante_id'].unique().tolist()
+        notas = self._promedios_evaluaciones(evaluaciones, ids_estudiantes)
+        asistencias = self._asistencias(trimestre, pares['materia_id'].unique().tolist(), ids_estudiantes)
+
+        pares = pares.merge(notas, on=['estudiante_id', 'materia_id'], how='left')
+        pares = pares.merge(asistencias, on=['estudiante_id', 'materia_id'], how='left')
+        pares['promedio_evaluaciones'] = pares['promedio_evaluaciones'].fillna(0.0)
+        pares['total_clases'] = pares['total_clases'].fillna(0).astype('int64')
+        pares['asistencias'] = pares['asistencias'].fillna(0).astype('int64')
+
+        pares['porcentaje_asistencia'] = np.where(
+            pares['total_clases'] > 0,
+            pares['asistencias'] * 100.0 / pares['total_clases'].where(pares['total_clases'] > 0, 1),
+            0.0
+        )
+        # Aprobación en centésimos enteros, con los mismos valores que se guardan (como en
+        # PromedioAnualService): un promedio de 50.995 se guarda 51.00 y aprueba en ambos
+        pares['promedio_centesimos'] = _a_centesimos(pares['promedio_evaluaciones'])
+        pares['asistencia_centesimos'] = _a_centesimos(pares['porcentaje_asistencia'])
+        pares['aprobado'] = (
+            (pares['asistencia_centesimos'] >= _umbral_centesimos(trimestre.porcentaje_asistencia_minima)) &
+            (pares['promedio_centesimos'] >= _umbral_centesimos(trimestre.nota_minima_aprobacion))
+        )
+
+        existentes = set(
+            PromedioTrimestral.objects.filter(
+                trimestre=trimestre,
+                materia_id__in=pares['materia_id'].unique().tolist(),
+                estudiante_id__in=ids_estudiantes
+            ).values_list('estudiante_id', 'materia_id')
+        )
+
+        with transaction.atomic():
+            self._guardar(trimestre, pares)
+
+        return [
+            {
+                'estudiante': fila.estudiante,
+                'materia': fila.materia,
+                'promedio_evaluaciones': float(fila.promedio_evaluaciones),
+                'promedio_final': float(fila.promedio_evaluaciones),
+                'porcentaje_asistencia': float(fila.porcentaje_asistencia),
+                'aprobado': bool(fila.aprobado),
+                'created': (fila.estudiante_id, fila.materia_id) not in existentes
+            }
+            for fila in pares.itertuples(index=False)
+        ]
+
+    def _cargar_evaluaciones(self, trimestre, materias_ids):
+        """Evaluaciones de ambos tipos del trimestre con su content type y porcentaje"""
+        filas = []
+        for modelo in (EvaluacionEntregable, EvaluacionParticipacion):
+            content_type_id = ContentType.objects.get_for_model(modelo).id
+            filas.extend(
+                (content_type_id, evaluacion_id, materia_id, porcentaje)
+                for evaluacion_id, materia_id, porcentaje in modelo.objects.filter(
+                    trimestre=trimestre,
+                    materia_id__in=materias_ids
+                ).values_list('id', 'materia_id', 'porcentaje_nota_final')
+            )
+
+        evaluaciones = pd.DataFrame(filas, columns=['content_type_id', 'object_id', 'materia_id', 'porcentaje'])
+        evaluaciones['porcentaje'] = evaluaciones['porcentaje'].astype('float64')
+        return evaluaciones
+
+    def _promedios_evaluaciones(self, evaluaciones, estudiantes_ids):
+        """Promedio ponderado (nota con penalización) por estudiante y materia"""
+        filas = []
+        for content_type_id, grupo in evaluaciones.groupby('content_type_id'):
+            filas.extend(
+                Calificacion.objects.filter(
+                    content_type_id=content_type_id,
+                    object_id__in=grupo['object_id'].tolist(),
+                    estudiante_id__in=estudiantes_ids
+                ).values_list('content_type_id', 'object_id', 'estudiante_id', 'nota', 'penalizacion_aplicada')
+            )
+
+        calificaciones = pd.DataFrame(
+            filas, columns=['content_type_id', 'object_id', 'estudiante_id', 'nota', 'penalizacion']
+        )
+        if calificaciones.empty:
+            return pd.DataFrame(columns=['estudiante_id', 'materia_id', 'promedio_evaluaciones'])
+
+        calificaciones = calificaciones.merge(evaluaciones, on=['content_type_id', 'object_id'])
+        nota = calificaciones['nota'].astype('float64')
+        penalizacion = calificaciones['penalizacion'].fillna(0).astype('float64')
+
+        # Igual que Calificacion.calcular_nota_con_penalizacion
+        calificaciones['nota_penalizada'] = np.where(
+            penalizacion > 0, np.maximum(0.0, nota - nota * penalizacion / 100), nota
+        )
+        calificaciones['ponderada'] = calificaciones['nota_penalizada'] * calificaciones['porcentaje'] / 100
+
+        promedios = calificaciones.groupby(['estudiante_id', 'materia_id']).agg(
+            suma_ponderada=('ponderada', 'sum'),
+            suma_porcentajes=('porcentaje', 'sum')
+        ).reset_index()
+
+        promedios['promedio_evaluaciones'] = np.where(
+            promedios['suma_porcentajes'] > 0,
+            promedios['suma_ponderada'] / promedios['suma_porcentajes'].where(promedios['suma_porcentajes'] > 0, 1) * 100,
+            0.0
+        )
+        return promedios[['estudiante_id', 'materia_id', 'promedio_evaluaciones']]
+
+    def _asistencias(self, trimestre, materias_ids, estudiantes_ids):
+        """Total de clases y presentes por estudiante y materia dentro de las fechas del trimestre"""
+        filas = Asistencia.objects.filter(
+            materia_id__in=materias_ids,
+            estudiante_id__in=estudiantes_ids,
+            fecha__range=[trimestre.fecha_inicio, trimestre.fecha_fin]
+        ).values('estudiante_id', 'materia_id').annotate(
+            total_clases=Count('id'),
+            asistencias=Count('id', filter=Q(presente=True))
+        ).order_by().values_list('estudiante_id', 'materia_id', 'total_clases', 'asistencias')
+
+        return pd.DataFrame(list(filas), columns=['estudiante_id', 'materia_id', 'total_clases', 'asistencias'])
+
+    def _guardar(self, trimestre, pares):
+        """Upsert de PromedioTrimestral sobre (estudiante, materia, trimestre)"""
+        registros = [
+            PromedioTrimestral(
+                estudiante_id=fila.estudiante_id,
+                materia_id=fila.materia_id,
+                trimestre=trimestre,
+                promedio_evaluaciones=_centesimos_a_decimal(fila.promedio_centesimos),
+                promedio_final=_centesimos_a_decimal(fila.promedio_centesimos),
+                total_clases=fila.total_clases,
+                asistencias=fila.asistencias,
+                porcentaje_asistencia=_centesimos_a_decimal(fila.asistencia_centesimos),
+                aprobado=bool(fila.aprobado),
+                calculado_automaticamente=True
+            )
+            for fila in pares.itertuples(index=False)
+        ]
+
+        PromedioTrimestral.objects.bulk_create(
+            registros,
+            batch_size=500,
+            update_conflicts=True,
+            unique_fields=['estudiante', 'materia', 'trimestre'],
+            update_fields=CAMPOS_PROMEDIO
+        )
+        logger.info(f"Promedios trimestrales guardados para {trimestre}: {len(registros)}")
+        return len(registros)
+
+
+
+class PromedioAnualService:
+    """
+    Consolidación anual a partir de los promedios trimestrales guardados: lee todos los
+    PromedioTrimestral del año en una consulta, los pivotea a una columna por trimestre,
+    calcula promedio, aprobación y asistencia por columnas y guarda PromedioAnual con un upsert.
+    """
+
+    def validar_trimestres(self, año_academico):
+        """Trimestres del año en orden; se requieren exactamente 3"""
+        trimestres = list(Trimestre.objects.filter(año_academico=año_academico).order_by('numero'))
+        if len(trimestres) != 3:
+            raise ValueError(
+                f'Se requieren exactamente 3 trimestres para calcular promedios anuales. Encontrados: {len(trimestres)}'
+            )
+        return trimestres
+
+    def calcular(self, año_academico, materias_ids=None, cursos_ids=None, progreso=None):
+        """
+        Calcular y guardar los promedios anuales del año académico, opcionalmente solo
+        para algunas materias o cursos. Se procesa cada (estudiante, materia) del curso
+        de la materia; el resultado se ordena por materia y estudiante.
+        `progreso(lote_actual, total_lotes, mensaje)` se llama al terminar cada etapa.
+        """
+        trimestres = self.validar_trimestres(año_academico)
+
+        materias = Materia.objects.order_by('id').values_list('id', 'nombre', 'curso_id')
+        if materias_ids is not None:
+            materias = materias.filter(id__in=materias_ids)
+        if cursos_ids is not None:
+            materias = materias.filter(curso_id__in=cursos_ids)
+        materias = list(materias)
+        if not materias:
+            return []
+
+        estudiantes_por_curso = {}
+        for estudiante in Usuario.objects.filter(
+            curso_id__in={curso_id for _, _, curso_id in materias},
+            rol__nombre='Estudiante'
+        ).order_by('id').values_list('id', 'nombre', 'apellido', 'curso_id'):
+            estudiantes_por_curso.setdefault(estudiante[3], []).append(estudiante)
+
+        pares = pd.DataFrame(
+            [
+                (estudiante_id, materia_id, f"{nombre} {apellido}", materia_nombre)
+                for materia_id, materia_nombre, curso_id in materias
+                for estudiante_id, nombre, apellido, _ in estudiantes_por_curso.get(curso_id, [])
+            ],
+            columns=['estudiante_id', 'materia_id', 'estudiante', 'materia']
+        )
+        if pares.empty:
+            return []
+
+        ids_materias = pares['materia_id'].unique().tolist()
+        ids_estudiantes = pares['estudiante_id'].unique().tolist()
+
+        pares = pares.merge(
+            self._pivotear_trimestres(trimestres, ids_materias, ids_estudiantes),
+            on=['estudiante_id', 'materia_id'],
+            how='left'
+        )
+        if progreso:
+            progreso(1, 2, 'Promedios trimestrales leídos')
+
+        # Las notas se manejan en centésimos enteros: sumas y comparaciones exactas,
+        # iguales a las de los Decimal de PromedioAnual.calcular_promedio_anual
+        columnas = [f'trimestre_{numero}' for numero in (1, 2, 3)]
+        notas = pares[columnas]
+        pares['cantidad'] = notas.notna().sum(axis=1).astype('int64')
+        pares['suma'] = notas.sum(axis=1, min_count=1).fillna(0).astype('int64')
+        pares['aprobado_anual'] = (pares['cantidad'] > 0) & (pares['suma'] >= 5100 * pares['cantidad'])
+        pares['asistencias_registradas'] = pares['asistencias_registradas'].fillna(0).astype('int64')
+        pares['suma_asistencia'] = pares['suma_asistencia'].fillna(0).astype('int64')
+
+        existentes = set(
+            PromedioAnual.objects.filter(
+                año_academico=año_academico,
+                materia_id__in=ids_materias,
+                estudiante_id__in=ids_estudiantes
+            ).values_list('estudiante_id', 'materia_id')
+        )
+
+        registros = []
+        resultados = []
+        for fila in pares.itertuples(index=False):
+            promedio_anual = self._promedio(fila.suma, fila.cantidad)
+            porcentaje_asistencia_anual = self._promedio(fila.suma_asistencia, fila.asistencias_registradas)
+
+            registros.append(PromedioAnual(
+                estudiante_id=fila.estudiante_id,
+                materia_id=fila.materia_id,
+                año_academico=año_academico,
+                promedio_trimestre_1=_centesimos_a_decimal(fila.trimestre_1),
+                promedio_trimestre_2=_centesimos_a_decimal(fila.trimestre_2),
+                promedio_trimestre_3=_centesimos_a_decimal(fila.trimestre_3),
+                promedio_anual=promedio_anual,
+                aprobado_anual=bool(fila.aprobado_anual),
+                porcentaje_asistencia_anual=porcentaje_asistencia_anual,
+                calculado_automaticamente=True
+            ))
+            resultados.append({
+                'estudiante': fila.estudiante,
+                'materia': fila.materia,
+                'promedio_anual': float(promedio_anual),
+                'aprobado_anual': bool(fila.aprobado_anual),
+                'porcentaje_asistencia_anual': float(porcentaje_asistencia_anual),
+                'created': (fila.estudiante_id, fila.materia_id) not in existentes
+            })
+
+        with transaction.atomic():
+            PromedioAnual.objects.bulk_create(
+                registros,
+                batch_size=500,
+                update_conflicts=True,
+                unique_fields=['estudiante', 'materia', 'año_academico'],
+                update_fields=CAMPOS_PROMEDIO_ANUAL
+            )
+        logger.info(f"Promedios anuales guardados para {año_academico}: {len(registros)}")
+
+        if progreso:
+            progreso(2, 2, f'{len(registros)} promedios anuales guardados')
+
+        return resultados
+
+    def _pivotear_trimestres(self, trimestres, materias_ids, estudiantes_ids):
+        """
+        Promedios trimestrales del año en una consulta, pivoteados a una columna
+        trimestre_<numero> (en centésimos) por (estudiante, materia), más la suma y
+        cantidad de porcentajes de asistencia registrados.
+        """
+        numeros = {trimestre.id: trimestre.numero for trimestre in trimestres}
+        filas = pd.DataFrame(
+            list(PromedioTrimestral.objects.filter(
+                trimestre_id__in=list(numeros),
+                materia_id__in=materias_ids,
+                estudiante_id__in=estudiantes_ids
+            ).order_by().values_list(
+                'estudiante_id', 'materia_id', 'trimestre_id', 'promedio_final', 'porcentaje_asistencia'
+            )),
+            columns=['estudiante_id', 'materia_id', 'trimestre_id', 'promedio_final', 'porcentaje_asistencia']
+        )
+
+        columnas = [f'trimestre_{numero}' for numero in (1, 2, 3)]
+        if filas.empty:
+            return pd.DataFrame(
+                columns=['estudiante_id', 'materia_id', *columnas, 'suma_asistencia', 'asistencias_registradas']
+            )
+
+        filas['columna'] = 'trimestre_' + filas['trimestre_id'].map(numeros).astype(str)
+        filas['nota'] = _a_centesimos(filas['promedio_final'])
+        filas['asistencia'] = _a_centesimos(filas['porcentaje_asistencia'])
+
+        notas = filas.pivot(
+            index=['estudiante_id', 'materia_id'], columns='columna', values='nota'
+        ).reindex(columns=columnas)
+        asistencias = filas.groupby(['estudiante_id', 'materia_id']).agg(
+            suma_asistencia=('asistencia', 'sum'),
+            asistencias_registradas=('asistencia', 'size')
+        )
+        return notas.join(asistencias).reset_index()
+
+    def _promedio(self, suma_centesimos, cantidad):
+        """Promedio en Decimal (sin redondear, como en el cálculo por modelo)"""
+        if not cantidad:
+            return Decimal('0.0')
+        return Decimal(int(suma_centesimos)).scaleb(-2) / cantidad
+
+
+def _a_centesimos(serie):
+    """Notas o porcentajes en centésimos enteros (el redondeo a 2 decimales con que se guardan)"""
+    return np.rint(serie.astype('float64') * 100).astype('int64')
+
+
+def _centesimos_a_decimal(valor):
+    if pd.isna(valor):
+        return None
+    return Decimal(int(valor)).scaleb(-2)
+
+
+def _umbral_centesimos(valor):
+    """Nota o asistencia mínima (DecimalField de 2 decimales) en centésimos"""
+    return int((Decimal(str(valor)) * 100).to_integral_value())
@@ -0,0 +1,454 @@
+import json
+import numpy as np
+from django.contrib.contenttypes.models import ContentType
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Avg, Count, OuterRef, Q, Subquery
+from ..models import (Calificacion, EvaluacionEntregable, EvaluacionParticipacion,
+                      PromedioAnual, PromedioTrimestral, Trimestre)
+from .exportacion_service import TAMAÑO_LOTE_EXPORTACION
+from Usuarios.models import Usuario
+import logging
+
+logger = logging.getLogger(__name__)
+
+NOTA_MINIMA_GENERAL = 51.0
+
+
+class PlanillaCalificaciones:
+    """
+    Planilla densa de una materia: estudiantes en filas, evaluaciones en columnas.
+    `notas` es una matriz float64 con NaN donde no hay calificación; `pesos` es el
+    vector de porcentaje_nota_final de cada columna.
+    """
+
+    def __init__(self, materia, estudiantes, evaluaciones, notas, entrega_tardia, pesos, notas_minimas):
+        self.materia = materia
+        self.estudiantes = estudiantes
+        self.evaluaciones = evaluaciones
+        self.notas = notas
+        self.entrega_tardia = entrega_tardia
+        self.pesos = pesos
+        self.notas_minimas = notas_minimas
+
+        # Promedio ponderado sobre las evaluaciones calificadas de cada estudiante:
+        # suma(nota * peso) / suma(peso), con la máscara NaN excluyendo las celdas vacías
+        calificadas = ~np.isnan(notas)
+        self.total_porcentaje = calificadas.astype('float64') @ pesos
+        suma_ponderada = np.where(calificadas, notas, 0.0) @ pesos
+        con_notas = self.total_porcentaje > 0
+        self.promedio_final = np.divide(
+            suma_ponderada, self.total_porcentaje,
+            out=np.zeros(len(estudiantes)), where=con_notas
+        )
+        # Redondeo a 9 decimales para que el ruido de punto flotante no cambie el resultado en el límite
+        self.esta_aprobado = con_notas & (np.round(self.promedio_final, 9) >= NOTA_MINIMA_GENERAL)
+        self.celdas_aprobadas = calificadas & (np.where(calificadas, notas, -np.inf) >= notas_minimas)
+
+    @property
+    def calificadas(self):
+        return ~np.isnan(self.notas)
+
+
+class PlanillaCalificacionesService:
+    """Construcción de la planilla de calificaciones de una materia con una consulta de calificaciones"""
+
+    def construir(self, materia):
+        estudiantes = list(
+            Usuario.objects.filter(
+                curso_id=materia.curso_id,
+                rol__nombre='Estudiante'
+            ).order_by('apellido', 'nombre').values_list('id', 'nombre', 'apellido', 'codigo')
+        )
+
+        # Evaluaciones activas de ambos tipos con su tipo_evaluacion (sin accesos perezosos)
+        evaluaciones = [
+            evaluacion
+            for modelo in (EvaluacionEntregable, EvaluacionParticipacion)
+            for evaluacion in modelo.objects.filter(materia=materia, activo=True).select_related('tipo_evaluacion')
+        ]
+        evaluaciones.sort(key=lambda x: getattr(x, 'fecha_asignacion', getattr(x, 'fecha_registro', None)))
+
+        content_types = {
+            modelo: ContentType.objects.get_for_model(modelo).id
+            for modelo in (EvaluacionEntregable, EvaluacionParticipacion)
+        }
+        columnas = {
+            (content_types[type(evaluacion)], evaluacion.id): indice
+            for indice, evaluacion in enumerate(evaluaciones)
+        }
+        filas = {estudiante[0]: indice for indice, estudiante in enumerate(estudiantes)}
+
+        notas = np.full((len(estudiantes), len(evaluaciones)), np.nan)
+        entrega_tardia = np.zeros((len(estudiantes), len(evaluaciones)), dtype=bool)
+
+        # Todas las calificaciones de la planilla en una sola consulta
+        if estudiantes and evaluaciones:
+            ids_por_tipo = {}
+            for evaluacion in evaluaciones:
+                ids_por_tipo.setdefault(content_types[type(evaluacion)], []).append(evaluacion.id)
+
+            calificaciones = Calificacion.objects.filter(
+                estudiante_id__in=list(filas),
+                content_type_id__in=list(ids_por_tipo),
+                object_id__in=[evaluacion.id for evaluacion in evaluaciones]
+            ).values_list('estudiante_id', 'content_type_id', 'object_id', 'nota', 'entrega_tardia')
+
+            for estudiante_id, content_type_id, object_id, nota, tardia in calificaciones:
+                columna = columnas.get((content_type_id, object_id))
+                if columna is None:
+                    continue
+                fila = filas[estudiante_id]
+                notas[fila, columna] = float(nota)
+                entrega_tardia[fila, columna] = tardia
+
+        pesos = np.array([float(evaluacion.porcentaje_nota_final) for evaluacion in evaluaciones], dtype='float64')
+        notas_minimas = np.array([
+            float(evaluacion.nota_minima_aprobacion) if isinstance(evaluacion, EvaluacionEntregable) else NOTA_MINIMA_GENERAL
+            for evaluacion in evaluaciones
+        ], dtype='float64')
+
+        return PlanillaCalificaciones(
+            materia, estudiantes, evaluaciones, notas, entrega_tardia, pesos, notas_minimas
+        )
+
+    def evaluaciones_info(self, planilla):
+        """Información de las columnas para el frontend"""
+        evaluaciones_info = []
+        for evaluacion in planilla.evaluaciones:
+            eval_data = {
+                'id': evaluacion.id,
+                'titulo': evaluacion.titulo,
+                'tipo': evaluacion.tipo_evaluacion.get_nombre_display(),
+                'porcentaje_nota_final': float(evaluacion.porcentaje_nota_final),
+            }
+
+            # Añadir campos específicos según tipo
+            if isinstance(evaluacion, EvaluacionEntregable):
+                eval_data.update({
+                    'fecha_entrega': evaluacion.fecha_entrega,
+                    'nota_maxima': float(evaluacion.nota_maxima),
+                    'nota_minima_aprobacion': float(evaluacion.nota_minima_aprobacion),
+                    'tipo_objeto': 'entregable'
+                })
+            else:
+                eval_data.update({
+                    'fecha_registro': evaluacion.fecha_registro,
+                    'nota_maxima': 100.0,
+                    'nota_minima_aprobacion': 51.0,
+                    'tipo_objeto': 'participacion'
+                })
+
+            evaluaciones_info.append(eval_data)
+        return evaluaciones_info
+
+    def a_filas(self, planilla):
+        """Formato clásico: un objeto por estudiante con sus calificaciones indexadas por evaluación"""
+        reporte_data = []
+        calificadas = planilla.calificadas
+
+        for fila, (estudiante_id, nombre, apellido, codigo) in enumerate(planilla.estudiantes):
+            calificaciones = {}
+            for columna, evaluacion in enumerate(planilla.evaluaciones):
+                if calificadas[fila, columna]:
+                    calificaciones[str(evaluacion.id)] = {
+                        'nota': float(planilla.notas[fila, columna]),
+                        'porcentaje': 100.0,
+                        'esta_aprobado': bool(planilla.celdas_aprobadas[fila, columna]),
+                        'entrega_tardia': bool(planilla.entrega_tardia[fila, columna])
+                    }
+                else:
+                    calificaciones[str(evaluacion.id)] = {
+                        'nota': None,
+                        'porcentaje': None,
+                        'esta_aprobado': False,
+                        'entrega_tardia': False
+                    }
+
+            reporte_data.append({
+                'estudiante': {
+                    'id': estudiante_id,
+                    'nombre': f"{nombre} {apellido}",
+                    'codigo': codigo
+                },
+                'calificaciones': calificaciones,
+                'promedio_final': self._redondear(planilla.promedio_final[fila]),
+                'total_porcentaje': float(planilla.total_porcentaje[fila]),
+                'esta_aprobado': bool(planilla.esta_aprobado[fila])
+            })
+        return reporte_data
+
+    def a_columnas(self, planilla):
+        """Formato columnar compacto: listas paralelas y la matriz de notas (null si falta)"""
+        calificadas = planilla.calificadas
+        return {
+            'evaluaciones': {
+                'id': [evaluacion.id for evaluacion in planilla.evaluaciones],
+                'titulo': [evaluacion.titulo for evaluacion in planilla.evaluaciones],
+                'tipo_objeto': [
+                    'entregable' if isinstance(evaluacion, EvaluacionEntregable) else 'participacion'
+                    for evaluacion in planilla.evaluaciones
+                ],
+                'porcentaje_nota_final': planilla.pesos.tolist(),
+                'nota_minima_aprobacion': planilla.notas_minimas.tolist()
+            },
+            'estudiantes': {
+                'id': [estudiante[0] for estudiante in planilla.estudiantes],
+                'nombre': [f"{estudiante[1]} {estudiante[2]}" for estudiante in planilla.estudiantes],
+                'codigo': [estudiante[3] for estudiante in planilla.estudiantes]
+            },
+            'notas': [
+                [float(nota) if calificada else None for nota, calificada in zip(fila, mascara)]
+                for fila, mascara in zip(planilla.notas.tolist(), calificadas.tolist())
+            ],
+            'entrega_tardia': planilla.entrega_tardia.tolist(),
+            'promedio_final': [self._redondear(promedio) for promedio in planilla.promedio_final],
+            'total_porcentaje': planilla.total_porcentaje.tolist(),
+            'esta_aprobado': planilla.esta_aprobado.tolist()
+        }
+
+    def columnas_exportacion(self, planilla):
+        """Encabezados de la planilla descargable: una columna por evaluación"""
+        return (
+            ['codigo', 'estudiante']
+            + [f"{evaluacion.titulo} ({float(evaluacion.porcentaje_nota_final):g}%)" for evaluacion in planilla.evaluaciones]
+            + ['promedio_final', 'total_porcentaje', 'esta_aprobado']
+        )
+
+    def filas_exportacion(self, planilla):
+        """Una fila por estudiante (celdas vacías donde no hay calificación)"""
+        calificadas = planilla.calificadas
+        for fila, (_, nombre, apellido, codigo) in enumerate(planilla.estudiantes):
+            yield (
+                [codigo, f"{nombre} {apellido}"]
+                + [
+                    float(planilla.notas[fila, columna]) if calificadas[fila, columna] else None
+                    for columna in range(len(planilla.evaluaciones))
+                ]
+                + [
+                    self._redondear(planilla.promedio_final[fila]),
+                    float(planilla.total_porcentaje[fila]),
+                    'SI' if planilla.esta_aprobado[fila] else 'NO'
+                ]
+            )
+
+    def _redondear(self, valor):
+        return round(float(valor), 2)
+
+
+class ReporteTrimestralService:
+    """Reporte de los promedios de un trimestre con sus estadísticas generales"""
+
+    COLUMNAS_EXPORTACION = [
+        'codigo', 'estudiante', 'materia', 'curso', 'promedio_evaluaciones', 'promedio_final',
+        'porcentaje_asistencia', 'total_clases', 'asistencias', 'aprobado', 'observaciones'
+    ]
+
+    def __init__(self, trimestre):
+        self.trimestre = trimestre
+
+    def consulta(self, materia_id=None, curso_id=None):
+        promedios = PromedioTrimestral.objects.filter(
+            trimestre=self.trimestre
+        ).select_related('estudiante', 'materia__curso__nivel')
+
+        if materia_id:
+            promedios = promedios.filter(materia_id=materia_id)
+        if curso_id:
+            promedios = promedios.filter(materia__curso_id=curso_id)
+        return promedios
+
+    def fila(self, promedio):
+        return {
+            'estudiante': {
+                'id': promedio.estudiante.id,
+                'nombre': f"{promedio.estudiante.nombre} {promedio.estudiante.apellido}",
+                'codigo': promedio.estudiante.codigo
+            },
+            'materia': {
+                'id': promedio.materia.id,
+                'nombre': promedio.materia.nombre,
+                'curso': str(promedio.materia.curso)
+            },
+            'promedio_evaluaciones': float(promedio.promedio_evaluaciones),
+            'promedio_final': float(promedio.promedio_final),
+            'porcentaje_asistencia': float(promedio.porcentaje_asistencia),
+            'total_clases': promedio.total_clases,
+            'asistencias': promedio.asistencias,
+            'aprobado': promedio.aprobado,
+            'observaciones': promedio.observaciones
+        }
+
+    def estadisticas(self, promedios):
+        """Totales, aprobación y promedios generales en una sola consulta de agregación"""
+        totales = promedios.order_by().aggregate(
+            total=Count('id'),
+            aprobados=Count('id', filter=Q(aprobado=True)),
+            promedio_general=Avg('promedio_final'),
+            asistencia_promedio=Avg('porcentaje_asistencia')
+        )
+        total_estudiantes = totales['total']
+        aprobados = totales['aprobados']
+
+        return {
+            'total_estudiantes': total_estudiantes,
+            'aprobados': aprobados,
+            'reprobados': total_estudiantes - aprobados,
+            'porcentaje_aprobacion': round((aprobados / total_estudiantes * 100), 2) if total_estudiantes > 0 else 0,
+            'promedio_general': round(float(totales['promedio_general'] or 0), 2),
+            'asistencia_promedio': round(float(totales['asistencia_promedio'] or 0), 2)
+        }
+
+    def filas_exportacion(self, promedios, chunk_size=TAMAÑO_LOTE_EXPORTACION):
+        """Filas planas del reporte (COLUMNAS_EXPORTACION) leídas con un cursor"""
+        for promedio in promedios.iterator(chunk_size=chunk_size):
+            yield [
+                promedio.estudiante.codigo,
+                f"{promedio.estudiante.nombre} {promedio.estudiante.apellido}",
+                promedio.materia.nombre,
+                str(promedio.materia.curso),
+                promedio.promedio_evaluaciones,
+                promedio.promedio_final,
+                promedio.porcentaje_asistencia,
+                promedio.total_clases,
+                promedio.asistencias,
+                promedio.aprobado,
+                promedio.observaciones
+            ]
+
+
+class ReporteAnualService:
+    """
+    Reporte comparativo anual: cada PromedioAnual trae pivoteados los promedios,
+    asistencia y aprobación de sus trimestres en la misma consulta (subconsultas
+    correlacionadas sobre el índice único de PromedioTrimestral), así que el costo
+    no crece con consultas por fila y el resultado se puede paginar o recorrer con un cursor.
+    """
+
+    CAMPOS_TRIMESTRE = ('promedio_final', 'porcentaje_asistencia', 'aprobado')
+
+    def __init__(self, año_academico):
+        self.año_academico = año_academico
+        self.trimestres = list(Trimestre.objects.filter(año_academico=año_academico).order_by('numero'))
+
+    def consulta(self, estudiante_id=None, curso_id=None):
+        """QuerySet ordenado del reporte con una columna anotada por trimestre y campo"""
+        promedios = PromedioAnual.objects.filter(
+            año_academico=self.año_academico
+        ).select_related('estudiante', 'materia__curso__nivel').order_by('materia__nombre', 'id')
+
+        if estudiante_id:
+            promedios = promedios.filter(estudiante_id=estudiante_id)
+        if curso_id:
+            promedios = promedios.filter(materia__curso_id=curso_id)
+
+        anotaciones = {}
+        for trimestre in self.trimestres:
+            trimestral = PromedioTrimestral.objects.filter(
+                estudiante_id=OuterRef('estudiante_id'),
+                materia_id=OuterRef('materia_id'),
+                trimestre_id=trimestre.id
+            ).order_by()
+            for campo in self.CAMPOS_TRIMESTRE:
+                anotaciones[self._columna(trimestre, campo)] = Subquery(trimestral.values(campo)[:1])
+
+        return promedios.annotate(**anotaciones)
+
+    def trimestres_info(self):
+        return [{'numero': t.numero, 'nombre': t.nombre} for t in self.trimestres]
+
+    def fila(self, promedio):
+        """Registro del reporte para un PromedioAnual anotado por consulta()"""
+        detalles_trimestrales = []
+        for trimestre in self.trimestres:
+            promedio_final = getattr(promedio, self._columna(trimestre, 'promedio_final'))
+            if promedio_final is None:
+                detalles_trimestrales.append({
+                    'trimestre': trimestre.numero,
+                    'nombre_trimestre': trimestre.nombre,
+                    'promedio': None,
+                    'asistencia': None,
+                    'aprobado': False
+                })
+            else:
+                detalles_trimestrales.append({
+                    'trimestre': trimestre.numero,
+                    'nombre_trimestre': trimestre.nombre,
+                    'promedio': float(promedio_final),
+                    'asistencia': float(getattr(promedio, self._columna(trimestre, 'porcentaje_asistencia'))),
+                    'aprobado': bool(getattr(promedio, self._columna(trimestre, 'aprobado')))
+                })
+
+        return {
+            'estudiante': {
+                'id': promedio.estudiante.id,
+                'nombre': f"{promedio.estudiante.nombre} {promedio.estudiante.apellido}",
+                'codigo': promedio.estudiante.codigo
+            },
+            'materia': {
+                'id': promedio.materia.id,
+                'nombre': promedio.materia.nombre,
+                'curso': str(promedio.materia.curso)
+            },
+            'trimestres': detalles_trimestrales,
+            'promedio_anual': float(promedio.promedio_anual),
+            'asistencia_anual': float(promedio.porcentaje_asistencia_anual),
+            'aprobado_anual': promedio.aprobado_anual
+        }
+
+    def filas(self, promedios, chunk_size=TAMAÑO_LOTE_EXPORTACION):
+        """Registros del reporte leídos con un cursor del servidor, sin cargar todo el año en memoria"""
+        for promedio in promedios.iterator(chunk_size=chunk_size):
+            yield self.fila(promedio)
+
+    def columnas_exportacion(self):
+        columnas = ['codigo', 'estudiante', 'materia', 'curso']
+        for trimestre in self.trimestres:
+            columnas += [
+                f'promedio_t{trimestre.numero}', f'asistencia_t{trimestre.numero}', f'aprobado_t{trimestre.numero}'
+            ]
+        return columnas + ['promedio_anual', 'asistencia_anual', 'aprobado_anual']
+
+    def filas_exportacion(self, promedios, chunk_size=TAMAÑO_LOTE_EXPORTACION):
+        """Filas planas del reporte (columnas de columnas_exportacion) leídas con un cursor"""
+        for promedio in promedios.iterator(chunk_size=chunk_size):
+            fila = [
+                promedio.estudiante.codigo,
+                f"{promedio.estudiante.nombre} {promedio.estudiante.apellido}",
+                promedio.materia.nombre,
+                str(promedio.materia.curso)
+            ]
+            for trimestre in self.trimestres:
+                fila += [getattr(promedio, self._columna(trimestre, campo)) for campo in self.CAMPOS_TRIMESTRE]
+            yield fila + [promedio.promedio_anual, promedio.porcentaje_asistencia_anual, promedio.aprobado_anual]
+
+    def json_streaming(self, promedios, chunk_size=TAMAÑO_LOTE_EXPORTACION):
+        """
+        El documento JSON del reporte (mismo formato que la respuesta normal) generado por
+        partes: la cabecera sale antes de leer las filas y cada fila se escribe al llegar.
+
+        La respuesta ya empezó cuando se consume el generador, así que un error no llega al
+        try/except del controlador: se cierra el arreglo `datos` y se agrega la clave `error`
+        (o se envía solo {"error": ...} si todavía no había salido la cabecera).
+        """
+        cabecera_enviada = False
+        try:
+            cabecera = json.dumps({
+                'año_academico': self.año_academico,
+                'trimestres': self.trimestres_info(),
+                'total_registros': promedios.count()
+            }, cls=DjangoJSONEncoder, ensure_ascii=False)
+            yield cabecera[:-1] + ', "datos": ['
+            cabecera_enviada = True
+
+            for indice, fila in enumerate(self.filas(promedios, chunk_size=chunk_size)):
+                yield (',' if indice else '') + json.dumps(fila, cls=DjangoJSONEncoder, ensure_ascii=False)
+        except Exception as e:
+            logger.error(f"Error generando el reporte anual {self.año_academico} en streaming: {str(e)}")
+            error = json.dumps(str(e), ensure_ascii=False)
+            yield ('], "error": ' if cabecera_enviada else '{"error": ') + error + '}'
+            return
+
+        yield ']}'
+
+    def _columna(self, trimestre, campo):
+        return f'trimestre_{trimestre.id}_{campo}'
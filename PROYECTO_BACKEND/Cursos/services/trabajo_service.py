@@ -0,0 +1,239 @@
+import os
+import socket
+import time
+from datetime import timedelta
+from django.conf import settings
+from django.db.models import F
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.module_loading import import_string
+from ..models import Materia, Trimestre, TrabajoAsincrono
+from .promedio_service import PromedioAnualService, PromedioTrimestralService
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Función que ejecuta cada tipo de trabajo: manejador(parametros, progreso) -> resultado (JSON)
+MANEJADORES = {
+    'CALCULAR_PROMEDIOS_TRIMESTRE': 'Cursos.services.trabajo_service.calcular_promedios_trimestre',
+    'CALCULAR_PROMEDIOS_ANUALES': 'Cursos.services.trabajo_service.calcular_promedios_anuales',
+    'CREAR_DATASET': 'machine_learning.services.trabajos.crear_dataset',
+    'ENTRENAR_MODELOS': 'machine_learning.services.trabajos.entrenar_modelos',
+    'REENTRENAR_MODELO': 'machine_learning.services.trabajos.reentrenar_modelo',
+}
+
+MATERIAS_POR_LOTE = 20
+
+
+class ProgresoTrabajo:
+    """
+    Callback de progreso que reciben los manejadores: progreso(lote_actual, total_lotes, mensaje).
+    Escribe en la fila del trabajo como máximo una vez por intervalo (y siempre en el último lote).
+    """
+
+    def __init__(self, trabajo_id, intervalo=1.0):
+        self.trabajo_id = trabajo_id
+        self.intervalo = intervalo
+        self._ultima_escritura = 0.0
+
+    def __call__(self, lote_actual, total_lotes, mensaje=''):
+        ahora = time.monotonic()
+        if lote_actual < total_lotes and ahora - self._ultima_escritura < self.intervalo:
+            return
+        self._ultima_escritura = ahora
+
+        porcentaje = round(lote_actual * 100 / total_lotes, 2) if total_lotes else 0
+        TrabajoAsincrono.objects.filter(id=self.trabajo_id).update(
+            lote_actual=lote_actual,
+            total_lotes=total_lotes,
+            porcentaje=min(porcentaje, 99.99),
+            mensaje=str(mensaje)[:255],
+            fecha_actualizacion=timezone.now()
+        )
+
+
+class TrabajoService:
+    """Cola de trabajos en base de datos: encolar, reclamar y consultar trabajos asíncronos"""
+
+    def encolar(self, tipo, parametros=None, creado_por=None):
+        """Crear un trabajo pendiente y devolverlo (se ejecuta con el comando procesar_trabajos)"""
+        if tipo not in MANEJADORES:
+            raise ValueError(f'Tipo de trabajo no soportado: {tipo}')
+
+        if creado_por is not None and not getattr(creado_por, 'is_authenticated', False):
+            creado_por = None
+
+        trabajo = TrabajoAsincrono.objects.create(
+            tipo=tipo,
+            parametros=parametros or {},
+            creado_por=creado_por
+        )
+        logger.info(f"Trabajo encolado: {trabajo.tipo} ({trabajo.id})")
+        return trabajo
+
+    def reclamar(self, limite, worker=None):
+        """
+        Marcar como EN_PROCESO hasta `limite` trabajos pendientes (los más antiguos primero)
+        y devolver sus ids. El UPDATE condicionado al estado hace que dos workers
+        nunca reclamen el mismo trabajo.
+        """
+        worker = worker or f"{socket.gethostname()}:{os.getpid()}"
+        candidatos = TrabajoAsincrono.objects.filter(estado='PENDIENTE').order_by(
+            'fecha_creacion'
+        ).values_list('id', flat=True)[:limite]
+
+        reclamados = []
+        for trabajo_id in candidatos:
+            actualizados = TrabajoAsincrono.objects.filter(id=trabajo_id, estado='PENDIENTE').update(
+                estado='EN_PROCESO',
+                worker=worker,
+                intentos=F('intentos') + 1,
+                fecha_inicio=timezone.now(),
+                fecha_actualizacion=timezone.now()
+            )
+            if actualizados:
+                reclamados.append(trabajo_id)
+        return reclamados
+
+    def liberar_bloqueados(self, minutos=None, max_intentos=None, excluir=()):
+        """
+        Devolver a la cola los trabajos EN_PROCESO sin actividad durante `minutos`
+        (p. ej. un worker que murió). Los que agotaron sus intentos quedan en ERROR.
+        `excluir`: ids que el worker que llama sigue ejecutando (no están bloqueados).
+        """
+        configuracion = settings.TRABAJOS_SETTINGS
+        minutos = minutos or configuracion.get('MINUTOS_BLOQUEO', 30)
+        max_intentos = max_intentos or configuracion.get('MAX_INTENTOS', 3)
+
+        bloqueados = TrabajoAsincrono.objects.filter(
+            estado='EN_PROCESO',
+            fecha_actualizacion__lt=timezone.now() - timedelta(minutes=minutos)
+        ).exclude(id__in=list(excluir))
+        fallidos = bloqueados.filter(intentos__gte=max_intentos).update(
+            estado='ERROR',
+            error='El worker dejó de responder',
+            fecha_fin=timezone.now()
+        )
+        reencolados = bloqueados.update(estado='PENDIENTE', worker='')
+        return reencolados, fallidos
+
+    def datos_encolado(self, trabajo, mensaje):
+        """Cuerpo de la respuesta 202 de un endpoint que encoló un trabajo"""
+        return {
+            'mensaje': mensaje,
+            'trabajo_id': str(trabajo.id),
+            'estado': trabajo.estado,
+            'url_estado': reverse('obtener_trabajo', args=[trabajo.id]),
+            'url_resultado': reverse('obtener_resultado_trabajo', args=[trabajo.id])
+        }
+
+    def serializar(self, trabajo, incluir_resultado=False):
+        """Representación del trabajo para la API"""
+        datos = {
+            'id': str(trabajo.id),
+            'tipo': trabajo.tipo,
+            'estado': trabajo.estado,
+            'progreso': {
+                'porcentaje': 100.0 if trabajo.estado == 'COMPLETADO' else float(trabajo.porcentaje),
+                'lote_actual': trabajo.lote_actual,
+                'total_lotes': trabajo.total_lotes,
+                'mensaje': trabajo.mensaje,
+                'eta_segundos': trabajo.eta_segundos
+            },
+            'parametros': trabajo.parametros,
+            'error': trabajo.error or None,
+            'intentos': trabajo.intentos,
+            'fecha_creacion': trabajo.fecha_creacion,
+            'fecha_inicio': trabajo.fecha_inicio,
+            'fecha_fin': trabajo.fecha_fin,
+            'duracion_segundos': trabajo.duracion_segundos
+        }
+        if incluir_resultado:
+            datos['resultado'] = trabajo.resultado
+        return datos
+
+
+def ejecutar_trabajo(trabajo_id):
+    """Ejecutar un trabajo ya reclamado y guardar su resultado o error (corre en el worker)"""
+    trabajo = TrabajoAsincrono.objects.get(id=trabajo_id)
+
+    try:
+        manejador = import_string(MANEJADORES[trabajo.tipo])
+        resultado = manejador(trabajo.parametros, ProgresoTrabajo(trabajo.id))
+    except Exception as e:
+        logger.exception(f"Error en trabajo {trabajo.tipo} ({trabajo.id})")
+        TrabajoAsincrono.objects.filter(id=trabajo.id).update(
+            estado='ERROR',
+            error=str(e),
+            fecha_fin=timezone.now(),
+            fecha_actualizacion=timezone.now()
+        )
+        return 'ERROR'
+
+    TrabajoAsincrono.objects.filter(id=trabajo.id).update(
+        estado='COMPLETADO',
+        resultado=resultado,
+        porcentaje=100,
+        lote_actual=F('total_lotes'),
+        fecha_fin=timezone.now(),
+        fecha_actualizacion=timezone.now()
+    )
+    logger.info(f"Trabajo completado: {trabajo.tipo} ({trabajo.id})")
+    return 'COMPLETADO'
+
+
+def inicializar_worker():
+    """Preparar Django en el proceso worker"""
+    import django
+    from django.apps import apps
+    if not apps.ready:
+        django.setup()
+
+
+# Manejadores de los trabajos académicos
+
+def calcular_promedios_trimestre(parametros, progreso):
+    """Promedios de un trimestre por lotes de materias"""
+    trimestre = Trimestre.objects.get(id=parametros['trimestre_id'])
+
+    materias = Materia.objects.order_by('id').values_list('id', flat=True)
+    if parametros.get('solo_materia_id'):
+        materias = materias.filter(id=parametros['solo_materia_id'])
+    materias = list(materias)
+
+    lotes = [materias[i:i + MATERIAS_POR_LOTE] for i in range(0, len(materias), MATERIAS_POR_LOTE)]
+    servicio = PromedioTrimestralService()
+    resultados = []
+
+    for numero, lote in enumerate(lotes, start=1):
+        resultados.extend(servicio.calcular(
+            trimestre,
+            materias_ids=lote,
+            estudiantes_ids=parametros.get('solo_estudiantes') or None
+        ))
+        progreso(numero, len(lotes), f'Lote de materias {numero}/{len(lotes)}')
+
+    return {
+        'mensaje': f'Promedios calculados para el {trimestre.nombre}',
+        'trimestre': str(trimestre),
+        'total_procesados': len(resultados),
+        'resultados': resultados
+    }
+
+
+def calcular_promedios_anuales(parametros, progreso):
+    """Promedios anuales de un año académico"""
+    año_academico = parametros['año_academico']
+    resultados = PromedioAnualService().calcular(
+        año_academico,
+        materias_ids=[parametros['solo_materia_id']] if parametros.get('solo_materia_id') else None,
+        cursos_ids=[parametros['solo_curso_id']] if parametros.get('solo_curso_id') else None,
+        progreso=progreso
+    )
+
+    return {
+        'mensaje': f'Promedios anuales calculados para {año_academico}',
+        'año_academico': año_academico,
+        'total_procesados': len(resultados),
+        'resultados': resultados
+    }
@@ -9,6 +9,7 @@ from .urls_asistencia import urlpatterns as asistencia_urls
 from .urls_calificacion import urlpatterns as calificacion_urls
 from .urls_nivel import urlpatterns as nivel_urls
 from .urls_tutor import urlpatterns as tutor_urls   
+from .urls_trabajo import urlpatterns as trabajo_urls
 
 
 # Combinar todos los patrones
@@ -22,4 +23,5 @@ urlpatterns.extend(asistencia_urls)
 urlpatterns.extend(calificacion_urls)
 urlpatterns.extend(nivel_urls)
 urlpatterns.extend(config_evaluacion_urls)
-urlpatterns.extend(tutor_urls)
\ No newline at end of file
+urlpatterns.extend(tutor_urls)
+urlpatterns.extend(trabajo_urls)
\ No newline at end of file
@@ -0,0 +1,9 @@
+from django.urls import path
+from ..controllers import trabajo_controllers
+
+urlpatterns = [
+    # Trabajos en segundo plano
+    path('trabajos/', trabajo_controllers.obtener_trabajos, name='obtener_trabajos'),
+    path('trabajos/<uuid:trabajo_id>/', trabajo_controllers.obtener_trabajo, name='obtener_trabajo'),
+    path('trabajos/<uuid:trabajo_id>/resultado/', trabajo_controllers.obtener_resultado_trabajo, name='obtener_resultado_trabajo'),
+]
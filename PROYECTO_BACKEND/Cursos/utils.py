@@ -39,4 +39,14 @@ def get_evaluaciones_activas(filtro=None):
     entregables = list(EvaluacionEntregable.objects.filter(**base_filter))
     participaciones = list(EvaluacionParticipacion.objects.filter(**base_filter))
     
-    return entregables + participaciones
\ No newline at end of file
+    return entregables + participaciones
+
+
+def es_solicitud_asincrona(request):
+    """True si el cliente pidió ejecutar la operación como trabajo en segundo plano (?asincrono=true)."""
+    valor = request.query_params.get('asincrono')
+    if valor is None and hasattr(request.data, 'get'):
+        valor = request.data.get('asincrono')
+    if isinstance(valor, bool):
+        return valor
+    return str(valor).lower() in ('true', '1', 'si', 'sí')
@@ -2,8 +2,31 @@ from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import AllowAny
 from rest_framework.response import Response
 from rest_framework import status
+from django.db.models import Count, Prefetch
 from ..models import Usuario, Rol
 from ..serializers import UsuarioSerializer
+from Cursos.services.listado_service import ListadoService
+
+# Representación de UsuarioSerializer para los listados con ?fields=
+CAMPOS_USUARIO = {
+    'id': 'id',
+    'codigo': 'codigo',
+    'nombre': 'nombre',
+    'apellido': 'apellido',
+    'telefono': 'telefono',
+    'rol': {'id': 'rol__id', 'nombre': 'rol__nombre'}
+}
+
+
+def _serializar_usuarios(usuarios):
+    return UsuarioSerializer(usuarios, many=True).data
+
+
+def _serializar_tutores_con_conteo(usuarios):
+    return [
+        {**datos, 'estudiantes_count': usuario.estudiantes_count}
+        for usuario, datos in zip(usuarios, UsuarioSerializer(usuarios, many=True).data)
+    ]
 
 @api_view(['GET'])
 @permission_classes([AllowAny])
@@ -11,11 +34,18 @@ def get_usuarios(request):
     """
     Obtiene todos los usuarios registrados.
     Acceso público para todos.
+
+    Parámetros opcionales: fields (proyección), limite y cursor (paginación en el orden del listado).
+    Con paginación la respuesta es {'usuarios', 'limite', 'siguiente_cursor'}.
     """
     try:
-        usuarios = Usuario.objects.all()
-        serializer = UsuarioSerializer(usuarios, many=True)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        listado = ListadoService(request, CAMPOS_USUARIO)
+        usuarios = listado.listar(Usuario.objects.all(), _serializar_usuarios)
+        if listado.paginado:
+            return Response({'usuarios': usuarios, **listado.datos_paginacion()}, status=status.HTTP_200_OK)
+        return Response(usuarios, status=status.HTTP_200_OK)
+    except ValueError as e:
+        return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
     except Exception as e:
         return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
@@ -131,7 +161,7 @@ def get_estudiantes_por_curso(request, curso_id):
         estudiantes = Usuario.objects.filter(
             rol__nombre='Estudiante',
             curso_id=curso_id
-        ).order_by('apellido', 'nombre')
+        ).select_related('rol').order_by('apellido', 'nombre')
         
         # Si no hay estudiantes en el curso
         if not estudiantes.exists():
@@ -160,18 +190,24 @@ def get_estudiantes_por_curso(request, curso_id):
 def get_estudiantes(request):
     """
     Obtiene todos los estudiantes registrados en el sistema.
+
+    Parámetros opcionales: fields (proyección), limite y cursor (paginación en el orden del listado).
     """
     try:
+        listado = ListadoService(request, CAMPOS_USUARIO)
         estudiantes = Usuario.objects.filter(rol__nombre='Estudiante').order_by('apellido', 'nombre')
-        serializer = UsuarioSerializer(estudiantes, many=True)
         
         result = {
             'total': estudiantes.count(),
-            'estudiantes': serializer.data
+            'estudiantes': listado.listar(estudiantes, _serializar_usuarios)
         }
+        if listado.paginado:
+            result.update(listado.datos_paginacion())
         
         return Response(result, status=status.HTTP_200_OK)
         
+    except ValueError as e:
+        return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
     except Exception as e:
         return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
@@ -184,10 +220,13 @@ def get_profesores(request):
     Parámetros de consulta opcionales:
     - materia_id: Filtra profesores asignados a una materia específica
     - activo: Filtra por estado activo (true/false)
+    - fields, limite, cursor: proyección y paginación en el orden del listado
     
     Ejemplo: /api/usuarios/profesores/?materia_id=10&activo=true
     """
     try:
+        listado = ListadoService(request, CAMPOS_USUARIO)
+        
         # Obtener profesores por su rol
         profesores = Usuario.objects.filter(rol__nombre='Profesor')
         
@@ -205,16 +244,18 @@ def get_profesores(request):
         # Ordenar por apellido y nombre
         profesores = profesores.order_by('apellido', 'nombre')
         
-        serializer = UsuarioSerializer(profesores, many=True)
-        
         # Añadir metadatos al resultado
         result = {
             'total': profesores.count(),
-            'profesores': serializer.data
+            'profesores': listado.listar(profesores, _serializar_usuarios)
         }
+        if listado.paginado:
+            result.update(listado.datos_paginacion())
         
         return Response(result, status=status.HTTP_200_OK)
         
+    except ValueError as e:
+        return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
     except Exception as e:
         return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
@@ -227,10 +268,25 @@ def get_tutores(request):
     Parámetros de consulta opcionales:
     - estudiante_id: Filtra tutores asignados a un estudiante específico
     - activo: Filtra por estado activo (true/false)
+    - include_estudiantes=true: lista solo usuarios con registro de Tutor, con estudiantes_count
+      (total sigue contando a todos los usuarios con rol Tutor)
+    - include=students: agrega la lista de estudiantes (con su curso) de cada tutor
+    - fields, limite, cursor: proyección y paginación en el orden del listado
     
     Ejemplo: /api/usuarios/tutores/?estudiante_id=10&activo=true
     """
     try:
+        include_estudiantes = request.GET.get('include_estudiantes', '').lower() == 'true'
+        expansiones = {valor.strip() for valor in request.GET.get('include', '').split(',') if valor.strip()}
+        incluir_lista_estudiantes = bool(expansiones & {'students', 'estudiantes'})
+        
+        campos = CAMPOS_USUARIO
+        if include_estudiantes:
+            campos = {**CAMPOS_USUARIO, 'estudiantes_count': 'estudiantes_count'}
+        listado = ListadoService(
+            request, campos, incluir=['estudiantes_count'] if include_estudiantes else ()
+        )
+        
         # Obtener tutores por su rol
         tutores = Usuario.objects.filter(rol__nombre='Tutor')
         
@@ -254,35 +310,68 @@ def get_tutores(request):
             is_active = activo.lower() == 'true'
             tutores = tutores.filter(is_active=is_active)
         
+        # total cuenta a todos los usuarios con rol Tutor, tengan o no registro de Tutor
+        total = tutores.count()
+        
+        # Cantidad de estudiantes anotada en la misma consulta del listado
+        serializar = _serializar_usuarios
+        if include_estudiantes:
+            tutores = tutores.filter(tutor__isnull=False).annotate(estudiantes_count=Count('tutor__estudiantes'))
+            serializar = _serializar_tutores_con_conteo
+        
         # Ordenar por apellido y nombre
         tutores = tutores.order_by('apellido', 'nombre')
         
-        serializer = UsuarioSerializer(tutores, many=True)
-        
         # Añadir metadatos al resultado
         result = {
-            'total': tutores.count(),
-            'tutores': serializer.data
+            'total': total,
+            'tutores': listado.listar(tutores, serializar)
         }
+        if listado.paginado:
+            result.update(listado.datos_paginacion())
         
-        # Opcionalmente, enriquecer la respuesta con datos de Tutor
-        include_estudiantes = request.GET.get('include_estudiantes', '').lower() == 'true'
-        if include_estudiantes:
-            from ..models import Tutor
-            tutores_data = []
-            for usuario in tutores:
-                try:
-                    tutor = Tutor.objects.get(usuario=usuario)
-                    estudiantes_count = tutor.estudiantes.count()
-                    usuario_data = serializer.to_representation(usuario)
-                    usuario_data['estudiantes_count'] = estudiantes_count
-                    tutores_data.append(usuario_data)
-                except Tutor.DoesNotExist:
-                    pass
-            
-            result['tutores'] = tutores_data
+        if incluir_lista_estudiantes:
+            estudiantes_por_tutor = _estudiantes_por_tutor(listado.ids)
+            for usuario_id, usuario_data in zip(listado.ids, result['tutores']):
+                usuario_data['estudiantes'] = estudiantes_por_tutor.get(usuario_id, [])
         
         return Response(result, status=status.HTTP_200_OK)
         
+    except ValueError as e:
+        return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
     except Exception as e:
-        return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
\ No newline at end of file
+        return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+def _estudiantes_por_tutor(tutores_ids):
+    """
+    Estudiantes de cada tutor (por id de usuario) con su curso: una consulta para los
+    tutores y otra para el M2M con usuario, curso y nivel de cada estudiante.
+    """
+    from ..models import Estudiante, Tutor
+    
+    tutores = Tutor.objects.filter(usuario_id__in=tutores_ids).prefetch_related(
+        Prefetch(
+            'estudiantes',
+            queryset=Estudiante.objects.select_related('usuario__curso__nivel').order_by(
+                'usuario__apellido', 'usuario__nombre'
+            )
+        )
+    )
+    
+    estudiantes_por_tutor = {}
+    for tutor in tutores:
+        estudiantes_por_tutor[tutor.usuario_id] = [
+            {
+                'id': estudiante.usuario.id,
+                'codigo': estudiante.usuario.codigo,
+                'nombre': estudiante.usuario.nombre,
+                'apellido': estudiante.usuario.apellido,
+                'curso': {
+                    'id': estudiante.usuario.curso.id,
+                    'nombre': str(estudiante.usuario.curso)
+                } if estudiante.usuario.curso else None
+            }
+            for estudiante in tutor.estudiantes.all()
+        ]
+    return estudiantes_por_tutor
@@ -6,6 +6,7 @@ Paquete de controladores para Machine Learning
 from .machine_learning_controllers import (
     crear_dataset,
     entrenar_modelos,
+    reentrenar_modelo,
     predecir_rendimiento,
     obtener_modelos,
     obtener_datasets,
@@ -16,6 +17,7 @@ from .machine_learning_controllers import (
 __all__ = [
     'crear_dataset',
     'entrenar_modelos', 
+    'reentrenar_modelo',
     'predecir_rendimiento',
     'obtener_modelos',
     'obtener_datasets',
@@ -5,12 +5,16 @@ from rest_framework import status
 from machine_learning.services.data_collector import DataCollectorService
 from machine_learning.services.model_trainer import ModelTrainerServiceSimplificado
 from machine_learning.services.prediction_service import PredictionService
+from machine_learning.services import trabajos as trabajos_ml
+from Cursos.services.trabajo_service import TrabajoService
+from Cursos.utils import es_solicitud_asincrona
 from machine_learning.models import DatasetAcademico, ModeloML, PrediccionAcademica
 from machine_learning.serializers import (
     DatasetAcademicoSerializer, ModeloMLSerializer, 
     PrediccionAcademicaSerializer, PrediccionRequestSerializer,
     PrediccionResponseSerializer
 )
+from django.conf import settings
 from django.utils import timezone
 import logging
 
@@ -32,6 +36,19 @@ def crear_dataset(request):
                 'error': 'El nombre del dataset es requerido'
             }, status=status.HTTP_400_BAD_REQUEST)
         
+        # Con ?asincrono=true la recolección se encola y se responde de inmediato
+        if es_solicitud_asincrona(request):
+            trabajo = TrabajoService().encolar('CREAR_DATASET', {
+                'nombre': nombre,
+                'descripcion': descripcion,
+                'año_inicio': año_inicio,
+                'año_fin': año_fin
+            }, creado_por=request.user)
+            return Response(
+                TrabajoService().datos_encolado(trabajo, f'Creación del dataset {nombre} encolada'),
+                status=status.HTTP_202_ACCEPTED
+            )
+        
         # Crear dataset
         collector = DataCollectorService()
         dataset = collector.crear_dataset(nombre, descripcion, año_inicio, año_fin)
@@ -54,6 +71,35 @@ def crear_dataset(request):
             'error': f'Error creando dataset: {str(e)}'
         }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def actualizar_dataset(request, dataset_id):
+    """Refrescar incrementalmente un dataset con los cambios desde su última sincronización"""
+    try:
+        try:
+            dataset = DatasetAcademico.objects.get(id=dataset_id)
+        except DatasetAcademico.DoesNotExist:
+            return Response({
+                'error': f'Dataset con ID {dataset_id} no encontrado'
+            }, status=status.HTTP_404_NOT_FOUND)
+        
+        collector = DataCollectorService()
+        resumen = collector.actualizar_dataset_incremental(dataset)
+        
+        serializer = DatasetAcademicoSerializer(dataset)
+        
+        return Response({
+            'mensaje': 'Dataset actualizado exitosamente',
+            'resumen': resumen,
+            'dataset': serializer.data
+        }, status=status.HTTP_200_OK)
+        
+    except Exception as e:
+        logger.error(f"Error actualizando dataset: {str(e)}")
+        return Response({
+            'error': f'Error actualizando dataset: {str(e)}'
+        }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
 def entrenar_modelos(request, dataset_id):
@@ -67,30 +113,17 @@ def entrenar_modelos(request, dataset_id):
                 'error': f'Dataset con ID {dataset_id} no encontrado'
             }, status=status.HTTP_404_NOT_FOUND)
         
-        # Entrenar modelos
-        trainer = ModelTrainerServiceSimplificado()
-        resultados = trainer.entrenar_todos_modelos(dataset_id)
+        if es_solicitud_asincrona(request):
+            trabajo = TrabajoService().encolar('ENTRENAR_MODELOS', {
+                'dataset_id': str(dataset.id)
+            }, creado_por=request.user)
+            return Response(
+                TrabajoService().datos_encolado(trabajo, f'Entrenamiento del dataset {dataset.nombre} encolado'),
+                status=status.HTTP_202_ACCEPTED
+            )
         
-        # Preparar respuesta
-        respuesta = {
-            'mensaje': 'Entrenamiento completado',
-            'dataset': dataset.nombre,
-            'resultados': {}
-        }
-        
-        for algoritmo, resultado in resultados.items():
-            if 'error' in resultado:
-                respuesta['resultados'][algoritmo] = {
-                    'estado': 'error',
-                    'mensaje': resultado['error']
-                }
-            else:
-                respuesta['resultados'][algoritmo] = {
-                    'estado': 'exitoso',
-                    'modelo_id': str(resultado['modelo_db'].id),
-                    'metricas': resultado['metricas'],
-                    'precision': f"{resultado['metricas']['r2'] * 100:.2f}%"
-                }
+        # Entrenar modelos (mismo manejador que el trabajo en segundo plano)
+        respuesta = trabajos_ml.entrenar_modelos({'dataset_id': str(dataset.id)})
         
         return Response(respuesta, status=status.HTTP_200_OK)
         
@@ -100,6 +133,38 @@ def entrenar_modelos(request, dataset_id):
             'error': f'Error entrenando modelos: {str(e)}'
         }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def reentrenar_modelo(request):
+    """
+    Actualizar el modelo activo con los registros agregados desde su entrenamiento
+    (partial_fit / warm_start). La nueva versión solo se activa si no empeora en el hold-out.
+    """
+    try:
+        if es_solicitud_asincrona(request):
+            trabajo = TrabajoService().encolar('REENTRENAR_MODELO', {
+                'usuario_id': request.user.id
+            }, creado_por=request.user)
+            return Response(
+                TrabajoService().datos_encolado(trabajo, 'Reentrenamiento incremental encolado'),
+                status=status.HTTP_202_ACCEPTED
+            )
+        
+        respuesta = trabajos_ml.reentrenar_modelo({'usuario_id': request.user.id})
+        
+        return Response(respuesta, status=status.HTTP_200_OK)
+        
+    except ValueError as e:
+        return Response({
+            'error': str(e)
+        }, status=status.HTTP_400_BAD_REQUEST)
+        
+    except Exception as e:
+        logger.error(f"Error en reentrenamiento incremental: {str(e)}")
+        return Response({
+            'error': f'Error en reentrenamiento incremental: {str(e)}'
+        }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
 @api_view(['POST'])
 @permission_classes([AllowAny])
 def predecir_rendimiento(request):
@@ -174,22 +239,13 @@ def predecir_rendimiento(request):
                 from Usuarios.models import Usuario
                 estudiante = Usuario.objects.get(codigo=estudiante_codigo)
                 
-                # Crear registro de predicción
-                PrediccionAcademica.objects.create(
-                    estudiante=estudiante,
-                    promedio_notas_anterior=datos_validados['promedio_notas_anterior'],
-                    porcentaje_asistencia=datos_validados['porcentaje_asistencia'],
-                    promedio_participaciones=datos_validados['promedio_participaciones'],
-                    materias_cursadas=datos_validados['materias_cursadas'],
-                    evaluaciones_completadas=datos_validados['evaluaciones_completadas'],
-                    prediccion_numerica=resultado['prediccion_rendimiento'],
-                    categoria_predicha=resultado['categoria'],
-                    nivel_confianza=resultado['confianza'],
-                    nivel_rendimiento=resultado['categoria'].upper(),
-                    datos_entrada=datos_validados,
-                    recomendaciones=resultado['recomendaciones']
+                # Registrar en el historial (una misma entrada con el mismo modelo no se duplica)
+                realizada_por = request.user if request.user.is_authenticated else None
+                _, creada = prediction_service.guardar_prediccion(
+                    estudiante, datos_validados, resultado, realizada_por=realizada_por
                 )
-                logger.info(f"Predicción guardada para estudiante {estudiante_codigo}")
+                if creada:
+                    logger.info(f"Predicción guardada para estudiante {estudiante_codigo}")
             except Usuario.DoesNotExist:
                 logger.warning(f"Estudiante {estudiante_codigo} no encontrado")
             except Exception as e:
@@ -369,51 +425,57 @@ def predecir_rendimiento_multiple(request):
                 'error': 'Se requiere una lista de estudiantes en el campo "estudiantes"'
             }, status=status.HTTP_400_BAD_REQUEST)
         
-        if len(estudiantes_data) > 50:  # Límite para evitar sobrecarga
+        limite = settings.ML_SETTINGS.get('MAX_PREDICCIONES_LOTE', 5000)
+        if len(estudiantes_data) > limite:  # Límite para evitar sobrecarga
             return Response({
-                'error': 'Máximo 50 estudiantes por solicitud'
+                'error': f'Máximo {limite} estudiantes por solicitud'
             }, status=status.HTTP_400_BAD_REQUEST)
         
         # Inicializar servicio
         prediction_service = PredictionService()
         
-        # Procesar predicciones
+        # Validar datos de cada estudiante antes de armar el lote
+        campos_requeridos = [
+            'promedio_notas_anterior', 'porcentaje_asistencia',
+            'promedio_participaciones', 'materias_cursadas',
+            'evaluaciones_completadas'
+        ]
+        
         resultados = []
         errores = []
+        indices_validos = []
         
         for i, datos_estudiante in enumerate(estudiantes_data):
-            try:
-                # Validar datos del estudiante
-                campos_requeridos = [
-                    'promedio_notas_anterior', 'porcentaje_asistencia',
-                    'promedio_participaciones', 'materias_cursadas',
-                    'evaluaciones_completadas'
-                ]
-                
-                for campo in campos_requeridos:
-                    if campo not in datos_estudiante:
-                        raise ValueError(f'Campo {campo} faltante')
-                
-                # Realizar predicción
-                resultado = prediction_service.predecir_rendimiento_estudiante(datos_estudiante)
-                
-                if 'error' in resultado:
-                    errores.append({
-                        'estudiante_index': i,
-                        'error': resultado['error']
-                    })
-                else:
-                    resultados.append({
-                        'estudiante_index': i,
-                        'estudiante_id': datos_estudiante.get('id', f'estudiante_{i}'),
-                        'prediccion': resultado
-                    })
-                    
-            except Exception as e:
+            if not isinstance(datos_estudiante, dict):
+                errores.append({'estudiante_index': i, 'error': 'Datos de estudiante inválidos'})
+                continue
+            
+            faltante = next((campo for campo in campos_requeridos if campo not in datos_estudiante), None)
+            if faltante:
+                errores.append({'estudiante_index': i, 'error': f'Campo {faltante} faltante'})
+                continue
+            
+            indices_validos.append(i)
+        
+        # Una sola predicción vectorizada para todo el lote
+        predicciones = prediction_service.predecir_lote(
+            [estudiantes_data[i] for i in indices_validos]
+        )
+        
+        for i, resultado in zip(indices_validos, predicciones):
+            if 'error' in resultado:
                 errores.append({
                     'estudiante_index': i,
-                    'error': str(e)
+                    'error': resultado['error']
                 })
+            else:
+                resultados.append({
+                    'estudiante_index': i,
+                    'estudiante_id': estudiantes_data[i].get('id', f'estudiante_{i}'),
+                    'prediccion': resultado
+                })
+        
+        errores.sort(key=lambda error: error['estudiante_index'])
         
         respuesta = {
             'mensaje': f'Procesadas {len(resultados)} predicciones exitosas',
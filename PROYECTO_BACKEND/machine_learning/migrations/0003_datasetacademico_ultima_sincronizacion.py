@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 20:31
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('machine_learning', '0002_resultadoentrenamiento'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='datasetacademico',
+            name='ultima_sincronizacion',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.18 on 2026-10-18 21:50
+
+from django.db import migrations, models
+
+
+def numerar_versiones(apps, schema_editor):
+    """Versiones de los modelos existentes por dataset y algoritmo, en orden de entrenamiento"""
+    ModeloML = apps.get_model('machine_learning', 'ModeloML')
+    siguientes = {}
+    for modelo in ModeloML.objects.order_by('fecha_entrenamiento').only('id', 'dataset_id', 'algoritmo'):
+        clave = (modelo.dataset_id, modelo.algoritmo)
+        siguientes[clave] = siguientes.get(clave, 0) + 1
+        ModeloML.objects.filter(id=modelo.id).update(version=siguientes[clave])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('machine_learning', '0003_datasetacademico_ultima_sincronizacion'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='modeloml',
+            name='version',
+            field=models.PositiveIntegerField(default=1),
+        ),
+        migrations.RunPython(numerar_versiones, migrations.RunPython.noop),
+    ]
@@ -12,6 +12,8 @@ class DatasetAcademico(models.Model):
     fecha_creacion = models.DateTimeField(auto_now_add=True)
     fecha_actualizacion = models.DateTimeField(auto_now=True)
     total_registros = models.IntegerField(default=0)
+    # Marca de agua: cambios en calificaciones/asistencias posteriores a esta fecha aún no están en el dataset
+    ultima_sincronizacion = models.DateTimeField(null=True, blank=True)
     año_inicio = models.IntegerField()
     año_fin = models.IntegerField()
     activo = models.BooleanField(default=True)
@@ -74,6 +76,7 @@ class ModeloML(models.Model):
     # Metadatos del modelo
     fecha_entrenamiento = models.DateTimeField(auto_now_add=True)
     archivo_modelo = models.CharField(max_length=500)  # Path al archivo del modelo
+    version = models.PositiveIntegerField(default=1)  # Por dataset y algoritmo
     activo = models.BooleanField(default=True)
     
     # Audit fields
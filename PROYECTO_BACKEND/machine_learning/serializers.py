@@ -10,7 +10,7 @@ class DatasetAcademicoSerializer(serializers.ModelSerializer):
         fields = [
             'id', 'nombre', 'descripcion', 'fecha_creacion', 
             'fecha_actualizacion', 'total_registros', 'año_inicio', 
-            'año_fin', 'activo'
+            'año_fin', 'activo', 'ultima_sincronizacion'
         ]
         read_only_fields = ['id', 'fecha_creacion', 'fecha_actualizacion']
 
@@ -1,19 +1,29 @@
+import os
 import pandas as pd
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from django.db import connections, transaction
+from django.utils import timezone
 from django.db.models import Avg, Count, Q
 from Usuarios.models import Usuario, Estudiante  # ✅ IMPORTACIÓN CORRECTA
 from Cursos.models import Calificacion, Asistencia, EvaluacionParticipacion, Trimestre, Materia, EvaluacionEntregable
+from Cursos.services.trabajo_service import inicializar_worker
 from machine_learning.models import DatasetAcademico, RegistroEstudianteML
+from machine_learning.services.feature_extractor import FeatureExtractorService, COLUMNAS_REGISTROS
 from decimal import Decimal
 import logging
 from django.contrib.contenttypes.models import ContentType
 
 logger = logging.getLogger(__name__)
 
+# Filas por consulta al buscar y eliminar registros obsoletos (dentro del límite de parámetros de SQLite)
+TAMANO_LOTE_ELIMINACION = 500
+
 class DataCollectorService:
     """Servicio para recolección y limpieza de datos académicos"""
     
     def __init__(self):
         self.dataset = None
+        self.inicio_recoleccion = None
         
     def crear_dataset(self, nombre, descripcion, año_inicio, año_fin):
         """Crear un nuevo dataset para ML"""
@@ -26,225 +36,89 @@ class DataCollectorService:
         return self.dataset
     
     def recolectar_datos_estudiantes(self):
-        """Recolectar datos históricos de estudiantes"""
+        """
+        Recolectar datos históricos de estudiantes.
+        Devuelve un DataFrame columnar (un registro por estudiante y trimestre)
+        listo para limpiar_y_normalizar_datos.
+        """
         logger.info("Iniciando recolección de datos de estudiantes...")
+        self.inicio_recoleccion = timezone.now()
+        
+        estudiantes = self._obtener_estudiantes()
+        trimestres = self._obtener_trimestres()
+        
+        logger.info(f"Procesando {estudiantes.count()} estudiantes en {len(trimestres)} trimestres")
         
-        # ✅ CORREGIR: Usar la nueva relación ForeignKey en lugar de ManyToMany
+        datos_procesados = FeatureExtractorService().construir_registros(
+            trimestres,
+            estudiantes_ids=estudiantes.values('id')
+        )
+        
+        logger.info(f"Recolección completada: {len(datos_procesados)} registros")
+        return datos_procesados
+    
+    def _obtener_estudiantes(self):
+        """Usuarios activos con rol Estudiante (todos los activos si el rol no existe)"""
         from Permisos.models import Rol
         try:
             rol_estudiante = Rol.objects.get(nombre='Estudiante')
-            # ✅ CAMBIO: usar usuarios_rol en lugar de usuarios
-            estudiantes = Usuario.objects.filter(
-                rol=rol_estudiante,  # ✅ CAMBIO: usar 'rol' en lugar de 'roles'
+            return Usuario.objects.filter(
+                rol=rol_estudiante,
                 is_active=True
-            )
+            ).order_by('id')
         except Rol.DoesNotExist:
             # Fallback: usar todos los usuarios activos
             logger.warning("Rol 'Estudiante' no encontrado, usando todos los usuarios activos")
-            estudiantes = Usuario.objects.filter(is_active=True)
-        
-        # Obtener trimestres en el rango del dataset
-        trimestres = Trimestre.objects.filter(
+            return Usuario.objects.filter(is_active=True).order_by('id')
+    
+    def _obtener_trimestres(self):
+        """Trimestres del rango del dataset en orden cronológico"""
+        trimestres = list(Trimestre.objects.filter(
             año_academico__gte=self.dataset.año_inicio,
             año_academico__lte=self.dataset.año_fin
-        ).order_by('año_academico', 'numero')
+        ).order_by('año_academico', 'numero'))
         
-        if not trimestres.exists():
+        if not trimestres:
             raise ValueError(f"No hay trimestres en el rango {self.dataset.año_inicio}-{self.dataset.año_fin}")
         
-        datos_procesados = []
-        total_estudiantes = estudiantes.count()
-        
-        logger.info(f"Procesando {total_estudiantes} estudiantes en {trimestres.count()} trimestres")
-        
-        for idx, estudiante in enumerate(estudiantes):
-            if idx % 10 == 0:  # Log cada 10 estudiantes
-                logger.info(f"Procesando estudiante {idx+1}/{total_estudiantes}: {estudiante.get_full_name()}")
-                
-            datos_estudiante = self._procesar_estudiante(estudiante, trimestres)
-            datos_procesados.extend(datos_estudiante)
-        
-        logger.info(f"Recolección completada: {len(datos_procesados)} registros")
-        return datos_procesados
-    
-    def _procesar_estudiante(self, estudiante, trimestres):
-        """Procesar datos de un estudiante individual"""
-        registros = []
-        trimestres_lista = list(trimestres)
-        
-        # Necesitamos al menos 2 trimestres para crear un registro (actual + siguiente)
-        for i in range(len(trimestres_lista) - 1):
-            trimestre_actual = trimestres_lista[i]
-            trimestre_siguiente = trimestres_lista[i + 1]
-            
-            # Calcular features del trimestre actual
-            features = self._calcular_features_trimestre(estudiante, trimestre_actual)
-            
-            # Calcular target del trimestre siguiente
-            target = self._calcular_rendimiento_futuro(estudiante, trimestre_siguiente)
-            
-            # Solo agregar si tenemos datos válidos
-            if features and target is not None and features['tiene_datos']:
-                registro = {
-                    'estudiante': estudiante,
-                    'trimestre': trimestre_actual,
-                    'promedio_notas_anterior': features['promedio_notas'],
-                    'porcentaje_asistencia': features['porcentaje_asistencia'],
-                    'promedio_participaciones': features['promedio_participaciones'],
-                    'materias_cursadas': features['materias_cursadas'],
-                    'evaluaciones_completadas': features['evaluaciones_completadas'],
-                    'rendimiento_futuro': target
-                }
-                registros.append(registro)
-        
-        return registros
-    
-    def _calcular_features_trimestre(self, estudiante, trimestre):
-        """Calcular features de entrada para un trimestre"""
-        try:
-            # Promedio de calificaciones (usando el modelo correcto)
-            calificaciones = Calificacion.objects.filter(
-                estudiante=estudiante,
-                evaluacion__isnull=False  # Asegurar que tiene evaluación asociada
-            )
-            
-            # Filtrar por trimestre a través de la evaluación
-            calificaciones_trimestre = []
-            for cal in calificaciones:
-                if hasattr(cal.evaluacion, 'trimestre') and cal.evaluacion.trimestre == trimestre:
-                    calificaciones_trimestre.append(cal.nota)
-            
-            if calificaciones_trimestre:
-                promedio_notas = sum(calificaciones_trimestre) / len(calificaciones_trimestre)
-            else:
-                promedio_notas = Decimal('0.0')
-            
-            # Porcentaje de asistencia
-            asistencias_trimestre = Asistencia.objects.filter(
-                estudiante=estudiante,
-                trimestre=trimestre
-            )
-            
-            total_asistencias = asistencias_trimestre.count()
-            asistencias_presentes = asistencias_trimestre.filter(presente=True).count()
-            
-            porcentaje_asistencia = Decimal('0.0')
-            if total_asistencias > 0:
-                porcentaje_asistencia = Decimal((asistencias_presentes / total_asistencias) * 100)
-            
-            # Promedio de participaciones (evaluaciones de tipo participación)
-            participaciones = []
-            for cal in calificaciones:
-                if (hasattr(cal.evaluacion, 'tipo_evaluacion') and 
-                    cal.evaluacion.tipo_evaluacion and
-                    cal.evaluacion.tipo_evaluacion.nombre == 'PARTICIPACION' and
-                    hasattr(cal.evaluacion, 'trimestre') and 
-                    cal.evaluacion.trimestre == trimestre):
-                    participaciones.append(cal.nota)
-            
-            if participaciones:
-                promedio_participaciones = sum(participaciones) / len(participaciones)
-            else:
-                promedio_participaciones = Decimal('0.0')
-            
-            # Contar materias cursadas (a través de calificaciones)
-            materias_ids = set()
-            for cal in calificaciones:
-                if (hasattr(cal.evaluacion, 'materia') and 
-                    hasattr(cal.evaluacion, 'trimestre') and 
-                    cal.evaluacion.trimestre == trimestre):
-                    materias_ids.add(cal.evaluacion.materia.id)
-            
-            materias_cursadas = len(materias_ids)
-            
-            # Contar evaluaciones completadas
-            evaluaciones_completadas = len(calificaciones_trimestre)
-            
-            # Verificar si tiene datos suficientes
-            tiene_datos = (
-                evaluaciones_completadas > 0 or 
-                total_asistencias > 0 or 
-                materias_cursadas > 0
-            )
-            
-            return {
-                'promedio_notas': Decimal(str(promedio_notas)),
-                'porcentaje_asistencia': porcentaje_asistencia,
-                'promedio_participaciones': Decimal(str(promedio_participaciones)),
-                'materias_cursadas': materias_cursadas,
-                'evaluaciones_completadas': evaluaciones_completadas,
-                'tiene_datos': tiene_datos
-            }
-            
-        except Exception as e:
-            logger.error(f"Error calculando features para {estudiante.get_full_name()}: {str(e)}")
-            return None
-    
-    def _calcular_rendimiento_futuro(self, estudiante, trimestre):
-        """Calcular el rendimiento futuro (target variable)"""
-        try:
-            # Similar lógica que _calcular_features_trimestre pero para el trimestre siguiente
-            calificaciones = Calificacion.objects.filter(
-                estudiante=estudiante,
-                evaluacion__isnull=False
-            )
-            
-            calificaciones_trimestre = []
-            for cal in calificaciones:
-                if hasattr(cal.evaluacion, 'trimestre') and cal.evaluacion.trimestre == trimestre:
-                    calificaciones_trimestre.append(cal.nota)
-            
-            if calificaciones_trimestre:
-                return Decimal(str(sum(calificaciones_trimestre) / len(calificaciones_trimestre)))
-            
-            return None
-            
-        except Exception as e:
-            logger.error(f"Error calculando target para {estudiante.get_full_name()}: {str(e)}")
-            return None
+        return trimestres
     
     def limpiar_y_normalizar_datos(self, datos_raw):
         """Limpiar y normalizar datos para entrenamiento"""
         logger.info("Iniciando limpieza y normalización de datos...")
         
-        if not datos_raw:
-            raise ValueError("No hay datos para limpiar")
-        
-        # Convertir a DataFrame para procesamiento
-        df_data = []
-        for dato in datos_raw:
-            df_data.append({
-                'promedio_notas_anterior': float(dato['promedio_notas_anterior']),
-                'porcentaje_asistencia': float(dato['porcentaje_asistencia']),
-                'promedio_participaciones': float(dato['promedio_participaciones']),
-                'materias_cursadas': dato['materias_cursadas'],
-                'evaluaciones_completadas': dato['evaluaciones_completadas'],
-                'rendimiento_futuro': float(dato['rendimiento_futuro']),
-                'estudiante': dato['estudiante'],
-                'trimestre': dato['trimestre']
+        if isinstance(datos_raw, pd.DataFrame):
+            if datos_raw.empty:
+                raise ValueError("No hay datos para limpiar")
+            df = datos_raw[COLUMNAS_REGISTROS].astype({
+                'promedio_notas_anterior': 'float64',
+                'porcentaje_asistencia': 'float64',
+                'promedio_participaciones': 'float64',
+                'rendimiento_futuro': 'float64'
             })
-        
-        df = pd.DataFrame(df_data)
+        else:
+            if not datos_raw:
+                raise ValueError("No hay datos para limpiar")
+            
+            # Convertir a DataFrame para procesamiento
+            df_data = []
+            for dato in datos_raw:
+                df_data.append({
+                    'estudiante_id': dato['estudiante'].id,
+                    'trimestre_id': dato['trimestre'].id,
+                    'promedio_notas_anterior': float(dato['promedio_notas_anterior']),
+                    'porcentaje_asistencia': float(dato['porcentaje_asistencia']),
+                    'promedio_participaciones': float(dato['promedio_participaciones']),
+                    'materias_cursadas': dato['materias_cursadas'],
+                    'evaluaciones_completadas': dato['evaluaciones_completadas'],
+                    'rendimiento_futuro': float(dato['rendimiento_futuro'])
+                })
+            
+            df = pd.DataFrame(df_data)
         
         logger.info(f"Datos originales: {len(df)} registros")
         
-        # Eliminar registros con valores nulos
-        df_limpio = df.dropna()
-        logger.info(f"Después de eliminar nulos: {len(df_limpio)} registros")
-        
-        # Eliminar outliers (valores fuera de rangos lógicos)
-        df_limpio = df_limpio[
-            (df_limpio['promedio_notas_anterior'] >= 0) & 
-            (df_limpio['promedio_notas_anterior'] <= 100) &
-            (df_limpio['porcentaje_asistencia'] >= 0) & 
-            (df_limpio['porcentaje_asistencia'] <= 100) &
-            (df_limpio['promedio_participaciones'] >= 0) & 
-            (df_limpio['promedio_participaciones'] <= 100) &
-            (df_limpio['rendimiento_futuro'] >= 0) & 
-            (df_limpio['rendimiento_futuro'] <= 100) &
-            (df_limpio['materias_cursadas'] > 0) &
-            (df_limpio['evaluaciones_completadas'] >= 0)
-        ]
+        df_limpio = self._filtrar_registros_validos(df)
         
         logger.info(f"Después de eliminar outliers: {len(df_limpio)} registros")
         
@@ -262,18 +136,7 @@ class DataCollectorService:
         
         registros_batch = []
         for dato in datos_limpios:
-            registro = RegistroEstudianteML(
-                dataset=self.dataset,
-                estudiante=dato['estudiante'],
-                trimestre=dato['trimestre'],
-                promedio_notas_anterior=Decimal(str(dato['promedio_notas_anterior'])),
-                porcentaje_asistencia=Decimal(str(dato['porcentaje_asistencia'])),
-                promedio_participaciones=Decimal(str(dato['promedio_participaciones'])),
-                materias_cursadas=dato['materias_cursadas'],
-                evaluaciones_completadas=dato['evaluaciones_completadas'],
-                rendimiento_futuro=Decimal(str(dato['rendimiento_futuro']))
-            )
-            registros_batch.append(registro)
+            registros_batch.append(self._construir_registro_ml(dato))
             
             # Guardar en lotes para optimizar
             if len(registros_batch) >= 100:  # Lotes más pequeños para testing
@@ -284,177 +147,158 @@ class DataCollectorService:
         if registros_batch:
             RegistroEstudianteML.objects.bulk_create(registros_batch, ignore_conflicts=True)
         
-        # Actualizar contador en dataset
+        # Actualizar contador y marca de agua del dataset
         self.dataset.total_registros = len(datos_limpios)
+        self.dataset.ultima_sincronizacion = self.inicio_recoleccion or timezone.now()
         self.dataset.save()
         
         logger.info(f"Dataset guardado: {len(datos_limpios)} registros")
         return self.dataset
     
-    def _obtener_calificaciones_estudiante_trimestre_corregido(self, estudiante, trimestre):
-        """Método corregido para obtener calificaciones usando ContentType"""
-        from Cursos.models import EvaluacionParticipacion
+    def actualizar_dataset_incremental(self, dataset=None):
+        """
+        Refrescar un dataset a partir de su marca de agua (ultima_sincronizacion).
+        
+        Solo se recalculan los pares (estudiante, trimestre) con calificaciones o
+        asistencias modificadas o eliminadas desde la última sincronización: el registro
+        del trimestre modificado (features) y el del trimestre anterior (target).
+        Los registros se actualizan con upsert y total_registros se ajusta en el lugar.
+        """
+        if dataset is not None:
+            self.dataset = dataset
+        
+        marca = self.dataset.ultima_sincronizacion
+        nueva_marca = timezone.now()
+        
+        trimestres = self._obtener_trimestres()
+        extractor = FeatureExtractorService()
+        
+        # Pares (estudiante, trimestre) modificados desde la marca de agua
+        pares_modificados = extractor.pares_modificados(trimestres, marca)
+        
+        # Un cambio en el trimestre T afecta al registro de T y al de su trimestre anterior
+        anterior = {
+            trimestres[i + 1].id: trimestres[i].id
+            for i in range(len(trimestres) - 1)
+        }
+        pares_afectados = set(pares_modificados)
+        pares_afectados.update(
+            (estudiante_id, anterior[trimestre_id])
+            for estudiante_id, trimestre_id in pares_modificados
+            if trimestre_id in anterior
+        )
         
-        calificaciones = []
+        resumen = {
+            'pares_modificados': len(pares_modificados),
+            'registros_actualizados': 0,
+            'registros_eliminados': 0
+        }
         
-        try:
-            # Calificaciones de evaluaciones entregables
-            evaluaciones_entregables_ids = list(
-                EvaluacionEntregable.objects.filter(trimestre=trimestre)
-                .values_list('id', flat=True)
-            )
-            
-            if evaluaciones_entregables_ids:
-                ct_entregable = ContentType.objects.get_for_model(EvaluacionEntregable)
-                calificaciones_entregables = Calificacion.objects.filter(
-                    estudiante=estudiante,
-                    content_type=ct_entregable,
-                    object_id__in=evaluaciones_entregables_ids
-                )
-                calificaciones.extend([float(cal.nota) for cal in calificaciones_entregables])
-            
-            # Calificaciones de evaluaciones de participación
-            evaluaciones_participacion_ids = list(
-                EvaluacionParticipacion.objects.filter(trimestre=trimestre)
-                .values_list('id', flat=True)
-            )
-            
-            if evaluaciones_participacion_ids:
-                ct_participacion = ContentType.objects.get_for_model(EvaluacionParticipacion)
-                calificaciones_participacion = Calificacion.objects.filter(
-                    estudiante=estudiante,
-                    content_type=ct_participacion,
-                    object_id__in=evaluaciones_participacion_ids
+        if pares_afectados:
+            estudiantes_ids = self._obtener_estudiantes().filter(
+                id__in={estudiante_id for estudiante_id, _ in pares_afectados}
+            ).values('id')
+            
+            registros = extractor.construir_registros(trimestres, estudiantes_ids=estudiantes_ids)
+            claves = pd.Series(list(zip(registros['estudiante_id'], registros['trimestre_id'])), dtype=object)
+            registros = self._filtrar_registros_validos(registros[claves.isin(pares_afectados).values])
+            
+            with transaction.atomic():
+                RegistroEstudianteML.objects.bulk_create(
+                    [self._construir_registro_ml(dato) for dato in registros.to_dict('records')],
+                    batch_size=500,
+                    update_conflicts=True,
+                    unique_fields=['estudiante', 'trimestre', 'dataset'],
+                    # fecha_registro también: el reentrenamiento incremental toma las filas corregidas como nuevas
+                    update_fields=[
+                        'promedio_notas_anterior', 'porcentaje_asistencia',
+                        'promedio_participaciones', 'materias_cursadas',
+                        'evaluaciones_completadas', 'rendimiento_futuro', 'fecha_registro'
+                    ]
                 )
-                calificaciones.extend([float(cal.nota) for cal in calificaciones_participacion])
-            
-            return calificaciones
-            
-        except Exception as e:
-            logger.error(f"Error obteniendo calificaciones para {estudiante.get_full_name()}: {str(e)}")
-            return []
-
-    def _procesar_estudiante_corregido(self, estudiante, trimestres):
-        """Versión corregida del procesamiento de estudiante"""
-        registros_generados = []
-        
-        # Necesitamos al menos 2 trimestres para hacer predicciones
-        if len(trimestres) < 2:
-            return registros_generados
-        
-        for i in range(len(trimestres) - 1):
-            trimestre_actual = trimestres[i]
-            trimestre_siguiente = trimestres[i + 1]
-            
-            try:
-                # Calcular features del trimestre actual
-                features = self._calcular_features_trimestre_corregido(estudiante, trimestre_actual)
                 
-                # Calcular target del trimestre siguiente
-                target = self._calcular_target_trimestre_corregido(estudiante, trimestre_siguiente)
-                
-                # Verificar que tenemos datos válidos
-                if features and features.get('tiene_datos') and target is not None:
-                    registro = {
-                        'estudiante': estudiante,
-                        'trimestre': trimestre_actual,
-                        'promedio_notas_anterior': features['promedio_notas'],
-                        'porcentaje_asistencia': features['porcentaje_asistencia'],
-                        'promedio_participaciones': features['promedio_participaciones'],
-                        'materias_cursadas': features['materias_cursadas'],
-                        'evaluaciones_completadas': features['evaluaciones_completadas'],
-                        'rendimiento_futuro': target
-                    }
-                    
-                    registros_generados.append(registro)
-                    
-            except Exception as e:
-                logger.warning(f"Error procesando {estudiante.get_full_name()} en {trimestre_actual}: {str(e)}")
-                continue
-        
-        return registros_generados
-
-    def _calcular_features_trimestre_corregido(self, estudiante, trimestre):
-        """Calcular features de un trimestre específico - versión corregida"""
-        
-        # Obtener calificaciones usando método corregido
-        calificaciones = self._obtener_calificaciones_estudiante_trimestre_corregido(estudiante, trimestre)
-        
-        # Calcular promedio de notas
-        promedio_notas = Decimal('0.0')
-        if calificaciones:
-            promedio_notas = Decimal(str(sum(calificaciones) / len(calificaciones)))
+                # Pares afectados que ya no producen un registro válido
+                vigentes = set(zip(registros['estudiante_id'], registros['trimestre_id']))
+                obsoletos = pares_afectados - vigentes
+                if obsoletos:
+                    ids = self._ids_registros(obsoletos)
+                    for inicio in range(0, len(ids), TAMANO_LOTE_ELIMINACION):
+                        eliminados, _ = RegistroEstudianteML.objects.filter(
+                            id__in=ids[inicio:inicio + TAMANO_LOTE_ELIMINACION]
+                        ).delete()
+                        resumen['registros_eliminados'] += eliminados
+            
+            resumen['registros_actualizados'] = len(registros)
+        
+        self.dataset.total_registros = self.dataset.registros.count()
+        self.dataset.ultima_sincronizacion = nueva_marca
+        self.dataset.save(update_fields=['total_registros', 'ultima_sincronizacion', 'fecha_actualizacion'])
+        
+        resumen['total_registros'] = self.dataset.total_registros
+        logger.info(f"Dataset {self.dataset.nombre} actualizado incrementalmente: {resumen}")
+        return resumen
+    
+    def _ids_registros(self, pares):
+        """
+        Ids de los RegistroEstudianteML del dataset para los pares (estudiante, trimestre).
+        Se buscan por lotes de estudiantes y se cruzan en memoria: un OR por par
+        supera la profundidad de expresión de SQLite con algunos cientos de pares.
+        """
+        estudiantes = sorted({estudiante_id for estudiante_id, _ in pares})
+        trimestres = {trimestre_id for _, trimestre_id in pares}
+        ids = []
+        for inicio in range(0, len(estudiantes), TAMANO_LOTE_ELIMINACION):
+            filas = RegistroEstudianteML.objects.filter(
+                dataset=self.dataset,
+                estudiante_id__in=estudiantes[inicio:inicio + TAMANO_LOTE_ELIMINACION],
+                trimestre_id__in=trimestres
+            ).values_list('id', 'estudiante_id', 'trimestre_id')
+            ids.extend(id_registro for id_registro, estudiante_id, trimestre_id in filas
+                       if (estudiante_id, trimestre_id) in pares)
+        return ids
+    
+    def _filtrar_registros_validos(self, df):
+        """Eliminar registros nulos y valores fuera de rangos lógicos"""
+        # Eliminar registros con valores nulos
+        df_limpio = df.dropna()
+        logger.info(f"Después de eliminar nulos: {len(df_limpio)} registros")
         
-        # Obtener asistencias
-        asistencias = Asistencia.objects.filter(
-            estudiante=estudiante,
-            trimestre=trimestre
+        # Eliminar outliers (valores fuera de rangos lógicos)
+        return df_limpio[
+            (df_limpio['promedio_notas_anterior'] >= 0) & 
+            (df_limpio['promedio_notas_anterior'] <= 100) &
+            (df_limpio['porcentaje_asistencia'] >= 0) & 
+            (df_limpio['porcentaje_asistencia'] <= 100) &
+            (df_limpio['promedio_participaciones'] >= 0) & 
+            (df_limpio['promedio_participaciones'] <= 100) &
+            (df_limpio['rendimiento_futuro'] >= 0) & 
+            (df_limpio['rendimiento_futuro'] <= 100) &
+            (df_limpio['materias_cursadas'] > 0) &
+            (df_limpio['evaluaciones_completadas'] >= 0)
+        ]
+    
+    def _construir_registro_ml(self, dato):
+        """RegistroEstudianteML (sin guardar) a partir de un registro limpio"""
+        return RegistroEstudianteML(
+            dataset=self.dataset,
+            estudiante_id=dato['estudiante_id'],
+            trimestre_id=dato['trimestre_id'],
+            promedio_notas_anterior=Decimal(str(dato['promedio_notas_anterior'])),
+            porcentaje_asistencia=Decimal(str(dato['porcentaje_asistencia'])),
+            promedio_participaciones=Decimal(str(dato['promedio_participaciones'])),
+            materias_cursadas=dato['materias_cursadas'],
+            evaluaciones_completadas=dato['evaluaciones_completadas'],
+            rendimiento_futuro=Decimal(str(dato['rendimiento_futuro']))
         )
-        
-        total_asistencias = asistencias.count()
-        asistencias_presentes = asistencias.filter(presente=True).count()
-        
-        porcentaje_asistencia = Decimal('0.0')
-        if total_asistencias > 0:
-            porcentaje_asistencia = Decimal(str((asistencias_presentes / total_asistencias) * 100))
-        
-        # Calcular otras métricas
-        materias_cursadas = max(1, len(calificaciones) // 3)  # Estimación
-        evaluaciones_completadas = len(calificaciones)
-        
-        # Promedio de participaciones (simplificado como el promedio general)
-        promedio_participaciones = promedio_notas
-        
-        # Verificar si tiene datos suficientes
-        tiene_datos = len(calificaciones) > 0 or total_asistencias > 0
-        
-        return {
-            'promedio_notas': promedio_notas,
-            'porcentaje_asistencia': porcentaje_asistencia,
-            'promedio_participaciones': promedio_participaciones,
-            'materias_cursadas': materias_cursadas,
-            'evaluaciones_completadas': evaluaciones_completadas,
-            'tiene_datos': tiene_datos
-        }
-
-    def _calcular_target_trimestre_corregido(self, estudiante, trimestre):
-        """Calcular target (rendimiento futuro) - versión corregida"""
-        
-        # Obtener calificaciones del trimestre objetivo
-        calificaciones = self._obtener_calificaciones_estudiante_trimestre_corregido(estudiante, trimestre)
-        
-        if calificaciones:
-            promedio = sum(calificaciones) / len(calificaciones)
-            return Decimal(str(promedio))
-        
-        return None
-
-    # Actualizar el método principal para usar la versión corregida
+    
     def recolectar_datos_estudiantes_corregido(self, limite_estudiantes=None):
         """Versión corregida de recolección de datos con parámetro de límite"""
         logger.info("Iniciando recolección de datos corregida...")
+        self.inicio_recoleccion = timezone.now()
         
-        from Permisos.models import Rol
-        try:
-            rol_estudiante = Rol.objects.get(nombre='Estudiante')
-            estudiantes = Usuario.objects.filter(
-                rol=rol_estudiante,
-                is_active=True
-            )
-        except Rol.DoesNotExist:
-            logger.warning("Rol 'Estudiante' no encontrado, usando todos los usuarios activos")
-            estudiantes = Usuario.objects.filter(is_active=True)
-    
-        # Obtener trimestres en el rango del dataset
-        trimestres = Trimestre.objects.filter(
-            año_academico__gte=self.dataset.año_inicio,
-            año_academico__lte=self.dataset.año_fin
-        ).order_by('año_academico', 'numero')
-        
-        if not trimestres.exists():
-            raise ValueError(f"No hay trimestres en el rango {self.dataset.año_inicio}-{self.dataset.año_fin}")
+        estudiantes = self._obtener_estudiantes()
+        trimestres = self._obtener_trimestres()
         
-        datos_procesados = []
         total_estudiantes = estudiantes.count()
         
         # ✅ NUEVO: Usar todos los estudiantes o un límite específico
@@ -463,96 +307,131 @@ class DataCollectorService:
         else:
             limite = min(limite_estudiantes, total_estudiantes)
     
-        logger.info(f"Procesando {limite} estudiantes de {total_estudiantes} disponibles en {trimestres.count()} trimestres")
-        logger.info(f"Registros esperados aproximadamente: {limite * (trimestres.count() - 1)}")
-        
-        # Procesar estudiantes
-        for idx, estudiante in enumerate(estudiantes[:limite]):
-            # Log de progreso cada 25 estudiantes
-            if idx % 25 == 0:
-                logger.info(f"Procesando estudiante {idx+1}/{limite}: {estudiante.get_full_name()}")
-                
-            datos_estudiante = self._procesar_estudiante_corregido(estudiante, list(trimestres))
-            datos_procesados.extend(datos_estudiante)
-            
-            # Mostrar progreso cada 50 estudiantes
-            if idx % 50 == 0 and idx > 0:
-                logger.info(f"   📊 Registros generados hasta ahora: {len(datos_procesados)}")
-                logger.info(f"   📈 Promedio registros/estudiante: {len(datos_procesados)/(idx+1):.1f}")
-            
-            # Pausa cada 100 estudiantes para evitar sobrecarga
-            if idx % 100 == 0 and idx > 0:
-                import time
-                time.sleep(0.1)  # Pausa breve
+        logger.info(f"Procesando {limite} estudiantes de {total_estudiantes} disponibles en {len(trimestres)} trimestres")
+        logger.info(f"Registros esperados aproximadamente: {limite * (len(trimestres) - 1)}")
+        
+        estudiantes_ids = list(estudiantes.values_list('id', flat=True)[:limite])
+        datos_procesados = FeatureExtractorService().construir_registros(trimestres, estudiantes_ids)
         
         logger.info(f"Recolección corregida completada: {len(datos_procesados)} registros de {limite} estudiantes")
         return datos_procesados
 
-    def recolectar_datos_masivos_optimizado(self, batch_size=50):
-        """Método optimizado para recolección masiva de datos en lotes"""
+    def recolectar_datos_masivos_optimizado(self, batch_size=50, num_workers=None, max_reintentos=2, progreso=None):
+        """
+        Recolección masiva por shards en paralelo.
+        
+        El rango de ids de estudiantes se divide en shards de `batch_size` estudiantes
+        que se procesan en un pool de procesos (cada worker abre su propia conexión).
+        Los resultados se unen en un solo DataFrame; un shard que falla se reintenta
+        hasta `max_reintentos` veces sin rehacer los demás. `progreso`, si se indica,
+        se llama con un dict por cada shard completado.
+        """
         logger.info("Iniciando recolección masiva optimizada...")
+        self.inicio_recoleccion = timezone.now()
         
-        from Permisos.models import Rol
-        try:
-            rol_estudiante = Rol.objects.get(nombre='Estudiante')
-            estudiantes = Usuario.objects.filter(
-                rol=rol_estudiante,
-                is_active=True
-            ).order_by('id')  # Orden consistente
-        except Rol.DoesNotExist:
-            logger.warning("Rol 'Estudiante' no encontrado, usando todos los usuarios activos")
-            estudiantes = Usuario.objects.filter(is_active=True).order_by('id')
+        estudiantes_ids = list(self._obtener_estudiantes().values_list('id', flat=True))
+        trimestres_ids = [trimestre.id for trimestre in self._obtener_trimestres()]
         
-        # Obtener trimestres
-        trimestres = list(Trimestre.objects.filter(
-            año_academico__gte=self.dataset.año_inicio,
-            año_academico__lte=self.dataset.año_fin
-        ).order_by('año_academico', 'numero'))
-        
-        if not trimestres:
-            raise ValueError(f"No hay trimestres en el rango {self.dataset.año_inicio}-{self.dataset.año_fin}")
-        
-        total_estudiantes = estudiantes.count()
-        total_batches = (total_estudiantes + batch_size - 1) // batch_size
+        total_estudiantes = len(estudiantes_ids)
+        if total_estudiantes == 0:
+            return pd.DataFrame(columns=COLUMNAS_REGISTROS)
         
-        logger.info(f"Procesando {total_estudiantes} estudiantes en {total_batches} lotes de {batch_size}")
-        logger.info(f"Trimestres disponibles: {len(trimestres)}")
-        
-        todos_los_datos = []
-        
-        # Procesar en lotes
-        for batch_num in range(total_batches):
-            start_idx = batch_num * batch_size
-            end_idx = min(start_idx + batch_size, total_estudiantes)
-            
-            estudiantes_batch = estudiantes[start_idx:end_idx]
-            
-            logger.info(f"\n📦 Procesando lote {batch_num + 1}/{total_batches}")
-            logger.info(f"   Estudiantes: {start_idx + 1} - {end_idx}")
-            
-            datos_batch = []
-            
-            for estudiante in estudiantes_batch:
-                try:
-                    datos_estudiante = self._procesar_estudiante_corregido(estudiante, trimestres)
-                    datos_batch.extend(datos_estudiante)
-                except Exception as e:
-                    logger.warning(f"Error procesando {estudiante.get_full_name()}: {str(e)}")
+        # Shards contiguos sobre el rango de ids: (numero, id_inicio, id_fin)
+        shards = [
+            (numero + 1, bloque[0], bloque[-1])
+            for numero, bloque in enumerate(
+                estudiantes_ids[inicio:inicio + batch_size]
+                for inicio in range(0, total_estudiantes, batch_size)
+            )
+        ]
+        total_shards = len(shards)
+        num_workers = max(1, min(num_workers or os.cpu_count() or 1, total_shards))
+        
+        logger.info(f"Procesando {total_estudiantes} estudiantes en {total_shards} shards de {batch_size} con {num_workers} workers")
+        logger.info(f"Trimestres disponibles: {len(trimestres_ids)}")
+        
+        resultados = {}
+        pendientes = shards
+        
+        for intento in range(max_reintentos + 1):
+            if not pendientes:
+                break
+            if intento > 0:
+                logger.warning(f"Reintento {intento}/{max_reintentos} de {len(pendientes)} shards fallidos")
+            
+            fallidos = []
+            for shard, datos, error in self._ejecutar_shards(pendientes, trimestres_ids, num_workers):
+                numero, id_inicio, id_fin = shard
+                if error is not None:
+                    logger.warning(f"   ❌ Shard {numero}/{total_shards} (ids {id_inicio}-{id_fin}) falló: {error}")
+                    fallidos.append(shard)
                     continue
-            
-            todos_los_datos.extend(datos_batch)
-            
-            logger.info(f"   ✅ Lote completado: {len(datos_batch)} registros")
-            logger.info(f"   📊 Total acumulado: {len(todos_los_datos)} registros")
-            
-            # Pausa entre lotes para evitar sobrecarga
-            if batch_num < total_batches - 1:
-                import time
-                time.sleep(0.2)
+                
+                resultados[numero] = datos
+                logger.info(f"   ✅ Shard {numero}/{total_shards} (ids {id_inicio}-{id_fin}): {len(datos)} registros")
+                
+                if progreso:
+                    progreso({
+                        'shard': numero,
+                        'total_shards': total_shards,
+                        'completados': len(resultados),
+                        'registros': len(datos)
+                    })
+            
+            pendientes = fallidos
+        
+        if pendientes:
+            rangos = ', '.join(f"{id_inicio}-{id_fin}" for _, id_inicio, id_fin in pendientes)
+            raise RuntimeError(f"No se pudieron procesar {len(pendientes)} shards (ids {rangos})")
+        
+        todos_los_datos = pd.concat(
+            [resultados[numero] for numero in sorted(resultados)],
+            ignore_index=True
+        )
         
         logger.info(f"\n🎉 Recolección masiva completada:")
         logger.info(f"   Total estudiantes procesados: {total_estudiantes}")
         logger.info(f"   Total registros generados: {len(todos_los_datos)}")
         logger.info(f"   Promedio registros/estudiante: {len(todos_los_datos)/total_estudiantes:.1f}")
         
-        return todos_los_datos
\ No newline at end of file
+        return todos_los_datos
+    
+    def _ejecutar_shards(self, shards, trimestres_ids, num_workers):
+        """Ejecutar shards y producir (shard, datos, error) a medida que terminan"""
+        if num_workers == 1:
+            for shard in shards:
+                try:
+                    yield shard, _recolectar_shard(trimestres_ids, shard[1], shard[2]), None
+                except Exception as e:
+                    yield shard, None, e
+            return
+        
+        # Cerrar conexiones antes de crear procesos: cada worker abre la suya
+        connections.close_all()
+        
+        with ProcessPoolExecutor(max_workers=num_workers, initializer=inicializar_worker) as executor:
+            futuros = {
+                executor.submit(_recolectar_shard, trimestres_ids, shard[1], shard[2]): shard
+                for shard in shards
+            }
+            for futuro in as_completed(futuros):
+                try:
+                    yield futuros[futuro], futuro.result(), None
+                except Exception as e:
+                    yield futuros[futuro], None, e
+
+
+def _recolectar_shard(trimestres_ids, id_inicio, id_fin):
+    """Features y targets de los estudiantes con id en [id_inicio, id_fin]"""
+    trimestres_por_id = Trimestre.objects.in_bulk(trimestres_ids)
+    trimestres = [trimestres_por_id[trimestre_id] for trimestre_id in trimestres_ids]
+    
+    estudiantes = DataCollectorService()._obtener_estudiantes().filter(
+        id__gte=id_inicio,
+        id__lte=id_fin
+    )
+    
+    return FeatureExtractorService().construir_registros(
+        trimestres,
+        estudiantes_ids=estudiantes.values('id')
+    )
@@ -1,8 +1,6 @@
-import pandas as pd
 import numpy as np
-import random
-from datetime import datetime, timedelta
-from decimal import Decimal
+from django.db import connection, transaction
+from django.utils import timezone
 from machine_learning.models import DatasetAcademico, RegistroEstudianteML
 from Usuarios.models import Usuario
 from Cursos.models import Trimestre
@@ -10,236 +8,227 @@ import logging
 
 logger = logging.getLogger(__name__)
 
+# Filas por INSERT (executemany)
+TAMAÑO_LOTE_GENERADOR = 5000
+
+# Columnas de ml_registro_estudiante en el orden de las filas insertadas
+COLUMNAS_REGISTRO = [
+    'dataset', 'estudiante', 'trimestre',
+    'promedio_notas_anterior', 'porcentaje_asistencia', 'promedio_participaciones',
+    'materias_cursadas', 'evaluaciones_completadas', 'rendimiento_futuro',
+    'fecha_registro'
+]
+
+# Tipos de estudiantes: probabilidad y rangos uniformes (mínimo, máximo) de cada rasgo del perfil
+TIPOS_ESTUDIANTE = ['excelente', 'bueno', 'promedio', 'variable', 'problemático']
+PROBABILIDADES_TIPO = [0.15, 0.25, 0.35, 0.15, 0.10]
+RANGOS_PERFIL = {
+    #                    excelente     bueno         promedio      variable      problemático
+    'base_rendimiento': [(85, 95),     (75, 85),     (60, 75),     (50, 80),     (40, 65)],
+    'variabilidad':     [(2, 5),       (3, 7),       (5, 10),      (8, 15),      (10, 20)],
+    'tendencia':        [(-0.5, 1.0),  (-1.0, 1.5),  (-1.5, 1.5),  (-2.0, 2.0),  (-2.0, 0.5)],
+    'asistencia_base':  [(90, 98),     (80, 92),     (70, 85),     (60, 90),     (45, 75)],
+}
+
+
 class RealisticDataGeneratorFixed:
-    """Generador de datos realistas CORREGIDO"""
+    """
+    Generador de datos realistas CORREGIDO.
+
+    Todo el dataset se simula con operaciones vectorizadas de NumPy: los perfiles de
+    los estudiantes se sortean de una vez y cada métrica es una matriz
+    (estudiantes × períodos). Los estudiantes y trimestres reales se leen una sola vez
+    y los registros se insertan por lotes directamente desde los arreglos.
+    """
     
-    def __init__(self):
-        self.random_state = 42
-        np.random.seed(self.random_state)
-        random.seed(self.random_state)
+    def __init__(self, random_state=42):
+        self.random_state = random_state
+        self.rng = np.random.default_rng(random_state)
     
-    def generar_dataset_realista(self, nombre="Dataset Realista ML", num_estudiantes=200, num_periodos=6):
-        """Generar un dataset con patrones realistas de rendimiento académico"""
+    def generar_dataset_realista(self, nombre="Dataset Realista ML", num_estudiantes=200, num_periodos=6,
+                                 batch_size=TAMAÑO_LOTE_GENERADOR):
+        """
+        Generar un dataset con patrones realistas de rendimiento académico.
+
+        Cada registro necesita un par (estudiante, trimestre) distinto dentro del dataset,
+        así que se pueden generar como máximo estudiantes reales × trimestres 2023-2024
+        registros; si se piden más se lanza ValueError.
+        """
         
         logger.info(f"Generando dataset realista con {num_estudiantes} estudiantes y {num_periodos} períodos")
         
-        # Crear dataset SIN campo 'estado'
-        dataset = DatasetAcademico.objects.create(
-            nombre=nombre,
-            descripcion=f"Dataset generado con patrones realistas - {num_estudiantes} estudiantes",
-            año_inicio=2023,
-            año_fin=2024
-            # Removido: estado='procesando'
-        )
-        
-        registros_generados = []
-        
-        # Generar estudiantes con perfiles diferentes
-        for estudiante_id in range(1, num_estudiantes + 1):
-            perfil_estudiante = self._generar_perfil_estudiante()
-            
-            # Generar secuencia temporal de rendimiento
-            for periodo in range(num_periodos):
-                registro = self._generar_registro_periodo(
-                    estudiante_id, periodo, perfil_estudiante, dataset
-                )
-                if registro:
-                    registros_generados.append(registro)
-        
-        # Guardar en lotes
-        RegistroEstudianteML.objects.bulk_create(registros_generados)
-        
-        # Actualizar dataset
-        dataset.total_registros = len(registros_generados)
-        dataset.save()
-        
-        logger.info(f"Dataset generado: {len(registros_generados)} registros")
-        return dataset
-    
-    def _generar_perfil_estudiante(self):
-        """Generar perfil de estudiante con características consistentes"""
-        
-        # Tipos de estudiantes con diferentes patrones
-        tipo = np.random.choice(['excelente', 'bueno', 'promedio', 'variable', 'problemático'], 
-                               p=[0.15, 0.25, 0.35, 0.15, 0.10])
-        
-        if tipo == 'excelente':
-            base_rendimiento = np.random.uniform(85, 95)
-            variabilidad = np.random.uniform(2, 5)
-            tendencia = np.random.uniform(-0.5, 1.0)
-            asistencia_base = np.random.uniform(90, 98)
-            
-        elif tipo == 'bueno':
-            base_rendimiento = np.random.uniform(75, 85)
-            variabilidad = np.random.uniform(3, 7)
-            tendencia = np.random.uniform(-1.0, 1.5)
-            asistencia_base = np.random.uniform(80, 92)
-            
-        elif tipo == 'promedio':
-            base_rendimiento = np.random.uniform(60, 75)
-            variabilidad = np.random.uniform(5, 10)
-            tendencia = np.random.uniform(-1.5, 1.5)
-            asistencia_base = np.random.uniform(70, 85)
+        estudiantes_ids, trimestres_ids = self._obtener_referencias()
+        total = num_estudiantes * num_periodos
+        capacidad = len(estudiantes_ids) * len(trimestres_ids)
+        if total > capacidad:
+            raise ValueError(
+                f"Se pidieron {total} registros pero solo hay {capacidad} combinaciones "
+                f"estudiante-trimestre ({len(estudiantes_ids)} estudiantes × {len(trimestres_ids)} trimestres)"
+            )
+        
+        perfiles = self._generar_perfiles(num_estudiantes)
+        metricas = self._simular_periodos(perfiles, num_periodos)
+        
+        # Registro k (estudiante sintético k // num_periodos, período k % num_periodos) -> par real distinto:
+        # los períodos consecutivos recorren los trimestres de un mismo estudiante real
+        indices = np.arange(total)
+        estudiantes = estudiantes_ids[indices // len(trimestres_ids)]
+        trimestres = trimestres_ids[indices % len(trimestres_ids)]
+        
+        with transaction.atomic():
+            dataset = DatasetAcademico.objects.create(
+                nombre=nombre,
+                descripcion=f"Dataset generado con patrones realistas - {num_estudiantes} estudiantes",
+                año_inicio=2023,
+                año_fin=2024
+            )
             
-        elif tipo == 'variable':
-            base_rendimiento = np.random.uniform(50, 80)
-            variabilidad = np.random.uniform(8, 15)
-            tendencia = np.random.uniform(-2.0, 2.0)
-            asistencia_base = np.random.uniform(60, 90)
+            self._insertar_registros(dataset, estudiantes, trimestres, metricas, batch_size)
             
-        else:  # problemático
-            base_rendimiento = np.random.uniform(40, 65)
-            variabilidad = np.random.uniform(10, 20)
-            tendencia = np.random.uniform(-2.0, 0.5)
-            asistencia_base = np.random.uniform(45, 75)
+            dataset.total_registros = total
+            dataset.save(update_fields=['total_registros', 'fecha_actualizacion'])
         
-        return {
-            'tipo': tipo,
-            'base_rendimiento': base_rendimiento,
-            'variabilidad': variabilidad,
-            'tendencia': tendencia,
-            'asistencia_base': asistencia_base,
-            'factores_externos': np.random.uniform(0.8, 1.2)
-        }
+        logger.info(f"Dataset generado: {total} registros")
+        return dataset
     
-    def _generar_registro_periodo(self, estudiante_id, periodo, perfil, dataset):
-        """Generar un registro para un período específico"""
-        
-        # Obtener primer estudiante real para referencia
-        try:
-            estudiante = Usuario.objects.filter(is_active=True).first()
-            if not estudiante:
-                return None
-        except:
-            return None
-        
-        # Obtener trimestre
-        try:
-            trimestre = Trimestre.objects.filter(año_academico__in=[2023, 2024]).first()
-            if not trimestre:
-                return None
-        except:
-            return None
-        
-        # Calcular rendimiento actual con evolución temporal
-        rendimiento_actual = self._calcular_rendimiento_periodo(perfil, periodo)
-        
-        # Calcular rendimiento futuro con factores realistas
-        rendimiento_futuro = self._calcular_rendimiento_futuro(
-            rendimiento_actual, perfil, periodo
+    def _obtener_referencias(self):
+        """Ids de estudiantes activos (todos los usuarios activos si no hay rol Estudiante) y de trimestres 2023-2024"""
+        estudiantes_ids = list(
+            Usuario.objects.filter(rol__nombre='Estudiante', is_active=True)
+            .order_by('id').values_list('id', flat=True)
         )
+        if not estudiantes_ids:
+            estudiantes_ids = list(Usuario.objects.filter(is_active=True).order_by('id').values_list('id', flat=True))
         
-        # Generar asistencia correlacionada con rendimiento
-        asistencia = self._calcular_asistencia(rendimiento_actual, perfil)
-        
-        # Calcular otras métricas
-        participaciones = self._calcular_participaciones(rendimiento_actual, asistencia, perfil)
-        materias_cursadas = np.random.randint(4, 8)
-        evaluaciones_completadas = np.random.randint(8, 16)
-        
-        return RegistroEstudianteML(
-            dataset=dataset,
-            estudiante=estudiante,
-            trimestre=trimestre,
-            promedio_notas_anterior=Decimal(str(round(rendimiento_actual, 2))),
-            porcentaje_asistencia=Decimal(str(round(asistencia, 2))),
-            promedio_participaciones=Decimal(str(round(participaciones, 2))),
-            materias_cursadas=materias_cursadas,
-            evaluaciones_completadas=evaluaciones_completadas,
-            rendimiento_futuro=Decimal(str(round(rendimiento_futuro, 2)))
-        )
-    
-    def _calcular_rendimiento_periodo(self, perfil, periodo):
-        """Calcular rendimiento actual considerando evolución temporal"""
-        
-        evolucion_temporal = perfil['tendencia'] * periodo
-        ruido = np.random.normal(0, perfil['variabilidad'])
-        factor_estacional = np.sin(periodo * np.pi / 3) * np.random.uniform(-2, 2)
-        
-        rendimiento = (
-            perfil['base_rendimiento'] + 
-            evolucion_temporal + 
-            ruido + 
-            factor_estacional
+        trimestres_ids = list(
+            Trimestre.objects.filter(año_academico__in=[2023, 2024])
+            .order_by('año_academico', 'numero').values_list('id', flat=True)
         )
         
-        return np.clip(rendimiento, 0, 100)
-    
-    def _calcular_rendimiento_futuro(self, rendimiento_actual, perfil, periodo):
-        """Calcular rendimiento futuro con factores predictivos realistas"""
-        
-        factor_persistencia = 0.7
-        media_personal = perfil['base_rendimiento']
-        factor_regresion = 0.15
-        evento_aleatorio = np.random.normal(0, perfil['variabilidad'] * 0.8)
-        factor_tendencia = perfil['tendencia'] * np.random.uniform(0.5, 1.5)
-        asistencia_efecto = (self._calcular_asistencia(rendimiento_actual, perfil) - 75) * 0.1
-        
-        rendimiento_futuro = (
-            rendimiento_actual * factor_persistencia +
-            media_personal * factor_regresion +
-            evento_aleatorio +
-            factor_tendencia +
-            asistencia_efecto +
-            np.random.uniform(-3, 3)
-        )
+        if not estudiantes_ids:
+            raise ValueError("No hay usuarios activos para asociar a los registros")
+        if not trimestres_ids:
+            raise ValueError("No hay trimestres de 2023-2024 para asociar a los registros")
         
-        return np.clip(rendimiento_futuro, 0, 100)
+        return np.array(estudiantes_ids), np.array(trimestres_ids)
     
-    def _calcular_asistencia(self, rendimiento, perfil):
-        """Calcular asistencia correlacionada con rendimiento"""
+    def _generar_perfiles(self, num_estudiantes):
+        """Perfiles de todos los estudiantes como arreglos (uno por rasgo) de largo num_estudiantes"""
         
-        correlacion_base = 0.6
+        tipos = self.rng.choice(len(TIPOS_ESTUDIANTE), size=num_estudiantes, p=PROBABILIDADES_TIPO)
+        perfiles = {'tipo': tipos}
         
-        asistencia = (
-            perfil['asistencia_base'] +
-            (rendimiento - perfil['base_rendimiento']) * correlacion_base * 0.3 +
-            np.random.normal(0, 8)
-        )
+        for rasgo, rangos in RANGOS_PERFIL.items():
+            minimos, maximos = np.array(rangos, dtype=float).T
+            perfiles[rasgo] = self.rng.uniform(minimos[tipos], maximos[tipos])
         
-        return np.clip(asistencia, 0, 100)
+        return perfiles
     
-    def _calcular_participaciones(self, rendimiento, asistencia, perfil):
-        """Calcular participaciones basadas en rendimiento y asistencia"""
-        
-        participaciones = (
-            rendimiento * 0.4 +
-            asistencia * 0.3 +
-            perfil['base_rendimiento'] * 0.2 +
-            np.random.normal(0, 5)
+    def _simular_periodos(self, perfiles, num_periodos):
+        """Métricas de cada estudiante y período como matrices (estudiantes × períodos), aplanadas por filas"""
+        
+        rng = self.rng
+        forma = (len(perfiles['tipo']), num_periodos)
+        periodos = np.arange(num_periodos)
+        # Rasgos como columnas para que se propaguen a todos los períodos
+        base = perfiles['base_rendimiento'][:, None]
+        variabilidad = perfiles['variabilidad'][:, None]
+        tendencia = perfiles['tendencia'][:, None]
+        asistencia_base = perfiles['asistencia_base'][:, None]
+        
+        # Rendimiento actual: evolución temporal + ruido personal + factor estacional
+        evolucion_temporal = tendencia * periodos
+        ruido = rng.normal(0, variabilidad, forma)
+        factor_estacional = np.sin(periodos * np.pi / 3) * rng.uniform(-2, 2, forma)
+        rendimiento = np.clip(base + evolucion_temporal + ruido + factor_estacional, 0, 100)
+        
+        # Asistencia correlacionada con el desvío del rendimiento respecto de la media personal
+        def asistencia_correlacionada():
+            return np.clip(asistencia_base + (rendimiento - base) * 0.6 * 0.3 + rng.normal(0, 8, forma), 0, 100)
+        
+        asistencia = asistencia_correlacionada()
+        
+        # Rendimiento futuro: persistencia + regresión a la media + tendencia + efecto de asistencia
+        rendimiento_futuro = np.clip(
+            rendimiento * 0.7 +
+            base * 0.15 +
+            rng.normal(0, variabilidad * 0.8, forma) +
+            tendencia * rng.uniform(0.5, 1.5, forma) +
+            (asistencia_correlacionada() - 75) * 0.1 +
+            rng.uniform(-3, 3, forma),
+            0, 100
+        )
+        
+        participaciones = np.clip(
+            rendimiento * 0.4 + asistencia * 0.3 + base * 0.2 + rng.normal(0, 5, forma),
+            0, 100
         )
         
-        return np.clip(participaciones, 0, 100)
+        return {
+            'promedio_notas_anterior': rendimiento.ravel(),
+            'porcentaje_asistencia': asistencia.ravel(),
+            'promedio_participaciones': participaciones.ravel(),
+            'materias_cursadas': rng.integers(4, 8, forma).ravel(),
+            'evaluaciones_completadas': rng.integers(8, 16, forma).ravel(),
+            'rendimiento_futuro': rendimiento_futuro.ravel()
+        }
+    
+    def _insertar_registros(self, dataset, estudiantes, trimestres, metricas, batch_size):
+        """
+        INSERT con executemany por lotes de batch_size filas armadas directamente desde
+        los arreglos. Con bulk_create casi todo el tiempo se iba en crear las instancias y
+        preparar cada campo en el ORM; así un millón de registros tarda segundos.
+        """
+        campos = [RegistroEstudianteML._meta.get_field(nombre) for nombre in COLUMNAS_REGISTRO]
+        columnas = ', '.join(connection.ops.quote_name(campo.column) for campo in campos)
+        marcadores = ', '.join(['%s'] * len(campos))
+        sql = f'INSERT INTO {connection.ops.quote_name(RegistroEstudianteML._meta.db_table)} ({columnas}) VALUES ({marcadores})'
+        
+        # Valores comunes a todas las filas, ya convertidos al formato de la base
+        dataset_id = DatasetAcademico._meta.pk.get_db_prep_value(dataset.pk, connection)
+        fecha_registro = RegistroEstudianteML._meta.get_field('fecha_registro').get_db_prep_value(timezone.now(), connection)
+        
+        with connection.cursor() as cursor:
+            for inicio in range(0, len(estudiantes), batch_size):
+                fin = inicio + batch_size
+                filas = zip(
+                    estudiantes[inicio:fin].tolist(),
+                    trimestres[inicio:fin].tolist(),
+                    *(self._columna(metricas[nombre][inicio:fin]) for nombre in COLUMNAS_REGISTRO[3:9])
+                )
+                cursor.executemany(sql, [(dataset_id, *fila, fecha_registro) for fila in filas])
+    
+    def _columna(self, valores):
+        """Valores de una columna como tipos de Python; los decimales con dos cifras como en el modelo"""
+        if np.issubdtype(valores.dtype, np.integer):
+            return valores.tolist()
+        return np.round(valores, 2).tolist()
     
     def generar_estadisticas_dataset(self, dataset):
         """Generar estadísticas del dataset creado"""
         
-        registros = RegistroEstudianteML.objects.filter(dataset=dataset)
+        filas = list(
+            RegistroEstudianteML.objects.filter(dataset=dataset)
+            .values_list('promedio_notas_anterior', 'rendimiento_futuro')
+        )
         
-        if not registros.exists():
+        if not filas:
             return None
         
-        data = []
-        for r in registros:
-            data.append({
-                'promedio_anterior': float(r.promedio_notas_anterior),
-                'rendimiento_futuro': float(r.rendimiento_futuro),
-                'asistencia': float(r.porcentaje_asistencia),
-                'participaciones': float(r.promedio_participaciones)
-            })
-        
-        df = pd.DataFrame(data)
+        valores = np.array(filas, dtype=np.float64)
+        promedio_anterior, rendimiento_futuro = valores[:, 0], valores[:, 1]
+        diferencia = rendimiento_futuro - promedio_anterior
         
         stats = {
-            'total_registros': len(df),
-            'correlacion_rendimiento': df['promedio_anterior'].corr(df['rendimiento_futuro']),
-            'diferencia_promedio': abs(df['rendimiento_futuro'].mean() - df['promedio_anterior'].mean()),
-            'std_diferencia': (df['rendimiento_futuro'] - df['promedio_anterior']).std(),
-            'rango_rendimiento': (df['promedio_anterior'].min(), df['promedio_anterior'].max()),
-            'rango_futuro': (df['rendimiento_futuro'].min(), df['rendimiento_futuro'].max())
+            'total_registros': len(valores),
+            'correlacion_rendimiento': float(np.corrcoef(promedio_anterior, rendimiento_futuro)[0, 1]) if len(valores) > 1 else float('nan'),
+            'diferencia_promedio': float(abs(rendimiento_futuro.mean() - promedio_anterior.mean())),
+            'std_diferencia': float(diferencia.std(ddof=1)) if len(valores) > 1 else float('nan'),
+            'rango_rendimiento': (float(promedio_anterior.min()), float(promedio_anterior.max())),
+            'rango_futuro': (float(rendimiento_futuro.min()), float(rendimiento_futuro.max()))
         }
         
         return stats
 
 # Crear instancia del generador corregido
-print("✅ GeneradorDataRealistaFixed creado")
\ No newline at end of file
+print("✅ GeneradorDataRealistaFixed creado")
@@ -0,0 +1,216 @@
+import numpy as np
+import pandas as pd
+from django.contrib.contenttypes.models import ContentType
+from django.db.models import Count, OuterRef, Q, Subquery, Sum
+from Cursos.models import (AcumuladoTrimestral, Asistencia, Calificacion, EvaluacionEntregable,
+                           EvaluacionParticipacion)
+import logging
+
+logger = logging.getLogger(__name__)
+
+COLUMNAS_FEATURES = [
+    'estudiante_id',
+    'trimestre_id',
+    'promedio_notas',
+    'promedio_participaciones',
+    'materias_cursadas',
+    'evaluaciones_completadas',
+    'total_asistencias',
+    'porcentaje_asistencia'
+]
+
+COLUMNAS_REGISTROS = [
+    'estudiante_id',
+    'trimestre_id',
+    'promedio_notas_anterior',
+    'porcentaje_asistencia',
+    'promedio_participaciones',
+    'materias_cursadas',
+    'evaluaciones_completadas',
+    'rendimiento_futuro'
+]
+
+
+class FeatureExtractorService:
+    """
+    Extracción de features por conjuntos: calcula las métricas de todos los
+    estudiantes y trimestres con consultas agregadas (una por tipo de
+    evaluación más una de asistencias) y devuelve DataFrames columnares.
+    """
+
+    def extraer_features(self, trimestres, estudiantes_ids=None):
+        """
+        Features por (estudiante, trimestre).
+
+        Calificaciones se unen a evaluaciones_entregables y evaluaciones_participacion
+        por content type y se agrupan por estudiante, trimestre y materia en la base de datos.
+        """
+        trimestres_ids = [t.id if hasattr(t, 'id') else t for t in trimestres]
+
+        notas = pd.concat([
+            self._agregar_calificaciones(EvaluacionEntregable, trimestres_ids, estudiantes_ids, False),
+            self._agregar_calificaciones(EvaluacionParticipacion, trimestres_ids, estudiantes_ids, True)
+        ], ignore_index=True)
+
+        if notas.empty:
+            features = pd.DataFrame(columns=['estudiante_id', 'trimestre_id'])
+        else:
+            notas['suma_participacion'] = notas['suma'].where(notas['es_participacion'], 0.0)
+            notas['total_participacion'] = notas['total'].where(notas['es_participacion'], 0)
+
+            features = notas.groupby(['estudiante_id', 'trimestre_id']).agg(
+                suma=('suma', 'sum'),
+                evaluaciones_completadas=('total', 'sum'),
+                suma_participacion=('suma_participacion', 'sum'),
+                total_participacion=('total_participacion', 'sum'),
+                materias_cursadas=('materia_id', 'nunique')
+            ).reset_index()
+
+            features['promedio_notas'] = features['suma'] / features['evaluaciones_completadas']
+            features['promedio_participaciones'] = np.where(
+                features['total_participacion'] > 0,
+                features['suma_participacion'] / features['total_participacion'].where(features['total_participacion'] > 0, 1),
+                0.0
+            )
+
+        asistencias = self._agregar_asistencias(trimestres_ids, estudiantes_ids)
+
+        features = features.merge(asistencias, on=['estudiante_id', 'trimestre_id'], how='outer')
+
+        for columna in ('promedio_notas', 'promedio_participaciones'):
+            features[columna] = features.get(columna, pd.Series(dtype='float64')).astype('float64').fillna(0.0)
+        for columna in ('materias_cursadas', 'evaluaciones_completadas', 'total_asistencias', 'presentes'):
+            features[columna] = features.get(columna, pd.Series(dtype='float64')).fillna(0).astype('int64')
+
+        features['porcentaje_asistencia'] = np.where(
+            features['total_asistencias'] > 0,
+            features['presentes'] * 100.0 / features['total_asistencias'].where(features['total_asistencias'] > 0, 1),
+            0.0
+        )
+
+        return features[COLUMNAS_FEATURES].sort_values(['estudiante_id', 'trimestre_id']).reset_index(drop=True)
+
+    def construir_registros(self, trimestres, estudiantes_ids=None):
+        """
+        Registros de entrenamiento: features del trimestre actual y, como target,
+        el promedio de notas del trimestre siguiente (orden cronológico recibido).
+        """
+        trimestres = list(trimestres)
+        if len(trimestres) < 2:
+            return pd.DataFrame(columns=COLUMNAS_REGISTROS)
+
+        features = self.extraer_features(trimestres, estudiantes_ids)
+
+        # Mapear cada trimestre a su sucesor en la secuencia
+        siguiente = {
+            trimestres[i].id: trimestres[i + 1].id
+            for i in range(len(trimestres) - 1)
+        }
+
+        actuales = features[features['trimestre_id'].isin(siguiente.keys())].copy()
+        actuales['trimestre_siguiente_id'] = actuales['trimestre_id'].map(siguiente)
+
+        # El target solo existe si el estudiante tiene calificaciones en el trimestre siguiente
+        targets = features.loc[
+            features['evaluaciones_completadas'] > 0,
+            ['estudiante_id', 'trimestre_id', 'promedio_notas']
+        ].rename(columns={
+            'trimestre_id': 'trimestre_siguiente_id',
+            'promedio_notas': 'rendimiento_futuro'
+        })
+
+        registros = actuales.merge(targets, on=['estudiante_id', 'trimestre_siguiente_id'], how='inner')
+
+        # Solo registros con datos en el trimestre actual
+        registros = registros[
+            (registros['evaluaciones_completadas'] > 0) |
+            (registros['total_asistencias'] > 0) |
+            (registros['materias_cursadas'] > 0)
+        ]
+
+        registros = registros.rename(columns={'promedio_notas': 'promedio_notas_anterior'})
+        return registros[COLUMNAS_REGISTROS].reset_index(drop=True)
+
+    def pares_modificados(self, trimestres, desde=None):
+        """
+        Pares (estudiante_id, trimestre_id) con calificaciones o asistencias
+        modificadas o eliminadas después de `desde` (todos los pares si `desde` es None).
+        """
+        trimestres_ids = [t.id if hasattr(t, 'id') else t for t in trimestres]
+        pares = set()
+
+        for modelo_evaluacion in (EvaluacionEntregable, EvaluacionParticipacion):
+            calificaciones = self._calificaciones_con_evaluacion(modelo_evaluacion, trimestres_ids)
+            if desde is not None:
+                calificaciones = calificaciones.filter(updated_at__gt=desde)
+            pares.update(
+                calificaciones.values_list('estudiante_id', 'eval_trimestre_id').distinct()
+            )
+
+        asistencias = Asistencia.objects.filter(trimestre_id__in=trimestres_ids)
+        if desde is not None:
+            asistencias = asistencias.filter(updated_at__gt=desde)
+        pares.update(
+            asistencias.order_by().values_list('estudiante_id', 'trimestre_id').distinct()
+        )
+
+        # Los acumulados se recalculan también al eliminar calificaciones o asistencias y al
+        # cambiar una evaluación: marcan pares que las tablas de origen ya no muestran
+        acumulados = AcumuladoTrimestral.objects.filter(trimestre_id__in=trimestres_ids)
+        if desde is not None:
+            acumulados = acumulados.filter(updated_at__gt=desde)
+        pares.update(
+            acumulados.order_by().values_list('estudiante_id', 'trimestre_id').distinct()
+        )
+
+        return pares
+
+    def _calificaciones_con_evaluacion(self, modelo_evaluacion, trimestres_ids):
+        """Calificaciones de un tipo de evaluación anotadas con trimestre y materia de la evaluación"""
+        evaluacion = modelo_evaluacion.objects.filter(pk=OuterRef('object_id'))
+
+        return Calificacion.objects.filter(
+            content_type=ContentType.objects.get_for_model(modelo_evaluacion)
+        ).annotate(
+            eval_trimestre_id=Subquery(evaluacion.values('trimestre_id')[:1]),
+            eval_materia_id=Subquery(evaluacion.values('materia_id')[:1])
+        ).filter(eval_trimestre_id__in=trimestres_ids).order_by()
+
+    def _agregar_calificaciones(self, modelo_evaluacion, trimestres_ids, estudiantes_ids, es_participacion):
+        """Suma y cantidad de notas por estudiante, trimestre y materia para un tipo de evaluación"""
+        calificaciones = self._calificaciones_con_evaluacion(modelo_evaluacion, trimestres_ids)
+
+        if estudiantes_ids is not None:
+            calificaciones = calificaciones.filter(estudiante_id__in=estudiantes_ids)
+
+        filas = calificaciones.values(
+            'estudiante_id', 'eval_trimestre_id', 'eval_materia_id'
+        ).annotate(
+            suma=Sum('nota'),
+            total=Count('id')
+        ).order_by().values_list('estudiante_id', 'eval_trimestre_id', 'eval_materia_id', 'suma', 'total')
+
+        df = pd.DataFrame(
+            list(filas),
+            columns=['estudiante_id', 'trimestre_id', 'materia_id', 'suma', 'total']
+        )
+        df['suma'] = df['suma'].astype('float64')
+        df['es_participacion'] = es_participacion
+        return df
+
+    def _agregar_asistencias(self, trimestres_ids, estudiantes_ids):
+        """Total de clases y presentes por estudiante y trimestre"""
+        asistencias = Asistencia.objects.filter(trimestre_id__in=trimestres_ids)
+
+        if estudiantes_ids is not None:
+            asistencias = asistencias.filter(estudiante_id__in=estudiantes_ids)
+
+        filas = asistencias.values('estudiante_id', 'trimestre_id').annotate(
+            total_asistencias=Count('id'),
+            presentes=Count('id', filter=Q(presente=True))
+        ).order_by().values_list('estudiante_id', 'trimestre_id', 'total_asistencias', 'presentes')
+
+        return pd.DataFrame(
+            list(filas),
+            columns=['estudiante_id', 'trimestre_id', 'total_asistencias', 'presentes']
+        )
@@ -0,0 +1,206 @@
+import copy
+import numpy as np
+from django.conf import settings
+from django.utils import timezone
+from sklearn.ensemble import GradientBoostingRegressor, RandomForestRegressor
+from sklearn.linear_model import SGDRegressor
+from sklearn.model_selection import train_test_split
+from sklearn.metrics import mean_absolute_error, mean_squared_error, r2_score
+from machine_learning.models import ModeloML
+from machine_learning.services.model_registry import FEATURES_COLUMNS, ModelRegistryService
+from machine_learning.services.training_data import TrainingDataLoader
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Parte de los registros nuevos que se reserva para decidir la promoción
+FRACCION_HOLD_OUT = 0.2
+
+# Mínimo de registros nuevos para que valga la pena actualizar el modelo
+MINIMO_REGISTROS_NUEVOS = 20
+
+# Árboles que se agregan a los ensambles con warm_start (proporción de los que ya tienen)
+PROPORCION_ARBOLES_NUEVOS = 0.2
+
+# Paso de SGD al seguir entrenando un modelo lineal (constante y chico: ajuste fino, no desde cero)
+TASA_APRENDIZAJE_SGD = 0.001
+
+SUFIJO_INCREMENTAL = ' (incremental)'
+
+
+class IncrementalTrainerService:
+    """
+    Reentrenamiento incremental del ModeloML activo con los RegistroEstudianteML de su
+    dataset agregados después de su fecha_entrenamiento:
+
+    - Modelos lineales: StandardScaler.partial_fit con las filas nuevas y
+      SGDRegressor.partial_fit partiendo de los coeficientes actuales (una regresión
+      lineal se convierte a un SGDRegressor equivalente la primera vez).
+    - RandomForest / GradientBoosting: warm_start, se agregan árboles ajustados a las
+      filas nuevas con el scaler del modelo sin cambios.
+
+    El candidato se compara con el modelo actual sobre un hold-out de filas nuevas más
+    la misma cantidad de filas anteriores (para detectar olvido) y solo se registra como
+    nueva versión activa si su R² no empeora.
+    """
+
+    def __init__(self, registry=None):
+        self.registry = registry or ModelRegistryService()
+        self.loader = TrainingDataLoader(usar_cache=False)
+        self.tolerancia_r2 = settings.ML_SETTINGS.get('INCREMENTAL_TOLERANCIA_R2', 0.0)
+
+    def reentrenar(self, creado_por=None, progreso=None):
+        """
+        Actualizar el modelo activo. Devuelve un resumen con las métricas de ambos
+        modelos en el hold-out y si el nuevo fue promovido.
+        Lanza ValueError si no hay modelo activo o su algoritmo no admite actualización.
+        """
+        modelo_id = self.registry.obtener_modelo_activo_id()
+        if modelo_id is None:
+            raise ValueError('No hay un modelo activo para reentrenar')
+
+        modelo_db = ModeloML.objects.select_related('dataset').get(id=modelo_id)
+        artefacto = self.registry.cargar_artefacto(modelo_db)
+        if artefacto is None:
+            raise ValueError(f'No se pudo cargar el artefacto del modelo {modelo_db.nombre}')
+
+        # Corte de esta actualización: lo que llegue mientras tanto queda para la próxima
+        corte = timezone.now()
+        dataset = modelo_db.dataset
+        nuevos = self.loader.cargar_rango(dataset, desde=modelo_db.fecha_entrenamiento, hasta=corte)
+
+        resumen = {
+            'modelo_actual': str(modelo_db.id),
+            'algoritmo': modelo_db.algoritmo,
+            'registros_nuevos': len(nuevos),
+            'promovido': False
+        }
+
+        if len(nuevos) < MINIMO_REGISTROS_NUEVOS:
+            resumen['mensaje'] = (
+                f'Solo hay {len(nuevos)} registros nuevos desde {modelo_db.fecha_entrenamiento:%Y-%m-%d %H:%M}; '
+                f'se necesitan al menos {MINIMO_REGISTROS_NUEVOS}'
+            )
+            return resumen
+
+        nuevos_ajuste, nuevos_hold_out = train_test_split(nuevos, test_size=FRACCION_HOLD_OUT, random_state=42)
+        anteriores = self.loader.cargar_rango(
+            dataset, hasta=modelo_db.fecha_entrenamiento, limite=len(nuevos_hold_out), recientes=True
+        )
+        hold_out = np.vstack([nuevos_hold_out, anteriores])
+
+        if progreso:
+            progreso(1, 3, f'{len(nuevos)} registros nuevos leídos')
+
+        columnas = len(FEATURES_COLUMNS)
+        X_nuevo, y_nuevo = nuevos_ajuste[:, :columnas], nuevos_ajuste[:, columnas]
+        X_hold_out, y_hold_out = hold_out[:, :columnas], hold_out[:, columnas]
+
+        modelo, scaler = self._actualizar(artefacto['modelo'], artefacto['scaler'], X_nuevo, y_nuevo)
+
+        if progreso:
+            progreso(2, 3, 'Modelo actualizado')
+
+        metricas_actual = _metricas(y_hold_out, artefacto['modelo'].predict(artefacto['scaler'].transform(X_hold_out)))
+        metricas_nuevo = _metricas(y_hold_out, modelo.predict(scaler.transform(X_hold_out)))
+        resumen.update({
+            'registros_hold_out': len(hold_out),
+            'metricas_actual': metricas_actual,
+            'metricas_nuevo': metricas_nuevo
+        })
+
+        if metricas_nuevo['r2'] < metricas_actual['r2'] - self.tolerancia_r2:
+            resumen['mensaje'] = 'El modelo actualizado no mejora en el hold-out; se mantiene el actual'
+            logger.info(
+                f"Reentrenamiento incremental descartado: R² {metricas_nuevo['r2']:.4f} "
+                f"< {metricas_actual['r2']:.4f} del modelo actual"
+            )
+        else:
+            tipo_modelo = artefacto.get('tipo_modelo', modelo_db.algoritmo)
+            if not tipo_modelo.endswith(SUFIJO_INCREMENTAL):
+                tipo_modelo += SUFIJO_INCREMENTAL
+
+            registrado = self.registry.registrar_modelo(
+                modelo,
+                scaler,
+                dataset,
+                metricas_nuevo,
+                algoritmo=modelo_db.algoritmo,
+                tipo_modelo=tipo_modelo,
+                creado_por=creado_por,
+                fecha_entrenamiento=corte
+            )
+            resumen.update({
+                'promovido': True,
+                'modelo_nuevo': registrado['modelo_id'],
+                'version': registrado['version'],
+                'mensaje': 'Nueva versión del modelo registrada como activa'
+            })
+            logger.info(
+                f"Reentrenamiento incremental promovido: v{registrado['version']} "
+                f"R² {metricas_nuevo['r2']:.4f} (antes {metricas_actual['r2']:.4f})"
+            )
+
+        if progreso:
+            progreso(3, 3, resumen['mensaje'])
+
+        return resumen
+
+    def _actualizar(self, modelo_actual, scaler_actual, X, y):
+        """Copia del modelo y del scaler actualizada con las filas nuevas (el activo no se modifica)"""
+        modelo = copy.deepcopy(modelo_actual)
+        scaler = copy.deepcopy(scaler_actual)
+
+        if isinstance(modelo, (RandomForestRegressor, GradientBoostingRegressor)):
+            # Los umbrales de los árboles existentes dependen del scaler: se mantiene igual
+            nuevos_arboles = max(1, int(modelo.n_estimators * PROPORCION_ARBOLES_NUEVOS))
+            modelo.set_params(warm_start=True, n_estimators=modelo.n_estimators + nuevos_arboles)
+            modelo.fit(scaler.transform(X), y)
+            return modelo, scaler
+
+        if hasattr(modelo, 'coef_') and hasattr(modelo, 'intercept_'):
+            if not hasattr(modelo, 'partial_fit'):
+                modelo = self._a_sgd(modelo)
+            scaler.partial_fit(X)
+            self._reexpresar_coeficientes(modelo, scaler_actual, scaler)
+            modelo.partial_fit(scaler.transform(X), y)
+            return modelo, scaler
+
+        if hasattr(modelo, 'partial_fit'):
+            modelo.partial_fit(scaler.transform(X), y)
+            return modelo, scaler
+
+        raise ValueError(
+            f'El modelo activo ({type(modelo).__name__}) no admite reentrenamiento incremental; '
+            'use el entrenamiento completo'
+        )
+
+    def _a_sgd(self, modelo):
+        """SGDRegressor con los coeficientes de un modelo lineal ya ajustado (mismas predicciones)"""
+        sgd = SGDRegressor(learning_rate='constant', eta0=TASA_APRENDIZAJE_SGD, random_state=42)
+        sgd.coef_ = np.asarray(modelo.coef_, dtype=np.float64).ravel().copy()
+        sgd.intercept_ = np.atleast_1d(np.asarray(modelo.intercept_, dtype=np.float64)).copy()
+        sgd.n_features_in_ = sgd.coef_.shape[0]
+        sgd.t_ = 1.0
+        return sgd
+
+    def _reexpresar_coeficientes(self, modelo, scaler_anterior, scaler_nuevo):
+        """
+        Ajustar coeficientes e intercepto al nuevo escalado para que el modelo prediga
+        exactamente lo mismo antes del partial_fit: w·(x-μ)/σ + b = w'·(x-μ')/σ' + b'.
+        """
+        coef = modelo.coef_ * scaler_nuevo.scale_ / scaler_anterior.scale_
+        modelo.intercept_ = modelo.intercept_ + np.sum(
+            modelo.coef_ * (scaler_nuevo.mean_ - scaler_anterior.mean_) / scaler_anterior.scale_
+        )
+        modelo.coef_ = coef
+
+
+def _metricas(y_real, y_pred):
+    mse = mean_squared_error(y_real, y_pred)
+    return {
+        'r2': float(r2_score(y_real, y_pred)),
+        'mae': float(mean_absolute_error(y_real, y_pred)),
+        'mse': float(mse),
+        'rmse': float(np.sqrt(mse))
+    }
@@ -0,0 +1,194 @@
+import os
+import threading
+import joblib
+from datetime import datetime
+from decimal import Decimal
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Max
+from django.utils import timezone
+from machine_learning.models import DatasetAcademico, MetricasModelo, ModeloML
+import logging
+
+logger = logging.getLogger(__name__)
+
+FEATURES_COLUMNS = [
+    'promedio_notas_anterior',
+    'porcentaje_asistencia',
+    'promedio_participaciones',
+    'materias_cursadas',
+    'evaluaciones_completadas'
+]
+
+# Métricas de validación cruzada que se guardan en MetricasModelo
+CAMPOS_METRICAS_CV = ['mae_cv_mean', 'mae_cv_std', 'r2_cv_mean', 'r2_cv_std']
+
+# Caché en memoria compartida por todos los hilos del proceso (cada worker tiene la suya)
+_cache = {'modelo_id': None, 'artefacto': None}
+_lock = threading.Lock()
+
+
+class ModelRegistryService:
+    """Registro de modelos entrenados: artefactos versionados en disco y caché por proceso"""
+
+    def obtener_modelo_activo_id(self):
+        """ID del ModeloML activo (el más reciente si quedara más de uno; una sola consulta indexada)"""
+        return ModeloML.objects.filter(activo=True).order_by(
+            '-fecha_entrenamiento'
+        ).values_list('id', flat=True).first()
+
+    def obtener_artefacto_activo(self):
+        """
+        Devuelve el artefacto del modelo activo, cargándolo desde disco solo la
+        primera vez o cuando un ModeloML más nuevo pasa a estar activo.
+        """
+        modelo_id = self.obtener_modelo_activo_id()
+        if modelo_id is None:
+            return None
+
+        if _cache['modelo_id'] == modelo_id:
+            return _cache['artefacto']
+
+        with _lock:
+            # Otro hilo pudo haberlo cargado mientras esperábamos el lock
+            if _cache['modelo_id'] == modelo_id:
+                return _cache['artefacto']
+
+            modelo = ModeloML.objects.get(id=modelo_id)
+            artefacto = self.cargar_artefacto(modelo)
+            if artefacto is None:
+                return None
+
+            _cache['modelo_id'] = modelo_id
+            _cache['artefacto'] = artefacto
+            logger.info(f"Modelo {modelo.nombre} cargado en caché desde {modelo.archivo_modelo}")
+            return artefacto
+
+    def cargar_artefacto(self, modelo):
+        """Cargar el artefacto de un ModeloML desde su archivo"""
+        ruta = self._resolver_ruta(modelo.archivo_modelo)
+        if not ruta or not os.path.exists(ruta):
+            logger.warning(f"Archivo de modelo no encontrado: {modelo.archivo_modelo}")
+            return None
+
+        try:
+            artefacto = joblib.load(ruta)
+        except Exception as e:
+            logger.error(f"Error cargando artefacto {ruta}: {str(e)}")
+            return None
+
+        # Solo se aceptan artefactos con modelo y scaler (formato del registro)
+        if not isinstance(artefacto, dict) or 'modelo' not in artefacto or 'scaler' not in artefacto:
+            logger.warning(f"El archivo {ruta} no tiene el formato de artefacto esperado")
+            return None
+
+        artefacto.setdefault('features_columns', list(FEATURES_COLUMNS))
+        artefacto.setdefault('metricas', {})
+        artefacto['modelo_id'] = str(modelo.id)
+        artefacto['version'] = artefacto.get('version', 1)
+        return artefacto
+
+    def registrar_modelo(self, modelo, scaler, dataset, metricas,
+                         algoritmo='LINEAR_REGRESSION',
+                         tipo_modelo='Linear Regression Optimizado Realista',
+                         creado_por=None, metricas_cv=None, fecha_entrenamiento=None):
+        """
+        Guardar un modelo entrenado como artefacto versionado y registrar su ModeloML.
+        El nuevo modelo pasa a ser el único activo y reemplaza la caché de este proceso.
+        `metricas_cv` (mae_cv_mean, mae_cv_std, r2_cv_mean, r2_cv_std), si se indica,
+        se guarda en su MetricasModelo. `fecha_entrenamiento` permite fijar el corte de
+        datos del modelo (por defecto, ahora).
+        """
+        directorio = settings.ML_SETTINGS['MODELS_DIR']
+        os.makedirs(directorio, exist_ok=True)
+
+        corte_explicito = fecha_entrenamiento is not None
+        fecha_entrenamiento = fecha_entrenamiento or timezone.now()
+
+        with transaction.atomic():
+            # El lock sobre el dataset serializa los registros concurrentes: versiones sin repetir
+            DatasetAcademico.objects.select_for_update().filter(id=dataset.id).exists()
+            version = (ModeloML.objects.filter(dataset=dataset, algoritmo=algoritmo).aggregate(
+                maxima=Max('version')
+            )['maxima'] or 0) + 1
+
+            # El archivo se nombra con el id del ModeloML: nunca pisa el artefacto de otro modelo
+            modelo_db = ModeloML(
+                nombre=f"{tipo_modelo} v{version}",
+                algoritmo=algoritmo,
+                dataset=dataset,
+                version=version,
+                mae_score=self._a_decimal(metricas.get('mae')),
+                mse_score=self._a_decimal(metricas.get('mse')),
+                r2_score=self._a_decimal(metricas.get('r2')),
+                creado_por=creado_por
+            )
+            ruta = os.path.join(directorio, f"{algoritmo.lower()}_{modelo_db.id}.joblib")
+            modelo_db.archivo_modelo = ruta
+            modelo_db.save(force_insert=True)
+
+            if corte_explicito:
+                # fecha_entrenamiento es auto_now_add: el corte se fija después de crear
+                ModeloML.objects.filter(id=modelo_db.id).update(fecha_entrenamiento=fecha_entrenamiento)
+
+            if metricas_cv:
+                MetricasModelo.objects.create(
+                    modelo=modelo_db,
+                    **{campo: self._a_decimal(metricas_cv.get(campo)) for campo in CAMPOS_METRICAS_CV}
+                )
+
+            ModeloML.objects.filter(activo=True).exclude(id=modelo_db.id).update(activo=False)
+
+            artefacto = {
+                'modelo': modelo,
+                'scaler': scaler,
+                'features_columns': list(FEATURES_COLUMNS),
+                'metricas': metricas,
+                'dataset_id': str(dataset.id),
+                'tipo_modelo': tipo_modelo,
+                'fecha_entrenamiento': fecha_entrenamiento.isoformat(),
+                'total_registros': dataset.total_registros,
+                'version': version
+            }
+            # Si el archivo no se puede escribir la transacción se revierte: no queda un ModeloML sin artefacto
+            try:
+                joblib.dump(artefacto, ruta)
+            except Exception:
+                if os.path.exists(ruta):
+                    os.remove(ruta)
+                raise
+
+        artefacto['modelo_id'] = str(modelo_db.id)
+
+        with _lock:
+            _cache['modelo_id'] = modelo_db.id
+            _cache['artefacto'] = artefacto
+
+        logger.info(f"Modelo registrado: {modelo_db.nombre} en {ruta}")
+        return artefacto
+
+    def invalidar_cache(self):
+        """Forzar la recarga del modelo activo en la próxima predicción"""
+        with _lock:
+            _cache['modelo_id'] = None
+            _cache['artefacto'] = None
+
+    def _resolver_ruta(self, ruta):
+        if not ruta:
+            return None
+        if os.path.isabs(ruta):
+            return ruta
+        return os.path.join(settings.BASE_DIR, ruta)
+
+    def _a_decimal(self, valor):
+        if valor is None:
+            return None
+        return Decimal(str(round(float(valor), 4)))
+
+    @staticmethod
+    def fecha_artefacto(artefacto):
+        """Fecha de entrenamiento del artefacto como datetime"""
+        fecha = artefacto.get('fecha_entrenamiento')
+        if isinstance(fecha, str):
+            return datetime.fromisoformat(fecha)
+        return fecha
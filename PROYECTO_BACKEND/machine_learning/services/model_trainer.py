@@ -1,27 +1,41 @@
+import django
 import pandas as pd
 import numpy as np
-from sklearn.model_selection import train_test_split, GridSearchCV
+from sklearn.base import clone
+from sklearn.model_selection import KFold, train_test_split
 from sklearn.ensemble import RandomForestRegressor, GradientBoostingRegressor
 from sklearn.linear_model import LinearRegression
 from sklearn.svm import SVR
 from sklearn.preprocessing import StandardScaler
 from sklearn.metrics import mean_squared_error, r2_score, mean_absolute_error
-import joblib
-import os
+from joblib import Parallel, delayed, effective_n_jobs, parallel_config
 from django.conf import settings
-from machine_learning.models import ModeloML, RegistroEstudianteML  # Sin ResultadoEntrenamiento por ahora
-from decimal import Decimal
+from machine_learning.services.model_registry import FEATURES_COLUMNS
+from machine_learning.services.training_data import TARGET_COLUMN, TrainingDataLoader
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Tolerancia (en puntos) de accuracy_custom
+TOLERANCIA_ACCURACY = 10
+
+
 class ModelTrainerServiceSimplificado:
-    """Versión simplificada del servicio de entrenamiento"""
+    """
+    Entrenamiento y comparación de los modelos candidatos.
+
+    Cada candidato se evalúa con validación cruzada de ML_SETTINGS['DEFAULT_CV_FOLDS']
+    folds sobre la parte de entrenamiento y además se ajusta una vez sobre toda esa parte
+    para medirlo en el hold-out. Todas esas tareas (candidatos × folds + hold-out) corren
+    a la vez en un pool de procesos de joblib; el mejor modelo se elige por el R² medio
+    de la validación cruzada y no por una sola partición.
+    """
     
-    def __init__(self, dataset):
+    def __init__(self, dataset, n_jobs=None):
         self.dataset = dataset
+        self.n_jobs = n_jobs if n_jobs is not None else settings.ML_SETTINGS.get('TRAINING_N_JOBS', -1)
         self.modelos_disponibles = {
-            'random_forest': RandomForestRegressor(n_estimators=100, random_state=42),
+            'random_forest': RandomForestRegressor(n_estimators=100, random_state=42, n_jobs=self.n_jobs),
             'gradient_boosting': GradientBoostingRegressor(n_estimators=100, random_state=42),
             'linear_regression': LinearRegression(),
             'svr': SVR(kernel='rbf', C=1.0)
@@ -29,125 +43,130 @@ class ModelTrainerServiceSimplificado:
         self.scaler = StandardScaler()
         
     def cargar_datos_entrenamiento(self):
-        """Cargar datos del dataset para entrenamiento"""
+        """Cargar datos del dataset para entrenamiento (desde el snapshot si el dataset no cambió)"""
         logger.info(f"Cargando datos del dataset: {self.dataset.nombre}")
         
-        registros = RegistroEstudianteML.objects.filter(dataset=self.dataset)
-        
-        if not registros.exists():
-            raise ValueError(f"No hay datos en el dataset {self.dataset.nombre}")
-        
-        # Convertir a DataFrame
-        data = []
-        for registro in registros:
-            data.append({
-                'promedio_notas_anterior': float(registro.promedio_notas_anterior),
-                'porcentaje_asistencia': float(registro.porcentaje_asistencia),
-                'promedio_participaciones': float(registro.promedio_participaciones),
-                'materias_cursadas': registro.materias_cursadas,
-                'evaluaciones_completadas': registro.evaluaciones_completadas,
-                'rendimiento_futuro': float(registro.rendimiento_futuro)
-            })
-        
-        df = pd.DataFrame(data)
+        matriz = TrainingDataLoader().cargar(self.dataset)
+        df = pd.DataFrame(matriz, columns=FEATURES_COLUMNS + [TARGET_COLUMN], copy=False)
         logger.info(f"Datos cargados: {len(df)} registros con {len(df.columns)} columnas")
         
         return df
     
     def preparar_datos(self, df):
-        """Preparar datos para entrenamiento"""
+        """
+        Separar features y target y dividir en entrenamiento y prueba.
+        Devuelve las matrices completas y los índices de cada parte; self.scaler queda
+        ajustado sobre la parte de entrenamiento (es el que se registra con el modelo).
+        """
         logger.info("Preparando datos para entrenamiento...")
         
-        # Separar features y target
-        feature_columns = [
-            'promedio_notas_anterior',
-            'porcentaje_asistencia', 
-            'promedio_participaciones',
-            'materias_cursadas',
-            'evaluaciones_completadas'
-        ]
-        
-        X = df[feature_columns]
-        y = df['rendimiento_futuro']
+        X = df[FEATURES_COLUMNS].to_numpy(dtype=np.float64)
+        y = df[TARGET_COLUMN].to_numpy(dtype=np.float64)
         
-        # División en entrenamiento y prueba
-        X_train, X_test, y_train, y_test = train_test_split(
-            X, y, test_size=0.2, random_state=42
+        # División en entrenamiento y prueba (mismas filas que train_test_split sobre X, y)
+        indices_train, indices_test = train_test_split(
+            np.arange(len(X)),
+            test_size=settings.ML_SETTINGS.get('DEFAULT_TRAIN_TEST_SPLIT', 0.2),
+            random_state=42
         )
         
-        # Escalar features
-        X_train_scaled = self.scaler.fit_transform(X_train)
-        X_test_scaled = self.scaler.transform(X_test)
+        self.scaler.fit(X[indices_train])
         
-        logger.info(f"Datos preparados: {len(X_train)} entrenamiento, {len(X_test)} prueba")
+        logger.info(f"Datos preparados: {len(indices_train)} entrenamiento, {len(indices_test)} prueba")
         
-        return X_train_scaled, X_test_scaled, y_train, y_test, feature_columns
+        return X, y, indices_train, indices_test
     
     def evaluar_modelo(self, modelo, X_test, y_test):
         """Evaluar rendimiento del modelo"""
-        # Predicciones
-        y_pred = modelo.predict(X_test)
-        
-        # Métricas
-        mse = mean_squared_error(y_test, y_pred)
-        rmse = np.sqrt(mse)
-        mae = mean_absolute_error(y_test, y_pred)
-        r2 = r2_score(y_test, y_pred)
-        
-        # Accuracy personalizado
-        tolerancia = 10
-        predicciones_aceptables = np.abs(y_pred - y_test) <= tolerancia
-        accuracy_custom = np.mean(predicciones_aceptables) * 100
-        
-        return {
-            'mse': mse,
-            'rmse': rmse,
-            'mae': mae,
-            'r2': r2,
-            'accuracy_custom': accuracy_custom
-        }
+        return _calcular_metricas(y_test, modelo.predict(X_test))
     
-    def entrenar_todos_los_modelos(self):
-        """Entrenar y comparar todos los modelos"""
-        logger.info("Iniciando entrenamiento simplificado...")
+    def entrenar_todos_los_modelos(self, progreso=None):
+        """
+        Entrenar y comparar todos los modelos.
+        `progreso(lote_actual, total_lotes, mensaje)`, si se indica, se llama cada vez que
+        termina una tarea (un fold o el ajuste final de un modelo).
+        """
+        logger.info("Iniciando entrenamiento con validación cruzada...")
         
         # Cargar y preparar datos
         df = self.cargar_datos_entrenamiento()
-        X_train, X_test, y_train, y_test, feature_columns = self.preparar_datos(df)
+        X, y, indices_train, indices_test = self.preparar_datos(df)
         
-        resultados = {}
+        folds = min(settings.ML_SETTINGS.get('DEFAULT_CV_FOLDS', 5), len(indices_train))
+        particiones = [
+            (indices_train[ajuste], indices_train[evaluacion])
+            for ajuste, evaluacion in KFold(n_splits=folds, shuffle=True, random_state=42).split(indices_train)
+        ]
         
+        # Con varios procesos el paralelismo lo da el pool; los ensambles usan su n_jobs solo si no hay pool
+        workers = effective_n_jobs(self.n_jobs)
+        n_jobs_modelo = 1 if workers > 1 else self.n_jobs
+        
+        tareas = []
         for nombre, modelo in self.modelos_disponibles.items():
-            try:
-                logger.info(f"Entrenando: {nombre}")
-                
-                # Entrenar modelo
-                modelo.fit(X_train, y_train)
-                
-                # Evaluar modelo
-                metricas = self.evaluar_modelo(modelo, X_test, y_test)
-                
-                # Guardar resultados
-                resultados[nombre] = {
-                    'modelo': modelo,
-                    'metricas': metricas
-                }
-                
-                logger.info(f"{nombre} - R²: {metricas['r2']:.4f}, RMSE: {metricas['rmse']:.4f}")
+            for fold, (ajuste, evaluacion) in enumerate(particiones, start=1):
+                tareas.append((nombre, fold, ajuste, evaluacion))
+            # fold None: ajuste sobre todo el entrenamiento y evaluación en el hold-out
+            tareas.append((nombre, None, indices_train, indices_test))
+        
+        logger.info(f"{len(self.modelos_disponibles)} modelos × {folds} folds en {workers} procesos")
+        
+        metricas_cv = {nombre: [] for nombre in self.modelos_disponibles}
+        resultados = {}
+        errores = {}
+        
+        # Los procesos del pool importan este módulo (y los modelos de Django) al recibir la primera tarea
+        with parallel_config(backend='loky', initializer=django.setup):
+            ejecucion = Parallel(n_jobs=workers, return_as='generator_unordered')(
+                delayed(_entrenar_tarea)(nombre, fold, self.modelos_disponibles[nombre], n_jobs_modelo, X, y, ajuste, evaluacion)
+                for nombre, fold, ajuste, evaluacion in tareas
+            )
+            
+            for completadas, (nombre, fold, resultado) in enumerate(ejecucion, start=1):
+                if 'error' in resultado:
+                    logger.error(f"Error entrenando {nombre}: {resultado['error']}")
+                    errores.setdefault(nombre, resultado['error'])
+                elif fold is None:
+                    resultados[nombre] = resultado
+                else:
+                    metricas_cv[nombre].append(resultado['metricas'])
                 
-            except Exception as e:
-                logger.error(f"Error entrenando {nombre}: {str(e)}")
+                if progreso:
+                    etiqueta = 'hold-out' if fold is None else f'fold {fold}/{folds}'
+                    progreso(completadas, len(tareas), f'Modelo {nombre} ({etiqueta})')
+        
+        for nombre in self.modelos_disponibles:
+            if nombre in errores:
+                resultados[nombre] = {'error': errores[nombre]}
                 continue
+            
+            mae = np.array([metricas['mae'] for metricas in metricas_cv[nombre]])
+            r2 = np.array([metricas['r2'] for metricas in metricas_cv[nombre]])
+            resultados[nombre]['metricas'].update({
+                'mae_cv_mean': mae.mean(),
+                'mae_cv_std': mae.std(),
+                'r2_cv_mean': r2.mean(),
+                'r2_cv_std': r2.std()
+            })
+            
+            metricas = resultados[nombre]['metricas']
+            logger.info(
+                f"{nombre} - R² CV: {metricas['r2_cv_mean']:.4f} ± {metricas['r2_cv_std']:.4f}, "
+                f"R² hold-out: {metricas['r2']:.4f}, RMSE: {metricas['rmse']:.4f}"
+            )
         
-        # Seleccionar mejor modelo
+        resultados = {nombre: resultados[nombre] for nombre in self.modelos_disponibles}
+        
+        # Seleccionar mejor modelo por el R² medio de la validación cruzada
         mejor_modelo = None
-        if resultados:
-            mejor_nombre = max(resultados.keys(), key=lambda x: resultados[x]['metricas']['r2'])
+        exitosos = [nombre for nombre in resultados if 'metricas' in resultados[nombre]]
+        if exitosos:
+            mejor_nombre = max(exitosos, key=lambda x: resultados[x]['metricas']['r2_cv_mean'])
             mejor_modelo = {
                 'nombre': mejor_nombre,
                 'modelo': resultados[mejor_nombre]['modelo'],
                 'metricas': resultados[mejor_nombre]['metricas'],
-                'score_combinado': resultados[mejor_nombre]['metricas']['r2']
+                'score_combinado': resultados[mejor_nombre]['metricas']['r2_cv_mean']
             }
         
         return resultados, mejor_modelo
@@ -176,5 +195,43 @@ class ModelTrainerServiceSimplificado:
             logger.error(f"Error en predicción: {str(e)}")
             return None
 
+
+def _calcular_metricas(y_test, y_pred):
+    mse = mean_squared_error(y_test, y_pred)
+    
+    # Accuracy personalizado: predicciones a menos de TOLERANCIA_ACCURACY puntos
+    predicciones_aceptables = np.abs(y_pred - y_test) <= TOLERANCIA_ACCURACY
+    
+    return {
+        'mse': mse,
+        'rmse': np.sqrt(mse),
+        'mae': mean_absolute_error(y_test, y_pred),
+        'r2': r2_score(y_test, y_pred),
+        'accuracy_custom': np.mean(predicciones_aceptables) * 100
+    }
+
+
+def _entrenar_tarea(nombre, fold, modelo, n_jobs_modelo, X, y, indices_ajuste, indices_evaluacion):
+    """
+    Tarea del pool: escalar con las filas de ajuste, entrenar una copia del modelo y
+    evaluarla. Devuelve (nombre, fold, {'metricas', 'modelo'} o {'error'}).
+    """
+    try:
+        modelo = clone(modelo)
+        if 'n_jobs' in modelo.get_params():
+            modelo.set_params(n_jobs=n_jobs_modelo)
+        
+        scaler = StandardScaler()
+        X_ajuste = scaler.fit_transform(X[indices_ajuste])
+        modelo.fit(X_ajuste, y[indices_ajuste])
+        
+        resultado = {'metricas': _calcular_metricas(y[indices_evaluacion], modelo.predict(scaler.transform(X[indices_evaluacion])))}
+        if fold is None:
+            resultado['modelo'] = modelo
+        return nombre, fold, resultado
+        
+    except Exception as e:
+        return nombre, fold, {'error': str(e)}
+
 # Crear una instancia del servicio (ejemplo)
-# trainer = ModelTrainerServiceSimplificado()
\ No newline at end of file
+# trainer = ModelTrainerServiceSimplificado()
@@ -0,0 +1,69 @@
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.locmem import LocMemCache
+import logging
+
+logger = logging.getLogger(__name__)
+
+ALIAS_CACHE_PREDICCIONES = 'predicciones'
+
+# Decimales con que se redondean las features para la clave (los de PrediccionAcademica)
+DECIMALES_FEATURES = 2
+
+# Features de conteo: se truncan con int() antes de escalar, como en la predicción individual
+FEATURES_ENTERAS = ('materias_cursadas', 'evaluaciones_completadas')
+
+# Respaldo local (LRU acotado con TTL) si no hay caché configurada o la compartida falla
+_cache_local = LocMemCache('predicciones-ml-local', {
+    'TIMEOUT': settings.ML_SETTINGS.get('PREDICTION_CACHE_TTL', 3600),
+    'OPTIONS': {'MAX_ENTRIES': settings.ML_SETTINGS.get('PREDICTION_CACHE_MAX_ENTRIES', 50000)}
+})
+
+
+class PredictionCacheService:
+    """
+    Caché de resultados de predicción por (modelo, vector de features redondeado).
+
+    Usa CACHES['predicciones'] (Redis compartido entre workers o LocMemCache por proceso)
+    y, si no está configurada o deja de responder, una LocMemCache local. El id del
+    modelo va en la clave: al activarse otro modelo las entradas anteriores dejan de
+    usarse y vencen por TTL.
+    """
+
+    def __init__(self):
+        self.cache = caches[ALIAS_CACHE_PREDICCIONES] if ALIAS_CACHE_PREDICCIONES in settings.CACHES else _cache_local
+
+    @staticmethod
+    def normalizar(datos, columnas):
+        """Vector de features (conteos truncados, el resto redondeado): misma clave y mismo cálculo para entradas equivalentes"""
+        return tuple(
+            int(datos[columna]) if columna in FEATURES_ENTERAS else round(float(datos[columna]), DECIMALES_FEATURES)
+            for columna in columnas
+        )
+
+    def obtener_varios(self, modelo_id, vectores):
+        """Resultados en caché como {vector: resultado}"""
+        claves = {self._clave(modelo_id, vector): vector for vector in vectores}
+        encontrados = self._ejecutar('get_many', list(claves)) or {}
+        return {claves[clave]: resultado for clave, resultado in encontrados.items()}
+
+    def guardar_varios(self, modelo_id, resultados):
+        """Guardar {vector: resultado} con el TTL de la caché"""
+        self._ejecutar('set_many', {
+            self._clave(modelo_id, vector): resultado for vector, resultado in resultados.items()
+        })
+
+    def _clave(self, modelo_id, vector):
+        return f"prediccion:{modelo_id}:" + ':'.join(map(str, vector))
+
+    def _ejecutar(self, operacion, argumento):
+        """Operación sobre la caché; un fallo nunca impide predecir (se pasa a la local o se omite)"""
+        try:
+            return getattr(self.cache, operacion)(argumento)
+        except Exception as e:
+            if self.cache is _cache_local:
+                logger.warning(f"Error en la caché local de predicciones: {str(e)}")
+                return {}
+            logger.warning(f"Caché de predicciones no disponible, se usa la local: {str(e)}")
+            self.cache = _cache_local
+            return self._ejecutar(operacion, argumento)
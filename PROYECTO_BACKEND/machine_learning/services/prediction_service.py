@@ -5,7 +5,11 @@ from sklearn.preprocessing import StandardScaler
 from sklearn.linear_model import LinearRegression
 from sklearn.model_selection import train_test_split
 from sklearn.metrics import r2_score, mean_squared_error
-from machine_learning.models import ModeloML, DatasetAcademico, RegistroEstudianteML
+from django.conf import settings
+from machine_learning.models import ModeloML, DatasetAcademico, PrediccionAcademica
+from machine_learning.services.model_registry import FEATURES_COLUMNS, ModelRegistryService
+from machine_learning.services.prediction_cache import PredictionCacheService
+from machine_learning.services.training_data import TrainingDataLoader
 import logging
 
 logger = logging.getLogger(__name__)
@@ -20,44 +24,55 @@ class PredictionService:
         self.dataset_info = None
     
     def cargar_mejor_modelo(self):
-        """Cargar el mejor modelo entrenado con datos reales"""
+        """Cargar el modelo activo desde el registro (entrena y registra uno solo si no existe)"""
         try:
-            # Buscar el dataset masivo más reciente
-            dataset_masivo = DatasetAcademico.objects.filter(
-                total_registros__gte=1000
-            ).order_by('-fecha_creacion').first()
+            registry = ModelRegistryService()
+            artefacto = registry.obtener_artefacto_activo()
             
-            if not dataset_masivo:
-                logger.error("No se encontró dataset masivo")
-                return False
-            
-            # Entrenar modelo real optimizado
-            modelo_real = self._entrenar_modelo_real_optimizado(dataset_masivo)
-            
-            if modelo_real is None:
-                logger.error("Error entrenando modelo real")
-                return False
-            
-            self.modelo_cargado = modelo_real['modelo']
-            self.scaler = modelo_real['scaler']
+            if artefacto is None:
+                # Buscar el dataset masivo más reciente
+                dataset_masivo = DatasetAcademico.objects.filter(
+                    total_registros__gte=1000
+                ).order_by('-fecha_creacion').first()
+                
+                if not dataset_masivo:
+                    logger.error("No se encontró dataset masivo")
+                    return False
+                
+                # Entrenar modelo real optimizado (solo una vez, luego queda registrado)
+                modelo_real = self._entrenar_modelo_real_optimizado(dataset_masivo)
+                
+                if modelo_real is None:
+                    logger.error("Error entrenando modelo real")
+                    return False
+                
+                artefacto = registry.registrar_modelo(
+                    modelo_real['modelo'],
+                    modelo_real['scaler'],
+                    dataset_masivo,
+                    metricas={
+                        'r2': modelo_real['r2_score'],
+                        'rmse': modelo_real['rmse'],
+                        'mse': modelo_real['rmse'] ** 2
+                    }
+                )
             
-            self.features_columns = [
-                'promedio_notas_anterior',
-                'porcentaje_asistencia', 
-                'promedio_participaciones',
-                'materias_cursadas',
-                'evaluaciones_completadas'
-            ]
+            self.modelo_cargado = artefacto['modelo']
+            self.scaler = artefacto['scaler']
+            self.features_columns = artefacto['features_columns']
             
             self.dataset_info = {
-                'id': dataset_masivo.id,
-                'registros': dataset_masivo.total_registros,
-                'fecha': dataset_masivo.fecha_creacion,
-                'r2_score': modelo_real['r2_score'],
-                'rmse': modelo_real['rmse']
+                'id': artefacto.get('dataset_id'),
+                'modelo_id': artefacto.get('modelo_id'),
+                'version': artefacto.get('version'),
+                'registros': artefacto.get('total_registros', 0),
+                'fecha': ModelRegistryService.fecha_artefacto(artefacto),
+                'tipo_modelo': artefacto.get('tipo_modelo', 'Linear Regression Optimizado Realista'),
+                'r2_score': float(artefacto['metricas'].get('r2', 0.75)),
+                'rmse': float(artefacto['metricas'].get('rmse', 0.0))
             }
             
-            logger.info(f"Modelo cargado exitosamente desde dataset {dataset_masivo.id}")
+            logger.info(f"Modelo {self.dataset_info['modelo_id']} listo para predicción")
             return True
             
         except Exception as e:
@@ -67,51 +82,20 @@ class PredictionService:
     def _entrenar_modelo_real_optimizado(self, dataset):
         """Entrenar modelo real con enfoque más optimista y realista"""
         
-        # Obtener datos del dataset
-        registros = RegistroEstudianteML.objects.filter(dataset=dataset)
-        
-        if not registros.exists():
+        # Obtener datos del dataset (columnar, desde el snapshot si el dataset no cambió)
+        try:
+            X, rendimiento_original = TrainingDataLoader().cargar_xy(dataset)
+        except ValueError:
             return None
         
-        # Preparar datos con ajustes optimistas
-        X = []
-        y = []
-        
-        for registro in registros:
-            X.append([
-                float(registro.promedio_notas_anterior),
-                float(registro.porcentaje_asistencia),
-                float(registro.promedio_participaciones),
-                registro.materias_cursadas,
-                registro.evaluaciones_completadas
-            ])
-            
-            # Ajustar target para ser más optimista pero realista
-            rendimiento_original = float(registro.rendimiento_futuro)
-            promedio_anterior = float(registro.promedio_notas_anterior)
-            
-            # Aplicar ajuste optimista: mantener tendencia pero menos dramática
-            if rendimiento_original < promedio_anterior:
-                # Si la predicción original es menor, suavizar la caída
-                diferencia = promedio_anterior - rendimiento_original
-                diferencia_suavizada = diferencia * 0.3  # Reducir caída al 30%
-                rendimiento_ajustado = promedio_anterior - diferencia_suavizada
-            else:
-                # Si es mayor o igual, mantener o mejorar ligeramente
-                diferencia = rendimiento_original - promedio_anterior
-                diferencia_mejorada = diferencia * 1.2  # Aumentar mejora al 120%
-                rendimiento_ajustado = promedio_anterior + diferencia_mejorada
-            
-            # Aplicar límites realistas
-            rendimiento_final = max(
-                promedio_anterior * 0.8,  # Como mínimo 80% del rendimiento anterior
-                min(100.0, rendimiento_ajustado)  # Como máximo 100
-            )
-            
-            y.append(rendimiento_final)
+        # Ajustar target para ser más optimista pero realista
+        promedio_anterior = X[:, FEATURES_COLUMNS.index('promedio_notas_anterior')]
+        diferencia = rendimiento_original - promedio_anterior
+        # Si el rendimiento original es menor se suaviza la caída al 30%; si es mayor o igual la mejora se aumenta al 120%
+        rendimiento_ajustado = promedio_anterior + np.where(diferencia < 0, diferencia * 0.3, diferencia * 1.2)
         
-        X = np.array(X)
-        y = np.array(y)
+        # Aplicar límites realistas: como mínimo 80% del rendimiento anterior, como máximo 100
+        y = np.maximum(promedio_anterior * 0.8, np.minimum(100.0, rendimiento_ajustado))
         
         # Dividir datos
         X_train, X_test, y_train, y_test = train_test_split(
@@ -141,267 +125,304 @@ class PredictionService:
     
     def predecir_rendimiento_estudiante(self, datos_estudiante):
         """Predecir rendimiento con enfoque realista y optimista"""
+        return self.predecir_lote([datos_estudiante])[0]
+    
+    def predecir_lote(self, lista_estudiantes):
+        """
+        Predicción vectorizada: una sola matriz de features, un solo
+        scaler.transform y un solo model.predict para todo el lote.
+        Los vectores ya calculados con el modelo activo salen de PredictionCacheService.
+        Devuelve un resultado (o un dict con 'error') por cada elemento, en el mismo orden.
+        """
         
         if not self.modelo_cargado:
             if not self.cargar_mejor_modelo():
-                return {'error': 'No se pudo cargar el modelo'}
+                return [{'error': 'No se pudo cargar el modelo'} for _ in lista_estudiantes]
         
-        try:
-            # Validar datos de entrada
-            features_requeridas = [
-                'promedio_notas_anterior',
-                'porcentaje_asistencia',
-                'promedio_participaciones',
-                'materias_cursadas',
-                'evaluaciones_completadas'
-            ]
-            
-            for feature in features_requeridas:
-                if feature not in datos_estudiante:
-                    return {'error': f'Falta el campo: {feature}'}
-            
-            # Preparar features
-            features = [
-                float(datos_estudiante['promedio_notas_anterior']),
-                float(datos_estudiante['porcentaje_asistencia']),
-                float(datos_estudiante['promedio_participaciones']),
-                int(datos_estudiante['materias_cursadas']),
-                int(datos_estudiante['evaluaciones_completadas'])
-            ]
-            
-            # Escalar features
-            features_scaled = self.scaler.transform([features])
-            
-            # Hacer predicción
-            prediccion_raw = self.modelo_cargado.predict(features_scaled)[0]
-            
-            # Aplicar post-procesamiento realista
-            promedio_anterior = float(datos_estudiante['promedio_notas_anterior'])
-            asistencia = float(datos_estudiante['porcentaje_asistencia'])
-            participaciones = float(datos_estudiante['promedio_participaciones'])
-            
-            # Ajustes por lógica realista
-            prediccion_ajustada = self._aplicar_logica_realista(
-                prediccion_raw, promedio_anterior, asistencia, participaciones
-            )
-            
-            # Ajustar predicción a rango válido
-            prediccion = max(0.0, min(100.0, prediccion_ajustada))
-            
-            # Calcular nivel de confianza mejorado
-            confianza = self._calcular_confianza_mejorada(datos_estudiante, prediccion)
+        resultados = [None] * len(lista_estudiantes)
+        filas = []
+        indices = []
+        
+        # Validar datos de entrada y construir la matriz de features
+        for i, datos in enumerate(lista_estudiantes):
+            if not isinstance(datos, dict):
+                resultados[i] = {'error': 'Datos de estudiante inválidos'}
+                continue
             
-            # Generar recomendaciones inteligentes
-            recomendaciones = self._generar_recomendaciones_inteligentes(datos_estudiante, prediccion)
+            faltante = next((c for c in self.features_columns if c not in datos), None)
+            if faltante:
+                resultados[i] = {'error': f'Falta el campo: {faltante}'}
+                continue
             
-            resultado = {
-                'prediccion_rendimiento': round(prediccion, 2),
-                'confianza': round(confianza, 2),
-                'categoria': self._categorizar_rendimiento_realista(prediccion),
-                'recomendaciones': recomendaciones,
-                'modelo_info': {
-                    'dataset_registros': self.dataset_info['registros'],
-                    'fecha_entrenamiento': self.dataset_info['fecha'].strftime('%Y-%m-%d'),
-                    'tipo_modelo': 'Linear Regression Optimizado Realista',
-                    'r2_score': round(self.dataset_info['r2_score'], 4),
-                    'rmse': round(self.dataset_info['rmse'], 4)
-                }
+            try:
+                filas.append(PredictionCacheService.normalizar(datos, self.features_columns))
+                indices.append(i)
+            except (TypeError, ValueError) as e:
+                resultados[i] = {'error': f'Error en predicción: {str(e)}'}
+        
+        if not filas:
+            return resultados
+        
+        # Resultados ya calculados con este modelo para los mismos vectores; solo se calcula el resto
+        cache = PredictionCacheService()
+        modelo_id = self.dataset_info['modelo_id']
+        calculados = cache.obtener_varios(modelo_id, set(filas))
+        pendientes = [fila for fila in dict.fromkeys(filas) if fila not in calculados]
+        
+        if pendientes:
+            try:
+                nuevos = dict(zip(pendientes, self._calcular_resultados(pendientes)))
+            except Exception as e:
+                logger.error(f"Error en predicción: {str(e)}")
+                for i, fila in zip(indices, filas):
+                    if fila not in calculados:
+                        resultados[i] = {'error': f'Error en predicción: {str(e)}'}
+            else:
+                cache.guardar_varios(modelo_id, nuevos)
+                calculados.update(nuevos)
+        
+        for i, fila in zip(indices, filas):
+            if fila in calculados:
+                # Copia por elemento: quien llama puede agregar claves (p. ej. estudiante_id)
+                resultado = dict(calculados[fila])
+                resultado['modelo_info'] = dict(resultado['modelo_info'])
+                resultados[i] = resultado
+        
+        return resultados
+    
+    def _calcular_resultados(self, filas):
+        """Predicción, confianza, categoría y recomendaciones para una lista de vectores de features"""
+        X = np.array(filas, dtype=np.float64)
+        columnas = {columna: X[:, j] for j, columna in enumerate(self.features_columns)}
+        
+        promedio_anterior = columnas['promedio_notas_anterior']
+        asistencia = columnas['porcentaje_asistencia']
+        participaciones = columnas['promedio_participaciones']
+        evaluaciones = columnas['evaluaciones_completadas']
+        
+        # Escalar y predecir todo el lote de una vez
+        prediccion_raw = self.modelo_cargado.predict(self.scaler.transform(X))
+        
+        # Ajustes por lógica realista y rango válido
+        prediccion = np.clip(
+            self._aplicar_logica_realista(prediccion_raw, promedio_anterior, asistencia, participaciones),
+            0.0, 100.0
+        )
+        
+        confianza = self._calcular_confianza_mejorada(promedio_anterior, asistencia, evaluaciones)
+        categorias = self._categorizar_rendimiento_realista(prediccion)
+        recomendaciones = self._generar_recomendaciones_inteligentes(
+            promedio_anterior, asistencia, participaciones, prediccion
+        )
+        
+        predicciones_redondeadas = [round(valor, 2) for valor in prediccion.tolist()]
+        confianzas_redondeadas = [round(valor, 2) for valor in confianza.tolist()]
+        modelo_info = {
+            'dataset_registros': self.dataset_info['registros'],
+            'fecha_entrenamiento': self.dataset_info['fecha'].strftime('%Y-%m-%d'),
+            'tipo_modelo': self.dataset_info['tipo_modelo'],
+            'r2_score': round(self.dataset_info['r2_score'], 4),
+            'rmse': round(self.dataset_info['rmse'], 4)
+        }
+        
+        return [
+            {
+                'prediccion_rendimiento': predicciones_redondeadas[k],
+                'confianza': confianzas_redondeadas[k],
+                'categoria': categorias[k],
+                'recomendaciones': recomendaciones[k],
+                'modelo_info': dict(modelo_info)
             }
-            
-            return resultado
-            
-        except Exception as e:
-            logger.error(f"Error en predicción: {str(e)}")
-            return {'error': f'Error en predicción: {str(e)}'}
+            for k in range(len(filas))
+        ]
     
     def _aplicar_logica_realista(self, prediccion_raw, promedio_anterior, asistencia, participaciones):
-        """Aplicar lógica más optimista pero realista"""
+        """Aplicar lógica más optimista pero realista (sobre arrays)"""
     
         # Factores de bonificación más generosos
-        factor_asistencia = 1.0
-        if asistencia >= 85:
-            factor_asistencia = 1.08  # Aumentado de 1.05
-        elif asistencia >= 75:
-            factor_asistencia = 1.05  # Aumentado de 1.02
-        elif asistencia >= 65:
-            factor_asistencia = 1.02  # Nuevo bonus
-        elif asistencia < 60:
-            factor_asistencia = 0.97  # Menos penalización
+        factor_asistencia = np.select(
+            [asistencia >= 85, asistencia >= 75, asistencia >= 65, asistencia < 60],
+            [1.08, 1.05, 1.02, 0.97],
+            default=1.0
+        )
     
-        factor_participaciones = 1.0
-        if participaciones >= 80:
-            factor_participaciones = 1.06  # Aumentado de 1.03
-        elif participaciones >= 70:
-            factor_participaciones = 1.03  # Nuevo bonus
-        elif participaciones >= 60:
-            factor_participaciones = 1.01  # Nuevo bonus
-        elif participaciones < 50:
-            factor_participaciones = 0.98  # Menos penalización
+        factor_participaciones = np.select(
+            [participaciones >= 80, participaciones >= 70, participaciones >= 60, participaciones < 50],
+            [1.06, 1.03, 1.01, 0.98],
+            default=1.0
+        )
     
         # Aplicar factores
         prediccion_ajustada = prediccion_raw * factor_asistencia * factor_participaciones
     
         # Reglas más optimistas
-        caida_maxima = promedio_anterior * 0.10  # Reducido de 0.15 a 0.10
+        caida_maxima = promedio_anterior * 0.10
         prediccion_minima = promedio_anterior - caida_maxima
     
-        mejora_maxima = promedio_anterior * 0.25  # Aumentado de 0.20 a 0.25
-        prediccion_maxima = min(100.0, promedio_anterior + mejora_maxima)
+        mejora_maxima = promedio_anterior * 0.25
+        prediccion_maxima = np.minimum(100.0, promedio_anterior + mejora_maxima)
     
         # Bonus por buen comportamiento
-        if asistencia >= 75 and participaciones >= 65:
-            prediccion_ajustada += 2
+        prediccion_ajustada = prediccion_ajustada + np.where(
+            (asistencia >= 75) & (participaciones >= 65), 2.0, 0.0
+        )
     
         # Aplicar límites
-        prediccion_final = max(prediccion_minima, min(prediccion_maxima, prediccion_ajustada))
+        return np.maximum(prediccion_minima, np.minimum(prediccion_maxima, prediccion_ajustada))
     
-        return prediccion_final
-    
-    def _calcular_confianza_mejorada(self, datos, prediccion):
-        """Calcular confianza mejorada"""
+    def _calcular_confianza_mejorada(self, promedio, asistencia, evaluaciones):
+        """Calcular confianza mejorada (sobre arrays)"""
         
         # Confianza base del modelo
         r2_modelo = self.dataset_info.get('r2_score', 0.75)
         confianza_base = 60 + (r2_modelo * 30)  # 60-90% basado en R²
         
-        asistencia = float(datos['porcentaje_asistencia'])
-        promedio = float(datos['promedio_notas_anterior'])
-        evaluaciones = int(datos['evaluaciones_completadas'])
-        
         # Ajustes por calidad de datos
-        if asistencia >= 85 and promedio >= 75:
-            confianza_base += 8
-        elif asistencia >= 70 and promedio >= 60:
-            confianza_base += 4
-        elif asistencia < 65 or promedio < 50:
-            confianza_base -= 6
-        
-        # Ajuste por cantidad de evaluaciones
-        if evaluaciones >= 12:
-            confianza_base += 4
-        elif evaluaciones < 6:
-            confianza_base -= 4
-        
-        return max(65.0, min(95.0, confianza_base))
+        ajuste_datos = np.select(
+            [
+                (asistencia >= 85) & (promedio >= 75),
+                (asistencia >= 70) & (promedio >= 60),
+                (asistencia < 65) | (promedio < 50)
+            ],
+            [8, 4, -6],
+            default=0
+        )
+        
+        # Ajuste por cantidad de evaluaciones (se trunca como int)
+        evaluaciones = np.trunc(evaluaciones)
+        ajuste_evaluaciones = np.select([evaluaciones >= 12, evaluaciones < 6], [4, -4], default=0)
+        
+        return np.clip(confianza_base + ajuste_datos + ajuste_evaluaciones, 65.0, 95.0)
     
     def _categorizar_rendimiento_realista(self, prediccion):
-        """Categorización más optimista y realista"""
-        if prediccion >= 90:
-            return "Excelente"
-        elif prediccion >= 80:  # Cambio: de 85 a 80
-            return "Muy Bueno"
-        elif prediccion >= 70:  # Cambio: de 75 a 70
-            return "Bueno"
-        elif prediccion >= 60:  # Cambio: de 65 a 60
-            return "Regular"
-        elif prediccion >= 50:  # Cambio: de 55 a 50
-            return "Bajo"
-        else:
-            return "Crítico"
+        """Categorización más optimista y realista (sobre arrays)"""
+        return np.select(
+            [prediccion >= 90, prediccion >= 80, prediccion >= 70, prediccion >= 60, prediccion >= 50],
+            ["Excelente", "Muy Bueno", "Bueno", "Regular", "Bajo"],
+            default="Crítico"
+        ).tolist()
     
-    def _generar_recomendaciones_inteligentes(self, datos, prediccion):
-        """Generar recomendaciones inteligentes y contextuales"""
-        
-        recomendaciones = []
-        
-        asistencia = float(datos['porcentaje_asistencia'])
-        promedio = float(datos['promedio_notas_anterior'])
-        participaciones = float(datos['promedio_participaciones'])
-        
-        # Recomendaciones por categoría de rendimiento predicho
-        if prediccion >= 85:
-            recomendaciones.append({
-                'tipo': 'felicitacion',
-                'mensaje': '¡Excelente trayectoria académica! Continúa con el gran trabajo.',
-                'prioridad': 'baja'
-            })
+    def _generar_recomendaciones_inteligentes(self, promedio, asistencia, participaciones, prediccion):
+        """
+        Generar recomendaciones inteligentes y contextuales.
+        Las reglas se evalúan como máscaras sobre todo el lote; solo el
+        armado de cada lista de mensajes se hace por estudiante.
+        """
+        
+        # Recomendación principal por categoría de rendimiento predicho
+        mensajes_categoria = [
+            {'tipo': 'felicitacion', 'mensaje': '¡Excelente trayectoria académica! Continúa con el gran trabajo.', 'prioridad': 'baja'},
+            {'tipo': 'mejora', 'mensaje': 'Buen rendimiento académico. Con pequeños ajustes puedes alcanzar la excelencia.', 'prioridad': 'baja'},
+            {'tipo': 'atencion', 'mensaje': 'Rendimiento regular. Implementar estrategias de mejora te ayudará a destacar.', 'prioridad': 'media'},
+            {'tipo': 'apoyo', 'mensaje': 'Rendimiento bajo. Se recomienda buscar apoyo académico y revisar métodos de estudio.', 'prioridad': 'alta'},
+            {'tipo': 'urgente', 'mensaje': 'Situación crítica. Es fundamental buscar apoyo académico inmediato.', 'prioridad': 'alta'}
+        ]
+        categoria = np.select(
+            [prediccion >= 85, prediccion >= 75, prediccion >= 65, prediccion >= 55],
+            [0, 1, 2, 3],
+            default=4
+        ).tolist()
+        liderazgo = ((prediccion >= 85) & (asistencia >= 90) & (participaciones >= 80)).tolist()
+        
+        # Recomendaciones específicas por métricas (solo si están realmente bajas)
+        nivel_asistencia = np.select([asistencia < 65, asistencia < 80], [2, 1], default=0).tolist()
+        nivel_participacion = np.select([participaciones < 50, participaciones < 65], [2, 1], default=0).tolist()
+        
+        # Recomendaciones por tendencia
+        diferencia = prediccion - promedio
+        tendencia = np.select([diferencia < -5, diferencia > 5], [0, 1], default=2).tolist()
+        mensajes_tendencia = [
+            {'tipo': 'alerta', 'mensaje': 'Se detecta riesgo de disminución en rendimiento. Revisar estrategias de estudio.', 'prioridad': 'media'},
+            {'tipo': 'motivacion', 'mensaje': '¡Se predice una mejora en tu rendimiento! Mantén el buen trabajo.', 'prioridad': 'baja'},
+            {'tipo': 'estabilidad', 'mensaje': 'Se predice un rendimiento estable. Continúa con tus estrategias actuales.', 'prioridad': 'baja'}
+        ]
+        
+        asistencia_lista = asistencia.tolist()
+        participaciones_lista = participaciones.tolist()
+        
+        recomendaciones_lote = []
+        for k in range(len(categoria)):
+            recomendaciones = [dict(mensajes_categoria[categoria[k]])]
             
-            if asistencia >= 90 and participaciones >= 80:
+            if liderazgo[k]:
                 recomendaciones.append({
                     'tipo': 'liderazgo',
                     'mensaje': 'Considera participar en actividades de mentoría para ayudar a otros estudiantes.',
                     'prioridad': 'baja'
                 })
-                
-        elif prediccion >= 75:
-            recomendaciones.append({
-                'tipo': 'mejora',
-                'mensaje': 'Buen rendimiento académico. Con pequeños ajustes puedes alcanzar la excelencia.',
-                'prioridad': 'baja'
-            })
             
-        elif prediccion >= 65:
-            recomendaciones.append({
-                'tipo': 'atencion',
-                'mensaje': 'Rendimiento regular. Implementar estrategias de mejora te ayudará a destacar.',
-                'prioridad': 'media'
-            })
+            if nivel_asistencia[k] == 2:
+                recomendaciones.append({
+                    'tipo': 'asistencia',
+                    'mensaje': f'Mejorar asistencia es prioritario (actual: {asistencia_lista[k]:.1f}%). Meta: >75%',
+                    'prioridad': 'alta'
+                })
+            elif nivel_asistencia[k] == 1:
+                recomendaciones.append({
+                    'tipo': 'asistencia',
+                    'mensaje': f'Aumentar asistencia mejorará tu rendimiento (actual: {asistencia_lista[k]:.1f}%)',
+                    'prioridad': 'media'
+                })
+            
+            if nivel_participacion[k]:
+                recomendaciones.append({
+                    'tipo': 'participacion',
+                    'mensaje': f'Incrementar participación en clase (actual: {participaciones_lista[k]:.1f}%)',
+                    'prioridad': 'alta' if nivel_participacion[k] == 2 else 'media'
+                })
             
-        elif prediccion >= 55:
-            recomendaciones.append({
-                'tipo': 'apoyo',
-                'mensaje': 'Rendimiento bajo. Se recomienda buscar apoyo académico y revisar métodos de estudio.',
-                'prioridad': 'alta'
-            })
-        else:
-            recomendaciones.append({
-                'tipo': 'urgente',
-                'mensaje': 'Situación crítica. Es fundamental buscar apoyo académico inmediato.',
-                'prioridad': 'alta'
-            })
+            recomendaciones.append(dict(mensajes_tendencia[tendencia[k]]))
+            recomendaciones_lote.append(recomendaciones)
         
-        # Recomendaciones específicas por métricas (solo si están realmente bajas)
-        if asistencia < 65:  # Solo si está realmente baja
-            recomendaciones.append({
-                'tipo': 'asistencia',
-                'mensaje': f'Mejorar asistencia es prioritario (actual: {asistencia:.1f}%). Meta: >75%',
-                'prioridad': 'alta'
-            })
-        elif asistencia < 80:
-            recomendaciones.append({
-                'tipo': 'asistencia',
-                'mensaje': f'Aumentar asistencia mejorará tu rendimiento (actual: {asistencia:.1f}%)',
-                'prioridad': 'media'
-            })
-        
-        if participaciones < 65:  # Solo si está realmente baja
-            recomendaciones.append({
-                'tipo': 'participacion',
-                'mensaje': f'Incrementar participación en clase (actual: {participaciones:.1f}%)',
-                'prioridad': 'alta' if participaciones < 50 else 'media'
-            })
-        
-        # Recomendaciones por tendencia (más positivas)
-        diferencia = prediccion - promedio
-        if diferencia < -5:  # Solo si la caída es significativa
-            recomendaciones.append({
-                'tipo': 'alerta',
-                'mensaje': 'Se detecta riesgo de disminución en rendimiento. Revisar estrategias de estudio.',
-                'prioridad': 'media'
-            })
-        elif diferencia > 5:
-            recomendaciones.append({
-                'tipo': 'motivacion',
-                'mensaje': '¡Se predice una mejora en tu rendimiento! Mantén el buen trabajo.',
-                'prioridad': 'baja'
-            })
-        elif abs(diferencia) <= 5:
-            recomendaciones.append({
-                'tipo': 'estabilidad',
-                'mensaje': 'Se predice un rendimiento estable. Continúa con tus estrategias actuales.',
-                'prioridad': 'baja'
-            })
-        
-        return recomendaciones
+        return recomendaciones_lote
+    
+    def guardar_prediccion(self, estudiante, datos_estudiante, resultado, realizada_por=None):
+        """
+        Registrar una predicción en el historial del estudiante.
+        Si ya existe una con el mismo modelo y las mismas entradas se reutiliza en vez de
+        duplicarla; después de crear se recorta el historial a MAX_PREDICTIONS_HISTORY
+        (las predicciones validadas no se borran). Devuelve (prediccion, creada).
+        """
+        vector = PredictionCacheService.normalizar(datos_estudiante, FEATURES_COLUMNS)
+        entradas = {
+            columna: valor if isinstance(valor, int) else Decimal(str(valor))
+            for columna, valor in zip(FEATURES_COLUMNS, vector)
+        }
+        modelo_id = self.dataset_info['modelo_id']
+        
+        existente = PrediccionAcademica.objects.filter(
+            estudiante=estudiante, modelo_id=modelo_id, **entradas
+        ).first()
+        if existente:
+            return existente, False
+        
+        prediccion = resultado['prediccion_rendimiento']
+        nueva = PrediccionAcademica.objects.create(
+            estudiante=estudiante,
+            modelo_id=modelo_id,
+            prediccion_numerica=Decimal(str(prediccion)),
+            nivel_rendimiento='ALTO' if prediccion >= 80 else 'MEDIO' if prediccion >= 60 else 'BAJO',
+            confianza=Decimal(str(round(resultado['confianza'] / 100, 4))),
+            realizada_por=realizada_por,
+            **entradas
+        )
+        
+        maximo = settings.ML_SETTINGS.get('MAX_PREDICTIONS_HISTORY', 50)
+        sobrantes = list(
+            PrediccionAcademica.objects.filter(estudiante=estudiante, validada=False)
+            .order_by('-fecha_prediccion').values_list('id', flat=True)[maximo:]
+        )
+        if sobrantes:
+            PrediccionAcademica.objects.filter(id__in=sobrantes).delete()
+        
+        return nueva, True
     
     def predecir_multiples_estudiantes(self, lista_estudiantes):
-        """Predecir rendimiento para múltiples estudiantes"""
+        """Predecir rendimiento para múltiples estudiantes en un solo lote vectorizado"""
         
-        resultados = []
+        resultados = self.predecir_lote(lista_estudiantes)
         
-        for i, datos in enumerate(lista_estudiantes):
-            resultado = self.predecir_rendimiento_estudiante(datos)
+        for i, resultado in enumerate(resultados):
             resultado['estudiante_id'] = i + 1
-            resultados.append(resultado)
         
-        return resultados
\ No newline at end of file
+        return resultados
@@ -0,0 +1,102 @@
+from machine_learning.models import DatasetAcademico, ModeloML
+from machine_learning.serializers import DatasetAcademicoSerializer
+from machine_learning.services.data_collector import DataCollectorService
+from machine_learning.services.incremental_trainer import IncrementalTrainerService
+from machine_learning.services.model_registry import ModelRegistryService
+from machine_learning.services.model_trainer import ModelTrainerServiceSimplificado
+from Usuarios.models import Usuario
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Manejadores de los trabajos ML de la cola (ver Cursos.services.trabajo_service.MANEJADORES).
+# Reciben los parámetros del trabajo y un callback progreso(lote_actual, total_lotes, mensaje).
+
+
+def crear_dataset(parametros, progreso=None):
+    """Crear un dataset recolectando los datos por shards de estudiantes"""
+    collector = DataCollectorService()
+    collector.crear_dataset(
+        parametros['nombre'],
+        parametros.get('descripcion', ''),
+        parametros.get('año_inicio', 2022),
+        parametros.get('año_fin', 2024)
+    )
+
+    def reportar_shard(info):
+        if progreso:
+            progreso(
+                info['completados'],
+                info['total_shards'],
+                f"Shard {info['shard']}/{info['total_shards']}: {info['registros']} registros"
+            )
+
+    # El paralelismo lo da el pool de procesar_trabajos; por defecto los shards corren en este proceso
+    datos_raw = collector.recolectar_datos_masivos_optimizado(
+        batch_size=parametros.get('batch_size', 50),
+        num_workers=parametros.get('num_workers', 1),
+        progreso=reportar_shard
+    )
+    datos_limpios = collector.limpiar_y_normalizar_datos(datos_raw)
+    dataset = collector.guardar_dataset_procesado(datos_limpios)
+
+    return {
+        'mensaje': 'Dataset creado exitosamente',
+        'dataset': DatasetAcademicoSerializer(dataset).data
+    }
+
+
+def entrenar_modelos(parametros, progreso=None):
+    """
+    Entrenar todos los modelos de un dataset (validación cruzada en paralelo) y registrar
+    el mejor como modelo activo, con sus métricas de validación cruzada
+    """
+    dataset = DatasetAcademico.objects.get(id=parametros['dataset_id'])
+
+    trainer = ModelTrainerServiceSimplificado(dataset)
+    resultados, mejor_modelo = trainer.entrenar_todos_los_modelos(progreso=progreso)
+
+    respuesta = {
+        'mensaje': 'Entrenamiento completado',
+        'dataset': dataset.nombre,
+        'resultados': {}
+    }
+
+    for algoritmo, resultado in resultados.items():
+        if 'error' in resultado:
+            respuesta['resultados'][algoritmo] = {
+                'estado': 'error',
+                'mensaje': resultado['error']
+            }
+        else:
+            metricas = {nombre: float(valor) for nombre, valor in resultado['metricas'].items()}
+            respuesta['resultados'][algoritmo] = {
+                'estado': 'exitoso',
+                'metricas': metricas,
+                'precision': f"{metricas['r2'] * 100:.2f}%"
+            }
+
+    if mejor_modelo:
+        algoritmo = mejor_modelo['nombre'].upper()
+        artefacto = ModelRegistryService().registrar_modelo(
+            mejor_modelo['modelo'],
+            trainer.scaler,
+            dataset,
+            respuesta['resultados'][mejor_modelo['nombre']]['metricas'],
+            algoritmo=algoritmo,
+            tipo_modelo=dict(ModeloML.ALGORITMOS).get(algoritmo, mejor_modelo['nombre']),
+            metricas_cv=mejor_modelo['metricas']
+        )
+        respuesta['resultados'][mejor_modelo['nombre']]['modelo_id'] = artefacto['modelo_id']
+        respuesta['mejor_modelo'] = mejor_modelo['nombre']
+
+    return respuesta
+
+
+def reentrenar_modelo(parametros, progreso=None):
+    """Actualizar el modelo activo con los registros nuevos; se promueve solo si no empeora"""
+    creado_por = None
+    if parametros.get('usuario_id'):
+        creado_por = Usuario.objects.filter(id=parametros['usuario_id']).first()
+
+    return IncrementalTrainerService().reentrenar(creado_por=creado_por, progreso=progreso)
@@ -0,0 +1,124 @@
+import os
+import itertools
+import tempfile
+import numpy as np
+from django.conf import settings
+from django.db.models import F, FloatField
+from django.db.models.functions import Cast
+from machine_learning.models import RegistroEstudianteML
+from machine_learning.services.model_registry import FEATURES_COLUMNS
+import logging
+
+logger = logging.getLogger(__name__)
+
+TARGET_COLUMN = 'rendimiento_futuro'
+
+# Filas por viaje al cursor (en PostgreSQL es un cursor del lado del servidor)
+TAMAÑO_BLOQUE_LECTURA = 20000
+
+
+class TrainingDataLoader:
+    """
+    Carga columnar de los registros de un dataset para entrenamiento.
+
+    Se leen solo las cinco features y el target con values_list, convertidos a float
+    en la propia consulta, y se vuelcan a una matriz float64 sin crear instancias
+    ni diccionarios por fila. La matriz se guarda como snapshot .npy identificado por
+    el id del dataset y su fecha_actualizacion (la actualizan la recolección, la
+    sincronización incremental y el generador), así que los siguientes entrenamientos
+    sobre el mismo dataset la abren con mmap sin consultar la base.
+    """
+
+    def __init__(self, usar_cache=True, directorio=None):
+        self.usar_cache = usar_cache
+        self.directorio = directorio or settings.ML_SETTINGS['TRAINING_CACHE_DIR']
+
+    def cargar(self, dataset):
+        """Matriz (registros × 6) float64: FEATURES_COLUMNS seguidas de TARGET_COLUMN"""
+        ruta = self._ruta_snapshot(dataset)
+
+        if self.usar_cache and os.path.exists(ruta):
+            logger.info(f"Datos del dataset {dataset.nombre} desde snapshot {ruta}")
+            return np.load(ruta, mmap_mode='r')
+
+        matriz = self._leer_base(dataset)
+        if not len(matriz):
+            raise ValueError(f"No hay datos en el dataset {dataset.nombre}")
+
+        if self.usar_cache:
+            self._guardar_snapshot(dataset, ruta, matriz)
+
+        return matriz
+
+    def cargar_xy(self, dataset):
+        """Features (registros × 5) y target (registros,) como arreglos float64"""
+        matriz = self.cargar(dataset)
+        return matriz[:, :len(FEATURES_COLUMNS)], matriz[:, len(FEATURES_COLUMNS)]
+
+    def cargar_rango(self, dataset, desde=None, hasta=None, limite=None, recientes=False):
+        """
+        Matriz de los registros con fecha_registro en (desde, hasta], sin snapshot.
+        Con `limite` se leen solo esa cantidad (los de id más alto si `recientes`).
+        """
+        registros = RegistroEstudianteML.objects.filter(dataset=dataset)
+        if desde is not None:
+            registros = registros.filter(fecha_registro__gt=desde)
+        if hasta is not None:
+            registros = registros.filter(fecha_registro__lte=hasta)
+        registros = registros.order_by('-id') if recientes else registros.order_by()
+        if limite is not None:
+            registros = registros[:limite]
+        return self._leer(registros)
+
+    def invalidar(self, dataset):
+        """Borrar los snapshots guardados de un dataset"""
+        self._borrar_snapshots(dataset, conservar=None)
+
+    def _leer_base(self, dataset):
+        matriz = self._leer(RegistroEstudianteML.objects.filter(dataset=dataset).order_by())
+        logger.info(f"Datos cargados del dataset {dataset.nombre}: {len(matriz)} registros")
+        return matriz
+
+    def _leer(self, registros):
+        columnas = FEATURES_COLUMNS + [TARGET_COLUMN]
+        filas = registros.values_list(
+            *[Cast(F(columna), FloatField()) for columna in columnas]
+        ).iterator(chunk_size=TAMAÑO_BLOQUE_LECTURA)
+
+        # Las tuplas del cursor se aplanan directo al buffer del arreglo, bloque por bloque
+        valores = np.fromiter(itertools.chain.from_iterable(filas), dtype=np.float64)
+        return valores.reshape(-1, len(columnas))
+
+    def _ruta_snapshot(self, dataset):
+        marca = int(dataset.fecha_actualizacion.timestamp() * 1_000_000)
+        return os.path.join(self.directorio, f"dataset_{dataset.id}_{marca}.npy")
+
+    def _guardar_snapshot(self, dataset, ruta, matriz):
+        try:
+            os.makedirs(self.directorio, exist_ok=True)
+            # Escribir aparte y renombrar: otro proceso nunca ve un snapshot a medias
+            descriptor, temporal = tempfile.mkstemp(dir=self.directorio, suffix='.npy.tmp')
+            with os.fdopen(descriptor, 'wb') as archivo:
+                np.save(archivo, matriz)
+            os.replace(temporal, ruta)
+        except OSError as e:
+            logger.warning(f"No se pudo guardar el snapshot {ruta}: {str(e)}")
+            return
+
+        self._borrar_snapshots(dataset, conservar=ruta)
+
+    def _borrar_snapshots(self, dataset, conservar):
+        """Snapshots de versiones anteriores del dataset ya no se pueden volver a usar"""
+        prefijo = f"dataset_{dataset.id}_"
+        try:
+            nombres = os.listdir(self.directorio)
+        except FileNotFoundError:
+            return
+
+        for nombre in nombres:
+            ruta = os.path.join(self.directorio, nombre)
+            if nombre.startswith(prefijo) and nombre.endswith('.npy') and ruta != conservar:
+                try:
+                    os.remove(ruta)
+                except OSError:
+                    pass
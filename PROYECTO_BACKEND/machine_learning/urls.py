@@ -7,9 +7,11 @@ urlpatterns = [
     # Gestión de datasets
     path('crear-dataset/', ml_controllers.crear_dataset, name='crear_dataset'),
     path('datasets/', ml_controllers.obtener_datasets, name='obtener_datasets'),
+    path('datasets/<uuid:dataset_id>/actualizar/', ml_controllers.actualizar_dataset, name='actualizar_dataset'),
     
     # Entrenamiento de modelos
     path('entrenar-modelos/<uuid:dataset_id>/', ml_controllers.entrenar_modelos, name='entrenar_modelos'),
+    path('reentrenar-modelo/', ml_controllers.reentrenar_modelo, name='reentrenar_modelo'),
     path('modelos/', ml_controllers.obtener_modelos, name='obtener_modelos'),
     path('modelo/<uuid:modelo_id>/estadisticas/', ml_controllers.estadisticas_modelo, name='estadisticas_modelo'),
     